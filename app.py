@@ -7,11 +7,30 @@ Cobertura: 200+ serviços AWS
 import os
 import sys
 import json
+import time
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, send_file, render_template_string, request, send_from_directory
+from flask import Flask, jsonify, send_file, render_template_string, request, send_from_directory, g
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from src.finops_aws.dashboard.http_cache import (
+    HTTPResponseCache, apply_cached_response, is_compressible, is_immutable_asset,
+    make_etag, CachedResponse, NO_STORE, REVALIDATE, IMMUTABLE
+)
+from src.finops_aws.dashboard.recommendation_index import (
+    RecommendationIndex, RecommendationQuery, InvalidCursorError
+)
+from src.finops_aws.dashboard.jobs import get_job_queue, JobPriority, JobStatus
+from src.finops_aws.analytics.cost_history import get_cost_history_store
+from src.finops_aws.analytics.cost_cube import get_cost_cube, materialize_cost_cube
+from src.finops_aws.pricing import get_price_index
+from src.finops_aws.dashboard.compute_optimizer_collector import get_compute_optimizer_snapshot
+from src.finops_aws.dashboard.trusted_advisor_collector import TrustedAdvisorCollector
+from src.finops_aws.dashboard.progress_stream import (
+    get_progress_broker, stage_progress_callback, state_manager_listener,
+    EVENT_STARTED, EVENT_RECOMMENDATIONS, EVENT_COMPLETE, EVENT_ERROR
+)
+
 # Serve React frontend static files from frontend/dist
 frontend_dist = os.path.join(os.path.dirname(__file__), 'frontend', 'dist')
 
@@ -35,6 +54,19 @@ _multi_region_cache = {
 import threading
 _multi_region_lock = threading.Lock()
 
+# Cache HTTP (ETag/304/compressão) versionado pelo snapshot de análise
+_http_cache = HTTPResponseCache()
+
+# Rotas GET cujo conteúdo deriva exclusivamente do snapshot em cache
+SNAPSHOT_ROUTES = (
+    '/api/v1/reports/latest',
+    '/api/v1/recommendations',
+    '/api/v1/notifications',
+    '/api/v1/costs',
+    '/api/v1/analytics',
+    '/api/v1/export/',
+)
+
 def get_cached_analysis():
     """Retorna análise do cache ou executa nova se expirado."""
     now = datetime.now()
@@ -46,12 +78,16 @@ def get_cached_analysis():
         if age < _analysis_cache['ttl_seconds']:
             return _analysis_cache['data']
     
+    # Materializa o cubo de custos compartilhado pelos serviços FinOps
+    refresh_cost_cube()
+    
     # Executa nova análise
     analysis = get_aws_analysis_internal()
     
     # Salva no cache
     _analysis_cache['data'] = analysis
     _analysis_cache['timestamp'] = now
+    _http_cache.bump_version()
     
     return analysis
 
@@ -59,16 +95,87 @@ def invalidate_cache():
     """Invalida o cache para forçar nova análise."""
     _analysis_cache['data'] = None
     _analysis_cache['timestamp'] = None
+    _http_cache.bump_version()
 
-@app.after_request
-def add_header(response):
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+
+def is_snapshot_fresh():
+    """Indica se o snapshot de análise em cache ainda está dentro do TTL."""
+    if _analysis_cache['data'] is None or _analysis_cache['timestamp'] is None:
+        return False
+    age = (datetime.now() - _analysis_cache['timestamp']).total_seconds()
+    return age < _analysis_cache['ttl_seconds']
+
+
+def _is_snapshot_route(path):
+    return any(path == route or (route.endswith('/') and path.startswith(route))
+               for route in SNAPSHOT_ROUTES)
+
+
+def _http_cache_key():
+    return f"{request.method}:{request.full_path}"
+
+@app.before_request
+def serve_from_http_cache():
+    """Responde rotas do snapshot direto do cache HTTP (304 ou corpo pré-comprimido)."""
+    if request.method != 'GET' or not _is_snapshot_route(request.path):
+        return None
+    if not is_snapshot_fresh():
+        return None
+    entry = _http_cache.get(_http_cache_key())
+    if entry is None:
+        return None
+    g.http_cache_handled = True
+    response = app.response_class(mimetype=entry.mimetype)
+    return apply_cached_response(response, entry, request.headers, _http_cache)
+
+
+def _apply_cache_policy(response):
+    """Define Cache-Control/ETag/compressão conforme o tipo de resposta."""
+    if getattr(g, 'http_cache_handled', False):
+        return response
+
+    if request.endpoint in ('static', 'serve_static') and is_immutable_asset(request.path.lstrip('/')):
+        if response.status_code == 200 and is_compressible(response.mimetype):
+            key = f"static:{request.path}"
+            entry = _http_cache.get(key)
+            if entry is None:
+                response.direct_passthrough = False
+                entry = _http_cache.put(key, response.get_data(), response.mimetype, versioned=False)
+            return apply_cached_response(response, entry, request.headers, _http_cache, IMMUTABLE)
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    if (request.method == 'GET' and response.status_code == 200
+            and request.path.startswith('/api/')
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and is_compressible(response.mimetype)):
+        body = response.get_data()
+        if _is_snapshot_route(request.path) and is_snapshot_fresh():
+            entry = _http_cache.put(_http_cache_key(), body, response.mimetype)
+        else:
+            entry = CachedResponse(body=body, etag=make_etag(body), mimetype=response.mimetype)
+        return apply_cached_response(response, entry, request.headers, _http_cache)
+
+    if request.method == 'GET' and request.endpoint in ('static', 'serve_static', 'serve_react_app', 'index'):
+        # index.html e arquivos sem hash: revalidação via ETag do Flask
+        response.headers['Cache-Control'] = REVALIDATE
+        return response
+
+    response.headers['Cache-Control'] = NO_STORE
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
+    return response
+
+
+@app.after_request
+def add_header(response):
+    response = _apply_cache_policy(response)
     # CORS headers for direct frontend access (bypassing proxy for long APIs)
     response.headers['Access-Control-Allow-Origin'] = '*'
     response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match'
+    response.headers['Access-Control-Expose-Headers'] = 'ETag'
     return response
 
 
@@ -134,7 +241,7 @@ def get_all_services_analysis(region):
             vol_type = vol.get('VolumeType', '')
             
             if state == 'available' and not attachments:
-                monthly_cost = size * 0.10
+                monthly_cost = size * get_price_index().ebs_gb_month(vol_type, region)
                 recommendations.append({
                     'type': 'EBS_ORPHAN',
                     'resource': vol_id,
@@ -5955,35 +6062,19 @@ def get_all_services_analysis(region):
 
 
 def get_compute_optimizer_recommendations(region):
-    """Obtém recomendações do AWS Compute Optimizer para EC2."""
-    import boto3
+    """Obtém recomendações do AWS Compute Optimizer (EC2, EBS, Lambda, ASG e ECS)."""
     recommendations = []
     
     try:
-        co = boto3.client('compute-optimizer', region_name=region)
-        
-        ec2_recs = co.get_ec2_instance_recommendations()
-        for rec in ec2_recs.get('instanceRecommendations', []):
-            instance_id = rec.get('instanceArn', '').split('/')[-1]
-            finding = rec.get('finding', '')
-            
-            if finding in ['OVER_PROVISIONED', 'UNDER_PROVISIONED']:
-                current_type = rec.get('currentInstanceType', '')
-                rec_options = rec.get('recommendationOptions', [])
-                
-                if rec_options:
-                    best_option = rec_options[0]
-                    recommended_type = best_option.get('instanceType', '')
-                    savings = best_option.get('estimatedMonthlySavings', {}).get('value', 0)
-                    
-                    recommendations.append({
-                        'type': 'COMPUTE_OPTIMIZER_EC2',
-                        'resource': instance_id,
-                        'description': f'EC2 {instance_id}: {current_type} → {recommended_type} ({finding})',
-                        'impact': 'high',
-                        'savings': round(savings, 2),
-                        'source': 'AWS Compute Optimizer'
-                    })
+        for rec in get_compute_optimizer_snapshot([region]).to_recommendations():
+            recommendations.append({
+                'type': rec['type'],
+                'resource': rec['resource_id'],
+                'description': rec['description'],
+                'impact': 'high' if rec['priority'] == 'HIGH' else 'medium',
+                'savings': rec['savings'],
+                'source': 'AWS Compute Optimizer'
+            })
     except Exception:
         pass
     
@@ -6051,40 +6142,18 @@ def get_cost_explorer_ri_recommendations(region):
 
 def get_trusted_advisor_recommendations():
     """Obtém recomendações do AWS Trusted Advisor."""
-    import boto3
     recommendations = []
     
     try:
-        support = boto3.client('support', region_name='us-east-1')
-        
-        checks = support.describe_trusted_advisor_checks(language='en')
-        
-        cost_checks = [c for c in checks.get('checks', []) if c.get('category') == 'cost_optimizing']
-        
-        for check in cost_checks[:10]:
-            check_id = check.get('id')
-            check_name = check.get('name')
-            
-            try:
-                result = support.describe_trusted_advisor_check_result(checkId=check_id, language='en')
-                status = result.get('result', {}).get('status', '')
-                
-                if status in ['warning', 'error']:
-                    flagged = result.get('result', {}).get('flaggedResources', [])
-                    
-                    for resource in flagged[:5]:
-                        metadata = resource.get('metadata', [])
-                        
-                        recommendations.append({
-                            'type': 'TRUSTED_ADVISOR',
-                            'resource': metadata[0] if metadata else 'N/A',
-                            'description': f'{check_name}',
-                            'impact': 'high' if status == 'error' else 'medium',
-                            'savings': 0,
-                            'source': 'AWS Trusted Advisor'
-                        })
-            except Exception:
-                pass
+        for rec in TrustedAdvisorCollector().collect().iter_recommendations():
+            recommendations.append({
+                'type': 'TRUSTED_ADVISOR',
+                'resource': rec['resource_id'],
+                'description': rec['description'],
+                'impact': 'high' if rec['priority'] == 'HIGH' else 'medium',
+                'savings': rec['savings'],
+                'source': 'AWS Trusted Advisor'
+            })
     except Exception as e:
         if 'SubscriptionRequiredException' in str(e):
             recommendations.append({
@@ -6182,25 +6251,95 @@ def health():
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
 
 
+COST_HISTORY_RETRY_SECONDS = 900
+_cost_history_sync = {'last_attempt': 0.0}
+
+COST_HISTORY_TAG_KEYS = [
+    key.strip() for key in os.environ.get('FINOPS_COST_HISTORY_TAGS', '').split(',') if key.strip()
+]
+
+
+def sync_cost_history(force=False):
+    """
+    Atualiza o histórico diário de custos a partir do Cost Explorer e,
+    se configurado, do CUR em Parquet (conta e usage_type por linha).
+    
+    Incremental: busca só os dias novos (mais a janela de reapuração) e
+    aplica a retenção configurada. Retorna None se não houve sincronização.
+    """
+    store = get_cost_history_store()
+    if not force and not store.needs_sync():
+        return None
+    if not force and time.time() - _cost_history_sync['last_attempt'] < COST_HISTORY_RETRY_SECONDS:
+        return None
+    _cost_history_sync['last_attempt'] = time.time()
+    try:
+        import boto3
+        ce = boto3.client('ce', region_name='us-east-1')
+        result = store.sync_from_cost_explorer(ce, tag_keys=COST_HISTORY_TAG_KEYS)
+        from src.finops_aws.services.cur_ingestion_service import CURIngestionService
+        reader = CURIngestionService().get_parquet_reader()
+        if reader is not None:
+            result['cur'] = store.sync_from_cur(reader)
+        store.apply_retention()
+        _http_cache.bump_version()
+        return result
+    except Exception as e:
+        print(f"Erro ao sincronizar histórico de custos: {e}")
+        return None
+
+
+def refresh_cost_cube():
+    """
+    Materializa o cubo de custos (dia × serviço × região × conta × tags).
+    
+    Executado uma vez por refresh da análise: alocação, showback, unit
+    economics, insights em tempo real e KPIs passam a ler do cubo em vez
+    de consultar o Cost Explorer cada um com seu GroupBy.
+    """
+    try:
+        import boto3
+        ce = boto3.client('ce', region_name='us-east-1')
+        return materialize_cost_cube(ce)
+    except Exception as e:
+        print(f"Erro ao materializar cubo de custos: {e}")
+        return None
+
+
+def execute_full_analysis():
+    """Invalida o cache e executa análise completa (rota síncrona e job 'analysis')."""
+    invalidate_cache()
+    
+    analysis = get_aws_analysis()
+    sync_cost_history(force=True)
+    
+    execution_id = f"exec-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    
+    services_count = analysis.get('resources', {}).get('_services_analyzed_count', 0)
+    
+    return {
+        'status': 'success',
+        'execution_id': execution_id,
+        'services_analyzed': services_count,
+        'data': analysis
+    }
+
+
 @app.route('/api/v1/analysis', methods=['POST'])
 def run_analysis():
-    """Executa análise completa de custos AWS."""
+    """
+    Executa análise completa de custos AWS.
+    
+    Com {"async": true} no corpo (ou ?async=true) enfileira um job e
+    responde 202 com o job_id em vez de bloquear a requisição.
+    """
     try:
-        # Invalida cache para forçar nova análise
-        invalidate_cache()
-        
-        analysis = get_aws_analysis()
-        
-        execution_id = f"exec-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        data = request.get_json(silent=True) or {}
+        if _wants_async(data):
+            priority = data.get('priority', JobPriority.INTERACTIVE.name)
+            return _submit_job_response('analysis', _job_payload(data), priority)
         
-        services_count = analysis.get('resources', {}).get('_services_analyzed_count', 0)
-        
-        return jsonify({
-            'status': 'success',
-            'execution_id': execution_id,
-            'services_analyzed': services_count,
-            'data': analysis
-        })
+        return jsonify(execute_full_analysis())
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
@@ -6265,11 +6404,88 @@ def get_latest_report():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+_recommendation_index = {'sources': None, 'version': 0, 'index': None}
+_recommendation_index_lock = threading.Lock()
+
+
+def get_recommendation_index():
+    """
+    Retorna o índice de recomendações do snapshot atual.
+    
+    O índice inclui as recomendações consolidadas da análise multi-região
+    quando disponíveis e é reconstruído só quando a análise ou o resultado
+    multi-região mudam; a versão própria (usada nos cursores) não avança
+    com outras invalidações do cache HTTP, como a sincronização do
+    histórico de custos.
+    """
+    analysis = _analysis_cache['data']
+    if analysis is None:
+        return None
+    
+    sources = (analysis, _multi_region_cache['data'])
+    with _recommendation_index_lock:
+        current = _recommendation_index['sources']
+        if current is None or any(old is not new for old, new in zip(current, sources)):
+            recommendations = list(analysis.get('recommendations', []))
+            multi_region_data = sources[1] or {}
+            recommendations.extend(multi_region_data.get('consolidated_recommendations', []))
+            version = _recommendation_index['version'] + 1
+            _recommendation_index['index'] = RecommendationIndex(
+                recommendations,
+                version=version,
+                default_region=analysis.get('region')
+            )
+            _recommendation_index['sources'] = sources
+            _recommendation_index['version'] = version
+        return _recommendation_index['index']
+
+
+@app.route('/api/v1/recommendations')
+def query_recommendations():
+    """
+    Consulta paginada de recomendações com filtros e ordenação no servidor.
+    
+    Query params:
+        type, service, region, priority: filtros (valores separados por vírgula)
+        min_savings, max_savings: faixa de economia mensal
+        q: busca textual em título, descrição e recurso
+        sort: savings | priority | type | service | region | title
+        order: asc | desc
+        limit: itens por página (máx. 500)
+        cursor: cursor retornado em next_cursor
+        facets: 'true' para incluir contagens por campo
+    """
+    try:
+        index = get_recommendation_index()
+        if index is None:
+            return jsonify({
+                'status': 'no_data',
+                'message': 'Nenhuma análise disponível. Clique em Atualizar para executar.',
+                'data': {'items': [], 'total': 0, 'next_cursor': None}
+            })
+        
+        query = RecommendationQuery.from_args(request.args)
+        page = index.query(query)
+        if request.args.get('facets', 'false').lower() == 'true':
+            page['facets'] = index.facets()
+        
+        return jsonify({'status': 'success', 'data': page})
+    except InvalidCursorError as e:
+        return jsonify({'status': 'error', 'code': 'invalid_cursor', 'message': str(e)}), 400
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @app.route('/api/v1/export/<format>')
 def export_report(format):
     """Exporta relatório em diferentes formatos (csv, json, html)."""
     from flask import Response
     try:
+        if _wants_async({}):
+            return _submit_job_response('export', {'format': format}, JobPriority.INTERACTIVE)
+        
         from src.finops_aws.dashboard import export_to_csv, export_to_json, export_to_html
         
         analysis = get_aws_analysis()
@@ -6296,44 +6512,48 @@ def export_report(format):
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-@app.route('/api/v1/ai-report', methods=['POST'])
-def generate_ai_report():
-    """Consultor FinOps Expert - Especialista completo em FinOps AWS."""
-    try:
-        data = request.get_json() or {}
-        provider_name = data.get('provider', 'perplexity')
-        persona_name = data.get('persona', 'ANALYST')
-        question = data.get('question', '')
-        
-        from src.finops_aws.ai_consultant.providers import AIProviderFactory
-        from src.finops_aws.ai_consultant.providers.base_provider import PersonaType
-        
-        persona_map = {
-            'EXECUTIVE': PersonaType.EXECUTIVE,
-            'CTO': PersonaType.CTO,
-            'DEVOPS': PersonaType.DEVOPS,
-            'ANALYST': PersonaType.ANALYST
-        }
-        persona = persona_map.get(persona_name, PersonaType.ANALYST)
-        
-        provider = AIProviderFactory.create(provider_name)
-        
-        health = provider.health_check()
-        if not health.get('healthy'):
-            return jsonify({
-                'status': 'error',
-                'message': f'Provedor {provider_name} indisponível: {health.get("details", {}).get("error", "Erro desconhecido")}'
-            }), 400
-        
-        # Usa cache se disponível, senão usa dados vazios (não executa análise completa)
-        if _analysis_cache['data'] is not None:
-            analysis = _analysis_cache['data']
-        else:
-            analysis = {'costs': {}, 'resources': {}, 'recommendations': []}
-        costs = analysis.get('costs', {})
-        resources = analysis.get('resources', {})
-        
-        finops_expert_system_prompt = """Você é o MAIOR ESPECIALISTA EM FINOPS do mundo.
+def build_ai_report(data):
+    """
+    Gera relatório do Consultor FinOps Expert.
+    
+    Usado pela rota síncrona e pelo job assíncrono 'ai_report'.
+    
+    Returns:
+        Tupla (payload, status HTTP)
+    """
+    provider_name = data.get('provider', 'perplexity')
+    persona_name = data.get('persona', 'ANALYST')
+    question = data.get('question', '')
+    
+    from src.finops_aws.ai_consultant.providers import AIProviderFactory
+    from src.finops_aws.ai_consultant.providers.base_provider import PersonaType
+    
+    persona_map = {
+        'EXECUTIVE': PersonaType.EXECUTIVE,
+        'CTO': PersonaType.CTO,
+        'DEVOPS': PersonaType.DEVOPS,
+        'ANALYST': PersonaType.ANALYST
+    }
+    persona = persona_map.get(persona_name, PersonaType.ANALYST)
+    
+    provider = AIProviderFactory.create(provider_name)
+    
+    health = provider.health_check()
+    if not health.get('healthy'):
+        return {
+            'status': 'error',
+            'message': f'Provedor {provider_name} indisponível: {health.get("details", {}).get("error", "Erro desconhecido")}'
+        }, 400
+    
+    # Usa cache se disponível, senão usa dados vazios (não executa análise completa)
+    if _analysis_cache['data'] is not None:
+        analysis = _analysis_cache['data']
+    else:
+        analysis = {'costs': {}, 'resources': {}, 'recommendations': []}
+    costs = analysis.get('costs', {})
+    resources = analysis.get('resources', {})
+    
+    finops_expert_system_prompt = """Você é o MAIOR ESPECIALISTA EM FINOPS do mundo.
 
 ## SUA IDENTIDADE
 - Você é um Consultor FinOps Certificado (FinOps Foundation)
@@ -6401,14 +6621,14 @@ def generate_ai_report():
 - [Link ou referência]
 ```"""
 
-        persona_instructions = {
-            PersonaType.EXECUTIVE: "Foco em: ROI, economia total, decisões estratégicas, resumo executivo.",
-            PersonaType.CTO: "Foco em: arquitetura, trade-offs técnicos, escalabilidade, segurança.",
-            PersonaType.DEVOPS: "Foco em: automação, scripts, implementação prática, IaC.",
-            PersonaType.ANALYST: "Foco em: dados detalhados, métricas, tabelas comparativas, cálculos."
-        }
-        
-        account_context = f"""
+    persona_instructions = {
+        PersonaType.EXECUTIVE: "Foco em: ROI, economia total, decisões estratégicas, resumo executivo.",
+        PersonaType.CTO: "Foco em: arquitetura, trade-offs técnicos, escalabilidade, segurança.",
+        PersonaType.DEVOPS: "Foco em: automação, scripts, implementação prática, IaC.",
+        PersonaType.ANALYST: "Foco em: dados detalhados, métricas, tabelas comparativas, cálculos."
+    }
+    
+    account_context = f"""
 
 ## DADOS DA CONTA AWS DO USUÁRIO (use quando relevante)
 - Custo Total: ${costs.get('total', 0):.2f}
@@ -6416,8 +6636,8 @@ def generate_ai_report():
 - Custos por Serviço: {json.dumps({k: f'${v:.2f}' for k, v in list(costs.get('by_service', {}).items())[:5]}, ensure_ascii=False) if costs.get('by_service') else 'N/A'}
 - Recomendações pendentes: {len(analysis.get('recommendations', []))}
 """
-        
-        full_prompt = f"""{finops_expert_system_prompt}
+    
+    full_prompt = f"""{finops_expert_system_prompt}
 
 ## PERSONA SELECIONADA: {persona_name}
 {persona_instructions.get(persona, '')}
@@ -6428,22 +6648,34 @@ def generate_ai_report():
 
 Responda de forma completa e direta:"""
 
-        response = provider.chat(
-            message=full_prompt,
-            system_prompt="Você é o maior especialista em FinOps do mundo. Responda em português do Brasil."
-        )
+    response = provider.chat(
+        message=full_prompt,
+        system_prompt="Você é o maior especialista em FinOps do mundo. Responda em português do Brasil."
+    )
+    
+    return {
+        'status': 'success',
+        'report': {
+            'provider': provider_name,
+            'model': response.model,
+            'content': response.content,
+            'tokens_used': response.tokens_used,
+            'latency_ms': response.latency_ms,
+            'metadata': response.metadata
+        }
+    }, 200
+
+
+@app.route('/api/v1/ai-report', methods=['POST'])
+def generate_ai_report():
+    """Consultor FinOps Expert - Especialista completo em FinOps AWS."""
+    try:
+        data = request.get_json() or {}
+        if _wants_async(data):
+            return _submit_job_response('ai_report', _job_payload(data), JobPriority.INTERACTIVE)
         
-        return jsonify({
-            'status': 'success',
-            'report': {
-                'provider': provider_name,
-                'model': response.model,
-                'content': response.content,
-                'tokens_used': response.tokens_used,
-                'latency_ms': response.latency_ms,
-                'metadata': response.metadata
-            }
-        })
+        payload, status_code = build_ai_report(data)
+        return jsonify(payload), status_code
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
@@ -6451,10 +6683,16 @@ Responda de forma completa e direta:"""
 def _fetch_multi_region_data():
     """Busca dados multi-region em background."""
     global _multi_region_cache
+    broker = get_progress_broker()
+    broker.open('multi-region')
+    broker.publish('multi-region', EVENT_STARTED, {'started_at': datetime.now().isoformat()})
     try:
         from src.finops_aws.dashboard import get_all_regions_analysis, get_region_costs
         
-        multi_region_data = get_all_regions_analysis(max_workers=3)
+        multi_region_data = get_all_regions_analysis(
+            max_workers=3,
+            on_region_complete=stage_progress_callback(broker, 'multi-region')
+        )
         
         try:
             region_costs = get_region_costs()
@@ -6466,12 +6704,343 @@ def _fetch_multi_region_data():
             _multi_region_cache['data'] = multi_region_data
             _multi_region_cache['timestamp'] = datetime.now()
             _multi_region_cache['is_loading'] = False
+        _http_cache.bump_version()
+        broker.publish('multi-region', EVENT_COMPLETE, {'summary': multi_region_data.get('summary', {})})
     except Exception as e:
         with _multi_region_lock:
             _multi_region_cache['is_loading'] = False
+        broker.publish('multi-region', EVENT_ERROR, {'message': str(e)})
         print(f"Erro ao carregar multi-region: {e}")
 
 
+_analysis_stream_lock = threading.Lock()
+
+
+def _analysis_state_manager(broker):
+    """
+    DynamoDBStateManager da varredura com o listener SSE registrado.
+    
+    Só é criado com FINOPS_DYNAMODB_TABLE configurada; sem ele o progresso
+    vai direto pelo callback de estágio.
+    """
+    if not os.environ.get('FINOPS_DYNAMODB_TABLE'):
+        return None
+    from src.finops_aws.core import DynamoDBStateManager
+    manager = DynamoDBStateManager()
+    manager.add_completion_listener(state_manager_listener(broker, 'analysis'))
+    return manager
+
+
+def _run_streamed_analysis():
+    """Executa análise completa publicando progresso no canal SSE 'analysis'."""
+    from src.finops_aws.dashboard import get_dashboard_analysis
+    broker = get_progress_broker()
+    try:
+        analysis = get_dashboard_analysis(
+            all_services_func=get_all_services_analysis,
+            include_multi_region=False,
+            progress_callback=stage_progress_callback(broker, 'analysis'),
+            state_manager=_analysis_state_manager(broker)
+        )
+        _analysis_cache['data'] = analysis
+        _analysis_cache['timestamp'] = datetime.now()
+        _http_cache.bump_version()
+        broker.publish('analysis', EVENT_COMPLETE, {
+            'summary': analysis.get('summary', {}),
+            'recommendations_count': len(analysis.get('recommendations', []))
+        })
+    except Exception as e:
+        broker.publish('analysis', EVENT_ERROR, {'message': str(e)})
+
+
+def _sse_response(channel):
+    """Cria resposta text/event-stream para o canal informado."""
+    from flask import Response, stream_with_context
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_event_id = 0
+    stream = get_progress_broker().stream(channel, last_event_id=last_event_id)
+    return Response(
+        stream_with_context(stream),
+        mimetype='text/event-stream',
+        headers={'X-Accel-Buffering': 'no'}
+    )
+
+
+def _export_job(payload):
+    """Job 'export': gera o conteúdo do relatório no formato pedido."""
+    from src.finops_aws.dashboard import export_to_csv, export_to_json, export_to_html
+    
+    fmt = payload.get('format', 'json')
+    exporters = {
+        'csv': (export_to_csv, 'text/csv; charset=utf-8'),
+        'html': (export_to_html, 'text/html; charset=utf-8'),
+        'json': (export_to_json, 'application/json; charset=utf-8'),
+    }
+    exporter, mimetype = exporters.get(fmt, exporters['json'])
+    return {
+        'format': fmt,
+        'mimetype': mimetype,
+        'filename': f"finops_report_{datetime.now().strftime('%Y%m%d')}.{fmt}",
+        'content': exporter(get_aws_analysis())
+    }
+
+
+def _ai_report_job(payload):
+    """Job 'ai_report': falha o job quando o provedor está indisponível."""
+    result, status_code = build_ai_report(payload)
+    if status_code != 200:
+        raise RuntimeError(result.get('message', 'Erro ao gerar relatório'))
+    return result
+
+
+_jobs_registered = False
+
+
+def get_jobs():
+    """Retorna a fila de jobs com os handlers do dashboard registrados."""
+    global _jobs_registered
+    queue = get_job_queue()
+    if not _jobs_registered:
+        queue.register('analysis', lambda payload: execute_full_analysis())
+        queue.register('ai_report', _ai_report_job)
+        queue.register('export', _export_job)
+        _jobs_registered = True
+    return queue
+
+
+def _wants_async(data):
+    return request.args.get('async', 'false').lower() == 'true' or bool(data.get('async'))
+
+
+def _job_payload(data):
+    return {k: v for k, v in data.items() if k not in ('async', 'priority')}
+
+
+def _submit_job_response(kind, payload, priority=JobPriority.NORMAL):
+    """Enfileira job e responde 202 com links de status e resultado (400 se a prioridade for inválida)."""
+    try:
+        priority = JobPriority.parse(priority)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    job, created = get_jobs().submit(kind, payload, priority=priority)
+    return jsonify({
+        'status': 'accepted',
+        'job_id': job.job_id,
+        'job_status': job.status.value,
+        'deduplicated': not created,
+        'links': {
+            'status': f'/api/v1/jobs/{job.job_id}',
+            'result': f'/api/v1/jobs/{job.job_id}/result'
+        }
+    }), 202
+
+
+@app.route('/api/v1/jobs', methods=['POST'])
+def submit_job():
+    """
+    Enfileira job assíncrono.
+    
+    Body: {"kind": "analysis|ai_report|export", "payload": {...},
+           "priority": "interactive|normal|scheduled", "dedup": true}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        kind = data.get('kind')
+        if not kind:
+            return jsonify({'status': 'error', 'message': "Campo 'kind' é obrigatório"}), 400
+        priority = data.get('priority', JobPriority.NORMAL.name)
+        if not data.get('dedup', True):
+            job, _ = get_jobs().submit(kind, data.get('payload') or {}, priority=priority, dedup=False)
+            return jsonify({'status': 'accepted', 'job_id': job.job_id, 'job_status': job.status.value}), 202
+        return _submit_job_response(kind, data.get('payload') or {}, priority)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/api/v1/jobs', methods=['GET'])
+def list_jobs():
+    """Lista jobs recentes (filtro opcional ?status=queued|running|...)."""
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+        jobs = get_jobs().list(status=request.args.get('status'), limit=limit)
+        return jsonify({
+            'status': 'success',
+            'jobs': [job.to_dict() for job in jobs],
+            'stats': get_jobs().get_stats()
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/api/v1/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Retorna status do job (sem o resultado)."""
+    job = get_jobs().get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job não encontrado'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict()})
+
+
+@app.route('/api/v1/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancela job que ainda está na fila."""
+    if get_jobs().cancel(job_id):
+        return jsonify({'status': 'success', 'job_id': job_id, 'job_status': JobStatus.CANCELLED.value})
+    return jsonify({'status': 'error', 'message': 'Job inexistente ou já iniciado'}), 409
+
+
+@app.route('/api/v1/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Retorna o resultado do job: 202 enquanto pendente, 500 se falhou."""
+    from flask import Response
+    job = get_jobs().get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job não encontrado'}), 404
+    if not job.is_finished:
+        return jsonify({'status': 'pending', 'job': job.to_dict()}), 202
+    if job.status != JobStatus.SUCCEEDED:
+        return jsonify({'status': 'error', 'message': job.error or job.status.value, 'job': job.to_dict()}), 500
+    
+    if job.kind == 'export':
+        result = job.result or {}
+        headers = {}
+        if result.get('format') != 'html':
+            headers['Content-Disposition'] = f"attachment; filename={result.get('filename')}"
+        return Response(result.get('content', ''), content_type=result.get('mimetype'), headers=headers)
+    return jsonify(job.result)
+
+
+@app.route('/api/v1/dashboard/summary')
+def get_dashboard_summary():
+    """
+    Dashboard em camadas ("resumo primeiro").
+    
+    Query params:
+        tier: 0 (uma consulta CE cacheada), 1 (+ integrações baratas) ou
+              2 (+ análise completa; enfileirada como job 'analysis' se
+              não houver snapshot válido, acompanhada pelos links do job)
+    
+    A resposta indica o status de cada tier e de qual tier veio cada campo.
+    """
+    from src.finops_aws.dashboard.summary import build_tiered_dashboard
+    try:
+        try:
+            tier = max(0, min(int(request.args.get('tier', 1)), 2))
+        except ValueError:
+            return jsonify({'status': 'error', 'message': "Parâmetro 'tier' deve ser 0, 1 ou 2"}), 400
+        
+        full_analysis = _analysis_cache['data'] if is_snapshot_fresh() else None
+        tier2_status = 'not_requested'
+        job_links = None
+        if tier >= 2 and full_analysis is None:
+            job, _ = get_jobs().submit('analysis', {}, priority=JobPriority.NORMAL)
+            tier2_status = job.status.value
+            job_links = {
+                'job_id': job.job_id,
+                'links': {
+                    'status': f'/api/v1/jobs/{job.job_id}',
+                    'result': f'/api/v1/jobs/{job.job_id}/result'
+                }
+            }
+        
+        result = build_tiered_dashboard(
+            max_tier=min(tier, 1),
+            full_analysis=full_analysis if tier >= 2 else None,
+            tier2_status=tier2_status
+        )
+        if job_links:
+            result['tiers']['2'].update(job_links)
+        
+        return jsonify({'status': 'success', **result})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/api/v1/analysis/stream')
+def stream_analysis():
+    """
+    Stream SSE do progresso da análise completa.
+    
+    Inicia uma análise em background (se nenhuma estiver em andamento) e envia
+    eventos 'progress' e 'recommendations' a cada estágio concluído, terminando
+    com 'complete'. Use ?refresh=true para ignorar o snapshot em cache.
+    """
+    broker = get_progress_broker()
+    refresh = request.args.get('refresh', 'false').lower() == 'true'
+    
+    with _analysis_stream_lock:
+        if not broker.is_active('analysis'):
+            broker.open('analysis')
+            if not refresh and is_snapshot_fresh():
+                analysis = _analysis_cache['data']
+                broker.publish('analysis', EVENT_COMPLETE, {
+                    'summary': analysis.get('summary', {}),
+                    'recommendations_count': len(analysis.get('recommendations', [])),
+                    'cached': True
+                })
+            else:
+                broker.publish('analysis', EVENT_STARTED, {'started_at': datetime.now().isoformat()})
+                threading.Thread(target=_run_streamed_analysis, daemon=True).start()
+    
+    return _sse_response('analysis')
+
+
+@app.route('/api/v1/multi-region/stream')
+def stream_multi_region():
+    """
+    Stream SSE do progresso da análise multi-região (um evento por região).
+    
+    Com cache válido não refaz a varredura: o cliente recebe o histórico
+    da última execução ou, se já expirado, o resultado em cache.
+    """
+    if not os.environ.get('AWS_ACCESS_KEY_ID'):
+        return jsonify({
+            'status': 'error',
+            'message': 'Credenciais AWS não configuradas'
+        }), 400
+    
+    broker = get_progress_broker()
+    with _multi_region_lock:
+        if _multi_region_cache['is_loading']:
+            return _sse_response('multi-region')
+        if _multi_region_is_stale(datetime.now()):
+            _multi_region_cache['is_loading'] = True
+            broker.open('multi-region')
+            threading.Thread(target=_fetch_multi_region_data, daemon=True).start()
+        elif not broker.get_history('multi-region'):
+            _publish_cached_multi_region(broker)
+    
+    return _sse_response('multi-region')
+
+
+def _multi_region_is_stale(now):
+    """Indica se o cache multi-região está vazio ou expirado (chamar com o lock)."""
+    if _multi_region_cache['data'] is None or not _multi_region_cache['timestamp']:
+        return True
+    age = (now - _multi_region_cache['timestamp']).total_seconds()
+    return age > _multi_region_cache['ttl_seconds']
+
+
+def _publish_cached_multi_region(broker):
+    """Reproduz no canal o resultado em cache quando o histórico já expirou."""
+    data = _multi_region_cache['data']
+    broker.open('multi-region')
+    recommendations = data.get('consolidated_recommendations', [])
+    if recommendations:
+        broker.publish('multi-region', EVENT_RECOMMENDATIONS, {
+            'stage': 'cache', 'recommendations': recommendations
+        })
+    broker.publish('multi-region', EVENT_COMPLETE, {
+        'summary': data.get('summary', {}),
+        'cached': True,
+        'cached_at': _multi_region_cache['timestamp'].isoformat()
+    })
+
+
 @app.route('/api/v1/multi-region')
 def multi_region_analysis():
     """Analisa todas as regiões AWS com cache inteligente."""
@@ -6487,10 +7056,7 @@ def multi_region_analysis():
     
     with _multi_region_lock:
         has_cache = _multi_region_cache['data'] is not None
-        is_stale = True
-        if has_cache and _multi_region_cache['timestamp']:
-            age = (now - _multi_region_cache['timestamp']).total_seconds()
-            is_stale = age > _multi_region_cache['ttl_seconds']
+        is_stale = _multi_region_is_stale(now)
         
         is_loading = _multi_region_cache['is_loading']
         
@@ -6972,6 +7538,7 @@ def clear_cache():
     try:
         AWS_ANALYSIS_CACHE['data'] = None
         AWS_ANALYSIS_CACHE['timestamp'] = None
+        _http_cache.bump_version()
         
         from datetime import datetime
         
@@ -7083,16 +7650,45 @@ def get_notifications():
         }), 500
 
 
+SERVICE_CATEGORIES = {
+    'compute': ['AWS Lambda', 'Amazon EC2', 'Amazon Elastic Compute Cloud - Compute', 'AWS Fargate',
+                'EC2 - Other', 'Amazon Elastic Container Service'],
+    'storage': ['Amazon S3', 'Amazon Simple Storage Service', 'Amazon EBS', 'Amazon Elastic File System'],
+    'database': ['Amazon RDS', 'Amazon Relational Database Service', 'Amazon DynamoDB', 'Amazon ElastiCache'],
+    'network': ['Amazon VPC', 'Amazon Virtual Private Cloud', 'Amazon CloudFront', 'AWS Data Transfer',
+                'Elastic Load Balancing']
+}
+
+
+def _categorize_costs(by_service):
+    """Distribuição percentual por categoria a partir dos custos por serviço."""
+    totals = {'Compute': 0.0, 'Storage': 0.0, 'Database': 0.0, 'Network': 0.0, 'Outros': 0.0}
+    for service, cost in by_service.items():
+        category = next(
+            (name for name, services in SERVICE_CATEGORIES.items() if service in services), None
+        )
+        totals[category.capitalize() if category else 'Outros'] += cost
+    grand_total = sum(totals.values())
+    return [
+        {'name': name, 'value': round(value / grand_total * 100, 1) if grand_total > 0 else 0}
+        for name, value in totals.items()
+    ]
+
+
 @app.route('/api/v1/costs')
 def get_costs_data():
-    """Retorna dados de custos com filtros de período e categoria."""
+    """
+    Retorna dados de custos com filtros de período e categoria.
+    
+    Períodos, comparação com o período anterior e tendências por serviço
+    vêm do histórico diário local (CostHistoryStore), sem chamar a AWS a
+    cada requisição. Sem histórico, 30d usa os custos de 30 dias da
+    análise; os demais períodos respondem status 'history_unavailable'.
+    """
     try:
         period = request.args.get('period', '30d')
         category = request.args.get('category', 'all')
         
-        analysis = get_aws_analysis()
-        costs = analysis.get('costs', {})
-        
         period_days = {
             '7d': 7,
             '30d': 30,
@@ -7100,68 +7696,165 @@ def get_costs_data():
             '1y': 365
         }
         days = period_days.get(period, 30)
-        
-        total = costs.get('total', 0)
-        by_service = costs.get('by_service', {})
-        
-        scale_factor = days / 30
-        scaled_total = total * scale_factor
-        previous_total = scaled_total * 0.95
-        
-        service_categories = {
-            'compute': ['AWS Lambda', 'Amazon EC2', 'AWS Fargate', 'AWS Cost Explorer'],
-            'storage': ['Amazon S3', 'Amazon Simple Storage Service', 'Amazon EBS'],
-            'database': ['Amazon RDS', 'Amazon Relational Database Service', 'Amazon DynamoDB'],
-            'network': ['Amazon VPC', 'Amazon CloudFront', 'AWS Payment Cryptography']
-        }
-        
-        filtered_services = {}
-        for service, cost in by_service.items():
-            scaled_cost = cost * scale_factor
-            
-            if category == 'all':
-                filtered_services[service] = scaled_cost
-            else:
-                if service in service_categories.get(category, []):
-                    filtered_services[service] = scaled_cost
-        
-        filtered_total = sum(filtered_services.values())
-        
-        services_with_details = []
-        for service, cost in filtered_services.items():
-            percentage = (cost / filtered_total * 100) if filtered_total > 0 else 0
-            services_with_details.append({
+        end = datetime.now().date()
+        start = end - timedelta(days=days)
+        
+        sync_cost_history()
+        store = get_cost_history_store()
+        
+        def in_category(service):
+            return category == 'all' or service in SERVICE_CATEGORIES.get(category, [])
+        
+        if store.covers(start, end):
+            comparison = store.compare(start, end, group_by='service')
+            trend_available = comparison['previous_available']
+            items = [item for item in comparison['items'] if in_category(item['key'])]
+            filtered_total = sum(item['cost'] for item in items)
+            previous_total = sum(item['previous'] for item in items) if trend_available else None
+            services_with_details = [{
+                'service': item['key'],
+                'cost': round(item['cost'], 2),
+                'percentage': round(item['cost'] / filtered_total * 100, 1) if filtered_total > 0 else 0,
+                'trend': item['trend'] if trend_available else 'stable',
+                'change': item['change_percent'] if item['change_percent'] is not None else 0
+            } for item in items]
+            by_service = {item['key']: item['cost'] for item in comparison['items']}
+            source = 'history'
+        elif days != 30:
+            return jsonify({
+                'status': 'history_unavailable',
+                'message': f'Histórico de custos ainda não cobre o período {period}',
+                'data': {
+                    'period': period,
+                    'period_days': days,
+                    'category': category,
+                    'coverage': store.coverage()
+                }
+            })
+        else:
+            costs = get_aws_analysis().get('costs', {})
+            by_service = costs.get('by_service', {})
+            filtered = {s: c for s, c in by_service.items() if in_category(s)}
+            filtered_total = sum(filtered.values())
+            previous_total = None
+            trend_available = False
+            services_with_details = [{
                 'service': service,
                 'cost': round(cost, 2),
-                'percentage': round(percentage, 1),
-                'trend': 'up' if hash(service) % 2 == 0 else 'down',
-                'change': round((hash(service) % 20) - 10, 1)
-            })
-        
-        services_with_details.sort(key=lambda x: x['cost'], reverse=True)
+                'percentage': round(cost / filtered_total * 100, 1) if filtered_total > 0 else 0,
+                'trend': 'stable',
+                'change': 0
+            } for service, cost in sorted(filtered.items(), key=lambda x: x[1], reverse=True)]
+            source = 'analysis'
         
         return jsonify({
             'status': 'success',
             'data': {
                 'period': period,
+                'period_days': days,
                 'category': category,
+                'source': source,
                 'total': round(filtered_total, 2),
-                'previous_period': round(previous_total, 2),
-                'change': round(((filtered_total - previous_total) / previous_total * 100) if previous_total > 0 else 0, 1),
+                'previous_period': round(previous_total, 2) if trend_available else None,
+                'change': round(((filtered_total - previous_total) / previous_total * 100) if trend_available and previous_total > 0 else 0, 1),
+                'trend_available': trend_available,
                 'by_service': services_with_details,
-                'by_category': [
-                    {'name': 'Compute', 'value': 45},
-                    {'name': 'Storage', 'value': 25},
-                    {'name': 'Database', 'value': 15},
-                    {'name': 'Network', 'value': 10},
-                    {'name': 'Outros', 'value': 5}
-                ]
+                'by_category': _categorize_costs(by_service)
             }
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@app.route('/api/v1/costs/history')
+def get_costs_history():
+    """
+    Consulta o histórico local de custos.
+    
+    Query params:
+        start, end: período (YYYY-MM-DD, fim exclusivo; padrão últimos 30 dias)
+        group_by: service, region, account ou usage_type (padrão service)
+        service: filtra por serviço (repetível)
+        tag: chave de tag para custos por valor de tag
+    """
+    try:
+        end = request.args.get('end') or datetime.now().date().isoformat()
+        start = request.args.get('start') or (
+            datetime.fromisoformat(end) - timedelta(days=30)
+        ).date().isoformat()
+        group_by = request.args.get('group_by', 'service')
+        services = request.args.getlist('service')
+        filters = {'service': services} if services else None
+        
+        store = get_cost_history_store()
+        data = {
+            'comparison': store.compare(start, end, group_by=group_by, filters=filters),
+            'daily': store.daily_series(start, end, filters=filters),
+            'coverage': store.coverage()
+        }
+        tag = request.args.get('tag')
+        if tag:
+            data['by_tag'] = store.tag_totals(start, end, tag)
+        return jsonify({'status': 'success', 'data': data})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/api/v1/costs/cube')
+def get_costs_cube():
+    """
+    Slice/dice/pivot sobre o cubo de custos materializado.
+
+    Query params:
+        start, end: período (YYYY-MM-DD, fim exclusivo; padrão janela do cubo)
+        rows: dimensão das linhas (service, region, account, day ou tag:<Chave>)
+        columns: dimensão das colunas (opcional; gera tabela cruzada)
+        top: limita as linhas aos N maiores grupos
+        filtro por dimensão: ?region=us-east-1&tag:Team=core (repetível)
+    """
+    try:
+        cube = get_cost_cube() or refresh_cost_cube()
+        if cube is None:
+            return jsonify({'status': 'error', 'message': 'Cubo de custos indisponível'}), 503
+
+        start = request.args.get('start') or cube.start
+        end = request.args.get('end') or cube.end
+        rows = request.args.get('rows', 'service')
+        columns = request.args.get('columns')
+        top = request.args.get('top', type=int)
+        reserved = {'start', 'end', 'rows', 'columns', 'top'}
+        filters = {
+            key: request.args.getlist(key)
+            for key in request.args if key not in reserved
+        }
+
+        if not cube.covers(start, end):
+            return jsonify({'status': 'error', 'message': 'Período fora da janela do cubo'}), 400
+        if not cube.has_dimensions([rows] + ([columns] if columns else []) + list(filters)):
+            return jsonify({'status': 'error', 'message': f'Dimensão não materializada. Disponíveis: {cube.dimensions}'}), 400
+
+        ranked = cube.top_k(rows, k=top, start=start, end=end, filters=filters)
+        data = {
+            'rows': [{'key': key, 'cost': round(cost, 2)} for key, cost in ranked],
+            'total': round(cube.total(start, end, filters), 2),
+            'cube': cube.to_dict()
+        }
+        if columns:
+            keep = {key for key, _ in ranked}
+            data['pivot'] = {
+                row: {column: round(cost, 2) for column, cost in values.items()}
+                for row, values in cube.pivot(rows, columns, start, end, filters).items()
+                if row in keep
+            }
+        return jsonify({'status': 'success', 'data': data})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 # Serve static files from frontend/dist
 @app.route('/<path:filename>', methods=['GET'])
 def serve_static(filename):
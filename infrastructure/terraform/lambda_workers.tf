@@ -36,13 +36,14 @@ resource "aws_lambda_function" "mapper" {
 
   environment {
     variables = {
-      LOG_LEVEL           = var.log_level
-      ENVIRONMENT         = var.environment
-      REPORTS_BUCKET_NAME = aws_s3_bucket.reports.id
-      STATE_PREFIX        = "state/"
-      BATCH_SIZE          = tostring(var.batch_size)
-      ENABLED_SERVICES    = join(",", var.enabled_services)
-      EXCLUDED_SERVICES   = join(",", var.excluded_services)
+      LOG_LEVEL            = var.log_level
+      ENVIRONMENT          = var.environment
+      REPORTS_BUCKET_NAME  = aws_s3_bucket.reports.id
+      STATE_PREFIX         = "state/"
+      BATCH_SIZE           = tostring(var.batch_size)
+      ENABLED_SERVICES     = join(",", var.enabled_services)
+      EXCLUDED_SERVICES    = join(",", var.excluded_services)
+      HEALTH_PROBE_ENABLED = "true"
     }
   }
 
@@ -0,0 +1,85 @@
+"""
+FinOps AWS Analytics Module
+
+Motores analíticos locais sobre dados de custo (CUR / Cost Explorer):
+- ColumnarCostFrame: agregação colunar vetorizada de line items
+- CostHistoryStore: histórico diário de custos embarcado (SQLite)
+- CostCube: cubo de custos em memória com roll-ups pré-calculados
+- StreamingAnomalyDetector: detecção online de anomalias (EWMA) por série
+- RollingCostWindow: janela móvel de custos diários por serviço
+- CommitmentSimulator: simulação vetorizada de compras de RI/Savings Plans
+- KPIEngine: KPIs derivados de fontes declaradas, buscadas uma vez em paralelo
+- RightsizingEngine: rightsizing vetorizado por percentis de utilização
+- PolicyEngine: avaliação compilada e vetorizada de políticas FinOps
+"""
+
+from .anomaly_stream import AnomalyEvent, StreamingAnomalyDetector, get_anomaly_detector
+from .commitment_simulator import (
+    CommitmentOffer,
+    CommitmentSimulator,
+    ExistingCommitment,
+    HourlyUsage,
+    SimulationResult,
+    hourly_usage_from_cost_explorer,
+    hourly_usage_from_frame,
+)
+from .cost_engine import ColumnarCostFrame
+from .cost_cube import (
+    CostCube,
+    get_cost_cube,
+    materialize_cost_cube,
+    resolve_cost_cube,
+    set_cost_cube,
+    tag_dimension,
+)
+from .cost_history import CostHistoryStore, get_cost_history_store
+from .cost_window import RollingCostWindow
+from .kpi_engine import DataSource, KPIDefinition, KPIEngine, KPIEvaluation
+from .policy_engine import MetricColumns, PolicyEngine, PolicyMatches, PolicyPlan, Predicate, compile_policy
+from .rightsizing import (
+    RightsizingEngine,
+    RightsizingPolicy,
+    RightsizingRecommendation,
+    RightsizingResult,
+    UtilizationBatch,
+    row_percentiles,
+)
+
+__all__ = [
+    'AnomalyEvent',
+    'StreamingAnomalyDetector',
+    'get_anomaly_detector',
+    'CommitmentOffer',
+    'CommitmentSimulator',
+    'ExistingCommitment',
+    'HourlyUsage',
+    'SimulationResult',
+    'hourly_usage_from_cost_explorer',
+    'hourly_usage_from_frame',
+    'ColumnarCostFrame',
+    'CostCube',
+    'get_cost_cube',
+    'materialize_cost_cube',
+    'resolve_cost_cube',
+    'set_cost_cube',
+    'tag_dimension',
+    'CostHistoryStore',
+    'get_cost_history_store',
+    'RollingCostWindow',
+    'DataSource',
+    'KPIDefinition',
+    'KPIEngine',
+    'KPIEvaluation',
+    'MetricColumns',
+    'PolicyEngine',
+    'PolicyMatches',
+    'PolicyPlan',
+    'Predicate',
+    'compile_policy',
+    'RightsizingEngine',
+    'RightsizingPolicy',
+    'RightsizingRecommendation',
+    'RightsizingResult',
+    'UtilizationBatch',
+    'row_percentiles',
+]
@@ -0,0 +1,446 @@
+"""
+Streaming Cost Anomaly Detector
+
+Detecção online de anomalias de custo com estado de tamanho constante por
+série (ex.: serviço × conta):
+
+- Média e variância exponenciais (EWMA), atualizadas em O(1) por ponto;
+  no início da série equivalem à média e variância acumuladas (sem viés)
+- Lotes de milhares de séries atualizados de uma vez em NumPy
+- Os últimos `revisions` pontos de cada série ficam provisórios: reenviar
+  um desses instantes com outro valor (dia parcial revisado pelo Cost
+  Explorer) substitui o valor anterior e o estado é recalculado a partir
+  do estado consolidado; o mesmo valor é ignorado
+- Pontos mais antigos que a janela provisória são ignorados, então
+  reprocessar a mesma janela não duplica alertas nem distorce o estado
+- Pontos anômalos entram no estado limitados a média ± threshold·desvio,
+  para um spike não inflar a variância e esconder o seguinte
+- Estado persistido em SQLite entre execuções
+
+Design Patterns:
+- Repository: Persistência do estado isolada em save()/load()
+- Singleton: Detector global via get_anomaly_detector()
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SeriesKey = Tuple[str, ...]
+TimeLike = Union[str, date, datetime, float, int]
+
+DEFAULT_ALPHA = 0.1
+DEFAULT_THRESHOLD = 3.0
+DEFAULT_WARMUP = 14
+DEFAULT_MIN_IMPACT = 1.0
+DEFAULT_MIN_STD_RATIO = 0.05
+DEFAULT_REVISIONS = 2
+KEY_SEPARATOR = '\x1f'
+
+
+def _series_key(key: Union[str, Sequence[str]]) -> SeriesKey:
+    """Chave de série como tupla (uma string vira tupla de um elemento)"""
+    return (key,) if isinstance(key, str) else tuple(key)
+
+
+def _timestamp(value: TimeLike) -> float:
+    """Converte data/hora (ISO, date, datetime ou epoch) em epoch UTC"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    else:
+        moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+@dataclass
+class AnomalyEvent:
+    """Ponto anômalo de uma série"""
+    series: SeriesKey
+    timestamp: float
+    value: float
+    expected: float
+    std: float
+    z_score: float
+    severity: str
+
+    @property
+    def impact(self) -> float:
+        """Diferença entre o custo observado e o esperado"""
+        return self.value - self.expected
+
+    @property
+    def observed_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc).replace(tzinfo=None)
+
+    @property
+    def event_id(self) -> str:
+        """Identificador estável (série + instante) para deduplicação"""
+        return f"{'/'.join(self.series)}@{self.observed_at.isoformat()}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'event_id': self.event_id,
+            'series': list(self.series),
+            'observed_at': self.observed_at.isoformat(),
+            'value': round(self.value, 2),
+            'expected': round(self.expected, 2),
+            'std': round(self.std, 4),
+            'z_score': round(self.z_score, 2),
+            'impact': round(self.impact, 2),
+            'severity': self.severity
+        }
+
+
+class StreamingAnomalyDetector:
+    """
+    Detector online EWMA com estado por série em arrays NumPy.
+
+    Cada série ocupa uma linha: estado consolidado (média, variância,
+    contagem, último timestamp) mais até `revisions` pontos provisórios
+    ainda revisáveis. O estado atual é o consolidado atualizado com os
+    provisórios. Um ponto é anômalo quando a série já passou do warm-up,
+    |z| > threshold e |valor - média| >= min_impact. O desvio usado no z
+    tem piso de min_std_ratio·|média|, para séries constantes também
+    acusarem saltos.
+    """
+
+    def __init__(
+        self,
+        alpha: float = DEFAULT_ALPHA,
+        threshold: float = DEFAULT_THRESHOLD,
+        warmup: int = DEFAULT_WARMUP,
+        min_impact: float = DEFAULT_MIN_IMPACT,
+        min_std_ratio: float = DEFAULT_MIN_STD_RATIO,
+        revisions: int = DEFAULT_REVISIONS,
+        capacity: int = 1024
+    ):
+        if revisions < 1:
+            raise ValueError(f"revisions deve ser >= 1: {revisions}")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_impact = min_impact
+        self.min_std_ratio = min_std_ratio
+        self.revisions = revisions
+        self._index: Dict[SeriesKey, int] = {}
+        self._keys: List[SeriesKey] = []
+        # Estado consolidado (pontos fora da janela de revisão)
+        self._base_mean = np.zeros(capacity)
+        self._base_var = np.zeros(capacity)
+        self._base_count = np.zeros(capacity, dtype=np.int64)
+        self._base_last = np.full(capacity, -np.inf)
+        # Pontos provisórios em ordem de timestamp (NaN = posição livre)
+        self._pending_ts = np.full((capacity, revisions), np.nan)
+        self._pending_value = np.zeros((capacity, revisions))
+        # Estado atual (consolidado + provisórios)
+        self._mean = np.zeros(capacity)
+        self._var = np.zeros(capacity)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._last = np.full(capacity, -np.inf)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def series(self) -> List[SeriesKey]:
+        """Séries conhecidas, na ordem em que apareceram"""
+        return list(self._keys)
+
+    def _grow(self, size: int) -> None:
+        capacity = len(self._mean)
+        if size <= capacity:
+            return
+        extra = max(size, 2 * capacity) - capacity
+        for name in ('_base_mean', '_base_var', '_mean', '_var'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra)]))
+        for name in ('_base_count', '_count'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=np.int64)]))
+        for name in ('_base_last', '_last'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.full(extra, -np.inf)]))
+        self._pending_ts = np.concatenate([self._pending_ts, np.full((extra, self.revisions), np.nan)])
+        self._pending_value = np.concatenate([self._pending_value, np.zeros((extra, self.revisions))])
+
+    def _rows(self, keys: Sequence[SeriesKey]) -> np.ndarray:
+        """Linhas das séries, criando as que ainda não existem"""
+        rows = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            row = self._index.get(key)
+            if row is None:
+                row = len(self._keys)
+                self._index[key] = row
+                self._keys.append(key)
+            rows[i] = row
+        self._grow(len(self._keys))
+        return rows
+
+    def _step(
+        self,
+        mean: np.ndarray,
+        var: np.ndarray,
+        count: np.ndarray,
+        values: np.ndarray
+    ) -> Tuple[np.ndarray, ...]:
+        """Aplica um ponto por série: (média, variância, contagem, desvio, z, anômalo)"""
+        std = np.maximum(np.sqrt(var), self.min_std_ratio * np.abs(mean))
+        deviation = values - mean
+        z_scores = np.divide(deviation, std, out=np.zeros_like(deviation), where=std > 0)
+        anomalous = ((count >= self.warmup) & (np.abs(z_scores) > self.threshold)
+                     & (np.abs(deviation) >= self.min_impact))
+
+        bound = self.threshold * std
+        diff = np.where(anomalous, np.clip(deviation, -bound, bound), deviation)
+        # Até 1/alpha pontos, alpha = 1/(n+1) reproduz média e variância acumuladas
+        alpha = np.maximum(self.alpha, 1.0 / (count + 1))
+        increment = alpha * diff
+        return (mean + increment, (1 - alpha) * (var + diff * increment), count + 1,
+                std, z_scores, anomalous)
+
+    def _settle(self, rows: np.ndarray) -> None:
+        """Consolida o ponto provisório mais antigo das linhas (janela cheia)"""
+        mean, var, count, *_ = self._step(
+            self._base_mean[rows], self._base_var[rows], self._base_count[rows],
+            self._pending_value[rows, 0]
+        )
+        self._base_mean[rows], self._base_var[rows], self._base_count[rows] = mean, var, count
+        self._base_last[rows] = self._pending_ts[rows, 0]
+        self._pending_ts[rows, :-1] = self._pending_ts[rows, 1:]
+        self._pending_value[rows, :-1] = self._pending_value[rows, 1:]
+        self._pending_ts[rows, -1] = np.nan
+
+    def _replay(self, rows: np.ndarray, moment: float = np.nan) -> Tuple[np.ndarray, ...]:
+        """
+        Recalcula o estado atual das linhas (consolidado + provisórios)
+
+        Returns:
+            (esperado, desvio, z, anômalo) do ponto em `moment` de cada linha
+        """
+        mean, var = self._base_mean[rows], self._base_var[rows]
+        count, last = self._base_count[rows], self._base_last[rows]
+        expected, std = np.zeros(len(rows)), np.zeros(len(rows))
+        z_scores, anomalous = np.zeros(len(rows)), np.zeros(len(rows), dtype=bool)
+
+        for slot in range(self.revisions):
+            stamps = self._pending_ts[rows, slot]
+            present = np.flatnonzero(~np.isnan(stamps))
+            if not len(present):
+                break
+            before = mean[present]
+            (mean[present], var[present], count[present],
+             step_std, step_z, step_anomalous) = self._step(
+                before, var[present], count[present], self._pending_value[rows[present], slot]
+            )
+            last[present] = stamps[present]
+            hit = stamps[present] == moment
+            at = present[hit]
+            expected[at], std[at] = before[hit], step_std[hit]
+            z_scores[at], anomalous[at] = step_z[hit], step_anomalous[hit]
+
+        self._mean[rows], self._var[rows] = mean, var
+        self._count[rows], self._last[rows] = count, last
+        return expected, std, z_scores, anomalous
+
+    def update(self, key: SeriesKey, value: float, timestamp: TimeLike) -> Optional[AnomalyEvent]:
+        """Processa um ponto de uma série"""
+        events = self.update_batch([key], [value], timestamp)
+        return events[0] if events else None
+
+    def update_batch(
+        self,
+        keys: Sequence[SeriesKey],
+        values: Sequence[float],
+        timestamp: TimeLike
+    ) -> List[AnomalyEvent]:
+        """
+        Processa um ponto de cada série no mesmo instante.
+
+        Um instante ainda provisório na série é revisado (se o valor
+        mudou); um instante posterior ao último entra como novo ponto,
+        consolidando o provisório mais antigo quando a janela está cheia.
+
+        Args:
+            keys: Séries (uma ocorrência por chave no lote)
+            values: Custo de cada série no instante
+            timestamp: Instante do lote (dia ou hora)
+
+        Returns:
+            Eventos anômalos do lote
+        """
+        keys = [_series_key(key) for key in keys]
+        moment = _timestamp(timestamp)
+        values = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            rows = self._rows(keys)
+            slots = self._pending_ts[rows] == moment
+            revised = slots.any(axis=1)
+            revised &= self._pending_value[rows, slots.argmax(axis=1)] != values
+            fresh = self._last[rows] < moment
+            accepted = revised | fresh
+            positions = np.flatnonzero(accepted)
+            rows, values = rows[accepted], values[accepted]
+            revised, fresh, slots = revised[accepted], fresh[accepted], slots[accepted]
+
+            changed = np.flatnonzero(revised)
+            self._pending_value[rows[changed], slots[changed].argmax(axis=1)] = values[changed]
+
+            added = np.flatnonzero(fresh)
+            full = rows[added][~np.isnan(self._pending_ts[rows[added], -1])]
+            if len(full):
+                self._settle(full)
+            free = np.isnan(self._pending_ts[rows[added]]).argmax(axis=1)
+            self._pending_ts[rows[added], free] = moment
+            self._pending_value[rows[added], free] = values[added]
+
+            expected, std, z_scores, anomalous = self._replay(rows, moment)
+
+        return [
+            AnomalyEvent(
+                series=keys[positions[i]],
+                timestamp=moment,
+                value=float(values[i]),
+                expected=float(expected[i]),
+                std=float(std[i]),
+                z_score=float(z_scores[i]),
+                severity='critical' if abs(z_scores[i]) >= 2 * self.threshold else 'warning'
+            )
+            for i in np.flatnonzero(anomalous)
+        ]
+
+    def state(self, key: SeriesKey) -> Optional[Dict[str, Any]]:
+        """Estado atual de uma série"""
+        row = self._index.get(_series_key(key))
+        if row is None:
+            return None
+        return {
+            'mean': float(self._mean[row]),
+            'std': float(np.sqrt(self._var[row])),
+            'count': int(self._count[row]),
+            'last_timestamp': float(self._last[row])
+        }
+
+    def latest_timestamp(self) -> Optional[float]:
+        """Instante mais recente já processado em qualquer série"""
+        if not self._keys:
+            return None
+        return float(self._last[:len(self._keys)].max())
+
+    def to_dict(self) -> Dict[str, Any]:
+        latest = self.latest_timestamp()
+        return {
+            'series': len(self),
+            'alpha': self.alpha,
+            'threshold': self.threshold,
+            'warmup': self.warmup,
+            'latest': datetime.fromtimestamp(latest, tz=timezone.utc).isoformat() if latest else None
+        }
+
+    @staticmethod
+    def default_path() -> str:
+        return os.getenv(
+            'FINOPS_ANOMALY_STATE_DB', os.path.join(tempfile.gettempdir(), 'finops_anomaly_state.db')
+        )
+
+    def save(self, path: Optional[str] = None) -> int:
+        """Grava o estado de todas as séries; retorna o número de séries"""
+        size = len(self._keys)
+        with self._lock:
+            pending = [
+                json.dumps([[ts, value] for ts, value in zip(stamps, values) if not np.isnan(ts)])
+                for stamps, values in zip(self._pending_ts[:size].tolist(), self._pending_value[:size].tolist())
+            ]
+            rows = list(zip(
+                [KEY_SEPARATOR.join(key) for key in self._keys],
+                self._base_mean[:size].tolist(),
+                self._base_var[:size].tolist(),
+                self._base_count[:size].tolist(),
+                self._base_last[:size].tolist(),
+                pending
+            ))
+        conn = sqlite3.connect(path or self.default_path())
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS anomaly_state ("
+                    "series TEXT PRIMARY KEY, mean REAL NOT NULL, var REAL NOT NULL, "
+                    "count INTEGER NOT NULL, last_ts REAL NOT NULL, pending TEXT) WITHOUT ROWID"
+                )
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(anomaly_state)")}
+                if 'pending' not in columns:
+                    conn.execute("ALTER TABLE anomaly_state ADD COLUMN pending TEXT")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO anomaly_state (series, mean, var, count, last_ts, pending) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+        finally:
+            conn.close()
+        return size
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, **kwargs: Any) -> 'StreamingAnomalyDetector':
+        """
+        Detector com o estado gravado (vazio se não houver arquivo)
+
+        Estados gravados antes da janela de revisão (sem a coluna pending)
+        são carregados inteiros como consolidados.
+        """
+        path = path or cls.default_path()
+        detector = cls(**kwargs)
+        if not os.path.exists(path):
+            return detector
+        conn = sqlite3.connect(path)
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(anomaly_state)")}
+            pending = 'pending' if 'pending' in columns else 'NULL'
+            records = conn.execute(
+                f"SELECT series, mean, var, count, last_ts, {pending} FROM anomaly_state"
+            ).fetchall() if columns else []
+        finally:
+            conn.close()
+        if records:
+            rows = detector._rows([tuple(series.split(KEY_SEPARATOR)) for series, *_ in records])
+            _, means, variances, counts, lasts, points = zip(*records)
+            detector._base_mean[rows] = means
+            detector._base_var[rows] = variances
+            detector._base_count[rows] = counts
+            detector._base_last[rows] = lasts
+            for row, encoded in zip(rows, points):
+                for ts, value in json.loads(encoded or '[]'):
+                    if not np.isnan(detector._pending_ts[row, -1]):
+                        detector._settle(np.array([row]))
+                    free = int(np.isnan(detector._pending_ts[row]).argmax())
+                    detector._pending_ts[row, free] = ts
+                    detector._pending_value[row, free] = value
+            detector._replay(rows)
+        return detector
+
+
+_anomaly_detector: Optional[StreamingAnomalyDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_anomaly_detector() -> StreamingAnomalyDetector:
+    """Retorna o detector global (estado em FINOPS_ANOMALY_STATE_DB)"""
+    global _anomaly_detector
+    with _detector_lock:
+        if _anomaly_detector is None:
+            try:
+                _anomaly_detector = StreamingAnomalyDetector.load()
+            except Exception as e:
+                logger.warning(f"Estado de anomalias não carregado: {e}")
+                _anomaly_detector = StreamingAnomalyDetector()
+        return _anomaly_detector
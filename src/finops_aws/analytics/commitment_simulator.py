@@ -0,0 +1,468 @@
+"""
+Commitment Simulator
+
+Simulador vetorizado de portfólios de compromisso (Savings Plans / RIs)
+sobre o uso horário em dólares On-Demand equivalentes:
+
+- Compromissos existentes cobrem o uso primeiro (capacidade horária =
+  compromisso / (1 - desconto), respeitando início e expiração)
+- Cada candidato (nível de compromisso × prazo × opção de pagamento)
+  cobre o uso residual: sum(min(residual, capacidade)) é calculado para
+  todos os candidatos de uma vez com o residual ordenado + soma
+  acumulada + np.searchsorted, em O(candidatos · log horas)
+- Cobertura, utilização, economia líquida mensal, break-even (meses e
+  utilização mínima) e fronteira eficiente (economia anual × obrigação
+  total) por candidato
+
+Fontes de uso: Cost Explorer HOURLY (RECORD_TYPE Usage +
+SavingsPlanCoveredUsage, ou DAILY distribuído por hora quando o
+horário não estiver habilitado) ou um ColumnarCostFrame do CUR com
+dimensão horária. O uso coberto por RIs (DiscountedUsage) fica fora da
+série do Cost Explorer; por isso RIs não entram como compromissos
+existentes sobre ela.
+
+Design Patterns:
+- Strategy: Ofertas (prazo, pagamento, desconto) configuráveis
+- Value Object: Resultado imutável com métricas por candidato
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_MONTH = 730
+TERM_HOURS = {'1yr': 8760, '3yr': 26280}
+UPFRONT_FRACTION = {'No Upfront': 0.0, 'Partial Upfront': 0.5, 'All Upfront': 1.0}
+
+# Descontos típicos de Compute Savings Plans sobre On-Demand
+DEFAULT_DISCOUNTS = {
+    ('1yr', 'No Upfront'): 0.27,
+    ('1yr', 'Partial Upfront'): 0.30,
+    ('1yr', 'All Upfront'): 0.32,
+    ('3yr', 'No Upfront'): 0.46,
+    ('3yr', 'Partial Upfront'): 0.50,
+    ('3yr', 'All Upfront'): 0.52,
+}
+
+# Serviços cobertos por Compute Savings Plans
+COMPUTE_SP_SERVICES = [
+    'Amazon Elastic Compute Cloud - Compute',
+    'AWS Lambda',
+    'Amazon Elastic Container Service',
+]
+
+PAYMENT_OPTIONS = {
+    'NO_UPFRONT': 'No Upfront',
+    'PARTIAL_UPFRONT': 'Partial Upfront',
+    'ALL_UPFRONT': 'All Upfront',
+}
+
+TERMS = {
+    'ONE_YEAR': '1yr',
+    'THREE_YEARS': '3yr',
+}
+
+
+@dataclass(frozen=True)
+class CommitmentOffer:
+    """Prazo, opção de pagamento e desconto sobre On-Demand"""
+    term: str
+    payment_option: str
+    discount: float
+
+    @property
+    def term_hours(self) -> int:
+        return TERM_HOURS[self.term]
+
+    @property
+    def upfront_fraction(self) -> float:
+        return UPFRONT_FRACTION.get(self.payment_option, 0.0)
+
+    @property
+    def label(self) -> str:
+        return f"{self.term} {self.payment_option}"
+
+    @classmethod
+    def defaults(cls) -> List['CommitmentOffer']:
+        return [cls(term, payment, discount) for (term, payment), discount in DEFAULT_DISCOUNTS.items()]
+
+    @classmethod
+    def from_aws(cls, term_in_years: str, payment_option: str) -> 'CommitmentOffer':
+        """Oferta com desconto padrão a partir dos valores da API (ONE_YEAR, NO_UPFRONT)"""
+        term = TERMS.get(str(term_in_years).upper(), '1yr')
+        payment = PAYMENT_OPTIONS.get(str(payment_option).upper(), 'No Upfront')
+        return cls(term, payment, DEFAULT_DISCOUNTS[(term, payment)])
+
+
+@dataclass
+class ExistingCommitment:
+    """Compromisso ativo (SP ou RI) em dólares por hora"""
+    hourly_commitment: float
+    discount: float
+    start_hour: int = 0
+    end_hour: Optional[int] = None
+    kind: str = 'savings_plan'
+    commitment_id: str = ''
+
+    @property
+    def capacity(self) -> float:
+        """Uso On-Demand equivalente coberto por hora"""
+        return self.hourly_commitment / max(1.0 - self.discount, 1e-9)
+
+    @staticmethod
+    def _window_hours(start: Optional[datetime], end: Optional[datetime],
+                      window_start: datetime) -> Tuple[int, Optional[int]]:
+        def hours(moment: Optional[datetime]) -> Optional[int]:
+            if moment is None:
+                return None
+            moment = moment.replace(tzinfo=None)
+            return int((moment - window_start).total_seconds() // 3600)
+
+        start_hour, end_hour = hours(start), hours(end)
+        return max(start_hour or 0, 0), end_hour
+
+    @classmethod
+    def from_savings_plan(cls, sp: Any, window_start: datetime,
+                          discount: Optional[float] = None) -> 'ExistingCommitment':
+        """A partir de SavingsPlanData (desconto padrão pelo prazo e pagamento)"""
+        term = '3yr' if getattr(sp, 'term_duration_hours', 0) > TERM_HOURS['1yr'] else '1yr'
+        payment = PAYMENT_OPTIONS.get(str(sp.payment_option).upper().replace(' ', '_'), sp.payment_option)
+        if discount is None:
+            discount = DEFAULT_DISCOUNTS.get((term, payment), DEFAULT_DISCOUNTS[('1yr', 'No Upfront')])
+        start_hour, end_hour = cls._window_hours(sp.start_time, sp.end_time, window_start)
+        return cls(sp.commitment, discount, start_hour, end_hour, 'savings_plan', sp.savings_plan_id)
+
+    @classmethod
+    def from_reserved_instance(cls, ri: Any, window_start: datetime,
+                               on_demand_hourly: float) -> 'ExistingCommitment':
+        """
+        A partir de ReservedInstanceData
+
+        Custo horário = taxa fixa amortizada + preço de uso + cobranças
+        recorrentes; capacidade = instâncias × preço On-Demand.
+        """
+        duration_hours = max(ri.duration_seconds / 3600, 1.0)
+        count = max(ri.instance_count, 1)
+        hourly = count * (ri.fixed_price / duration_hours + ri.usage_price + ri.recurring_charges)
+        capacity = count * on_demand_hourly
+        discount = 1.0 - hourly / capacity if capacity > 0 else 0.0
+        start_hour, end_hour = cls._window_hours(ri.start_time, ri.end_time, window_start)
+        return cls(hourly, min(max(discount, 0.0), 0.99), start_hour, end_hour,
+                   'reserved_instance', ri.reservation_id)
+
+
+@dataclass
+class HourlyUsage:
+    """Uso horário On-Demand equivalente"""
+    values: np.ndarray
+    start: datetime
+    granularity: str = 'HOURLY'
+    source: str = 'cost_explorer'
+
+    @property
+    def hours(self) -> int:
+        return int(len(self.values))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'start': self.start.isoformat(),
+            'hours': self.hours,
+            'granularity': self.granularity,
+            'source': self.source,
+            'total': round(float(self.values.sum()), 2),
+            'peak_hourly': round(float(self.values.max()) if self.hours else 0.0, 4)
+        }
+
+
+def hourly_usage_from_cost_explorer(
+    ce_client: Any,
+    days: int = 14,
+    services: Optional[Sequence[str]] = None,
+    end: Optional[datetime] = None
+) -> HourlyUsage:
+    """
+    Uso On-Demand equivalente por hora (UnblendedCost de Usage e
+    SavingsPlanCoveredUsage)
+
+    Uso coberto por RIs (DiscountedUsage) não entra: o UnblendedCost dele é
+    a tarifa da reserva, não o On-Demand equivalente. Compromissos
+    existentes aplicados sobre esta série devem ser só Savings Plans.
+
+    O Cost Explorer só guarda granularidade horária dos últimos 14 dias
+    (com opt-in); sem ela, cada dia DAILY é distribuído nas 24 horas.
+    """
+    end = (end or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    usage_filter = {'And': [
+        {'Dimensions': {'Key': 'RECORD_TYPE', 'Values': ['Usage', 'SavingsPlanCoveredUsage']}},
+        {'Dimensions': {'Key': 'SERVICE', 'Values': list(services or COMPUTE_SP_SERVICES)}},
+    ]}
+
+    def query(granularity: str, period: Dict[str, str]) -> List[Tuple[str, float]]:
+        params = {
+            'TimePeriod': period,
+            'Granularity': granularity,
+            'Metrics': ['UnblendedCost'],
+            'Filter': usage_filter
+        }
+        points = []
+        while True:
+            response = ce_client.get_cost_and_usage(**params)
+            for result in response.get('ResultsByTime', []):
+                points.append((result.get('TimePeriod', {}).get('Start', ''),
+                               float(result.get('Total', {}).get('UnblendedCost', {}).get('Amount', 0))))
+            token = response.get('NextPageToken')
+            if not token:
+                return points
+            params['NextPageToken'] = token
+
+    hours = int((end - start).total_seconds() // 3600)
+    values = np.zeros(hours)
+    try:
+        points = query('HOURLY', {'Start': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                  'End': end.strftime('%Y-%m-%dT%H:%M:%SZ')})
+        granularity = 'HOURLY'
+        for moment, cost in points:
+            index = int((datetime.strptime(moment[:13], '%Y-%m-%dT%H') - start).total_seconds() // 3600)
+            if 0 <= index < hours:
+                values[index] += cost
+    except Exception as e:
+        logger.info(f"Uso horário indisponível, usando DAILY: {e}")
+        points = query('DAILY', {'Start': start.strftime('%Y-%m-%d'), 'End': end.strftime('%Y-%m-%d')})
+        granularity = 'DAILY'
+        for moment, cost in points:
+            index = (datetime.strptime(moment[:10], '%Y-%m-%d') - start).days * 24
+            if 0 <= index < hours:
+                values[index:index + 24] += cost / 24
+    return HourlyUsage(values=values, start=start, granularity=granularity, source='cost_explorer')
+
+
+def hourly_usage_from_frame(frame: Any, hour_dimension: str = 'usage_hour',
+                            metric: str = 'unblended') -> HourlyUsage:
+    """
+    Uso por hora a partir de um ColumnarCostFrame do CUR
+
+    A dimensão horária deve ter valores ISO truncados na hora
+    ('2024-01-01T05' ou '2024-01-01 05:00:00'); horas sem uso viram zero.
+    """
+    by_hour = frame.group_sum(hour_dimension, metric)
+    moments = {datetime.strptime(str(key)[:13].replace(' ', 'T'), '%Y-%m-%dT%H'): cost
+               for key, cost in by_hour.items() if key}
+    if not moments:
+        return HourlyUsage(values=np.zeros(0), start=datetime.utcnow(), source='cur')
+    start = min(moments)
+    values = np.zeros(int((max(moments) - start).total_seconds() // 3600) + 1)
+    for moment, cost in moments.items():
+        values[int((moment - start).total_seconds() // 3600)] += cost
+    return HourlyUsage(values=values, start=start, granularity='HOURLY', source='cur')
+
+
+@dataclass
+class SimulationResult:
+    """Métricas por candidato (ofertas × níveis de compromisso)"""
+    offers: List[CommitmentOffer]
+    levels: np.ndarray
+    commitment: np.ndarray
+    coverage: np.ndarray
+    utilization: np.ndarray
+    monthly_net_savings: np.ndarray
+    upfront: np.ndarray
+    break_even_months: np.ndarray
+    obligation: np.ndarray
+    hours: int
+    usage_total: float
+    baseline: Dict[str, float]
+    elapsed_seconds: float = 0.0
+
+    @property
+    def annual_net_savings(self) -> np.ndarray:
+        return self.monthly_net_savings * 12
+
+    def candidate(self, offer_index: int, level_index: int) -> Dict[str, Any]:
+        offer = self.offers[offer_index]
+        i, j = offer_index, level_index
+        break_even = float(self.break_even_months[i, j])
+        return {
+            'term': offer.term,
+            'payment_option': offer.payment_option,
+            'discount_percent': round(offer.discount * 100, 2),
+            'hourly_commitment': round(float(self.commitment[i, j]), 4),
+            'coverage_percent': round(float(self.coverage[i, j]) * 100, 2),
+            'utilization_percent': round(float(self.utilization[i, j]) * 100, 2),
+            'monthly_net_savings': round(float(self.monthly_net_savings[i, j]), 2),
+            'annual_net_savings': round(float(self.monthly_net_savings[i, j]) * 12, 2),
+            'upfront_cost': round(float(self.upfront[i, j]), 2),
+            'total_obligation': round(float(self.obligation[i, j]), 2),
+            'break_even_months': round(break_even, 1) if np.isfinite(break_even) else None,
+            'break_even_utilization_percent': round((1 - offer.discount) * 100, 2)
+        }
+
+    def best(self) -> Optional[Dict[str, Any]]:
+        """Candidato de maior economia líquida (None se nenhum economiza)"""
+        if self.monthly_net_savings.size == 0 or self.monthly_net_savings.max() <= 0:
+            return None
+        i, j = np.unravel_index(int(np.argmax(self.monthly_net_savings)), self.monthly_net_savings.shape)
+        return self.candidate(int(i), int(j))
+
+    def frontier(self) -> List[Dict[str, Any]]:
+        """
+        Fronteira eficiente: candidatos sem outro de obrigação menor ou
+        igual e economia anual maior
+        """
+        savings = self.monthly_net_savings.ravel()
+        obligation = self.obligation.ravel()
+        positive = np.flatnonzero(savings > 0)
+        if positive.size == 0:
+            return []
+        order = positive[np.lexsort((-savings[positive], obligation[positive]))]
+        ordered = savings[order]
+        previous_best = np.concatenate(([-np.inf], np.maximum.accumulate(ordered)[:-1]))
+        efficient = order[ordered > previous_best]
+        levels = self.monthly_net_savings.shape[1]
+        return [self.candidate(int(index // levels), int(index % levels)) for index in efficient]
+
+    def to_dict(self, frontier_limit: int = 50) -> Dict[str, Any]:
+        frontier = self.frontier()
+        if len(frontier) > frontier_limit:
+            picks = np.unique(np.linspace(0, len(frontier) - 1, frontier_limit).round().astype(int))
+            frontier = [frontier[i] for i in picks]
+        return {
+            'hours_simulated': self.hours,
+            'usage_total': round(self.usage_total, 2),
+            'candidates_evaluated': int(self.monthly_net_savings.size),
+            'elapsed_seconds': round(self.elapsed_seconds, 4),
+            'baseline': {k: round(v, 4) for k, v in self.baseline.items()},
+            'best': self.best(),
+            'efficient_frontier': frontier
+        }
+
+
+class CommitmentSimulator:
+    """
+    Avalia milhares de compras de compromisso de uma vez
+
+    Example:
+        simulator = CommitmentSimulator()
+        result = simulator.simulate(usage, existing=[...], num_levels=2000)
+        result.frontier()
+    """
+
+    def __init__(self, offers: Optional[Iterable[CommitmentOffer]] = None):
+        self.offers = list(offers) if offers is not None else CommitmentOffer.defaults()
+
+    @staticmethod
+    def existing_capacity(hours: int, existing: Iterable[ExistingCommitment]) -> np.ndarray:
+        """Capacidade On-Demand equivalente coberta por hora pelos compromissos ativos"""
+        capacity = np.zeros(hours)
+        for commitment in existing:
+            start = min(max(commitment.start_hour, 0), hours)
+            end = hours if commitment.end_hour is None else min(max(commitment.end_hour, 0), hours)
+            capacity[start:end] += commitment.capacity
+        return capacity
+
+    def simulate(
+        self,
+        usage: Any,
+        existing: Iterable[ExistingCommitment] = (),
+        levels: Optional[Sequence[float]] = None,
+        num_levels: int = 1000,
+        candidates: Optional[Sequence[Tuple[CommitmentOffer, float]]] = None
+    ) -> SimulationResult:
+        """
+        Simula candidatos sobre o uso residual
+
+        Args:
+            usage: HourlyUsage ou array de uso horário On-Demand equivalente
+            existing: Compromissos ativos (aplicados antes dos candidatos)
+            levels: Compromissos horários a testar (grade ofertas × níveis)
+            num_levels: Tamanho da grade automática (0 até o pico residual)
+            candidates: Compras explícitas (oferta, compromisso horário);
+                substituem a grade e viram uma linha por candidato
+
+        Returns:
+            SimulationResult com métricas de cada candidato
+        """
+        started = time.perf_counter()
+        values = np.asarray(getattr(usage, 'values', usage), dtype=np.float64)
+        hours = len(values)
+        if hours == 0:
+            raise ValueError("Uso horário vazio")
+        existing = list(existing)
+
+        capacity = self.existing_capacity(hours, existing)
+        existing_covered = np.minimum(values, capacity)
+        residual = values - existing_covered
+        usage_total = float(values.sum())
+        existing_hours_capacity = float(capacity.sum())
+        existing_cost = sum(
+            c.hourly_commitment * max(0, (hours if c.end_hour is None else min(c.end_hour, hours))
+                                      - min(max(c.start_hour, 0), hours))
+            for c in existing
+        )
+
+        if candidates:
+            offers = [offer for offer, _ in candidates]
+            commitment = np.array([[level] for _, level in candidates], dtype=np.float64)
+        else:
+            offers = self.offers
+            if levels is None:
+                peak = float(residual.max()) * (1 - min(o.discount for o in offers))
+                levels = np.linspace(0.0, peak, max(num_levels, 2))
+            commitment = np.broadcast_to(np.asarray(levels, dtype=np.float64), (len(offers), len(levels)))
+
+        discount = np.array([o.discount for o in offers])[:, None]
+        upfront_fraction = np.array([o.upfront_fraction for o in offers])[:, None]
+        term_hours = np.array([o.term_hours for o in offers], dtype=np.float64)[:, None]
+
+        caps = commitment / (1.0 - discount)
+        ordered = np.sort(residual)
+        prefix = np.concatenate(([0.0], np.cumsum(ordered)))
+        below = np.searchsorted(ordered, caps, side='left')
+        covered = prefix[below] + caps * (hours - below)
+
+        scale = HOURS_PER_MONTH / hours
+        paid = commitment * hours
+        with np.errstate(divide='ignore', invalid='ignore'):
+            utilization = np.where(caps > 0, covered / (caps * hours), 0.0)
+        coverage = (float(existing_covered.sum()) + covered) / usage_total if usage_total > 0 else np.zeros_like(covered)
+        monthly_net = (covered - paid) * scale
+        upfront = commitment * term_hours * upfront_fraction
+        monthly_avoided = covered * scale
+        monthly_recurring = commitment * HOURS_PER_MONTH * (1.0 - upfront_fraction)
+        margin = monthly_avoided - monthly_recurring
+        with np.errstate(divide='ignore', invalid='ignore'):
+            break_even = np.where(
+                monthly_net <= 0, np.inf,
+                np.where(upfront > 0, upfront / np.where(margin > 0, margin, np.nan), 0.0)
+            )
+        break_even = np.where(np.isnan(break_even) | (break_even > term_hours / HOURS_PER_MONTH),
+                              np.inf, break_even)
+
+        baseline = {
+            'coverage': float(existing_covered.sum()) / usage_total if usage_total > 0 else 0.0,
+            'utilization': float(existing_covered.sum()) / existing_hours_capacity if existing_hours_capacity else 0.0,
+            'monthly_net_savings': (float(existing_covered.sum()) - existing_cost) * scale,
+            'monthly_on_demand': float(residual.sum()) * scale
+        }
+
+        return SimulationResult(
+            offers=list(offers),
+            levels=np.asarray(commitment[0] if not candidates else commitment[:, 0]),
+            commitment=np.array(commitment),
+            coverage=np.asarray(coverage),
+            utilization=utilization,
+            monthly_net_savings=monthly_net,
+            upfront=upfront,
+            break_even_months=break_even,
+            obligation=commitment * term_hours,
+            hours=hours,
+            usage_total=usage_total,
+            baseline=baseline,
+            elapsed_seconds=time.perf_counter() - started
+        )
@@ -0,0 +1,513 @@
+"""
+Cost Cube
+
+Cubo multidimensional de custos em memória (dia × serviço × região ×
+conta × top-N valores de tag), materializado uma vez por refresh:
+
+- Cuboides: ColumnarCostFrame pré-agregados por conjunto de dimensões,
+  todos com 'day' para permitir recortes de período
+- Roll-ups pré-calculados (dia, dia×serviço, dia×região, ...): cada
+  consulta agrega apenas as células do menor cuboide que a atende
+- slice / dice / pivot / top-K em O(células), sem chamar a AWS
+
+Fontes:
+- CUR (ColumnarCostFrame com grão completo): um único cuboide base
+- Cost Explorer: GetCostAndUsage aceita no máximo dois GroupBy, então o
+  cubo é montado com consultas DAILY SERVICE×REGION, SERVICE×LINKED_ACCOUNT
+  e SERVICE×TAG (uma por chave), que são projeções do grão completo
+
+Design Patterns:
+- Materialized View: Agregações calculadas uma vez e reutilizadas
+- Singleton: Cubo ativo compartilhado via get_cost_cube()
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .cost_engine import DEFAULT_METRIC, ColumnarCostFrame, GroupKey
+
+logger = logging.getLogger(__name__)
+
+DAY = 'day'
+SERVICE = 'service'
+REGION = 'region'
+ACCOUNT = 'account'
+TAG_PREFIX = 'tag:'
+
+# Dimensões do Cost Explorer usadas nas projeções SERVICE×X
+CE_DIMENSIONS = {
+    REGION: 'REGION',
+    ACCOUNT: 'LINKED_ACCOUNT',
+}
+
+# Valores de tag fora do top-N são somados nesta categoria
+OTHER_VALUE = 'Other'
+
+DEFAULT_TAG_KEYS = (
+    'CostCenter', 'Project', 'Environment', 'Owner', 'Application', 'Team', 'BusinessUnit'
+)
+DEFAULT_TAG_TOP_N = 50
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_MAX_AGE = timedelta(minutes=15)
+DEFAULT_WORKERS = 4
+
+# Mapeamento padrão das dimensões de CURParquetReader.load_frame
+CUR_DIMENSIONS = {
+    DAY: 'usage_day',
+    SERVICE: 'product_code',
+    REGION: 'region',
+    ACCOUNT: 'account_id',
+}
+
+DateLike = Union[str, date, datetime]
+Filters = Dict[str, Union[str, Sequence[str]]]
+
+
+def tag_dimension(tag_key: str) -> str:
+    """Nome da dimensão do cubo para uma chave de tag"""
+    return f'{TAG_PREFIX}{tag_key}'
+
+
+def _day(value: DateLike) -> str:
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def period_bounds(start: DateLike, end: DateLike) -> Tuple[str, str]:
+    """
+    Normaliza [start, end) para dias
+
+    Mesmo dia de início e fim vira um dia inteiro, como nas consultas
+    DAILY do Cost Explorer feitas pelos serviços.
+    """
+    first, last = _day(start), _day(end)
+    if first == last:
+        last = (date.fromisoformat(first) + timedelta(days=1)).isoformat()
+    return first, last
+
+
+def _as_values(values: Union[str, Sequence[str]]) -> List[str]:
+    return [values] if isinstance(values, str) else list(values)
+
+
+class CostCube:
+    """
+    Cubo de custos com cuboides pré-agregados
+
+    Example:
+        cube = CostCube.from_cost_explorer(ce, '2024-01-01', '2024-04-01')
+        cube.top_k('service', k=5, start='2024-03-01')
+        cube.pivot('service', 'region')
+        cube.slice('tag:BusinessUnit', 'Finance').group_sum('service')
+    """
+
+    def __init__(
+        self,
+        cuboids: Iterable[ColumnarCostFrame],
+        start: DateLike,
+        end: DateLike,
+        source: str = 'cost_explorer',
+        built_at: Optional[datetime] = None,
+        folded: Optional[Dict[str, FrozenSet[str]]] = None,
+        materialize: bool = True
+    ):
+        self.start, self.end = _day(start), _day(end)
+        self.source = source
+        self.built_at = built_at or datetime.now()
+        self._folded = dict(folded or {})
+        self._cuboids: Dict[FrozenSet[str], ColumnarCostFrame] = {}
+        for frame in cuboids:
+            if DAY not in frame.dimension_names:
+                raise ValueError(f"Cuboide sem a dimensão '{DAY}': {frame.dimension_names}")
+            self._cuboids.setdefault(frozenset(frame.dimension_names), frame)
+        if materialize:
+            self._materialize_rollups()
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame: ColumnarCostFrame,
+        start: DateLike,
+        end: DateLike,
+        dimensions: Optional[Dict[str, str]] = None,
+        metric: str = 'unblended',
+        tag_top_n: int = DEFAULT_TAG_TOP_N,
+        source: str = 'cur'
+    ) -> 'CostCube':
+        """
+        Cria o cubo a partir de um frame com grão completo (ex.: CUR)
+
+        Args:
+            frame: ColumnarCostFrame de line items
+            dimensions: dimensão do cubo -> dimensão do frame
+                (padrão CUR_DIMENSIONS; tags como 'tag:Team')
+            metric: Métrica do frame usada como custo
+            tag_top_n: Valores de tag mantidos por chave
+        """
+        dimensions = dimensions or CUR_DIMENSIONS
+        base = frame.project(dimensions, {DEFAULT_METRIC: metric})
+        base, folded = cls._fold_tags(base, tag_top_n)
+        return cls([base.rollup(list(dimensions))], start, end, source=source, folded=folded)
+
+    @classmethod
+    def from_cost_explorer(
+        cls,
+        ce_client: Any,
+        start: DateLike,
+        end: DateLike,
+        tag_keys: Sequence[str] = DEFAULT_TAG_KEYS,
+        tag_top_n: Optional[int] = DEFAULT_TAG_TOP_N,
+        dimensions: Sequence[str] = (REGION, ACCOUNT),
+        max_workers: int = 1
+    ) -> 'CostCube':
+        """
+        Cria o cubo com consultas DAILY ao Cost Explorer
+
+        Uma consulta paginada por projeção (SERVICE×REGION,
+        SERVICE×LINKED_ACCOUNT e SERVICE×TAG por chave), executadas em
+        paralelo com max_workers > 1. Falha em uma chave de tag apenas
+        remove a dimensão do cubo; quem consultar essa tag usa o Cost
+        Explorer.
+
+        Args:
+            tag_top_n: Valores mantidos por tag (None mantém todos)
+            dimensions: Projeções não-tag a buscar (region, account)
+        """
+        period = {'Start': _day(start), 'End': _day(end)}
+        projections = [
+            ([SERVICE, name], [{'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                               {'Type': 'DIMENSION', 'Key': CE_DIMENSIONS[name]}], ())
+            for name in dimensions
+        ]
+        for tag_key in tag_keys:
+            name = tag_dimension(tag_key)
+            projections.append(([SERVICE, name], [{'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                                                  {'Type': 'TAG', 'Key': tag_key}], (name,)))
+
+        def fetch(projection):
+            names, group_by, tags = projection
+            return ColumnarCostFrame.from_cost_explorer(
+                list(cls._fetch_pages(ce_client, period, group_by)),
+                names, tag_dimensions=tags, period_dimension=DAY
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(fetch, projection) for projection in projections]
+
+        cuboids = []
+        folded: Dict[str, FrozenSet[str]] = {}
+        error: Optional[Exception] = None
+        for (_, _, tags), future in zip(projections, futures):
+            try:
+                frame = future.result()
+            except Exception as e:
+                if not tags:
+                    raise
+                logger.warning(f"Erro ao carregar {tags[0]} no cubo de custos: {e}")
+                error = e
+                continue
+            frame, frame_folded = cls._fold_tags(frame, tag_top_n)
+            folded.update(frame_folded)
+            cuboids.append(frame.rollup(frame.dimension_names) if frame_folded else frame)
+
+        if not cuboids and error is not None:
+            raise error
+        return cls(cuboids, start, end, source='cost_explorer', folded=folded)
+
+    @staticmethod
+    def _fetch_pages(ce_client: Any, period: Dict[str, str],
+                     group_by: List[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+        params = {
+            'TimePeriod': period,
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': group_by
+        }
+        while True:
+            response = ce_client.get_cost_and_usage(**params)
+            yield response
+            token = response.get('NextPageToken')
+            if not token:
+                return
+            params['NextPageToken'] = token
+
+    @staticmethod
+    def _fold_tags(
+        frame: ColumnarCostFrame,
+        top_n: Optional[int]
+    ) -> Tuple[ColumnarCostFrame, Dict[str, FrozenSet[str]]]:
+        """Mantém os top-N valores de cada tag (e o vazio); o resto vira OTHER_VALUE"""
+        folded = {}
+        if top_n is None:
+            return frame, folded
+        for name in frame.dimension_names:
+            if not name.startswith(TAG_PREFIX):
+                continue
+            ranked = [value for value, _ in frame.top_k(name, k=None) if value]
+            if len(ranked) <= top_n:
+                continue
+            kept = frozenset(ranked[:top_n]) | {''}
+            frame = frame.recode(name, lambda v, kept=kept: v if v in kept else OTHER_VALUE)
+            folded[name] = kept
+        return frame, folded
+
+    def _materialize_rollups(self) -> None:
+        """
+        Pré-calcula os roll-ups: dia×serviço×X a partir das bases, depois
+        dia×X e dia, sempre a partir do menor cuboide que os contém
+        """
+        dimensions = set().union(*self._cuboids) - {DAY} if self._cuboids else set()
+        targets = []
+        if SERVICE in dimensions:
+            targets += [{DAY, SERVICE, name} for name in sorted(dimensions - {SERVICE})]
+        targets += [{DAY, name} for name in sorted(dimensions)]
+        targets.append({DAY})
+        for target in targets:
+            key = frozenset(target)
+            if key in self._cuboids or not any(key <= existing for existing in self._cuboids):
+                continue
+            source = self._cuboid(target)
+            self._cuboids[key] = source.rollup([n for n in source.dimension_names if n in key])
+
+    @property
+    def dimensions(self) -> List[str]:
+        """Dimensões consultáveis (em algum cuboide)"""
+        return sorted(set().union(*self._cuboids)) if self._cuboids else []
+
+    @property
+    def folded_dimensions(self) -> List[str]:
+        """Dimensões de tag com valores fora do top-N somados em OTHER_VALUE"""
+        return sorted(self._folded)
+
+    def categories(self, dimension: str) -> List[str]:
+        """Valores distintos da dimensão"""
+        return self._cuboid({dimension}).categories(dimension)
+
+    def _cuboid(self, dimensions: Iterable[str]) -> ColumnarCostFrame:
+        """Menor cuboide que contém as dimensões"""
+        needed = set(dimensions) | {DAY}
+        candidates = [frame for key, frame in self._cuboids.items() if needed <= key]
+        if not candidates:
+            raise KeyError(f"Nenhum cuboide com as dimensões {sorted(needed)}")
+        return min(candidates, key=len)
+
+    def has_dimensions(self, dimensions: Iterable[str]) -> bool:
+        needed = set(dimensions) | {DAY}
+        return any(needed <= key for key in self._cuboids)
+
+    def covers(self, start: DateLike, end: DateLike) -> bool:
+        """Indica se o período está inteiro dentro da janela do cubo"""
+        first, last = period_bounds(start, end)
+        return self.start <= first and last <= self.end
+
+    def is_fresh(self, max_age: timedelta = DEFAULT_MAX_AGE) -> bool:
+        return datetime.now() - self.built_at <= max_age
+
+    def can_answer(
+        self,
+        start: DateLike,
+        end: DateLike,
+        dimensions: Iterable[str] = (),
+        filters: Optional[Filters] = None
+    ) -> bool:
+        """
+        Indica se a consulta pode ser respondida pelo cubo
+
+        Falso quando o período sai da janela, uma dimensão não foi
+        materializada ou o filtro pede um valor de tag somado em OTHER_VALUE.
+        """
+        filters = filters or {}
+        if not self.covers(start, end) or not self.has_dimensions(list(dimensions) + list(filters)):
+            return False
+        for name, values in filters.items():
+            kept = self._folded.get(name)
+            if kept is not None and any(v not in kept for v in _as_values(values)):
+                return False
+        return True
+
+    def select(
+        self,
+        dimensions: Iterable[str] = (),
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        filters: Optional[Filters] = None
+    ) -> ColumnarCostFrame:
+        """
+        Células do menor cuboide com as dimensões, recortadas por período e filtros
+
+        O frame retornado pode ser refinado com where/group_sum/top_k.
+        """
+        filters = filters or {}
+        frame = self._cuboid(list(dimensions) + list(filters))
+        first, last = period_bounds(start or self.start, end or self.end)
+        if first > self.start or last < self.end:
+            frame = frame.where(DAY, predicate=lambda d: first <= d < last)
+        for name, values in filters.items():
+            frame = frame.where(name, _as_values(values))
+        return frame
+
+    def total(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        filters: Optional[Filters] = None
+    ) -> float:
+        """Custo total do período (e filtros)"""
+        return self.select((), start, end, filters).total()
+
+    def group_sum(
+        self,
+        by: Union[str, Sequence[str]],
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        filters: Optional[Filters] = None
+    ) -> Dict[GroupKey, float]:
+        """Custo por uma ou mais dimensões"""
+        by_list = [by] if isinstance(by, str) else list(by)
+        return self.select(by_list, start, end, filters).group_sum(by)
+
+    def top_k(
+        self,
+        by: Union[str, Sequence[str]],
+        k: Optional[int] = 10,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        filters: Optional[Filters] = None
+    ) -> List[Tuple[GroupKey, float]]:
+        """Maiores grupos em ordem decrescente"""
+        by_list = [by] if isinstance(by, str) else list(by)
+        return self.select(by_list, start, end, filters).top_k(by, k=k)
+
+    def pivot(
+        self,
+        rows: str,
+        columns: str,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        filters: Optional[Filters] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Tabela cruzada {linha: {coluna: custo}}"""
+        table: Dict[str, Dict[str, float]] = {}
+        for (row, column), cost in self.group_sum((rows, columns), start, end, filters).items():
+            table.setdefault(row, {})[column] = cost
+        return table
+
+    def daily_series(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        filters: Optional[Filters] = None
+    ) -> List[Dict[str, Any]]:
+        """Custo por dia, com zero nos dias sem dados"""
+        first, last = period_bounds(start or self.start, end or self.end)
+        by_day = self.group_sum(DAY, first, last, filters)
+        current, stop = date.fromisoformat(first), date.fromisoformat(last)
+        series = []
+        while current < stop:
+            day = current.isoformat()
+            series.append({'date': day, 'cost': round(by_day.get(day, 0.0), 2)})
+            current += timedelta(days=1)
+        return series
+
+    def dice(self, filters: Filters) -> 'CostCube':
+        """Sub-cubo com os filtros aplicados (cuboides sem as dimensões são descartados)"""
+        needed = set(filters)
+        cuboids = []
+        for key, frame in self._cuboids.items():
+            if needed <= key:
+                for name, values in filters.items():
+                    frame = frame.where(name, _as_values(values))
+                cuboids.append(frame)
+        return CostCube(cuboids, self.start, self.end, source=self.source,
+                        built_at=self.built_at, folded=self._folded, materialize=False)
+
+    def slice(self, dimension: str, value: str) -> 'CostCube':
+        """Sub-cubo com uma dimensão fixada em um valor"""
+        return self.dice({dimension: [value]})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'start': self.start,
+            'end': self.end,
+            'source': self.source,
+            'built_at': self.built_at.isoformat(),
+            'total': round(self.total(), 2) if self._cuboids else 0.0,
+            'cuboids': [
+                {'dimensions': sorted(key), 'cells': len(frame)}
+                for key, frame in sorted(self._cuboids.items(), key=lambda item: len(item[1]))
+            ]
+        }
+
+
+_active_cube: Optional[CostCube] = None
+_cube_lock = threading.Lock()
+
+
+def _max_age() -> timedelta:
+    return timedelta(seconds=int(os.getenv('FINOPS_COST_CUBE_MAX_AGE', str(int(DEFAULT_MAX_AGE.total_seconds())))))
+
+
+def get_cost_cube(max_age: Optional[timedelta] = None) -> Optional[CostCube]:
+    """Retorna o cubo ativo se ainda estiver fresco (None caso contrário)"""
+    with _cube_lock:
+        cube = _active_cube
+    if cube is None or not cube.is_fresh(max_age or _max_age()):
+        return None
+    return cube
+
+
+def set_cost_cube(cube: Optional[CostCube]) -> None:
+    """Publica (ou remove, com None) o cubo ativo"""
+    global _active_cube
+    with _cube_lock:
+        _active_cube = cube
+
+
+def materialize_cost_cube(
+    ce_client: Any,
+    days: Optional[int] = None,
+    tag_keys: Optional[Sequence[str]] = None,
+    tag_top_n: Optional[int] = None,
+    end: Optional[DateLike] = None
+) -> CostCube:
+    """
+    Materializa o cubo a partir do Cost Explorer e o publica como ativo
+
+    A janela termina amanhã em UTC (exclusivo), incluindo o custo parcial de hoje.
+    Padrões em FINOPS_COST_CUBE_DAYS, FINOPS_COST_CUBE_TAGS,
+    FINOPS_COST_CUBE_TOP_N e FINOPS_COST_CUBE_WORKERS.
+    """
+    days = days or int(os.getenv('FINOPS_COST_CUBE_DAYS', str(DEFAULT_WINDOW_DAYS)))
+    if tag_keys is None:
+        configured = [k.strip() for k in os.getenv('FINOPS_COST_CUBE_TAGS', '').split(',') if k.strip()]
+        tag_keys = configured or DEFAULT_TAG_KEYS
+    tag_top_n = tag_top_n or int(os.getenv('FINOPS_COST_CUBE_TOP_N', str(DEFAULT_TAG_TOP_N)))
+    workers = int(os.getenv('FINOPS_COST_CUBE_WORKERS', str(DEFAULT_WORKERS)))
+    last = date.fromisoformat(_day(end)) if end else datetime.utcnow().date() + timedelta(days=1)
+    cube = CostCube.from_cost_explorer(
+        ce_client, last - timedelta(days=days), last, tag_keys=tag_keys, tag_top_n=tag_top_n,
+        max_workers=workers
+    )
+    set_cost_cube(cube)
+    return cube
+
+
+def resolve_cost_cube(
+    cube: Optional[CostCube],
+    start: DateLike,
+    end: DateLike,
+    dimensions: Iterable[str] = (),
+    filters: Optional[Filters] = None
+) -> Optional[CostCube]:
+    """Cubo (explícito ou ativo) capaz de responder à consulta, ou None"""
+    cube = cube or get_cost_cube()
+    if cube is not None and cube.can_answer(start, end, dimensions, filters):
+        return cube
+    return None
@@ -0,0 +1,400 @@
+"""
+Columnar Cost Engine
+
+Motor colunar de agregação de custos (struct-of-arrays em NumPy):
+
+- Dimensões (serviço, região, conta, usage_type, tags) codificadas em
+  dicionário: um array int32 de códigos + lista de categorias
+- Métricas (unblended, amortizado, ...) em arrays float64
+- group-by, soma e top-K vetorizados (np.bincount / np.argpartition),
+  sem criar um objeto por line item
+
+Alimentado por lotes Arrow do CUR (CURParquetReader) ou por respostas do
+Cost Explorer, e usado por alocação, showback/chargeback e unit economics.
+
+Design Patterns:
+- Value Object: Frame imutável; filtros retornam novas visões
+- Flyweight: Strings de dimensão armazenadas uma vez por categoria
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRIC = 'cost'
+
+# Acima deste número de combinações o group-by multi-dimensional usa
+# np.unique em vez de bincount denso
+DENSE_GROUP_LIMIT = 1 << 24
+
+GroupKey = Union[str, Tuple[str, ...]]
+
+
+def _encode(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Codifica strings em dicionário (None vira string vazia)"""
+    if PYARROW_AVAILABLE:
+        array = pc.fill_null(pa.array(values, type=pa.string()), '')
+        encoded = array.dictionary_encode()
+        return (
+            encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32, copy=False),
+            encoded.dictionary.to_pylist()
+        )
+    index: Dict[str, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(v or '', len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values)
+    )
+    return codes, list(index)
+
+
+def _strip_tag_prefix(value: str) -> str:
+    """Converte chave de grupo TAG do Cost Explorer ('Key$valor') em 'valor'"""
+    return value.split('$', 1)[1] if '$' in value else value
+
+
+class ColumnarCostFrame:
+    """
+    Tabela colunar de custos com dimensões codificadas em dicionário
+
+    Example:
+        frame = ColumnarCostFrame.from_columns(
+            {'service': services, 'region': regions},
+            {'cost': costs}
+        )
+        frame.group_sum('service')
+        frame.top_k(('service', 'region'), k=5)
+    """
+
+    def __init__(
+        self,
+        dimensions: Dict[str, Tuple[np.ndarray, List[str]]],
+        metrics: Dict[str, np.ndarray]
+    ):
+        lengths = {len(codes) for codes, _ in dimensions.values()}
+        lengths.update(len(values) for values in metrics.values())
+        if len(lengths) > 1:
+            raise ValueError(f"Colunas com tamanhos diferentes: {sorted(lengths)}")
+        self._dimensions = dimensions
+        self._metrics = metrics
+        self._num_rows = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_columns(
+        cls,
+        dimensions: Dict[str, Sequence[Optional[str]]],
+        metrics: Dict[str, Sequence[float]]
+    ) -> 'ColumnarCostFrame':
+        """Cria frame a partir de listas/arrays por coluna"""
+        return cls(
+            {name: _encode(values) for name, values in dimensions.items()},
+            {name: np.asarray(values, dtype=np.float64) for name, values in metrics.items()}
+        )
+
+    @classmethod
+    def from_arrow(
+        cls,
+        data: Any,
+        dimensions: Dict[str, str],
+        metrics: Dict[str, str]
+    ) -> 'ColumnarCostFrame':
+        """
+        Cria frame a partir de Table/RecordBatch do pyarrow
+
+        Args:
+            data: pyarrow.Table ou RecordBatch
+            dimensions: nome no frame -> coluna de origem
+            metrics: nome no frame -> coluna de origem
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow é necessário para ColumnarCostFrame.from_arrow")
+
+        def column(name):
+            col = data.column(name)
+            return col.combine_chunks() if isinstance(col, pa.ChunkedArray) else col
+
+        encoded = {}
+        for name, source in dimensions.items():
+            col = pc.fill_null(column(source).cast(pa.string()), '').dictionary_encode()
+            encoded[name] = (
+                col.indices.to_numpy(zero_copy_only=False).astype(np.int32, copy=False),
+                col.dictionary.to_pylist()
+            )
+        values = {
+            name: pc.fill_null(column(source).cast(pa.float64()), 0.0).to_numpy(zero_copy_only=False)
+            for name, source in metrics.items()
+        }
+        return cls(encoded, values)
+
+    @classmethod
+    def from_cost_explorer(
+        cls,
+        responses: Union[Dict[str, Any], Iterable[Dict[str, Any]]],
+        dimensions: Sequence[str],
+        tag_dimensions: Sequence[str] = (),
+        metric: str = 'UnblendedCost',
+        metric_name: str = DEFAULT_METRIC,
+        period_dimension: Optional[str] = None
+    ) -> 'ColumnarCostFrame':
+        """
+        Cria frame a partir de respostas get_cost_and_usage com GroupBy
+
+        Args:
+            responses: Resposta (ou páginas) do Cost Explorer
+            dimensions: Nome de cada posição de Keys, na ordem do GroupBy
+            tag_dimensions: Dimensões do tipo TAG ('Key$valor' vira 'valor')
+            metric: Métrica do Cost Explorer
+            metric_name: Nome da métrica no frame
+            period_dimension: Se informado, grava TimePeriod.Start de cada
+                resultado nesta dimensão (útil com Granularity DAILY)
+        """
+        if isinstance(responses, dict):
+            responses = [responses]
+
+        columns: List[List[str]] = [[] for _ in dimensions]
+        amounts: List[float] = []
+        periods: List[str] = []
+        for response in responses:
+            for result in response.get('ResultsByTime', []):
+                period = result.get('TimePeriod', {}).get('Start', '')
+                for group in result.get('Groups', []):
+                    keys = group.get('Keys', [])
+                    periods.append(period)
+                    for position, values in enumerate(columns):
+                        values.append(keys[position] if position < len(keys) else '')
+                    amounts.append(float(group.get('Metrics', {}).get(metric, {}).get('Amount', 0)))
+
+        tags = set(tag_dimensions)
+        for position, name in enumerate(dimensions):
+            if name in tags:
+                columns[position] = [_strip_tag_prefix(v) for v in columns[position]]
+
+        named = {name: columns[position] for position, name in enumerate(dimensions)}
+        if period_dimension:
+            named[period_dimension] = periods
+        return cls.from_columns(named, {metric_name: amounts})
+
+    @classmethod
+    def concat(cls, frames: Sequence['ColumnarCostFrame']) -> 'ColumnarCostFrame':
+        """Concatena frames unificando os dicionários de cada dimensão"""
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            return cls({}, {})
+        if len(frames) == 1:
+            return frames[0]
+
+        dimensions = {}
+        for name in frames[0].dimension_names:
+            union: Dict[str, int] = {}
+            parts = []
+            for frame in frames:
+                codes, categories = frame._dimensions[name]
+                remap = np.fromiter(
+                    (union.setdefault(c, len(union)) for c in categories),
+                    dtype=np.int32, count=len(categories)
+                )
+                parts.append(remap[codes] if len(codes) else codes)
+            dimensions[name] = (np.concatenate(parts), list(union))
+        metrics = {
+            name: np.concatenate([frame._metrics[name] for frame in frames])
+            for name in frames[0].metric_names
+        }
+        return cls(dimensions, metrics)
+
+    @property
+    def num_rows(self) -> int:
+        return self._num_rows
+
+    def __len__(self) -> int:
+        return self._num_rows
+
+    @property
+    def dimension_names(self) -> List[str]:
+        return list(self._dimensions)
+
+    @property
+    def metric_names(self) -> List[str]:
+        return list(self._metrics)
+
+    def categories(self, dimension: str) -> List[str]:
+        """Valores distintos conhecidos da dimensão"""
+        return list(self._dimensions[dimension][1])
+
+    def total(self, metric: str = DEFAULT_METRIC) -> float:
+        """Soma da métrica"""
+        return float(self._metrics[metric].sum()) if self._num_rows else 0.0
+
+    def where(
+        self,
+        dimension: str,
+        values: Optional[Iterable[str]] = None,
+        predicate: Optional[Callable[[str], bool]] = None,
+        negate: bool = False
+    ) -> 'ColumnarCostFrame':
+        """
+        Filtra linhas pelo valor de uma dimensão
+
+        O predicado é avaliado uma vez por categoria, não por linha.
+        """
+        codes, categories = self._dimensions[dimension]
+        wanted = set(values) if values is not None else None
+        selected = [
+            i for i, category in enumerate(categories)
+            if (wanted is None or category in wanted) and (predicate is None or predicate(category))
+        ]
+        lookup = np.zeros(len(categories), dtype=bool)
+        lookup[selected] = True
+        mask = lookup[codes]
+        if negate:
+            mask = ~mask
+        return ColumnarCostFrame(
+            {name: (c[mask], cats) for name, (c, cats) in self._dimensions.items()},
+            {name: v[mask] for name, v in self._metrics.items()}
+        )
+
+    def project(
+        self,
+        dimensions: Dict[str, str],
+        metrics: Dict[str, str]
+    ) -> 'ColumnarCostFrame':
+        """
+        Seleciona e renomeia colunas sem copiar os arrays
+
+        Args:
+            dimensions: nome novo -> dimensão atual
+            metrics: nome novo -> métrica atual
+        """
+        return ColumnarCostFrame(
+            {name: self._dimensions[source] for name, source in dimensions.items()},
+            {name: self._metrics[source] for name, source in metrics.items()}
+        )
+
+    def recode(self, dimension: str, mapping: Callable[[str], str]) -> 'ColumnarCostFrame':
+        """
+        Renomeia categorias de uma dimensão, unificando as que colidem
+
+        O mapeamento é avaliado uma vez por categoria, não por linha.
+        """
+        codes, categories = self._dimensions[dimension]
+        union: Dict[str, int] = {}
+        remap = np.fromiter(
+            (union.setdefault(mapping(c), len(union)) for c in categories),
+            dtype=np.int32, count=len(categories)
+        )
+        dimensions = dict(self._dimensions)
+        dimensions[dimension] = (remap[codes] if len(codes) else codes, list(union))
+        return ColumnarCostFrame(dimensions, self._metrics)
+
+    def rollup(self, by: Union[str, Sequence[str]]) -> 'ColumnarCostFrame':
+        """
+        Pré-agrega o frame nas dimensões informadas (uma linha por célula)
+
+        Todas as métricas são somadas e os dicionários são preservados,
+        de modo que o resultado pode ser filtrado e agregado de novo.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if not self._num_rows:
+            return ColumnarCostFrame(
+                {name: (np.zeros(0, dtype=np.int32), list(self._dimensions[name][1])) for name in by},
+                {name: np.zeros(0) for name in self._metrics}
+            )
+        combined, cells, sizes = self._combine(by)
+        if cells <= DENSE_GROUP_LIMIT:
+            present = np.flatnonzero(np.bincount(combined, minlength=cells))
+            inverse = np.searchsorted(present, combined)
+        else:
+            present, inverse = np.unique(combined, return_inverse=True)
+        metrics = {
+            name: np.bincount(inverse, weights=values, minlength=len(present))
+            for name, values in self._metrics.items()
+        }
+        codes = np.unravel_index(present, sizes) if len(by) > 1 else (present,)
+        return ColumnarCostFrame(
+            {
+                name: (codes[d].astype(np.int32), list(self._dimensions[name][1]))
+                for d, name in enumerate(by)
+            },
+            metrics
+        )
+
+    def _combine(self, by: Sequence[str]) -> Tuple[np.ndarray, int, List[int]]:
+        """Combina os códigos das dimensões em um único índice por linha"""
+        code_arrays = [self._dimensions[name][0] for name in by]
+        sizes = [max(len(self._dimensions[name][1]), 1) for name in by]
+        if len(by) == 1:
+            return code_arrays[0], sizes[0], sizes
+        return np.ravel_multi_index(code_arrays, sizes), int(np.prod(sizes, dtype=np.int64)), sizes
+
+    def _group(self, by: Sequence[str], metric: str) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+        """Retorna (índice combinado de cada grupo presente, somas, cardinalidades)"""
+        weights = self._metrics[metric]
+        combined, cells, sizes = self._combine(by)
+
+        if cells <= DENSE_GROUP_LIMIT:
+            sums = np.bincount(combined, weights=weights, minlength=cells)
+            counts = np.bincount(combined, minlength=cells)
+            present = np.flatnonzero(counts)
+            return present, sums[present], sizes
+
+        present, inverse = np.unique(combined, return_inverse=True)
+        return present, np.bincount(inverse, weights=weights, minlength=len(present)), sizes
+
+    def _labels(self, by: Sequence[str], combined: np.ndarray, sizes: List[int]) -> List[GroupKey]:
+        """Converte índices combinados nos valores das dimensões"""
+        category_lists = [self._dimensions[name][1] for name in by]
+        if len(by) == 1:
+            categories = category_lists[0]
+            return [categories[i] for i in combined.tolist()]
+        per_dimension = [idx.tolist() for idx in np.unravel_index(combined, sizes)]
+        return [
+            tuple(category_lists[d][codes[d]] for d in range(len(by)))
+            for codes in zip(*per_dimension)
+        ]
+
+    def group_sum(self, by: Union[str, Sequence[str]], metric: str = DEFAULT_METRIC) -> Dict[GroupKey, float]:
+        """
+        Soma a métrica por uma ou mais dimensões
+
+        Returns:
+            {valor: soma} para uma dimensão ou {(v1, v2, ...): soma}
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if not self._num_rows:
+            return {}
+        present, sums, sizes = self._group(by, metric)
+        return dict(zip(self._labels(by, present, sizes), sums.tolist()))
+
+    def top_k(
+        self,
+        by: Union[str, Sequence[str]],
+        k: Optional[int] = 10,
+        metric: str = DEFAULT_METRIC
+    ) -> List[Tuple[GroupKey, float]]:
+        """Maiores grupos pela métrica, em ordem decrescente (k=None retorna todos)"""
+        by = [by] if isinstance(by, str) else list(by)
+        if not self._num_rows or k == 0:
+            return []
+        present, sums, sizes = self._group(by, metric)
+        if k is not None and k < len(sums):
+            candidates = np.argpartition(-sums, k - 1)[:k]
+        else:
+            candidates = np.arange(len(sums))
+        order = candidates[np.argsort(-sums[candidates], kind='stable')]
+        return list(zip(self._labels(by, present[order], sizes), sums[order].tolist()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self._num_rows,
+            'dimensions': {name: len(cats) for name, (_, cats) in self._dimensions.items()},
+            'metrics': {name: round(self.total(name), 2) for name in self._metrics}
+        }
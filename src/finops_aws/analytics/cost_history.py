@@ -0,0 +1,661 @@
+"""
+Cost History Store
+
+Armazenamento analítico embarcado (SQLite) do histórico diário de custos:
+
+- Fatos diários por serviço, região, conta e usage_type, e custos
+  diários por tag em tabela separada (sem dupla contagem)
+- Ingestão incremental a partir do Cost Explorer (janela de reapuração
+  dos últimos dias) e do CUR em Parquet (todas as dimensões por linha)
+- Dias do Cost Explorer guardam uma projeção SERVICE×dimensão por
+  dimensão (GroupBy aceita só duas); consultas leem uma projeção por dia
+- Consultas de períodos arbitrários, comparações com o período anterior
+  e séries diárias sem chamar a AWS
+- Retenção configurável: dias antigos são compactados em totais mensais
+
+Design Patterns:
+- Repository: Persistência isolada do restante do dashboard
+- Singleton: Store global via get_cost_history_store()
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ('service', 'region', 'account', 'usage_type')
+
+SOURCE_COST_EXPLORER = 'cost_explorer'
+SOURCE_CUR = 'cur'
+
+# Granularidade das linhas: GRAIN_ALL tem todas as dimensões (CUR); as
+# demais são projeções do Cost Explorer SERVICE×<dimensão>
+GRAIN_ALL = 'all'
+CE_PROJECTIONS = {'region': 'REGION', 'account': 'LINKED_ACCOUNT', 'usage_type': 'USAGE_TYPE'}
+
+# Dimensões pedidas a CURParquetReader.load_frame
+CUR_FRAME_DIMENSIONS = ('usage_day', 'product_code', 'region', 'account_id', 'usage_type')
+
+# Cerca de 13 meses: cobre o maior período do dashboard (1y) dentro do
+# limite de dados DAILY do Cost Explorer
+DEFAULT_BACKFILL_DAYS = 395
+
+DateLike = Union[str, date, datetime]
+
+
+def _day(value: DateLike) -> str:
+    """Normaliza data para 'YYYY-MM-DD'"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def _parse_day(value: DateLike) -> date:
+    return date.fromisoformat(_day(value))
+
+
+def _days_between(start: DateLike, end: DateLike) -> List[str]:
+    """Dias em [start, end)"""
+    first, last = _parse_day(start), _parse_day(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days)]
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class CostHistoryStore:
+    """
+    Histórico de custos em SQLite.
+
+    Períodos seguem a convenção do Cost Explorer: início inclusivo e fim
+    exclusivo. Meses já compactados são somados integralmente quando
+    intersectam o período consultado.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        daily_retention_days: Optional[int] = None,
+        monthly_retention_months: Optional[int] = None
+    ):
+        self.path = path or os.getenv(
+            'FINOPS_COST_HISTORY_DB', os.path.join(tempfile.gettempdir(), 'finops_cost_history.db')
+        )
+        self.daily_retention_days = daily_retention_days or int(
+            os.getenv('FINOPS_COST_HISTORY_DAILY_DAYS', '400')
+        )
+        self.monthly_retention_months = monthly_retention_months or int(
+            os.getenv('FINOPS_COST_HISTORY_MONTHLY_MONTHS', '36')
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            legacy = self._legacy_fact_tables()
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS daily_costs (
+                    day TEXT NOT NULL,
+                    grain TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    usage_type TEXT NOT NULL,
+                    cost REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    PRIMARY KEY (day, grain, service, region, account, usage_type)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_daily_service ON daily_costs (service, day, grain, cost);
+                CREATE TABLE IF NOT EXISTS monthly_costs (
+                    month TEXT NOT NULL,
+                    grain TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    usage_type TEXT NOT NULL,
+                    cost REAL NOT NULL,
+                    PRIMARY KEY (month, grain, service, region, account, usage_type)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS daily_tag_costs (
+                    day TEXT NOT NULL,
+                    tag_key TEXT NOT NULL,
+                    tag_value TEXT NOT NULL,
+                    cost REAL NOT NULL,
+                    PRIMARY KEY (day, tag_key, tag_value)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS monthly_tag_costs (
+                    month TEXT NOT NULL,
+                    tag_key TEXT NOT NULL,
+                    tag_value TEXT NOT NULL,
+                    cost REAL NOT NULL,
+                    PRIMARY KEY (month, tag_key, tag_value)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    source TEXT PRIMARY KEY,
+                    first_day TEXT,
+                    last_day TEXT,
+                    synced_at TEXT NOT NULL
+                );
+            """)
+            columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(sync_state)')}
+            if 'first_day' not in columns:
+                self._conn.execute('ALTER TABLE sync_state ADD COLUMN first_day TEXT')
+            self._migrate_legacy_facts(legacy)
+
+    def _legacy_fact_tables(self) -> List[str]:
+        """Renomeia tabelas de fatos sem a coluna grain (versão anterior do schema)"""
+        legacy = []
+        for table in ('daily_costs', 'monthly_costs'):
+            columns = {row['name'] for row in self._conn.execute(f'PRAGMA table_info({table})')}
+            if columns and 'grain' not in columns:
+                self._conn.execute(f'ALTER TABLE {table} RENAME TO {table}_legacy')
+                legacy.append(table)
+        if 'daily_costs' in legacy:
+            self._conn.execute('DROP INDEX IF EXISTS idx_daily_service')
+        return legacy
+
+    def _migrate_legacy_facts(self, legacy: Sequence[str]) -> None:
+        """Copia os fatos antigos: linhas só com região eram do Cost Explorer (SERVICE×REGION)"""
+        dims = ', '.join(DIMENSIONS)
+        grain = f"CASE WHEN account = '' AND usage_type = '' THEN 'region' ELSE '{GRAIN_ALL}' END"
+        for table in legacy:
+            period, extra = ('day', ', source') if table == 'daily_costs' else ('month', '')
+            self._conn.execute(
+                f"INSERT INTO {table} ({period}, grain, {dims}, cost{extra}) "
+                f"SELECT {period}, {grain}, {dims}, cost{extra} FROM {table}_legacy"
+            )
+            self._conn.execute(f'DROP TABLE {table}_legacy')
+
+    def _transaction(self, statements: Sequence[Tuple[str, Any]]) -> None:
+        """Executa (sql, params | lista de params) numa transação"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, params in statements:
+                    if isinstance(params, list):
+                        self._conn.executemany(sql, params)
+                    else:
+                        self._conn.execute(sql, params)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def write_daily(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        source: str,
+        days: Optional[Iterable[DateLike]] = None
+    ) -> int:
+        """
+        Grava fatos diários substituindo os dias cobertos.
+
+        Cada dia pertence a uma única fonte (a última gravada), o que torna
+        a ingestão idempotente e evita somar Cost Explorer e CUR.
+
+        Args:
+            rows: Dicts com day, cost, dimensões (ausentes viram '') e
+                grain opcional (padrão GRAIN_ALL; projeções do Cost
+                Explorer usam a dimensão agrupada com SERVICE)
+            source: Origem dos dados
+            days: Dias a substituir (padrão: dias presentes em rows)
+
+        Returns:
+            Número de linhas gravadas
+        """
+        aggregated: Dict[Tuple[str, ...], float] = {}
+        for row in rows:
+            key = (_day(row['day']), row.get('grain') or GRAIN_ALL) + tuple(str(row.get(d) or '') for d in DIMENSIONS)
+            aggregated[key] = aggregated.get(key, 0.0) + float(row.get('cost', 0.0))
+
+        replaced = sorted({_day(d) for d in days} if days is not None else {k[0] for k in aggregated})
+        self._transaction([
+            ("DELETE FROM daily_costs WHERE day = ?", [(d,) for d in replaced]),
+            ("INSERT INTO daily_costs (day, grain, service, region, account, usage_type, cost, source) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+             [key + (cost, source) for key, cost in aggregated.items()]),
+        ])
+        return len(aggregated)
+
+    def write_daily_tags(
+        self,
+        tag_key: str,
+        rows: Iterable[Dict[str, Any]],
+        days: Optional[Iterable[DateLike]] = None
+    ) -> int:
+        """Grava custos diários por valor de uma tag, substituindo os dias cobertos"""
+        aggregated: Dict[Tuple[str, str], float] = {}
+        for row in rows:
+            key = (_day(row['day']), str(row.get('tag_value') or ''))
+            aggregated[key] = aggregated.get(key, 0.0) + float(row.get('cost', 0.0))
+
+        replaced = sorted({_day(d) for d in days} if days is not None else {k[0] for k in aggregated})
+        self._transaction([
+            ("DELETE FROM daily_tag_costs WHERE day = ? AND tag_key = ?", [(d, tag_key) for d in replaced]),
+            ("INSERT INTO daily_tag_costs (day, tag_key, tag_value, cost) VALUES (?, ?, ?, ?)",
+             [(day, tag_key, value, cost) for (day, value), cost in aggregated.items()]),
+        ])
+        return len(aggregated)
+
+    def ingest_frame(self, frame: Any, source: str = SOURCE_CUR, metric: str = 'unblended',
+                     day_dimension: str = 'usage_day') -> int:
+        """
+        Grava um ColumnarCostFrame (ex.: CURParquetReader.load_frame)
+
+        O frame precisa da dimensão de dia; dimensões de DIMENSIONS ausentes
+        viram ''. Mapeia product_code/account_id do CUR para service/account
+        e região vazia para 'global', como o Cost Explorer.
+        """
+        aliases = {'service': 'product_code', 'account': 'account_id'}
+        available = set(frame.dimension_names)
+        columns = [day_dimension]
+        names = []
+        for dimension in DIMENSIONS:
+            source_name = dimension if dimension in available else aliases.get(dimension)
+            if source_name in available:
+                columns.append(source_name)
+                names.append(dimension)
+
+        rows = []
+        for key, cost in frame.group_sum(columns, metric=metric).items():
+            row = {'day': key[0], 'cost': cost}
+            row.update(zip(names, key[1:]))
+            if 'region' in names and not row['region']:
+                row['region'] = 'global'
+            rows.append(row)
+        written = self.write_daily(rows, source=source)
+        days = [_day(r['day']) for r in rows]
+        self._mark_synced(source, max(days, default=None), min(days, default=None))
+        return written
+
+    def _mark_synced(self, source: str, last_day: Optional[str], first_day: Optional[str] = None) -> None:
+        """Registra a sincronização; first_day é o início da janela ingerida (mesmo sem custos)"""
+        self._transaction([(
+            "INSERT INTO sync_state (source, first_day, last_day, synced_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(source) DO UPDATE SET "
+            "first_day = COALESCE(MIN(excluded.first_day, sync_state.first_day), "
+            "excluded.first_day, sync_state.first_day), "
+            "last_day = COALESCE(MAX(excluded.last_day, sync_state.last_day), excluded.last_day, sync_state.last_day), "
+            "synced_at = excluded.synced_at",
+            (source, first_day, last_day, datetime.now().isoformat())
+        )])
+
+    def sync_state(self, source: str = SOURCE_COST_EXPLORER) -> Optional[Dict[str, Any]]:
+        """Último dia ingerido e horário da última sincronização da fonte"""
+        rows = self._query("SELECT * FROM sync_state WHERE source = ?", (source,))
+        return dict(rows[0]) if rows else None
+
+    def needs_sync(self, source: str = SOURCE_COST_EXPLORER, max_age: timedelta = timedelta(hours=6)) -> bool:
+        """Indica se a fonte nunca foi sincronizada ou está desatualizada"""
+        state = self.sync_state(source)
+        if not state:
+            return True
+        return datetime.now() - datetime.fromisoformat(state['synced_at']) > max_age
+
+    def sync_from_cost_explorer(
+        self,
+        ce_client: Any,
+        end_date: Optional[DateLike] = None,
+        backfill_days: int = DEFAULT_BACKFILL_DAYS,
+        restate_days: int = 3,
+        tag_keys: Sequence[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Ingestão incremental diária a partir do Cost Explorer.
+
+        Busca apenas os dias ainda não ingeridos, mais uma janela de
+        reapuração (o Cost Explorer ajusta os últimos dias), com uma
+        consulta DAILY por projeção de CE_PROJECTIONS (SERVICE + REGION,
+        LINKED_ACCOUNT e USAGE_TYPE) e uma por tag. Se o
+        histórico ainda não alcança backfill_days (ex.: backfill padrão
+        aumentado), a janela inteira é buscada de novo.
+
+        Returns:
+            Dicionário com período sincronizado e linhas gravadas
+        """
+        end = _parse_day(end_date or date.today())
+        backfill_start = end - timedelta(days=backfill_days)
+        state = self.sync_state(SOURCE_COST_EXPLORER)
+        backfilled = bool(state and state.get('first_day') and state['first_day'] <= backfill_start.isoformat())
+        if backfilled and state.get('last_day'):
+            start = _parse_day(state['last_day']) - timedelta(days=restate_days - 1)
+        else:
+            start = backfill_start
+        start = max(start, backfill_start)
+        if start >= end:
+            return {'start': start.isoformat(), 'end': end.isoformat(), 'rows': 0}
+
+        period = {'Start': start.isoformat(), 'End': end.isoformat()}
+        days = _days_between(start, end)
+
+        rows = []
+        for dimension, ce_key in CE_PROJECTIONS.items():
+            for group_day, keys, cost in self._fetch_groups(ce_client, period, [
+                {'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                {'Type': 'DIMENSION', 'Key': ce_key}
+            ]):
+                value = keys[1] if len(keys) > 1 else ''
+                if dimension == 'region':
+                    value = value or 'global'
+                rows.append({'day': group_day, 'grain': dimension, 'service': keys[0],
+                             dimension: value, 'cost': cost})
+        written = self.write_daily(rows, source=SOURCE_COST_EXPLORER, days=days)
+
+        for tag_key in tag_keys:
+            tag_rows = [
+                {'day': group_day, 'tag_value': keys[0].split('$', 1)[-1] if keys else '', 'cost': cost}
+                for group_day, keys, cost in self._fetch_groups(
+                    ce_client, period, [{'Type': 'TAG', 'Key': tag_key}]
+                )
+            ]
+            self.write_daily_tags(tag_key, tag_rows, days=days)
+
+        last_day = (end - timedelta(days=1)).isoformat()
+        self._mark_synced(SOURCE_COST_EXPLORER, last_day, start.isoformat())
+        return {'start': start.isoformat(), 'end': end.isoformat(), 'rows': written}
+
+    def sync_from_cur(
+        self,
+        reader: Any,
+        end_date: Optional[DateLike] = None,
+        backfill_days: int = DEFAULT_BACKFILL_DAYS
+    ) -> Dict[str, Any]:
+        """
+        Ingestão incremental a partir do CUR em Parquet (CURParquetReader)
+
+        O CUR reapura o mês até o fechamento, então cada execução relê a
+        partir do primeiro dia do mês do último dia ingerido. Dias do CUR
+        substituem os do Cost Explorer e trazem conta e usage_type.
+
+        Returns:
+            Dicionário com período sincronizado e linhas gravadas
+        """
+        end = _parse_day(end_date or date.today())
+        state = self.sync_state(SOURCE_CUR)
+        start = end - timedelta(days=backfill_days)
+        if state and state.get('last_day'):
+            start = max(start, _month_start(_parse_day(state['last_day'])))
+        if start >= end:
+            return {'start': start.isoformat(), 'end': end.isoformat(), 'rows': 0}
+
+        frame = reader.load_frame(
+            datetime.combine(start, datetime.min.time()),
+            datetime.combine(end, datetime.min.time()),
+            dimensions=CUR_FRAME_DIMENSIONS
+        )
+        if 'usage_day' not in frame.dimension_names:
+            return {'start': start.isoformat(), 'end': end.isoformat(), 'rows': 0}
+        written = self.ingest_frame(frame, source=SOURCE_CUR)
+        return {'start': start.isoformat(), 'end': end.isoformat(), 'rows': written}
+
+    @staticmethod
+    def _fetch_groups(ce_client: Any, period: Dict[str, str],
+                      group_by: List[Dict[str, str]]) -> List[Tuple[str, List[str], float]]:
+        params = {
+            'TimePeriod': period,
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': group_by
+        }
+        groups = []
+        while True:
+            response = ce_client.get_cost_and_usage(**params)
+            for result in response.get('ResultsByTime', []):
+                day = result.get('TimePeriod', {}).get('Start')
+                for group in result.get('Groups', []):
+                    amount = float(group.get('Metrics', {}).get('UnblendedCost', {}).get('Amount', 0))
+                    groups.append((day, group.get('Keys', []), amount))
+            token = response.get('NextPageToken')
+            if not token:
+                return groups
+            params['NextPageToken'] = token
+
+    @staticmethod
+    def _filter_sql(filters: Optional[Dict[str, Sequence[str]]],
+                    group_by: Sequence[str] = ()) -> Tuple[str, List[Any]]:
+        """
+        Filtros por dimensão mais a escolha de granularidade
+
+        Cada dia tem linhas GRAIN_ALL (CUR) ou uma projeção do Cost
+        Explorer por dimensão; lê-se GRAIN_ALL e a primeira projeção que
+        contém as dimensões usadas, para não somar projeções entre si.
+        """
+        clauses, params = [], []
+        for dimension, values in (filters or {}).items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Dimensão inválida: {dimension}")
+            values = [values] if isinstance(values, str) else list(values)
+            clauses.append(f"{dimension} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+        used = ({*group_by, *(filters or {})}) - {'service'}
+        grain = next((d for d in CE_PROJECTIONS if used <= {d}), None)
+        if grain is None:
+            raise ValueError(f"Combinação de dimensões sem projeção no histórico: {', '.join(sorted(used))}")
+        clauses.append('grain IN (?, ?)')
+        params.extend([GRAIN_ALL, grain])
+        return ' AND ' + ' AND '.join(clauses), params
+
+    def query_totals(
+        self,
+        start: DateLike,
+        end: DateLike,
+        group_by: Union[str, Sequence[str]] = ('service',),
+        filters: Optional[Dict[str, Sequence[str]]] = None
+    ) -> Dict[Any, float]:
+        """
+        Custo do período agrupado por dimensões
+
+        Returns:
+            {valor: custo} para uma dimensão ou {(v1, v2): custo}
+        """
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        for dimension in group_by:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Dimensão inválida: {dimension}")
+        start_day, end_day = _day(start), _day(end)
+        last_month = (_parse_day(end_day) - timedelta(days=1)).strftime('%Y-%m')
+        where, params = self._filter_sql(filters, group_by)
+        columns = ', '.join(group_by) if group_by else "'total'"
+
+        rows = self._query(
+            f"SELECT {columns}, SUM(cost) AS cost FROM ("
+            f"  SELECT {columns}, cost FROM daily_costs WHERE day >= ? AND day < ?{where}"
+            f"  UNION ALL"
+            f"  SELECT {columns}, cost FROM monthly_costs WHERE month >= ? AND month <= ?{where}"
+            f") GROUP BY {columns}",
+            [start_day, end_day, *params, start_day[:7], last_month, *params]
+        )
+        result = {}
+        for row in rows:
+            values = tuple(row)[:-1]
+            result[values[0] if len(values) == 1 else values] = row['cost']
+        return result
+
+    def total(self, start: DateLike, end: DateLike,
+              filters: Optional[Dict[str, Sequence[str]]] = None) -> float:
+        """Custo total do período"""
+        return sum(self.query_totals(start, end, group_by=(), filters=filters).values())
+
+    def daily_series(self, start: DateLike, end: DateLike,
+                     filters: Optional[Dict[str, Sequence[str]]] = None) -> List[Dict[str, Any]]:
+        """Série diária do período (dias sem dados retornam 0)"""
+        where, params = self._filter_sql(filters)
+        rows = self._query(
+            f"SELECT day, SUM(cost) AS cost FROM daily_costs WHERE day >= ? AND day < ?{where} GROUP BY day",
+            [_day(start), _day(end), *params]
+        )
+        by_day = {row['day']: row['cost'] for row in rows}
+        return [{'date': d, 'cost': round(by_day.get(d, 0.0), 4)} for d in _days_between(start, end)]
+
+    def tag_totals(self, start: DateLike, end: DateLike, tag_key: str) -> Dict[str, float]:
+        """Custo do período por valor de tag"""
+        start_day, end_day = _day(start), _day(end)
+        last_month = (_parse_day(end_day) - timedelta(days=1)).strftime('%Y-%m')
+        rows = self._query(
+            "SELECT tag_value, SUM(cost) AS cost FROM ("
+            "  SELECT tag_value, cost FROM daily_tag_costs WHERE tag_key = ? AND day >= ? AND day < ?"
+            "  UNION ALL"
+            "  SELECT tag_value, cost FROM monthly_tag_costs WHERE tag_key = ? AND month >= ? AND month <= ?"
+            ") GROUP BY tag_value",
+            (tag_key, start_day, end_day, tag_key, start_day[:7], last_month)
+        )
+        return {row['tag_value']: row['cost'] for row in rows}
+
+    def compare(
+        self,
+        start: DateLike,
+        end: DateLike,
+        group_by: str = 'service',
+        filters: Optional[Dict[str, Sequence[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Compara o período com o período anterior de mesma duração
+
+        Se o histórico não cobre o período anterior, previous_total,
+        previous e change_percent são None e a tendência é 'unavailable'
+        (em vez de comparar contra zero).
+
+        Returns:
+            Dicionário com total, previous_total, change_percent,
+            previous_available e items [{key, cost, previous,
+            change_percent, trend}]
+        """
+        first, last = _parse_day(start), _parse_day(end)
+        previous_start = first - (last - first)
+        current = self.query_totals(first, last, group_by=group_by, filters=filters)
+        previous_available = self.covers(previous_start, first)
+        previous = (
+            self.query_totals(previous_start, first, group_by=group_by, filters=filters)
+            if previous_available else {}
+        )
+
+        def change(now: float, before: float) -> Optional[float]:
+            return round((now - before) / before * 100, 1) if before > 0 else None
+
+        items = []
+        for key, cost in sorted(current.items(), key=lambda x: x[1], reverse=True):
+            if not previous_available:
+                items.append({'key': key, 'cost': cost, 'previous': None,
+                              'change_percent': None, 'trend': 'unavailable'})
+                continue
+            before = previous.get(key, 0.0)
+            delta = change(cost, before)
+            items.append({
+                'key': key,
+                'cost': cost,
+                'previous': before,
+                'change_percent': delta,
+                'trend': 'up' if cost > before else 'down' if cost < before else 'stable'
+            })
+
+        total = sum(current.values())
+        previous_total = sum(previous.values()) if previous_available else None
+        return {
+            'period': {'start': first.isoformat(), 'end': last.isoformat()},
+            'previous_period': {'start': previous_start.isoformat(), 'end': first.isoformat()},
+            'total': total,
+            'previous_total': previous_total,
+            'previous_available': previous_available,
+            'change_percent': change(total, previous_total) if previous_available else None,
+            'items': items
+        }
+
+    def coverage(self) -> Dict[str, Any]:
+        """Intervalo de dados disponível (diário e mensal)"""
+        daily = self._query("SELECT MIN(day) AS first, MAX(day) AS last, COUNT(*) AS rows FROM daily_costs")[0]
+        monthly = self._query("SELECT MIN(month) AS first, MAX(month) AS last, COUNT(*) AS rows FROM monthly_costs")[0]
+        return {
+            'daily': dict(daily),
+            'monthly': dict(monthly),
+            'sources': [dict(r) for r in self._query("SELECT * FROM sync_state ORDER BY source")]
+        }
+
+    def covers(self, start: DateLike, end: DateLike) -> bool:
+        """
+        Indica se o histórico (diário ou compactado) cobre todo o período
+
+        O início considera também a janela sincronizada: dias sem custo no
+        começo do backfill (conta mais nova que o período) estão cobertos.
+        """
+        info = self.coverage()
+        daily, monthly = info['daily'], info['monthly']
+        starts = [d for d in [f"{monthly['first']}-01" if monthly['first'] else None, daily['first'],
+                              *(s.get('first_day') for s in info['sources'])] if d]
+        first = min(starts) if starts else None
+        synced = [s['last_day'] for s in info['sources'] if s.get('last_day')]
+        candidates = [d for d in [daily['last'], *synced] if d]
+        if monthly['last']:
+            candidates.append(f"{monthly['last']}-31")
+        if not first or not candidates:
+            return False
+        return first <= _day(start) and max(candidates) >= (_parse_day(end) - timedelta(days=1)).isoformat()
+
+    def apply_retention(self, today: Optional[DateLike] = None) -> Dict[str, int]:
+        """
+        Compacta dias antigos em totais mensais e remove meses expirados.
+
+        Meses inteiros anteriores ao limite de retenção diária são
+        agregados em monthly_costs / monthly_tag_costs.
+        """
+        today = _parse_day(today or date.today())
+        cutoff = _month_start(today - timedelta(days=self.daily_retention_days)).isoformat()
+        expired = _add_months(_month_start(today), -self.monthly_retention_months).strftime('%Y-%m')
+        dims = ', '.join(('grain',) + DIMENSIONS)
+
+        with self._lock:
+            compacted = self._conn.execute(
+                "SELECT COUNT(*) FROM daily_costs WHERE day < ?", (cutoff,)
+            ).fetchone()[0]
+        self._transaction([
+            (f"INSERT INTO monthly_costs (month, {dims}, cost) "
+             f"SELECT substr(day, 1, 7), {dims}, SUM(cost) FROM daily_costs WHERE day < ? "
+             f"GROUP BY substr(day, 1, 7), {dims} "
+             f"ON CONFLICT(month, {dims}) DO UPDATE SET cost = monthly_costs.cost + excluded.cost",
+             (cutoff,)),
+            ("DELETE FROM daily_costs WHERE day < ?", (cutoff,)),
+            ("INSERT INTO monthly_tag_costs (month, tag_key, tag_value, cost) "
+             "SELECT substr(day, 1, 7), tag_key, tag_value, SUM(cost) FROM daily_tag_costs WHERE day < ? "
+             "GROUP BY substr(day, 1, 7), tag_key, tag_value "
+             "ON CONFLICT(month, tag_key, tag_value) DO UPDATE SET cost = monthly_tag_costs.cost + excluded.cost",
+             (cutoff,)),
+            ("DELETE FROM daily_tag_costs WHERE day < ?", (cutoff,)),
+            ("DELETE FROM monthly_costs WHERE month < ?", (expired,)),
+            ("DELETE FROM monthly_tag_costs WHERE month < ?", (expired,)),
+            ("UPDATE sync_state SET first_day = ? WHERE first_day < ?", (f'{expired}-01', f'{expired}-01')),
+        ])
+        return {'compacted_daily_rows': compacted, 'daily_cutoff': cutoff, 'monthly_cutoff': expired}
+
+
+_cost_history_store: Optional[CostHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_cost_history_store() -> CostHistoryStore:
+    """Retorna o store global (caminho em FINOPS_COST_HISTORY_DB)"""
+    global _cost_history_store
+    with _store_lock:
+        if _cost_history_store is None:
+            _cost_history_store = CostHistoryStore()
+        return _cost_history_store
@@ -0,0 +1,183 @@
+"""
+Rolling Cost Window
+
+Janela móvel de custos diários por serviço (últimos ~35 dias), mantida com
+uma única consulta DAILY agrupada por SERVICE:
+
+- Primeira carga busca a janela inteira; as seguintes rebuscam os
+  últimos REVISED_DAYS dias gravados (o Cost Explorer ainda revisa o
+  custo de ontem e anteontem) e os dias novos
+- Dias fora da janela são descartados
+- Estado persistido em JSON entre execuções
+- Totais de períodos, custo por serviço e top serviços calculados
+  localmente, sem chamar a AWS
+
+Design Patterns:
+- Repository: Persistência da janela isolada em save()/load()
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_DAYS = 35
+
+# Dias mais recentes sempre rebuscados: custos ainda em revisão no Cost Explorer
+REVISED_DAYS = 3
+
+DateLike = Union[str, date, datetime]
+
+
+def _day(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class RollingCostWindow:
+    """
+    Custos diários por serviço dos últimos `days` dias (incluindo hoje).
+
+    Períodos seguem a convenção do Cost Explorer: início inclusivo e fim
+    exclusivo.
+    """
+
+    def __init__(self, days: int = DEFAULT_WINDOW_DAYS, path: Optional[str] = None):
+        self.days = days
+        self.path = path
+        self.covered_from: Optional[date] = None
+        self.last_day: Optional[date] = None
+        self.refreshed_at: Optional[datetime] = None
+        self._costs: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_path() -> str:
+        return os.getenv(
+            'FINOPS_COST_WINDOW_PATH', os.path.join(tempfile.gettempdir(), 'finops_cost_window.json')
+        )
+
+    def _fetch_range(self, today: date) -> Tuple[date, date]:
+        """Dias a buscar: a janela inteira ou os últimos REVISED_DAYS dias gravados em diante"""
+        window_start = today - timedelta(days=self.days - 1)
+        if self.covered_from is None or self.last_day is None or self.covered_from > window_start:
+            return window_start, today + timedelta(days=1)
+        revised_from = min(self.last_day, today) - timedelta(days=REVISED_DAYS - 1)
+        return max(window_start, revised_from), today + timedelta(days=1)
+
+    def refresh(self, ce_client: Any, today: Optional[DateLike] = None) -> Dict[str, Any]:
+        """
+        Atualiza a janela com uma consulta DAILY agrupada por SERVICE
+
+        Returns:
+            Período buscado e número de dias recebidos
+        """
+        today = _day(today or datetime.utcnow())
+        start, end = self._fetch_range(today)
+        params = {
+            'TimePeriod': {'Start': start.isoformat(), 'End': end.isoformat()},
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': [{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+        }
+
+        fetched: Dict[str, Dict[str, float]] = {}
+        while True:
+            response = ce_client.get_cost_and_usage(**params)
+            for result in response.get('ResultsByTime', []):
+                services = fetched.setdefault(result.get('TimePeriod', {}).get('Start', '')[:10], {})
+                for group in result.get('Groups', []):
+                    service = group.get('Keys', ['Unknown'])[0]
+                    amount = float(group.get('Metrics', {}).get('UnblendedCost', {}).get('Amount', 0))
+                    services[service] = services.get(service, 0.0) + amount
+            token = response.get('NextPageToken')
+            if not token:
+                break
+            params['NextPageToken'] = token
+
+        window_start = (today - timedelta(days=self.days - 1)).isoformat()
+        with self._lock:
+            costs = {day: services for day, services in self._costs.items()
+                     if window_start <= day < start.isoformat()}
+            costs.update(fetched)
+            self._costs = costs
+            self.covered_from = max(min(self.covered_from or start, start), _day(window_start))
+            self.last_day = today
+            self.refreshed_at = datetime.now()
+
+        if self.path:
+            self.save()
+        return {'start': start.isoformat(), 'end': end.isoformat(), 'days': len(fetched)}
+
+    def by_service(self, start: DateLike, end: Optional[DateLike] = None) -> Dict[str, float]:
+        """Custo por serviço em [start, end) (um dia se end for omitido)"""
+        first = _day(start)
+        last = _day(end) if end is not None else first + timedelta(days=1)
+        totals: Dict[str, float] = {}
+        for day, services in self._costs.items():
+            if first.isoformat() <= day < last.isoformat():
+                for service, cost in services.items():
+                    totals[service] = totals.get(service, 0.0) + cost
+        return totals
+
+    def total(self, start: DateLike, end: DateLike) -> float:
+        """Custo total em [start, end)"""
+        return sum(self.by_service(start, end).values())
+
+    def top_services(self, start: DateLike, end: Optional[DateLike] = None, limit: int = 5) -> Dict[str, float]:
+        """Maiores serviços por custo no período"""
+        ranked = sorted(self.by_service(start, end).items(), key=lambda item: item[1], reverse=True)
+        return dict(ranked[:limit])
+
+    def daily_totals(self) -> List[Tuple[str, float]]:
+        """(dia, custo total) em ordem cronológica"""
+        return [(day, sum(services.values())) for day, services in sorted(self._costs.items())]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'days': self.days,
+            'covered_from': self.covered_from.isoformat() if self.covered_from else None,
+            'last_day': self.last_day.isoformat() if self.last_day else None,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'costs': self._costs
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Grava a janela (escrita atômica)"""
+        path = path or self.path or self.default_path()
+        with self._lock:
+            payload = self.to_dict()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as handle:
+            json.dump(payload, handle)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, days: int = DEFAULT_WINDOW_DAYS) -> 'RollingCostWindow':
+        """Janela gravada (vazia se não houver arquivo ou se estiver inválido)"""
+        path = path or cls.default_path()
+        window = cls(days=days, path=path)
+        if not os.path.exists(path):
+            return window
+        try:
+            with open(path) as handle:
+                payload = json.load(handle)
+            window._costs = payload.get('costs', {})
+            if payload.get('covered_from'):
+                window.covered_from = date.fromisoformat(payload['covered_from'])
+            if payload.get('last_day'):
+                window.last_day = date.fromisoformat(payload['last_day'])
+            if payload.get('refreshed_at'):
+                window.refreshed_at = datetime.fromisoformat(payload['refreshed_at'])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Janela de custos não carregada: {e}")
+            return cls(days=days, path=path)
+        return window
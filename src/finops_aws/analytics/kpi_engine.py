@@ -0,0 +1,229 @@
+"""
+KPI Engine
+
+Motor de KPIs com dependências de dados declaradas:
+
+- Cada fonte de dados (DataSource) declara como é buscada e de quais
+  outras fontes depende; cada KPI (KPIDefinition) declara as fontes e os
+  KPIs de que precisa
+- evaluate() busca só as fontes necessárias, uma vez cada, em paralelo
+  (em ondas, respeitando as dependências entre fontes)
+- Os KPIs são derivados localmente em ordem topológica, com tempo de
+  cálculo e linhagem (fontes de origem, inclusive transitivas) por KPI
+
+Design Patterns:
+- Strategy: Busca e cálculo injetados como funções
+- Dependency Graph: Fontes e KPIs resolvidos pela ordem das dependências
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DataSource:
+    """
+    Fonte de dados de KPIs
+
+    fetch recebe os valores das fontes em `requires`. Se o valor
+    retornado for um dict com a chave 'origin', ela é registrada na
+    linhagem (ex.: cubo local vs Cost Explorer).
+    """
+    name: str
+    fetch: Callable[[Dict[str, Any]], Any]
+    requires: Tuple[str, ...] = ()
+    origin: str = ''
+
+
+@dataclass
+class KPIDefinition:
+    """KPI derivado localmente das fontes e de outros KPIs"""
+    name: str
+    compute: Callable[[Dict[str, Any]], Any]
+    sources: Tuple[str, ...] = ()
+    kpis: Tuple[str, ...] = ()
+    default: Any = 0.0
+
+
+@dataclass
+class SourceRecord:
+    """Resultado da busca de uma fonte"""
+    name: str
+    origin: str
+    seconds: float
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'origin': self.origin,
+            'seconds': round(self.seconds, 4),
+            'error': self.error
+        }
+
+
+@dataclass
+class KPIEvaluation:
+    """Valores, tempos de cálculo e linhagem de uma avaliação"""
+    values: Dict[str, Any]
+    compute_ms: Dict[str, float]
+    lineage: Dict[str, List[str]]
+    sources: Dict[str, SourceRecord]
+    fetch_seconds: float
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'values': self.values,
+            'compute_ms': {name: round(ms, 4) for name, ms in self.compute_ms.items()},
+            'lineage': self.lineage,
+            'sources': {name: record.to_dict() for name, record in self.sources.items()},
+            'fetch_seconds': round(self.fetch_seconds, 4),
+            'errors': self.errors
+        }
+
+
+class KPIEngine:
+    """
+    Avalia um conjunto de KPIs buscando cada fonte uma única vez
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[DataSource],
+        kpis: Iterable[KPIDefinition],
+        max_workers: int = 6
+    ):
+        self.sources = {source.name: source for source in sources}
+        self.kpis = {kpi.name: kpi for kpi in kpis}
+        self.max_workers = max_workers
+        self._validate()
+
+    def _validate(self) -> None:
+        for source in self.sources.values():
+            for name in source.requires:
+                if name not in self.sources:
+                    raise ValueError(f"Fonte '{source.name}' depende de fonte desconhecida '{name}'")
+        for kpi in self.kpis.values():
+            for name in kpi.sources:
+                if name not in self.sources:
+                    raise ValueError(f"KPI '{kpi.name}' depende de fonte desconhecida '{name}'")
+            for name in kpi.kpis:
+                if name not in self.kpis:
+                    raise ValueError(f"KPI '{kpi.name}' depende de KPI desconhecido '{name}'")
+        self._kpi_order(self.kpis)
+
+    def _kpi_order(self, names: Iterable[str]) -> List[str]:
+        """KPIs (e dependências) em ordem topológica"""
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dependência circular no KPI '{name}'")
+            state[name] = 1
+            for dependency in self.kpis[name].kpis:
+                visit(dependency)
+            state[name] = 2
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def _source_closure(self, names: Iterable[str]) -> Set[str]:
+        needed: Set[str] = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.sources[name].requires)
+        return needed
+
+    def required_sources(self, kpis: Optional[Sequence[str]] = None) -> Set[str]:
+        """Fontes necessárias para os KPIs pedidos (todos, se omitido)"""
+        order = self._kpi_order(kpis if kpis is not None else self.kpis)
+        return self._source_closure(name for kpi in order for name in self.kpis[kpi].sources)
+
+    def _fetch_one(self, source: DataSource, data: Dict[str, Any]) -> Tuple[Any, SourceRecord]:
+        started = time.perf_counter()
+        try:
+            value = source.fetch({name: data.get(name) for name in source.requires})
+            origin = value.get('origin', source.origin) if isinstance(value, dict) else source.origin
+            return value, SourceRecord(source.name, origin or source.name, time.perf_counter() - started)
+        except Exception as e:
+            logger.error(f"Erro ao buscar fonte {source.name}: {e}")
+            return None, SourceRecord(source.name, source.origin or source.name,
+                                      time.perf_counter() - started, error=str(e))
+
+    def fetch(self, names: Iterable[str]) -> Tuple[Dict[str, Any], Dict[str, SourceRecord]]:
+        """Busca as fontes em ondas paralelas (cada onda só depende das anteriores)"""
+        pending = set(names)
+        data: Dict[str, Any] = {}
+        records: Dict[str, SourceRecord] = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            while pending:
+                ready = sorted(name for name in pending if all(r in data for r in self.sources[name].requires))
+                if not ready:
+                    raise ValueError(f"Dependência circular entre fontes: {sorted(pending)}")
+                futures = {name: executor.submit(self._fetch_one, self.sources[name], data) for name in ready}
+                for name, future in futures.items():
+                    data[name], records[name] = future.result()
+                pending.difference_update(ready)
+        return data, records
+
+    def evaluate(self, kpis: Optional[Sequence[str]] = None) -> KPIEvaluation:
+        """
+        Busca as fontes necessárias e calcula os KPIs
+
+        Args:
+            kpis: KPIs desejados (todos, se omitido); dependências incluídas
+
+        Returns:
+            KPIEvaluation com valores, tempo por KPI e linhagem
+        """
+        order = self._kpi_order(kpis if kpis is not None else self.kpis)
+        started = time.perf_counter()
+        data, records = self.fetch(self.required_sources(order))
+        fetch_seconds = time.perf_counter() - started
+
+        values: Dict[str, Any] = {}
+        compute_ms: Dict[str, float] = {}
+        lineage: Dict[str, List[str]] = {}
+        errors: Dict[str, str] = {}
+        for name in order:
+            kpi = self.kpis[name]
+            context = {source: data.get(source) for source in kpi.sources}
+            context.update({dependency: values[dependency] for dependency in kpi.kpis})
+            began = time.perf_counter()
+            try:
+                values[name] = kpi.compute(context)
+            except Exception as e:
+                logger.error(f"Erro ao calcular KPI {name}: {e}")
+                values[name] = kpi.default
+                errors[name] = str(e)
+            compute_ms[name] = (time.perf_counter() - began) * 1000
+
+            origins = set(self._source_closure(kpi.sources))
+            for dependency in kpi.kpis:
+                origins.update(lineage[dependency])
+            lineage[name] = sorted(origins)
+
+        return KPIEvaluation(
+            values=values,
+            compute_ms=compute_ms,
+            lineage=lineage,
+            sources=records,
+            fetch_seconds=fetch_seconds,
+            errors=errors
+        )
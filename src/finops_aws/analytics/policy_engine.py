@@ -0,0 +1,230 @@
+"""
+Policy Engine
+
+Avaliação compilada e vetorizada de políticas FinOps sobre um inventário
+de recursos:
+
+- Cada política é compilada uma vez num plano de predicados
+  (métrica, operador, limiar); operadores desconhecidos são ignorados,
+  como na avaliação recurso a recurso
+- Os recursos são projetados uma única vez em colunas float64, apenas
+  para as métricas referenciadas pelas políticas (métrica ausente vale 0;
+  Decimal, como vem do DynamoDB, é convertido; valor não numérico vira
+  NaN e não satisfaz nenhuma condição)
+- Cada predicado vira uma máscara booleana sobre todos os recursos;
+  predicados idênticos entre políticas são calculados uma única vez
+- O resultado guarda só os índices casados por política: registros de
+  execução são criados pelo chamador apenas para esses recursos
+
+Design Patterns:
+- Interpreter: Condições compiladas em plano de predicados
+- Flyweight: Máscaras de predicados compartilhadas entre políticas
+"""
+
+import logging
+import numbers
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    'less_than': np.less,
+    'greater_than': np.greater,
+    'equals': np.equal,
+}
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """Condição compilada: coluna `metric` comparada ao limiar"""
+    metric: str
+    operator: str
+    threshold: float
+
+    def mask(self, column: np.ndarray) -> np.ndarray:
+        """Máscara booleana da condição sobre a coluna da métrica"""
+        return OPERATORS[self.operator](column, self.threshold)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'metric': self.metric,
+            'operator': self.operator,
+            'threshold': self.threshold
+        }
+
+
+@dataclass
+class PolicyPlan:
+    """Plano de avaliação de uma política (conjunção de predicados)"""
+    policy: Any
+    predicates: Tuple[Predicate, ...]
+
+    @property
+    def policy_id(self) -> str:
+        return self.policy.policy_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'policy_id': self.policy_id,
+            'predicates': [p.to_dict() for p in self.predicates]
+        }
+
+
+def compile_policy(policy: Any) -> PolicyPlan:
+    """
+    Compila as condições de uma política em predicados
+
+    Args:
+        policy: Objeto com `policy_id` e `conditions` (metric, operator,
+                threshold), como FinOpsPolicy
+
+    Returns:
+        PolicyPlan sem as condições de operador desconhecido
+    """
+    predicates = []
+    for condition in policy.conditions:
+        if condition.operator not in OPERATORS:
+            logger.debug(f"Operador ignorado em {policy.policy_id}: {condition.operator}")
+            continue
+        predicates.append(Predicate(condition.metric, condition.operator, float(condition.threshold)))
+    return PolicyPlan(policy, tuple(predicates))
+
+
+def _as_float(value: Any) -> float:
+    """Valor numérico (inclusive Decimal) como float; qualquer outro vira NaN"""
+    if isinstance(value, (numbers.Real, Decimal)):
+        return float(value)
+    return np.nan
+
+
+@dataclass
+class MetricColumns:
+    """Métricas dos recursos em formato colunar (uma coluna por métrica)"""
+    size: int
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def from_resources(
+        cls,
+        resources: Sequence[Dict[str, Any]],
+        metrics: Sequence[str]
+    ) -> 'MetricColumns':
+        """
+        Projeta `resource['metrics'][metric]` de cada recurso em colunas
+
+        Args:
+            resources: Recursos no formato de evaluate_policies
+            metrics: Métricas a projetar
+        """
+        metric_maps = [resource.get('metrics') or {} for resource in resources]
+        columns = {}
+        for metric in metrics:
+            values = np.asarray([m.get(metric, 0) for m in metric_maps])
+            if values.dtype.kind in 'biuf':
+                columns[metric] = values.astype(np.float64, copy=False)
+            else:
+                columns[metric] = np.fromiter(
+                    (_as_float(m.get(metric, 0)) for m in metric_maps),
+                    dtype=np.float64, count=len(metric_maps)
+                )
+        return cls(len(metric_maps), columns)
+
+
+@dataclass
+class PolicyMatches:
+    """Índices dos recursos casados por cada política, na ordem dos planos"""
+    plans: List[PolicyPlan]
+    indices: List[np.ndarray]
+    resource_count: int
+    predicates_evaluated: int = 0
+    seconds: float = 0.0
+
+    def __iter__(self) -> Iterator[Tuple[PolicyPlan, np.ndarray]]:
+        return iter(zip(self.plans, self.indices))
+
+    @property
+    def total_matches(self) -> int:
+        return int(sum(len(i) for i in self.indices))
+
+    def counts(self) -> Dict[str, int]:
+        """Quantidade de recursos casados por política"""
+        return {plan.policy_id: len(indices) for plan, indices in self}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'policies': len(self.plans),
+            'resources': self.resource_count,
+            'predicates_evaluated': self.predicates_evaluated,
+            'total_matches': self.total_matches,
+            'matches_by_policy': self.counts(),
+            'seconds': round(self.seconds, 4)
+        }
+
+
+class PolicyEngine:
+    """
+    Avaliador vetorizado de um conjunto de políticas
+
+    Exemplo:
+        engine = PolicyEngine(policies)
+        for plan, indices in engine.evaluate(resources):
+            ...
+    """
+
+    def __init__(self, policies: Sequence[Any]):
+        self.plans = [compile_policy(policy) for policy in policies]
+
+    @property
+    def metrics(self) -> List[str]:
+        """Métricas referenciadas pelos planos, na ordem de aparição"""
+        seen: Dict[str, None] = {}
+        for plan in self.plans:
+            for predicate in plan.predicates:
+                seen.setdefault(predicate.metric)
+        return list(seen)
+
+    def project(self, resources: Sequence[Dict[str, Any]]) -> MetricColumns:
+        """Projeta os recursos nas colunas usadas pelas políticas"""
+        return MetricColumns.from_resources(resources, self.metrics)
+
+    def evaluate(
+        self,
+        resources: Union[Sequence[Dict[str, Any]], MetricColumns]
+    ) -> PolicyMatches:
+        """
+        Avalia todas as políticas sobre os recursos
+
+        Args:
+            resources: Recursos ou colunas já projetadas
+
+        Returns:
+            PolicyMatches com os índices casados por política
+        """
+        started = time.perf_counter()
+        columns = resources if isinstance(resources, MetricColumns) else self.project(resources)
+        masks: Dict[Predicate, np.ndarray] = {}
+        indices = []
+
+        for plan in self.plans:
+            mask = None
+            for predicate in plan.predicates:
+                predicate_mask = masks.get(predicate)
+                if predicate_mask is None:
+                    predicate_mask = predicate.mask(columns.columns[predicate.metric])
+                    masks[predicate] = predicate_mask
+                mask = predicate_mask if mask is None else mask & predicate_mask
+            if mask is None:
+                indices.append(np.arange(columns.size))
+            else:
+                indices.append(np.flatnonzero(mask))
+
+        return PolicyMatches(
+            self.plans, indices, columns.size,
+            predicates_evaluated=len(masks),
+            seconds=time.perf_counter() - started
+        )
@@ -0,0 +1,394 @@
+"""
+Rightsizing Engine
+
+Motor interno de rightsizing sobre séries de utilização em lote
+(EC2, RDS, ElastiCache e tarefas ECS/Fargate):
+
+- Percentis p50/p95/p99 por recurso calculados de uma vez sobre a
+  matriz recursos × horas (ordenação por linha + interpolação linear,
+  equivalente a np.nanpercentile, com buracos NaN)
+- Capacidade necessária por recurso: vCPU e memória escaladas pelo
+  maior entre p95/alvo e p99/limite; rede pelo p95 com folga
+- Casamento com o tipo mais barato que atende (máscara recursos ×
+  candidatos + argmin do preço), respeitando arquitetura e burstable
+- Preços dos candidatos vêm do InstanceCatalog / PriceIndex
+
+Design Patterns:
+- Strategy: Política de rightsizing (alvos, limites, economia mínima)
+- Value Object: Resultado colunar com recomendações sob demanda
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..pricing.instance_catalog import InstanceCatalog
+from ..pricing.price_index import DEFAULT_REGION
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_MONTH = 730
+PERCENTILES = (50, 95, 99)
+ROW_CHUNK = 8192
+
+KEEP = 'keep'
+DOWNSIZE = 'downsize'
+UPSIZE = 'upsize'
+INSUFFICIENT_DATA = 'insufficient_data'
+UNSUPPORTED_TYPE = 'unsupported_type'
+
+
+def row_percentiles(matrix: np.ndarray, q: Sequence[float] = PERCENTILES,
+                    chunk: int = ROW_CHUNK) -> np.ndarray:
+    """
+    Percentis por linha ignorando NaN (interpolação linear)
+
+    Returns:
+        Array (linhas × len(q)); linhas sem pontos retornam NaN
+    """
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2:
+        raise ValueError("matrix deve ser 2D (recursos × pontos)")
+    rows = matrix.shape[0]
+    fractions = np.asarray(q, dtype=np.float64) / 100.0
+    result = np.full((rows, len(fractions)), np.nan)
+    if matrix.shape[1] == 0:
+        return result
+
+    for start in range(0, rows, chunk):
+        block = np.sort(matrix[start:start + chunk], axis=1)
+        counts = (~np.isnan(block)).sum(axis=1)
+        valid = counts > 0
+        positions = (np.maximum(counts, 1) - 1)[:, None] * fractions[None, :]
+        lower = np.floor(positions).astype(np.intp)
+        upper = np.ceil(positions).astype(np.intp)
+        low_values = np.take_along_axis(block, lower, axis=1).astype(np.float64)
+        high_values = np.take_along_axis(block, upper, axis=1).astype(np.float64)
+        values = low_values + (high_values - low_values) * (positions - lower)
+        values[~valid] = np.nan
+        result[start:start + chunk] = values
+    return result
+
+
+@dataclass
+class UtilizationBatch:
+    """
+    Séries de utilização de uma frota (uma linha por recurso)
+
+    cpu e memory em percentual (0-100); network_mbps em Mbps (entrada +
+    saída). counts multiplica o custo (nós de um cluster, tarefas de um
+    serviço ECS).
+    """
+    service: str
+    resource_ids: List[str]
+    current_types: List[str]
+    cpu: np.ndarray
+    memory: Optional[np.ndarray] = None
+    network_mbps: Optional[np.ndarray] = None
+    counts: Optional[np.ndarray] = None
+    regions: Optional[List[str]] = None
+    engines: Optional[List[str]] = None
+    region: str = DEFAULT_REGION
+
+    def __post_init__(self):
+        size = len(self.resource_ids)
+        self.cpu = np.asarray(self.cpu)
+        if self.cpu.ndim != 2 or self.cpu.shape[0] != size or len(self.current_types) != size:
+            raise ValueError("cpu, resource_ids e current_types devem ter uma linha por recurso")
+        for name in ('memory', 'network_mbps'):
+            matrix = getattr(self, name)
+            if matrix is not None:
+                matrix = np.asarray(matrix)
+                if matrix.shape[0] != size:
+                    raise ValueError(f"{name} deve ter uma linha por recurso")
+                setattr(self, name, matrix)
+        self.counts = (np.ones(size) if self.counts is None
+                       else np.asarray(self.counts, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.resource_ids)
+
+
+@dataclass
+class RightsizingPolicy:
+    """Alvos e limites de utilização após o rightsizing"""
+    target_cpu_percent: float = 60.0
+    max_cpu_percent: float = 90.0
+    target_memory_percent: float = 75.0
+    max_memory_percent: float = 90.0
+    network_headroom: float = 0.8
+    min_savings_percent: float = 10.0
+    min_datapoints: int = 24 * 7
+    allow_burstable: bool = False
+    allow_arch_change: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class RightsizingRecommendation:
+    """Recomendação de rightsizing de um recurso"""
+    resource_id: str
+    service: str
+    action: str
+    current_type: str
+    recommended_type: str
+    region: str
+    count: float
+    datapoints: int
+    cpu_percentiles: Dict[str, Optional[float]]
+    memory_percentiles: Dict[str, Optional[float]]
+    network_p95_mbps: Optional[float]
+    current_hourly: float
+    recommended_hourly: float
+    monthly_savings: float
+    savings_percent: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'resource_id': self.resource_id,
+            'service': self.service,
+            'action': self.action,
+            'current_type': self.current_type,
+            'recommended_type': self.recommended_type,
+            'region': self.region,
+            'count': self.count,
+            'datapoints': self.datapoints,
+            'cpu_percentiles': self.cpu_percentiles,
+            'memory_percentiles': self.memory_percentiles,
+            'network_p95_mbps': self.network_p95_mbps,
+            'current_hourly': round(self.current_hourly, 4),
+            'recommended_hourly': round(self.recommended_hourly, 4),
+            'monthly_savings': round(self.monthly_savings, 2),
+            'savings_percent': round(self.savings_percent, 2),
+        }
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+@dataclass
+class RightsizingResult:
+    """Resultado colunar do rightsizing de uma frota"""
+    service: str
+    resource_ids: List[str]
+    current_types: List[str]
+    recommended_types: List[str]
+    actions: np.ndarray
+    regions: List[str]
+    counts: np.ndarray
+    datapoints: np.ndarray
+    cpu: np.ndarray
+    memory: np.ndarray
+    network: np.ndarray
+    current_hourly: np.ndarray
+    recommended_hourly: np.ndarray
+    elapsed_seconds: float = 0.0
+    policy: RightsizingPolicy = field(default_factory=RightsizingPolicy)
+
+    def __len__(self) -> int:
+        return len(self.resource_ids)
+
+    @cached_property
+    def monthly_savings(self) -> np.ndarray:
+        """Economia mensal por recurso (negativa em upsize; zero sem mudança)"""
+        changed = np.isin(self.actions, (DOWNSIZE, UPSIZE))
+        delta = (self.current_hourly - self.recommended_hourly) * self.counts * HOURS_PER_MONTH
+        return np.where(changed, np.nan_to_num(delta), 0.0)
+
+    def recommendation(self, i: int) -> RightsizingRecommendation:
+        current = float(self.current_hourly[i])
+        recommended = float(self.recommended_hourly[i])
+        savings = float(self.monthly_savings[i])
+        labels = [f"p{q}" for q in PERCENTILES]
+        return RightsizingRecommendation(
+            resource_id=self.resource_ids[i],
+            service=self.service,
+            action=str(self.actions[i]),
+            current_type=self.current_types[i],
+            recommended_type=self.recommended_types[i],
+            region=self.regions[i],
+            count=float(self.counts[i]),
+            datapoints=int(self.datapoints[i]),
+            cpu_percentiles={label: _optional(v) for label, v in zip(labels, self.cpu[i])},
+            memory_percentiles={label: _optional(v) for label, v in zip(labels, self.memory[i])},
+            network_p95_mbps=_optional(self.network[i]),
+            current_hourly=0.0 if np.isnan(current) else current,
+            recommended_hourly=0.0 if np.isnan(recommended) else recommended,
+            monthly_savings=savings,
+            savings_percent=(float(savings / (current * self.counts[i] * HOURS_PER_MONTH) * 100)
+                             if current > 0 and savings else 0.0)
+        )
+
+    def recommendations(self, actions: Sequence[str] = (DOWNSIZE, UPSIZE),
+                        limit: Optional[int] = None) -> List[RightsizingRecommendation]:
+        """Recomendações das ações pedidas, maior economia primeiro"""
+        indices = np.flatnonzero(np.isin(self.actions, list(actions)))
+        order = indices[np.argsort(-self.monthly_savings[indices], kind='stable')]
+        if limit is not None:
+            order = order[:limit]
+        return [self.recommendation(int(i)) for i in order]
+
+    def summary(self) -> Dict[str, Any]:
+        savings = self.monthly_savings
+        actions, counts = np.unique(self.actions, return_counts=True)
+        return {
+            'service': self.service,
+            'resources_analyzed': len(self),
+            'actions': {str(a): int(c) for a, c in zip(actions, counts)},
+            'monthly_savings': round(float(savings[self.actions == DOWNSIZE].sum()), 2),
+            'monthly_upsize_cost': round(float(-savings[self.actions == UPSIZE].sum()), 2),
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+        }
+
+    def to_dict(self, limit: Optional[int] = 100) -> Dict[str, Any]:
+        return {
+            'summary': self.summary(),
+            'policy': self.policy.to_dict(),
+            'recommendations': [r.to_dict() for r in self.recommendations(limit=limit)],
+        }
+
+
+class RightsizingEngine:
+    """
+    Rightsizing vetorizado por percentis
+
+    Example:
+        engine = RightsizingEngine()
+        batch = UtilizationBatch('ec2', ids, types, cpu_matrix, memory_matrix)
+        result = engine.analyze(batch)
+        top = result.recommendations(limit=20)
+    """
+
+    def __init__(self, catalog: Optional[InstanceCatalog] = None,
+                 policy: Optional[RightsizingPolicy] = None):
+        self.catalog = catalog or InstanceCatalog()
+        self.policy = policy or RightsizingPolicy()
+
+    def _requirements(self, cpu: np.ndarray, memory: np.ndarray,
+                      network: np.ndarray, current_vcpu: np.ndarray,
+                      current_memory: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """vCPU, memória (GiB) e rede (Gbps) necessárias por recurso"""
+        policy = self.policy
+        cpu_factor = np.fmax(cpu[:, 1] / policy.target_cpu_percent, cpu[:, 2] / policy.max_cpu_percent)
+        required_vcpu = current_vcpu * cpu_factor
+
+        memory_factor = np.fmax(memory[:, 1] / policy.target_memory_percent,
+                                memory[:, 2] / policy.max_memory_percent)
+        required_memory = np.where(np.isnan(memory_factor), current_memory, current_memory * memory_factor)
+
+        required_network = np.nan_to_num(network / 1000.0 / policy.network_headroom)
+        return required_vcpu, required_memory, required_network
+
+    def analyze(self, batch: UtilizationBatch) -> RightsizingResult:
+        """Percentis, capacidade necessária e tipo mais barato para a frota"""
+        started = time.perf_counter()
+        size = len(batch)
+        service = batch.service
+        regions = batch.regions or [batch.region] * size
+        engines = batch.engines or [''] * size
+
+        cpu = row_percentiles(batch.cpu)
+        memory = (row_percentiles(batch.memory) if batch.memory is not None
+                  else np.full((size, len(PERCENTILES)), np.nan))
+        network = (row_percentiles(batch.network_mbps, q=(95,))[:, 0] if batch.network_mbps is not None
+                   else np.full(size, np.nan))
+        datapoints = (~np.isnan(batch.cpu)).sum(axis=1)
+
+        type_names, type_inverse = np.unique(np.asarray(batch.current_types, dtype=object).astype(str),
+                                             return_inverse=True)
+        specs = [self.catalog.spec(service, name) for name in type_names]
+        known = np.array([spec is not None for spec in specs])[type_inverse]
+        current_vcpu = np.array([spec.vcpu if spec else np.nan for spec in specs])[type_inverse]
+        current_memory = np.array([spec.memory_gib if spec else np.nan for spec in specs])[type_inverse]
+        current_arch = np.array([spec.arch if spec else '' for spec in specs])[type_inverse]
+
+        required_vcpu, required_memory, required_network = self._requirements(
+            cpu, memory, network, current_vcpu, current_memory)
+
+        recommended_index = np.full(size, -1, dtype=np.intp)
+        current_hourly = np.full(size, np.nan)
+        recommended_hourly = np.full(size, np.nan)
+        recommended_types = list(batch.current_types)
+
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, key in enumerate(zip(regions, engines)):
+            groups.setdefault(key, []).append(i)
+
+        for (region, engine), rows in groups.items():
+            rows = np.asarray(rows, dtype=np.intp)
+            candidates = self.catalog.candidates(service, region, engine)
+            candidate_position = {name: j for j, name in enumerate(candidates.names)}
+            current_index = np.array([candidate_position.get(batch.current_types[i], -1) for i in rows],
+                                     dtype=np.intp)
+            has_current = current_index >= 0
+            current_hourly[rows[has_current]] = candidates.price[current_index[has_current]]
+
+            base_allowed = np.ones(len(candidates), dtype=bool)
+            if not self.policy.allow_burstable:
+                base_allowed &= ~candidates.burstable
+
+            for start in range(0, len(rows), ROW_CHUNK):
+                chunk = rows[start:start + ROW_CHUNK]
+                chunk_current = current_index[start:start + ROW_CHUNK]
+                fits = ((candidates.vcpu[None, :] >= required_vcpu[chunk, None] - 1e-9)
+                        & (candidates.memory_gib[None, :] >= required_memory[chunk, None] - 1e-9)
+                        & (candidates.network_gbps[None, :] >= required_network[chunk, None]))
+                allowed = np.broadcast_to(base_allowed, fits.shape)
+                if not self.policy.allow_arch_change:
+                    allowed = allowed & (candidates.arch[None, :] == current_arch[chunk, None])
+                # O tipo atual continua elegível mesmo fora da política (burstable/arquitetura)
+                allowed = allowed | (np.arange(len(candidates))[None, :] == chunk_current[:, None])
+                fits &= allowed
+
+                prices = np.where(fits, candidates.price[None, :], np.inf)
+                best = np.argmin(prices, axis=1)
+                best_price = prices[np.arange(len(chunk)), best]
+                found = np.isfinite(best_price)
+                recommended_index[chunk[found]] = best[found]
+                recommended_hourly[chunk[found]] = best_price[found]
+                for i, j in zip(chunk[found], best[found]):
+                    recommended_types[i] = candidates.names[j]
+
+        actions = np.full(size, KEEP, dtype=object)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            savings_percent = (current_hourly - recommended_hourly) / current_hourly * 100
+        changed = np.array([recommended_types[i] != batch.current_types[i] for i in range(size)], dtype=bool)
+        downsize = changed & (savings_percent >= self.policy.min_savings_percent)
+        undersized = (required_vcpu > current_vcpu + 1e-9) | (required_memory > current_memory + 1e-9)
+        upsize = changed & undersized & (recommended_index >= 0)
+        actions[downsize] = DOWNSIZE
+        actions[upsize & ~downsize] = UPSIZE
+        actions[datapoints < self.policy.min_datapoints] = INSUFFICIENT_DATA
+        actions[~known | np.isnan(current_hourly)] = UNSUPPORTED_TYPE
+
+        keep = actions == KEEP
+        for i in np.flatnonzero(keep | (actions == INSUFFICIENT_DATA) | (actions == UNSUPPORTED_TYPE)):
+            recommended_types[i] = batch.current_types[i]
+        recommended_hourly = np.where(np.isin(actions, (DOWNSIZE, UPSIZE)), recommended_hourly, current_hourly)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Rightsizing {service}: {size} recursos em {elapsed:.2f}s")
+        return RightsizingResult(
+            service=service,
+            resource_ids=list(batch.resource_ids),
+            current_types=list(batch.current_types),
+            recommended_types=recommended_types,
+            actions=actions.astype(str),
+            regions=list(regions),
+            counts=batch.counts,
+            datapoints=datapoints,
+            cpu=cpu,
+            memory=memory,
+            network=network,
+            current_hourly=current_hourly,
+            recommended_hourly=recommended_hourly,
+            elapsed_seconds=elapsed,
+            policy=self.policy
+        )
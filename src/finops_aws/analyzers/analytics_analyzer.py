@@ -33,12 +33,11 @@ class AnalyticsAnalyzer(BaseAnalyzer):
     
     def _get_client(self, region: str) -> Any:
         """Retorna clientes boto3 para analytics."""
-        import boto3
         return {
-            'emr': boto3.client('emr', region_name=region),
-            'kinesis': boto3.client('kinesis', region_name=region),
-            'glue': boto3.client('glue', region_name=region),
-            'redshift': boto3.client('redshift', region_name=region),
+            'emr': self._create_client('emr', region_name=region),
+            'kinesis': self._create_client('kinesis', region_name=region),
+            'glue': self._create_client('glue', region_name=region),
+            'redshift': self._create_client('redshift', region_name=region),
         }
     
     def _collect_resources(self, clients: Dict[str, Any]) -> Dict[str, Any]:
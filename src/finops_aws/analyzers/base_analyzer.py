@@ -162,11 +162,19 @@ class BaseAnalyzer(ABC):
     def __init__(self, client_factory: Optional[Callable] = None):
         """
         Args:
-            client_factory: Função para criar clientes boto3 (DI)
+            client_factory: Função para criar clientes boto3 (DI), com a
+                            assinatura de boto3.client(serviço, region_name=...)
         """
         self._client_factory = client_factory
         self._logger = logging.getLogger(f"finops.{self.name}")
     
+    def _create_client(self, service_name: str, region_name: Optional[str] = None) -> Any:
+        """Cria cliente pela client_factory injetada ou por boto3.client"""
+        if self._client_factory:
+            return self._client_factory(service_name, region_name=region_name)
+        import boto3
+        return boto3.client(service_name, region_name=region_name)
+    
     def analyze(self, region: str) -> AnalysisResult:
         """
         Template Method - define o algoritmo de análise.
@@ -43,11 +43,10 @@ class ComputeAnalyzer(BaseAnalyzer):
     
     def _get_client(self, region: str) -> Any:
         """Retorna clientes boto3 para computação."""
-        import boto3
         return {
-            'ec2': boto3.client('ec2', region_name=region),
-            'lambda': boto3.client('lambda', region_name=region),
-            'ecs': boto3.client('ecs', region_name=region),
+            'ec2': self._create_client('ec2', region_name=region),
+            'lambda': self._create_client('lambda', region_name=region),
+            'ecs': self._create_client('ecs', region_name=region),
         }
     
     def _collect_resources(self, clients: Dict[str, Any]) -> Dict[str, Any]:
@@ -33,11 +33,10 @@ class DatabaseAnalyzer(BaseAnalyzer):
     
     def _get_client(self, region: str) -> Any:
         """Retorna clientes boto3 para bancos de dados."""
-        import boto3
         return {
-            'rds': boto3.client('rds', region_name=region),
-            'dynamodb': boto3.client('dynamodb', region_name=region),
-            'elasticache': boto3.client('elasticache', region_name=region),
+            'rds': self._create_client('rds', region_name=region),
+            'dynamodb': self._create_client('dynamodb', region_name=region),
+            'elasticache': self._create_client('elasticache', region_name=region),
         }
     
     def _collect_resources(self, clients: Dict[str, Any]) -> Dict[str, Any]:
@@ -33,12 +33,11 @@ class NetworkAnalyzer(BaseAnalyzer):
     
     def _get_client(self, region: str) -> Any:
         """Retorna clientes boto3 para rede."""
-        import boto3
         return {
-            'elbv2': boto3.client('elbv2', region_name=region),
-            'elb': boto3.client('elb', region_name=region),
-            'cloudfront': boto3.client('cloudfront'),
-            'apigateway': boto3.client('apigateway', region_name=region),
+            'elbv2': self._create_client('elbv2', region_name=region),
+            'elb': self._create_client('elb', region_name=region),
+            'cloudfront': self._create_client('cloudfront'),
+            'apigateway': self._create_client('apigateway', region_name=region),
         }
     
     def _collect_resources(self, clients: Dict[str, Any]) -> Dict[str, Any]:
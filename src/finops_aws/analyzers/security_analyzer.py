@@ -33,11 +33,10 @@ class SecurityAnalyzer(BaseAnalyzer):
     
     def _get_client(self, region: str) -> Any:
         """Retorna clientes boto3 para segurança."""
-        import boto3
         return {
-            'iam': boto3.client('iam'),
-            'logs': boto3.client('logs', region_name=region),
-            'ecr': boto3.client('ecr', region_name=region),
+            'iam': self._create_client('iam'),
+            'logs': self._create_client('logs', region_name=region),
+            'ecr': self._create_client('ecr', region_name=region),
         }
     
     def _collect_resources(self, clients: Dict[str, Any]) -> Dict[str, Any]:
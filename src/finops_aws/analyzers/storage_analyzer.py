@@ -31,10 +31,9 @@ class StorageAnalyzer(BaseAnalyzer):
     
     def _get_client(self, region: str) -> Any:
         """Retorna clientes boto3 para armazenamento."""
-        import boto3
         return {
-            's3': boto3.client('s3'),
-            'efs': boto3.client('efs', region_name=region),
+            's3': self._create_client('s3'),
+            'efs': self._create_client('efs', region_name=region),
         }
     
     def _collect_resources(self, clients: Dict[str, Any]) -> Dict[str, Any]:
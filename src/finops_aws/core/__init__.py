@@ -7,6 +7,7 @@ Este módulo contém a lógica central do FinOps AWS:
 - ResilientExecutor: Execução resiliente com retry e circuit breaker
 - CleanupManager: Limpeza automática de arquivos temporários
 - Factories: Criação centralizada de clientes e serviços (FASE 1.3)
+- HealthProbe: Health checks concorrentes com cache por conta
 """
 
 from .state_manager import (
@@ -58,6 +59,14 @@ from .factories import (
     ServiceConfig,
     ServiceProtocol
 )
+from .health_probe import (
+    HealthProbe,
+    HealthReport,
+    ProbeResult,
+    ProbeStatus,
+    S3ProbeStore,
+    get_skipped_services
+)
 
 __all__ = [
     # Legacy S3 State Manager
@@ -102,5 +111,12 @@ __all__ = [
     'AWSClientConfig',
     'ServiceFactory',
     'ServiceConfig',
-    'ServiceProtocol'
+    'ServiceProtocol',
+    # Health Probe
+    'HealthProbe',
+    'HealthReport',
+    'ProbeResult',
+    'ProbeStatus',
+    'S3ProbeStore',
+    'get_skipped_services'
 ]
@@ -355,6 +355,7 @@ class DynamoDBStateManager:
         self._table = table
         self.current_execution: Optional[ExecutionRecord] = None
         self.mapper = DynamoDBMapper()
+        self._completion_listeners: List[Callable[[Dict[str, Any]], None]] = []
         
         self._retry_handler = retry_handler or RetryHandler(
             policy=create_aws_retry_policy()
@@ -396,6 +397,49 @@ class DynamoDBStateManager:
         """Acesso ao retry handler para operações resilientes"""
         return self._retry_handler
 
+    def add_completion_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Registra callback chamado quando um serviço termina (concluído, falho ou pulado)
+        
+        O callback recebe um dicionário com execution_id, service_name, status,
+        result_summary, error_message e o progresso atual da execução.
+        
+        Args:
+            listener: Função de callback
+        """
+        if listener not in self._completion_listeners:
+            self._completion_listeners.append(listener)
+
+    def remove_completion_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Remove callback de conclusão registrado"""
+        if listener in self._completion_listeners:
+            self._completion_listeners.remove(listener)
+
+    def _notify_completion(self, service_name: str, checkpoint: CheckpointData) -> None:
+        """Notifica listeners sobre a conclusão de um serviço"""
+        if not self._completion_listeners or not self.current_execution:
+            return
+        
+        execution = self.current_execution
+        total = execution.total_services
+        event = {
+            'execution_id': execution.execution_id,
+            'service_name': service_name,
+            'status': checkpoint.status.value,
+            'result_summary': checkpoint.result_summary,
+            'error_message': checkpoint.error_message,
+            'completed_services': execution.completed_services,
+            'failed_services': execution.failed_services,
+            'total_services': total,
+            'progress_percentage': round((execution.completed_services / total) * 100, 2) if total > 0 else 0
+        }
+        
+        for listener in list(self._completion_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Completion listener failed for {service_name}: {e}")
+
     def _generate_execution_id(self, account_id: str) -> str:
         """Gera ID único para execução"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
@@ -796,6 +840,9 @@ class DynamoDBStateManager:
             'extra_data': checkpoint.to_dict()
         })
         
+        if status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.SKIPPED]:
+            self._notify_completion(service_name, checkpoint)
+        
         return True
 
     def start_service(self, service_name: str, items_total: int = 0) -> bool:
@@ -2520,6 +2520,15 @@ class ServiceFactory:
             self._services['reservedinstances'] = ReservedInstancesService(self.client_factory)
         return self._services['reservedinstances']
 
+    def get_rightsizing_service(self):
+        """Obtém instância do RightsizingService"""
+        if 'rightsizing' in self._mocks:
+            return self._mocks['rightsizing']
+        if 'rightsizing' not in self._services:
+            from ..services.rightsizing_service import RightsizingService
+            self._services['rightsizing'] = RightsizingService(self.client_factory)
+        return self._services['rightsizing']
+
     def get_costanomalydetection_service(self):
         """Obtém instância do CostAnomalyDetectionService"""
         if 'costanomalydetection' in self._mocks:
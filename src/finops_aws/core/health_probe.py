@@ -0,0 +1,505 @@
+"""
+Health Probe
+
+Verificação concorrente de saúde dos serviços FinOps:
+
+- Todos os health checks rodam em paralelo sob um prazo global; o que não
+  termina no prazo é classificado como 'timeout' (a thread é abandonada)
+- Resultado classificado em ok, denied (sem permissão), not_subscribed
+  (assinatura/opt-in ausente), timeout, unavailable ou error
+- Como a maioria dos health_check() engole a exceção e devolve False, o
+  código de erro da AWS é capturado por um handler 'after-call' do
+  botocore (por thread) instalado nas sessões usadas pelos serviços
+- Resultados definitivos ficam no FinOpsCache por conta, com TTL longo;
+  timeout e error são sondados de novo na próxima execução
+- Com um bucket configurado (HEALTH_PROBE_BUCKET ou REPORTS_BUCKET_NAME),
+  os resultados também são persistidos em S3, compartilhados entre o
+  dashboard e as Lambdas do Step Functions
+- get_skipped_services() expõe ao scan (lambda_mapper) os serviços sabidamente
+  negados ou não assinados, sem nenhuma chamada de probe
+
+Design Patterns:
+- Cache-Aside: Resultado por conta servido do cache até expirar
+- Observer: Erros das chamadas AWS capturados via eventos do botocore
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import boto3
+from botocore.client import BaseClient
+from botocore.exceptions import (
+    ClientError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    NoCredentialsError,
+    ReadTimeoutError,
+)
+
+from ..utils.cache import FinOpsCache
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_KEY = 'core:health_probe'
+DEFAULT_TTL_SECONDS = 12 * 3600
+DEFAULT_DEADLINE_SECONDS = 20.0
+MAX_WORKERS = 32
+
+
+class ProbeStatus(Enum):
+    """Classificação do resultado de um probe"""
+    OK = "ok"
+    DENIED = "denied"
+    NOT_SUBSCRIBED = "not_subscribed"
+    TIMEOUT = "timeout"
+    UNAVAILABLE = "unavailable"
+    ERROR = "error"
+
+
+# Status que o scan pode pular com segurança
+SKIP_STATUSES = frozenset({ProbeStatus.DENIED, ProbeStatus.NOT_SUBSCRIBED})
+
+# Status transitórios: não vão para o cache
+TRANSIENT_STATUSES = frozenset({ProbeStatus.TIMEOUT, ProbeStatus.ERROR})
+
+DENIED_CODES = frozenset({
+    'AccessDenied', 'AccessDeniedException', 'UnauthorizedOperation', 'UnauthorizedException',
+    'AuthorizationError', 'AuthorizationErrorException', 'UnrecognizedClientException',
+    'InvalidClientTokenId', 'ForbiddenException', 'NotAuthorized',
+})
+
+NOT_SUBSCRIBED_CODES = frozenset({
+    'SubscriptionRequiredException', 'SubscriptionRequired', 'OptInRequired', 'OptInRequiredException',
+    'NotSubscribedException', 'AWSOrganizationsNotInUseException', 'NotSignedUp',
+})
+
+_captured = threading.local()
+_capture_lock = threading.Lock()
+CAPTURE_FLAG = '_finops_error_capture'
+
+
+def _record_response(parsed=None, **kwargs) -> None:
+    error = (parsed or {}).get('Error') if isinstance(parsed, dict) else None
+    if error and error.get('Code'):
+        _captured.code = error['Code']
+
+
+def _record_exception(exception=None, **kwargs) -> None:
+    if exception is not None:
+        _captured.exception = exception
+
+
+def install_error_capture(session: Any = None) -> None:
+    """
+    Registra a captura de erros AWS na sessão (padrão: sessão default do boto3)
+
+    Vale só para os clientes criados depois da instalação: o botocore copia
+    os eventos da sessão para cada cliente na criação. Clientes já criados
+    usam install_client_error_capture().
+    """
+    session = session or boto3._get_default_session()
+    core = getattr(session, '_session', session)
+    with _capture_lock:
+        if getattr(core, CAPTURE_FLAG, False):
+            return
+        core.register('after-call', _record_response)
+        core.register('after-call-error', _record_exception)
+        setattr(core, CAPTURE_FLAG, True)
+
+
+def install_client_error_capture(client: Any) -> None:
+    """Registra a captura de erros AWS em um cliente já criado"""
+    events = client.meta.events
+    with _capture_lock:
+        if getattr(events, CAPTURE_FLAG, False):
+            return
+        events.register('after-call', _record_response)
+        events.register('after-call-error', _record_exception)
+        setattr(events, CAPTURE_FLAG, True)
+
+
+def _service_clients(service: Any) -> List[Any]:
+    """Clientes botocore mantidos como atributos de um serviço"""
+    try:
+        values = vars(service).values()
+    except TypeError:
+        return []
+    return [value for value in values if isinstance(value, BaseClient)]
+
+
+def classify_error(error: Any) -> ProbeStatus:
+    """Classifica uma exceção ou código de erro da AWS"""
+    if isinstance(error, ClientError):
+        error = error.response.get('Error', {}).get('Code', '')
+    if isinstance(error, str):
+        if error in DENIED_CODES or 'AccessDenied' in error or 'Unauthorized' in error:
+            return ProbeStatus.DENIED
+        if error in NOT_SUBSCRIBED_CODES or 'Subscription' in error or 'OptIn' in error:
+            return ProbeStatus.NOT_SUBSCRIBED
+        return ProbeStatus.ERROR
+    if isinstance(error, (ReadTimeoutError, ConnectTimeoutError, TimeoutError)):
+        return ProbeStatus.TIMEOUT
+    if isinstance(error, (EndpointConnectionError, NoCredentialsError)):
+        return ProbeStatus.UNAVAILABLE
+    return ProbeStatus.ERROR
+
+
+def _error_code(error: Any) -> Optional[str]:
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') or None
+    if isinstance(error, str):
+        return error
+    return type(error).__name__ if error is not None else None
+
+
+@dataclass
+class ProbeResult:
+    """Resultado do probe de um serviço"""
+    service: str
+    status: ProbeStatus
+    seconds: float = 0.0
+    code: Optional[str] = None
+    checked_at: float = field(default_factory=time.time)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == ProbeStatus.OK
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'service': self.service,
+            'status': self.status.value,
+            'seconds': round(self.seconds, 4),
+            'code': self.code,
+            'checked_at': self.checked_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProbeResult':
+        return cls(data['service'], ProbeStatus(data['status']), data.get('seconds', 0.0),
+                   data.get('code'), data.get('checked_at', 0.0))
+
+
+@dataclass
+class HealthReport:
+    """Resultados de uma varredura (sondados agora e vindos do cache)"""
+    account_id: str
+    results: Dict[str, ProbeResult]
+    probed: List[str] = field(default_factory=list)
+    cached: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    deadline_hit: bool = False
+
+    def status_map(self) -> Dict[str, bool]:
+        """Serviço -> operacional"""
+        return {name: result.ok for name, result in self.results.items()}
+
+    def skipped(self) -> Set[str]:
+        """Serviços negados ou não assinados"""
+        return {name for name, result in self.results.items() if result.status in SKIP_STATUSES}
+
+    def summary(self) -> Dict[str, Any]:
+        counts = {status.value: 0 for status in ProbeStatus}
+        for result in self.results.values():
+            counts[result.status.value] += 1
+        return {
+            'account_id': self.account_id,
+            'services': len(self.results),
+            'by_status': counts,
+            'probed': len(self.probed),
+            'cached': len(self.cached),
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'deadline_hit': self.deadline_hit
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'summary': self.summary(),
+            'results': {name: result.to_dict() for name, result in sorted(self.results.items())}
+        }
+
+
+class S3ProbeStore:
+    """
+    Resultados por conta persistidos em S3
+
+    Compartilha os resultados entre processos: o mapper do Step Functions
+    lê o que o dashboard ou uma execução anterior sondou.
+    """
+
+    def __init__(self, bucket: str, prefix: str = 'state/', client: Any = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = boto3.client('s3')
+        return self._client
+
+    def key(self, account_id: str) -> str:
+        return f"{self.prefix}health_probe/{account_id}.json"
+
+    def load(self, account_id: str) -> Dict[str, Dict[str, Any]]:
+        """Resultados gravados da conta ({} se ainda não houver)"""
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key(account_id))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return {}
+            raise
+        return json.loads(response['Body'].read())
+
+    def save(self, account_id: str, results: Dict[str, Dict[str, Any]]) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.key(account_id),
+            Body=json.dumps(results).encode('utf-8'),
+            ContentType='application/json'
+        )
+
+
+def default_probe_store() -> Optional[S3ProbeStore]:
+    """Store em S3 configurado pelo ambiente (None sem bucket)"""
+    bucket = os.getenv('HEALTH_PROBE_BUCKET') or os.getenv('REPORTS_BUCKET_NAME')
+    if not bucket:
+        return None
+    return S3ProbeStore(bucket, os.getenv('STATE_PREFIX', 'state/'))
+
+
+def _load_stored(account_id: str, store: Optional[S3ProbeStore]) -> Dict[str, Dict[str, Any]]:
+    """Resultados da conta: FinOpsCache do processo, senão o store persistente"""
+    cache = FinOpsCache()
+    stored = cache.get(_cache_key(account_id))
+    if stored is not None:
+        return dict(stored)
+    if store is None:
+        return {}
+    try:
+        stored = store.load(account_id)
+    except Exception as e:
+        logger.warning(f"Resultados de health probe não lidos do S3: {e}")
+        return {}
+    cache.set(_cache_key(account_id), stored, ttl=DEFAULT_TTL_SECONDS)
+    return dict(stored)
+
+
+_account_id: Optional[str] = None
+
+
+def resolve_account_id(account_id: Optional[str] = None) -> str:
+    """Conta usada na chave do cache (parâmetro, AWS_ACCOUNT_ID ou STS)"""
+    global _account_id
+    if account_id:
+        return account_id
+    if os.getenv('AWS_ACCOUNT_ID'):
+        return os.environ['AWS_ACCOUNT_ID']
+    if _account_id is None:
+        try:
+            _account_id = boto3.client('sts').get_caller_identity()['Account']
+        except Exception as e:
+            logger.warning(f"Conta AWS não identificada para o cache de health probe: {e}")
+            return 'default'
+    return _account_id
+
+
+def _cache_key(account_id: str) -> str:
+    return f"{CACHE_KEY}:{account_id}"
+
+
+def get_cached_results(account_id: Optional[str] = None,
+                       store: Optional[S3ProbeStore] = None) -> Dict[str, ProbeResult]:
+    """Resultados conhecidos da conta, do cache ou do S3 (sem sondar)"""
+    stored = _load_stored(resolve_account_id(account_id), store or default_probe_store())
+    now = time.time()
+    return {
+        name: ProbeResult.from_dict(data) for name, data in stored.items()
+        if now - data.get('checked_at', 0) < DEFAULT_TTL_SECONDS
+    }
+
+
+def get_skipped_services(account_id: Optional[str] = None,
+                         store: Optional[S3ProbeStore] = None) -> Set[str]:
+    """Serviços sabidamente negados ou não assinados na conta"""
+    return {
+        name for name, result in get_cached_results(account_id, store).items()
+        if result.status in SKIP_STATUSES
+    }
+
+
+class HealthProbe:
+    """
+    Executa health checks em paralelo, com prazo global e cache por conta
+
+    Example:
+        probe = HealthProbe.from_service_factory()
+        report = probe.run()
+        report.skipped()  # {'macie', 'securityhub', ...}
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], Any]],
+        account_id: Optional[str] = None,
+        max_workers: int = MAX_WORKERS,
+        deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        sessions: Iterable[Any] = (),
+        clients: Iterable[Any] = (),
+        store: Optional[S3ProbeStore] = None
+    ):
+        self.probes = dict(probes)
+        self._account_id = account_id
+        self.max_workers = max_workers
+        self.deadline_seconds = deadline_seconds
+        self.ttl_seconds = ttl_seconds
+        self.store = store if store is not None else default_probe_store()
+        install_error_capture()
+        for session in sessions:
+            install_error_capture(session)
+        for client in clients:
+            install_client_error_capture(client)
+
+    @classmethod
+    def from_service_factory(cls, factory: Any = None, names: Optional[Iterable[str]] = None,
+                             **kwargs) -> 'HealthProbe':
+        """
+        Probes a partir do health_check() dos serviços do ServiceFactory
+
+        A captura de erros é instalada nas sessões antes de criar os
+        serviços; clientes que a factory (singleton) já havia criado recebem
+        a captura diretamente.
+        """
+        if factory is None:
+            from .factories import ServiceFactory
+            factory = ServiceFactory()
+        client_factory = getattr(factory, 'client_factory', None)
+        session = getattr(client_factory, 'session', None)
+        install_error_capture()
+        if session is not None:
+            install_error_capture(session)
+
+        services = factory.get_all_services()
+        if names is not None:
+            services = {name: services[name] for name in names if name in services}
+        clients = list(getattr(client_factory, '_clients', {}).values())
+        for service in services.values():
+            clients.extend(_service_clients(service))
+        return cls({name: service.health_check for name, service in services.items()},
+                   sessions=[session] if session is not None else (), clients=clients, **kwargs)
+
+    @property
+    def account_id(self) -> str:
+        return resolve_account_id(self._account_id)
+
+    def _probe(self, name: str) -> ProbeResult:
+        _captured.code = None
+        _captured.exception = None
+        started = time.perf_counter()
+        try:
+            outcome = self.probes[name]()
+        except Exception as e:
+            return ProbeResult(name, classify_error(e), time.perf_counter() - started, _error_code(e))
+        seconds = time.perf_counter() - started
+
+        if isinstance(outcome, dict):
+            healthy = str(outcome.get('status', '')).lower() in ('ok', 'healthy', 'true')
+            message = str(outcome.get('message', ''))
+        else:
+            healthy = bool(outcome)
+            message = ''
+        if healthy:
+            return ProbeResult(name, ProbeStatus.OK, seconds)
+
+        error = getattr(_captured, 'code', None) or getattr(_captured, 'exception', None)
+        if error is not None:
+            return ProbeResult(name, classify_error(error), seconds, _error_code(error))
+        status = classify_error(message) if message else ProbeStatus.ERROR
+        if status == ProbeStatus.ERROR:
+            status = ProbeStatus.UNAVAILABLE
+        return ProbeResult(name, status, seconds)
+
+    def run(self, names: Optional[Iterable[str]] = None, use_cache: bool = True) -> HealthReport:
+        """
+        Sonda os serviços (em paralelo) e atualiza o cache da conta
+
+        Args:
+            names: Serviços a sondar (todos, se omitido)
+            use_cache: Reaproveita resultados em cache ainda válidos
+
+        Returns:
+            HealthReport com o resultado de cada serviço
+        """
+        started = time.perf_counter()
+        account_id = self.account_id
+        cache = FinOpsCache()
+        stored = _load_stored(account_id, self.store)
+        wanted = list(names) if names is not None else list(self.probes)
+        now = time.time()
+
+        results: Dict[str, ProbeResult] = {}
+        cached_names: List[str] = []
+        pending: List[str] = []
+        for name in wanted:
+            entry = stored.get(name)
+            if use_cache and entry and now - entry.get('checked_at', 0) < self.ttl_seconds:
+                results[name] = ProbeResult.from_dict(entry)
+                cached_names.append(name)
+            elif name in self.probes:
+                pending.append(name)
+
+        deadline_hit = False
+        if pending:
+            executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending))))
+            try:
+                futures = {executor.submit(self._probe, name): name for name in pending}
+                deadline = started + self.deadline_seconds
+                remaining = set(futures)
+                while remaining:
+                    left = deadline - time.perf_counter()
+                    if left <= 0:
+                        break
+                    done, remaining = wait(remaining, timeout=left, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        results[result.service] = result
+                for future in remaining:
+                    deadline_hit = True
+                    name = futures[future]
+                    results[name] = ProbeResult(name, ProbeStatus.TIMEOUT, self.deadline_seconds,
+                                                'DeadlineExceeded')
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            for name in pending:
+                result = results[name]
+                if result.status in TRANSIENT_STATUSES:
+                    stored.pop(name, None)
+                else:
+                    stored[name] = result.to_dict()
+            cache.set(_cache_key(account_id), stored, ttl=self.ttl_seconds)
+            if self.store is not None:
+                try:
+                    self.store.save(account_id, stored)
+                except Exception as e:
+                    logger.warning(f"Resultados de health probe não gravados no S3: {e}")
+
+        report = HealthReport(
+            account_id=account_id,
+            results=results,
+            probed=pending,
+            cached=cached_names,
+            elapsed_seconds=time.perf_counter() - started,
+            deadline_hit=deadline_hit
+        )
+        logger.info(f"Health probe: {report.summary()['by_status']} "
+                    f"({len(pending)} sondados, {len(cached_names)} do cache)")
+        return report
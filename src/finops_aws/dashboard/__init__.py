@@ -6,20 +6,43 @@ Contém funções para integrações AWS, análise multi-região e exportação.
 """
 
 from .integrations import (
+    get_rightsizing_recommendations,
     get_compute_optimizer_recommendations,
     get_cost_explorer_ri_recommendations,
     get_trusted_advisor_recommendations,
     get_amazon_q_insights,
 )
+from .compute_optimizer_collector import (
+    ComputeOptimizerCollector,
+    ComputeOptimizerSnapshot,
+    OptimizerRecord,
+    get_compute_optimizer_snapshot,
+)
+from .trusted_advisor_collector import CheckSummary, TrustedAdvisorCollector, TrustedAdvisorSnapshot
 from .multi_region import get_all_regions_analysis, get_region_costs
 from .export import export_to_csv, export_to_json, export_to_html, save_report
 from .analysis import get_dashboard_analysis
+from .pipeline import PipelineRun, Stage, StageClients, StagePipeline, StageTiming
+from .finops_context import FinOpsRunContext
+from .http_cache import HTTPResponseCache, CachedResponse
+from .recommendation_index import RecommendationIndex, RecommendationQuery
+from .jobs import JobQueue, JobPriority, JobStatus, get_job_queue
+from .progress_stream import ProgressBroker, ProgressEvent, get_progress_broker
+from .summary import build_tiered_dashboard, get_tier0_summary, get_tier1_summary
 
 __all__ = [
+    'get_rightsizing_recommendations',
     'get_compute_optimizer_recommendations',
     'get_cost_explorer_ri_recommendations',
     'get_trusted_advisor_recommendations',
     'get_amazon_q_insights',
+    'ComputeOptimizerCollector',
+    'ComputeOptimizerSnapshot',
+    'OptimizerRecord',
+    'get_compute_optimizer_snapshot',
+    'CheckSummary',
+    'TrustedAdvisorCollector',
+    'TrustedAdvisorSnapshot',
     'get_all_regions_analysis',
     'get_region_costs',
     'export_to_csv',
@@ -27,4 +50,24 @@ __all__ = [
     'export_to_html',
     'save_report',
     'get_dashboard_analysis',
+    'PipelineRun',
+    'Stage',
+    'StageClients',
+    'StagePipeline',
+    'StageTiming',
+    'FinOpsRunContext',
+    'HTTPResponseCache',
+    'CachedResponse',
+    'RecommendationIndex',
+    'RecommendationQuery',
+    'JobQueue',
+    'JobPriority',
+    'JobStatus',
+    'get_job_queue',
+    'ProgressBroker',
+    'ProgressEvent',
+    'get_progress_broker',
+    'build_tiered_dashboard',
+    'get_tier0_summary',
+    'get_tier1_summary',
 ]
@@ -6,6 +6,7 @@ Módulo principal de análise que consolida todas as fontes de dados.
 Design Patterns:
 - Facade: Simplifica acesso à análise complexa
 - Strategy: Usa analyzers modulares
+- Dependency Graph: Integrações executadas como estágios paralelos (pipeline)
 
 SOLID:
 - SRP: Coordena análise, não implementa
@@ -13,6 +14,7 @@ SOLID:
 """
 
 import os
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Callable, Optional
@@ -22,6 +24,7 @@ from botocore.exceptions import ClientError
 
 from .integrations import (
     get_compute_optimizer_recommendations,
+    get_rightsizing_recommendations,
     get_cost_explorer_ri_recommendations,
     get_trusted_advisor_recommendations,
     get_amazon_q_insights,
@@ -33,11 +36,34 @@ from .integrations import (
     get_finops_kpis,
     get_commitments_summary,
 )
+from .pipeline import Stage, StageClients, StagePipeline, StageTiming
 
 logger = logging.getLogger(__name__)
 
+MAX_WORKERS = 8
 
-def get_analyzers_analysis(region: str) -> tuple[List[Dict], Dict[str, Any]]:
+STAGE_TIMEOUTS: Dict[str, float] = {
+    'costs': 30,
+    'account': 10,
+    'analyzers': 180,
+    'all_services': 300,
+    'rightsizing': 120,
+    'compute_optimizer': 60,
+    'cost_explorer_ri': 30,
+    'trusted_advisor': 60,
+    'amazon_q': 60,
+    'multi_region': 300,
+    'budgets': 30,
+    'anomalies': 30,
+    'savings_plans': 30,
+    'reserved_instances': 30,
+    'commitments': 15,
+    'tag_governance': 60,
+    'kpis': 30,
+}
+
+
+def get_analyzers_analysis(region: str, client_factory: Optional[Any] = None) -> tuple[List[Dict], Dict[str, Any]]:
     """
     Executa análise usando os analyzers modulares (Strategy Pattern).
     
@@ -51,6 +77,7 @@ def get_analyzers_analysis(region: str) -> tuple[List[Dict], Dict[str, Any]]:
     
     Args:
         region: Região AWS para análise
+        client_factory: Clientes compartilhados (StageClients), opcional
         
     Returns:
         Tuple (recommendations, resources)
@@ -58,7 +85,7 @@ def get_analyzers_analysis(region: str) -> tuple[List[Dict], Dict[str, Any]]:
     try:
         from ..analyzers import AnalyzerFactory
         
-        factory = AnalyzerFactory()
+        factory = AnalyzerFactory(client_factory.get_client if client_factory else None)
         result = factory.analyze_all(region)
         
         recommendations = [rec.to_dict() for rec in result.recommendations]
@@ -83,7 +110,11 @@ def get_analyzers_analysis(region: str) -> tuple[List[Dict], Dict[str, Any]]:
 
 def get_dashboard_analysis(
     all_services_func: Optional[Callable] = None,
-    include_multi_region: bool = False
+    include_multi_region: bool = False,
+    progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    stage_timeouts: Optional[Dict[str, float]] = None,
+    max_workers: int = MAX_WORKERS,
+    state_manager: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Executa análise completa de custos e recursos AWS para o dashboard.
@@ -91,15 +122,32 @@ def get_dashboard_analysis(
     Esta função é chamada pelos endpoints da API quando precisam de análise
     completa. Ela não importa de app.py para evitar dependência circular.
     
+    As integrações são estágios de um DAG (StagePipeline): estágios
+    independentes rodam em paralelo e apenas Amazon Q (custos e recursos),
+    Commitments (Savings Plans e RIs) e KPIs (todas as recomendações e
+    tags) esperam suas dependências. Cada estágio tem seu tempo limite;
+    o detalhamento de tempos fica em result['metadata']['pipeline'].
+    
     Args:
         all_services_func: Função opcional para análise de todos os serviços.
                           Quando None, usa apenas as integrações.
         include_multi_region: Se True, analisa todas as regiões
+        progress_callback: Callback opcional chamado ao fim de cada estágio
+                          com (estágio, payload); o payload traz o progresso
+                          e o lote parcial de recomendações do estágio
+        stage_timeouts: Tempos limite (segundos) por estágio, sobrepondo
+                       STAGE_TIMEOUTS
+        max_workers: Estágios executados simultaneamente
+        state_manager: DynamoDBStateManager opcional; cada estágio vira um
+                      checkpoint (complete_service/fail_service) e o
+                      progresso chega pelos completion listeners do
+                      gerenciador em vez de progress_callback
         
     Returns:
         Dicionário com análise completa
     """
     region = os.environ.get('AWS_REGION', 'us-east-1')
+    timeouts = {**STAGE_TIMEOUTS, **(stage_timeouts or {})}
     
     result = {
         'costs': {},
@@ -108,6 +156,7 @@ def get_dashboard_analysis(
         'integrations': {
             'analyzers': False,
             'all_services': False,
+            'rightsizing': False,
             'compute_optimizer': False,
             'cost_explorer_ri': False,
             'trusted_advisor': False,
@@ -134,167 +183,233 @@ def get_dashboard_analysis(
         'generated_at': datetime.utcnow().isoformat()
     }
     
-    result['costs'] = _get_cost_data()
-    
-    try:
-        sts = boto3.client('sts')
-        result['account_id'] = sts.get_caller_identity()['Account']
-    except ClientError:
-        pass
-    
-    analyzer_recs, analyzer_resources = get_analyzers_analysis(region)
-    if analyzer_recs:
-        result['recommendations'].extend(_normalize_recommendations(analyzer_recs))
-        result['integrations']['analyzers'] = True
-    if analyzer_resources:
-        result['resources'].update(analyzer_resources)
-    
-    if all_services_func:
+    clients = StageClients(boto3.session.Session())
+    stages = _build_stages(region, all_services_func, include_multi_region, timeouts, clients)
+    stage_recommendations: Dict[str, List[Dict[str, Any]]] = {}
+    completed_stages = 0
+    tracked = state_manager is not None and _start_execution(state_manager, stages)
+    
+    def on_complete(stage: str, output: Dict[str, Any], timing: StageTiming) -> None:
+        nonlocal completed_stages
+        recommendations = _apply_stage_output(result, stage, output)
+        stage_recommendations[stage] = recommendations
+        completed_stages += 1
+        payload = {
+            'completed_stages': completed_stages,
+            'total_stages': len(stages),
+            'progress_percentage': round(completed_stages / len(stages) * 100, 2),
+            'success': result['integrations'].get(stage, True) and timing.status == 'ok',
+            'recommendations': recommendations
+        }
+        if tracked and _record_stage(state_manager, stage, timing, payload):
+            return
+        if not progress_callback:
+            return
         try:
-            all_services_recs, all_services_resources = all_services_func(region)
-            if all_services_recs:
-                result['recommendations'].extend(_normalize_recommendations(all_services_recs))
-                result['integrations']['all_services'] = True
-            if all_services_resources:
-                result['resources'].update(all_services_resources)
+            progress_callback(stage, payload)
         except Exception as e:
-            logger.error(f"Erro na análise de serviços: {e}")
-    
-    try:
-        co_recs = get_compute_optimizer_recommendations(region)
-        if co_recs:
-            result['recommendations'].extend(co_recs)
-            result['integrations']['compute_optimizer'] = True
-    except Exception as e:
-        logger.error(f"Erro no Compute Optimizer: {e}")
-    
-    try:
-        ri_recs = get_cost_explorer_ri_recommendations(region)
-        if ri_recs:
-            result['recommendations'].extend(ri_recs)
-            result['integrations']['cost_explorer_ri'] = True
-    except Exception as e:
-        logger.error(f"Erro no Cost Explorer RI: {e}")
+            logger.error(f"Erro no callback de progresso ({stage}): {e}")
     
-    try:
-        ta_recs = get_trusted_advisor_recommendations()
-        if ta_recs:
-            result['recommendations'].extend(ta_recs)
-            result['integrations']['trusted_advisor'] = True
-    except Exception as e:
-        logger.error(f"Erro no Trusted Advisor: {e}")
-    
-    try:
-        q_insights = get_amazon_q_insights(result.get('costs', {}), result.get('resources', {}))
-        if q_insights:
-            result['recommendations'].extend(q_insights)
-            result['integrations']['amazon_q'] = True
-    except Exception as e:
-        logger.error(f"Erro no Amazon Q: {e}")
-    
-    if include_multi_region:
+    run = StagePipeline(stages, max_workers=max_workers).run(on_complete)
+    if tracked:
         try:
-            from .multi_region import get_all_regions_analysis
-            multi_region_data = get_all_regions_analysis(max_workers=3)
-            result['multi_region'] = multi_region_data
-            result['integrations']['multi_region'] = True
-            
-            for rec in multi_region_data.get('consolidated_recommendations', []):
-                result['recommendations'].append(rec)
+            state_manager.complete_execution()
         except Exception as e:
-            logger.error(f"Erro na análise multi-region: {e}")
-    
-    try:
-        budgets_data = get_budgets_analysis()
-        if budgets_data and 'error' not in budgets_data:
-            result['finops']['budgets'] = budgets_data
-            result['integrations']['budgets'] = True
-            for rec in budgets_data.get('recommendations', []):
-                result['recommendations'].append(rec)
-    except Exception as e:
-        logger.error(f"Erro na análise de Budgets: {e}")
-    
-    try:
-        anomalies_data = get_anomaly_detection_analysis(days_back=90)
-        if anomalies_data and 'error' not in anomalies_data:
-            result['finops']['anomalies'] = anomalies_data
-            result['integrations']['anomalies'] = True
-            for rec in anomalies_data.get('recommendations', []):
-                result['recommendations'].append(rec)
-    except Exception as e:
-        logger.error(f"Erro na análise de Anomalias: {e}")
+            logger.error(f"Erro ao concluir execução no state manager: {e}")
     
-    sp_data = None
-    ri_data = None
-    
-    try:
-        sp_data = get_savings_plans_analysis()
-        if sp_data and 'error' not in sp_data:
-            result['finops']['savings_plans'] = sp_data
-            result['integrations']['savings_plans'] = True
-            for rec in sp_data.get('recommendations', []):
-                result['recommendations'].append(rec)
-    except Exception as e:
-        logger.error(f"Erro na análise de Savings Plans: {e}")
+    for stage in stages:
+        result['recommendations'].extend(stage_recommendations.get(stage.name, []))
+    result['recommendations'] = _deduplicate_recommendations(result['recommendations'])
+    result['recommendations'].sort(key=lambda x: x.get('savings', 0), reverse=True)
     
-    try:
-        ri_data = get_reserved_instances_analysis()
-        if ri_data and 'error' not in ri_data:
-            result['finops']['reserved_instances'] = ri_data
-            result['integrations']['reserved_instances'] = True
-            for rec in ri_data.get('recommendations', []):
-                result['recommendations'].append(rec)
-    except Exception as e:
-        logger.error(f"Erro na análise de Reserved Instances: {e}")
+    result['summary'] = _generate_summary(result)
+    result['metadata'] = {'pipeline': run.to_dict()}
     
-    try:
-        commitments_data = get_commitments_summary(sp_data=sp_data, ri_data=ri_data)
-        if commitments_data:
-            result['finops']['commitments'] = commitments_data.get('summary', {})
-    except Exception as e:
-        logger.error(f"Erro no resumo de Commitments: {e}")
+    return result
+
+
+def _build_stages(
+    region: str,
+    all_services_func: Optional[Callable],
+    include_multi_region: bool,
+    timeouts: Dict[str, float],
+    clients: StageClients
+) -> List[Stage]:
+    """
+    Declara os estágios da análise e suas dependências.
     
-    tag_data: Optional[Dict[str, Any]] = None
-    try:
-        tag_data = get_tag_governance_analysis()
-        if tag_data and 'error' not in tag_data:
-            result['finops']['tag_governance'] = tag_data
-            result['integrations']['tag_governance'] = True
-            for rec in tag_data.get('recommendations', []):
-                result['recommendations'].append(rec)
-    except Exception as e:
-        logger.error(f"Erro na análise de Tag Governance: {e}")
+    Cada estágio devolve um dicionário com as chaves opcionais
+    'recommendations', 'resources', 'data' e 'success', consolidado por
+    _apply_stage_output na thread chamadora. Os clientes boto3 vêm de
+    `clients`, criado na thread chamadora.
+    """
+    def costs(deps):
+        return {'data': _get_cost_data()}
     
-    try:
+    def account(deps):
+        try:
+            return {'data': clients.get_client('sts').get_caller_identity()['Account']}
+        except ClientError:
+            return {}
+    
+    def analyzers(deps):
+        recs, resources = get_analyzers_analysis(region, client_factory=clients)
+        return {'recommendations': _normalize_recommendations(recs) if recs else [],
+                'resources': resources, 'success': bool(recs)}
+    
+    def all_services(deps):
+        recs, resources = all_services_func(region)
+        return {'recommendations': _normalize_recommendations(recs) if recs else [],
+                'resources': resources, 'success': bool(recs)}
+    
+    def listing(fetch: Callable[[], List[Dict[str, Any]]]) -> Callable:
+        def stage(deps):
+            recs = fetch()
+            return {'recommendations': recs or [], 'success': bool(recs)}
+        return stage
+    
+    def amazon_q(deps):
+        resources: Dict[str, Any] = {}
+        for name in ('analyzers', 'all_services'):
+            resources.update((deps.get(name) or {}).get('resources') or {})
+        costs_data = (deps.get('costs') or {}).get('data') or {}
+        recs = get_amazon_q_insights(costs_data, resources)
+        return {'recommendations': recs or [], 'success': bool(recs)}
+    
+    def multi_region(deps):
+        from .multi_region import get_all_regions_analysis
+        data = get_all_regions_analysis(max_workers=3)
+        return {'data': data, 'recommendations': data.get('consolidated_recommendations', []), 'success': True}
+    
+    def finops(fetch: Callable[[], Optional[Dict[str, Any]]]) -> Callable:
+        def stage(deps):
+            data = fetch()
+            if data and 'error' not in data:
+                return {'data': data, 'recommendations': data.get('recommendations', []), 'success': True}
+            return {'raw': data}
+        return stage
+    
+    def commitments(deps):
+        def raw(name):
+            output = deps.get(name) or {}
+            return output.get('data', output.get('raw'))
+        data = get_commitments_summary(sp_data=raw('savings_plans'), ri_data=raw('reserved_instances'))
+        return {'data': data.get('summary', {}) if data else None}
+    
+    def kpis(deps):
+        recommendations = [r for name in recommendation_stages
+                           for r in (deps.get(name) or {}).get('recommendations', [])]
+        tag_data = (deps.get('tag_governance') or {}).get('data')
         idle_cost = sum(
-            r.get('savings', 0) for r in result['recommendations'] 
+            r.get('savings', 0) for r in recommendations
             if 'idle' in r.get('type', '').lower() or 'unused' in r.get('type', '').lower()
         )
         shadow_cost = tag_data.get('costs', {}).get('total_cost', 0) if tag_data else 0
-        savings_potential = sum(r.get('savings', 0) for r in result['recommendations'])
+        savings_potential = sum(r.get('savings', 0) for r in recommendations)
         
         tag_coverage_percent = 0.0
         if tag_data and 'coverage' in tag_data:
             tag_coverage_percent = tag_data['coverage'].get('compliance_percent', 0.0)
         
-        kpis_data = get_finops_kpis(
+        data = get_finops_kpis(
             idle_cost=idle_cost,
             shadow_cost=shadow_cost,
             savings_potential=savings_potential,
             tag_coverage_percent=tag_coverage_percent
         )
-        if kpis_data and 'error' not in kpis_data:
-            result['finops']['kpis'] = kpis_data
-            result['integrations']['kpis'] = True
-    except Exception as e:
-        logger.error(f"Erro no cálculo de KPIs: {e}")
-    
-    result['recommendations'] = _deduplicate_recommendations(result['recommendations'])
-    result['recommendations'].sort(key=lambda x: x.get('savings', 0), reverse=True)
+        if data and 'error' not in data:
+            return {'data': data, 'success': True}
+        return {}
+    
+    sources = ['analyzers'] + (['all_services'] if all_services_func else [])
+    stages = [
+        Stage('costs', costs, inline=True),
+        Stage('account', account),
+        Stage('analyzers', analyzers),
+    ]
+    if all_services_func:
+        stages.append(Stage('all_services', all_services))
+    stages += [
+        Stage('rightsizing', listing(lambda: get_rightsizing_recommendations(region, clients))),
+        Stage('compute_optimizer', listing(lambda: get_compute_optimizer_recommendations(region, clients))),
+        Stage('cost_explorer_ri', listing(lambda: get_cost_explorer_ri_recommendations(region, clients))),
+        Stage('trusted_advisor', listing(lambda: get_trusted_advisor_recommendations(clients))),
+        Stage('amazon_q', amazon_q, requires=tuple(['costs'] + sources)),
+    ]
+    if include_multi_region:
+        stages.append(Stage('multi_region', multi_region))
+    stages += [
+        Stage('budgets', finops(lambda: get_budgets_analysis(clients))),
+        Stage('anomalies', finops(lambda: get_anomaly_detection_analysis(days_back=90, client_factory=clients))),
+        Stage('savings_plans', finops(lambda: get_savings_plans_analysis(clients))),
+        Stage('reserved_instances', finops(lambda: get_reserved_instances_analysis(clients))),
+        Stage('commitments', commitments, requires=('savings_plans', 'reserved_instances')),
+        Stage('tag_governance', finops(lambda: get_tag_governance_analysis(client_factory=clients))),
+    ]
+    recommendation_stages = [s.name for s in stages if s.name not in ('costs', 'account', 'commitments')]
+    stages.append(Stage('kpis', kpis, requires=tuple(recommendation_stages)))
+    
+    for stage in stages:
+        stage.timeout = timeouts.get(stage.name)
+        if stage.default is None:
+            stage.default = {}
+    return stages
+
+
+def _start_execution(state_manager: Any, stages: List[Stage]) -> bool:
+    """
+    Abre no state manager uma execução com um checkpoint por estágio.
     
-    result['summary'] = _generate_summary(result)
+    Returns:
+        False se a execução não pôde ser criada ou se foi retomada uma
+        execução de outra varredura (sem os checkpoints dos estágios)
+    """
+    names = [stage.name for stage in stages]
+    try:
+        account_id = os.environ.get('AWS_ACCOUNT_ID') or boto3.client('sts').get_caller_identity()['Account']
+        execution = state_manager.create_execution(account_id, services=names, metadata={'source': 'dashboard'})
+    except Exception as e:
+        logger.error(f"Erro ao criar execução no state manager: {e}")
+        return False
+    return set(names) <= set(execution.checkpoints)
+
+
+def _record_stage(state_manager: Any, stage: str, timing: StageTiming, payload: Dict[str, Any]) -> bool:
+    """Registra o fim do estágio como checkpoint; False se não foi gravado"""
+    try:
+        if timing.status == 'ok':
+            summary = json.loads(json.dumps(payload, default=str))
+            return state_manager.complete_service(stage, result_summary=summary)
+        return state_manager.fail_service(stage, timing.error or timing.status)
+    except Exception as e:
+        logger.error(f"Erro ao registrar checkpoint do estágio {stage}: {e}")
+        return False
+
+
+def _apply_stage_output(result: Dict[str, Any], stage: str, output: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Consolida a saída de um estágio no resultado da análise.
     
-    return result
+    Returns:
+        Recomendações do estágio (lote parcial do progresso)
+    """
+    output = output or {}
+    data = output.get('data')
+    if stage == 'costs':
+        result['costs'] = data if data is not None else {'total': 0, 'by_service': {}}
+    elif stage == 'account':
+        if data:
+            result['account_id'] = data
+    elif stage == 'multi_region':
+        if data is not None:
+            result['multi_region'] = data
+    elif stage in result['finops'] and data:
+        result['finops'][stage] = data
+    if output.get('resources'):
+        result['resources'].update(output['resources'])
+    if output.get('success') and stage in result['integrations']:
+        result['integrations'][stage] = True
+    return output.get('recommendations') or []
 
 
 def _normalize_recommendations(recommendations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
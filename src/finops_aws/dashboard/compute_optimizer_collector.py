@@ -0,0 +1,379 @@
+"""
+Compute Optimizer Collector for FinOps Dashboard
+
+Coleta completa das recomendações do AWS Compute Optimizer:
+
+- Cinco tipos de recurso: EC2, EBS, Lambda, Auto Scaling groups e
+  serviços ECS (Fargate), cada um paginado por nextToken
+- Tarefas (tipo × região × conta) executadas em paralelo; contas-membro
+  incluídas quando a conta é management/delegated admin da organização
+- Resultado normalizado em um registro compacto (OptimizerRecord)
+- Cache no FinOpsCache com TTL até a próxima atualização diária do
+  Compute Optimizer (lastRefreshTimestamp + 24h)
+
+Design Patterns:
+- Strategy: Um extrator por tipo de recurso
+- Cache-Aside: Snapshot servido do FinOpsCache até o próximo refresh
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import boto3
+from botocore.exceptions import ClientError
+
+from ..utils.cache import FinOpsCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'dashboard:compute_optimizer'
+REFRESH_INTERVAL_SECONDS = 24 * 3600
+MIN_TTL_SECONDS = 3600
+MAX_WORKERS = 8
+
+EC2 = 'EC2'
+EBS = 'EBS'
+LAMBDA = 'LAMBDA'
+ASG = 'ASG'
+ECS = 'ECS'
+
+RESOURCE_TYPES = (EC2, EBS, LAMBDA, ASG, ECS)
+
+# Findings do Compute Optimizer normalizados (cada API usa uma grafia)
+FINDINGS = {
+    'OVER_PROVISIONED': 'OVER_PROVISIONED',
+    'OVERPROVISIONED': 'OVER_PROVISIONED',
+    'UNDER_PROVISIONED': 'UNDER_PROVISIONED',
+    'UNDERPROVISIONED': 'UNDER_PROVISIONED',
+    'NOT_OPTIMIZED': 'NOT_OPTIMIZED',
+    'NOTOPTIMIZED': 'NOT_OPTIMIZED',
+    'OPTIMIZED': 'OPTIMIZED',
+    'UNAVAILABLE': 'UNAVAILABLE',
+}
+
+ACTIONABLE_FINDINGS = ('OVER_PROVISIONED', 'UNDER_PROVISIONED', 'NOT_OPTIMIZED')
+
+
+@dataclass(frozen=True, slots=True)
+class OptimizerRecord:
+    """Recomendação do Compute Optimizer normalizada (um recurso)"""
+    resource_type: str
+    resource_id: str
+    account_id: str
+    region: str
+    finding: str
+    current: str
+    recommended: str
+    monthly_savings: float = 0.0
+    savings_percent: float = 0.0
+    last_refresh: Optional[datetime] = None
+
+    @property
+    def actionable(self) -> bool:
+        return self.finding in ACTIONABLE_FINDINGS and bool(self.recommended)
+
+    def to_recommendation(self) -> Dict[str, Any]:
+        """Formato de recomendação do dashboard"""
+        labels = {EC2: 'EC2', EBS: 'EBS', LAMBDA: 'Lambda', ASG: 'Auto Scaling', ECS: 'ECS'}
+        label = labels.get(self.resource_type, self.resource_type)
+        return {
+            'type': f'COMPUTE_OPTIMIZER_{self.resource_type}',
+            'resource_id': self.resource_id,
+            'title': f'Right-size {label}: {self.current} → {self.recommended}',
+            'description': f'{label} {self.resource_id}: {self.current} → {self.recommended} ({self.finding})',
+            'priority': 'HIGH' if self.finding == 'UNDER_PROVISIONED' or self.monthly_savings >= 100 else 'MEDIUM',
+            'savings': round(self.monthly_savings, 2),
+            'service': 'AWS Compute Optimizer',
+            'region': self.region,
+            'account_id': self.account_id,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'resource_type': self.resource_type,
+            'resource_id': self.resource_id,
+            'account_id': self.account_id,
+            'region': self.region,
+            'finding': self.finding,
+            'current': self.current,
+            'recommended': self.recommended,
+            'monthly_savings': round(self.monthly_savings, 2),
+            'savings_percent': round(self.savings_percent, 2),
+            'last_refresh': self.last_refresh.isoformat() if self.last_refresh else None,
+        }
+
+
+def _savings(option: Dict[str, Any]) -> Tuple[float, float]:
+    """(economia mensal, percentual) da opção recomendada"""
+    opportunity = option.get('savingsOpportunity') or {}
+    amount = (opportunity.get('estimatedMonthlySavings') or option.get('estimatedMonthlySavings') or {})
+    return float(amount.get('value', 0) or 0), float(opportunity.get('savingsOpportunityPercentage', 0) or 0)
+
+
+def _resource_id(arn: str) -> str:
+    return arn.split('/')[-1].split(':')[-1] if arn else ''
+
+
+def _ec2(rec: Dict[str, Any]) -> Tuple[str, str, str, Dict[str, Any]]:
+    option = (rec.get('recommendationOptions') or [{}])[0]
+    return (_resource_id(rec.get('instanceArn', '')), rec.get('currentInstanceType', ''),
+            option.get('instanceType', ''), option)
+
+
+def _ebs(rec: Dict[str, Any]) -> Tuple[str, str, str, Dict[str, Any]]:
+    option = (rec.get('volumeRecommendationOptions') or [{}])[0]
+
+    def describe(config: Dict[str, Any]) -> str:
+        return f"{config.get('volumeType', '')} {config.get('volumeSize', '')}GiB" if config else ''
+
+    return (_resource_id(rec.get('volumeArn', '')), describe(rec.get('currentConfiguration') or {}),
+            describe(option.get('configuration') or {}), option)
+
+
+def _lambda(rec: Dict[str, Any]) -> Tuple[str, str, str, Dict[str, Any]]:
+    option = (rec.get('memorySizeRecommendationOptions') or [{}])[0]
+    arn = rec.get('functionArn', '')
+    name = arn.split(':function:')[-1].split(':')[0] if ':function:' in arn else _resource_id(arn)
+    recommended = f"{option['memorySize']}MB" if option.get('memorySize') else ''
+    return name, f"{rec.get('currentMemorySize', '')}MB", recommended, option
+
+
+def _asg(rec: Dict[str, Any]) -> Tuple[str, str, str, Dict[str, Any]]:
+    option = (rec.get('recommendationOptions') or [{}])[0]
+    current = (rec.get('currentConfiguration') or {}).get('instanceType', '')
+    return (rec.get('autoScalingGroupName') or _resource_id(rec.get('autoScalingGroupArn', '')), current,
+            (option.get('configuration') or {}).get('instanceType', ''), option)
+
+
+def _ecs(rec: Dict[str, Any]) -> Tuple[str, str, str, Dict[str, Any]]:
+    option = (rec.get('serviceRecommendationOptions') or [{}])[0]
+    current = rec.get('currentServiceConfiguration') or {}
+
+    def describe(config: Dict[str, Any]) -> str:
+        return f"{config.get('cpu', '')} CPU / {config.get('memory', '')} MiB" if config.get('cpu') else ''
+
+    arn = rec.get('serviceArn', '')
+    service = arn.split(':service/')[-1] if ':service/' in arn else _resource_id(arn)
+    return service, describe(current), describe(option), option
+
+
+# Tipo -> (operação da API, chave da lista na resposta, extrator)
+EXTRACTORS: Dict[str, Tuple[str, str, Callable]] = {
+    EC2: ('get_ec2_instance_recommendations', 'instanceRecommendations', _ec2),
+    EBS: ('get_ebs_volume_recommendations', 'volumeRecommendations', _ebs),
+    LAMBDA: ('get_lambda_function_recommendations', 'lambdaFunctionRecommendations', _lambda),
+    ASG: ('get_auto_scaling_group_recommendations', 'autoScalingGroupRecommendations', _asg),
+    ECS: ('get_ecs_service_recommendations', 'ecsServiceRecommendations', _ecs),
+}
+
+
+def normalize_recommendation(resource_type: str, region: str, rec: Dict[str, Any]) -> OptimizerRecord:
+    """Converte um item da API no registro compacto"""
+    _, _, extract = EXTRACTORS[resource_type]
+    resource_id, current, recommended, option = extract(rec)
+    savings, percent = _savings(option)
+    finding = str(rec.get('finding', '')).upper()
+    refreshed = rec.get('lastRefreshTimestamp')
+    if isinstance(refreshed, datetime) and refreshed.tzinfo is None:
+        refreshed = refreshed.replace(tzinfo=timezone.utc)
+    return OptimizerRecord(
+        resource_type=resource_type,
+        resource_id=resource_id,
+        account_id=str(rec.get('accountId', '')),
+        region=region,
+        finding=FINDINGS.get(finding.replace(' ', '_'), finding),
+        current=str(current),
+        recommended=str(recommended),
+        monthly_savings=savings,
+        savings_percent=percent,
+        last_refresh=refreshed if isinstance(refreshed, datetime) else None
+    )
+
+
+@dataclass
+class ComputeOptimizerSnapshot:
+    """Recomendações coletadas de todas as regiões/contas/tipos"""
+    records: List[OptimizerRecord]
+    regions: List[str]
+    accounts: List[str]
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    collected_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    elapsed_seconds: float = 0.0
+    api_calls: int = 0
+
+    def actionable(self, resource_types: Optional[Iterable[str]] = None) -> List[OptimizerRecord]:
+        """Registros com ação recomendada, maior economia primeiro"""
+        types = set(resource_types or RESOURCE_TYPES)
+        selected = [r for r in self.records if r.actionable and r.resource_type in types]
+        return sorted(selected, key=lambda r: r.monthly_savings, reverse=True)
+
+    def to_recommendations(self, resource_types: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        return [r.to_recommendation() for r in self.actionable(resource_types)]
+
+    def ttl_seconds(self, now: Optional[datetime] = None) -> int:
+        """Segundos até o próximo refresh diário do Compute Optimizer"""
+        refreshed = [r.last_refresh for r in self.records if r.last_refresh]
+        if not refreshed:
+            return REFRESH_INTERVAL_SECONDS
+        now = now or datetime.now(timezone.utc)
+        remaining = (max(refreshed) + timedelta(seconds=REFRESH_INTERVAL_SECONDS) - now).total_seconds()
+        return int(min(max(remaining, MIN_TTL_SECONDS), REFRESH_INTERVAL_SECONDS))
+
+    def summary(self) -> Dict[str, Any]:
+        by_type: Dict[str, Dict[str, Any]] = {}
+        for record in self.records:
+            entry = by_type.setdefault(record.resource_type, {'resources': 0, 'actionable': 0, 'monthly_savings': 0.0})
+            entry['resources'] += 1
+            if record.actionable:
+                entry['actionable'] += 1
+                entry['monthly_savings'] += record.monthly_savings
+        for entry in by_type.values():
+            entry['monthly_savings'] = round(entry['monthly_savings'], 2)
+        return {
+            'resources': len(self.records),
+            'actionable': sum(e['actionable'] for e in by_type.values()),
+            'monthly_savings': round(sum(e['monthly_savings'] for e in by_type.values()), 2),
+            'by_type': by_type,
+            'regions': self.regions,
+            'accounts': self.accounts,
+            'errors': len(self.errors),
+            'api_calls': self.api_calls,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'summary': self.summary(),
+            'records': [r.to_dict() for r in self.records],
+            'errors': self.errors,
+            'collected_at': self.collected_at.isoformat(),
+        }
+
+
+class ComputeOptimizerCollector:
+    """
+    Coletor paralelo e paginado do Compute Optimizer
+
+    Example:
+        collector = ComputeOptimizerCollector()
+        snapshot = collector.collect(['us-east-1', 'eu-west-1'])
+        recommendations = snapshot.to_recommendations()
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[str], Any]] = None,
+                 max_workers: int = MAX_WORKERS):
+        self._client_factory = client_factory or (lambda region: boto3.client('compute-optimizer', region_name=region))
+        self.max_workers = max_workers
+
+    def member_accounts(self, client) -> List[str]:
+        """Contas ativas da organização (vazio se não for management/delegated admin)"""
+        accounts = []
+        params: Dict[str, Any] = {}
+        try:
+            while True:
+                response = client.get_enrollment_statuses_for_organization(**params)
+                accounts.extend(
+                    s['accountId'] for s in response.get('accountEnrollmentStatuses', [])
+                    if s.get('status') == 'Active' and s.get('accountId')
+                )
+                token = response.get('nextToken')
+                if not token:
+                    return accounts
+                params['nextToken'] = token
+        except ClientError as e:
+            logger.info(f"Compute Optimizer sem acesso à organização, usando apenas a conta atual: {e}")
+            return []
+
+    def _fetch(self, client, resource_type: str, region: str,
+               account_id: Optional[str]) -> Tuple[List[OptimizerRecord], int]:
+        operation, key, _ = EXTRACTORS[resource_type]
+        params: Dict[str, Any] = {'accountIds': [account_id]} if account_id else {}
+        records, calls = [], 0
+        while True:
+            response = getattr(client, operation)(**params)
+            calls += 1
+            records.extend(normalize_recommendation(resource_type, region, rec) for rec in response.get(key, []))
+            token = response.get('nextToken')
+            if not token:
+                return records, calls
+            params['nextToken'] = token
+
+    def collect(self, regions: Sequence[str], resource_types: Sequence[str] = RESOURCE_TYPES,
+                include_member_accounts: bool = True, use_cache: bool = True) -> ComputeOptimizerSnapshot:
+        """
+        Coleta todos os tipos em todas as regiões (e contas-membro)
+
+        Args:
+            regions: Regiões a consultar
+            resource_types: Subconjunto de RESOURCE_TYPES
+            include_member_accounts: Consultar contas da organização quando permitido
+            use_cache: Usar FinOpsCache
+
+        Returns:
+            ComputeOptimizerSnapshot
+        """
+        regions = list(regions)
+        resource_types = [t for t in resource_types if t in EXTRACTORS]
+        cache = FinOpsCache()
+        cache_key = f"{CACHE_KEY}:{','.join(sorted(regions))}:{','.join(sorted(resource_types))}:{include_member_accounts}"
+        if use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        # Clientes criados fora das threads (criação de cliente boto3 não é thread-safe)
+        clients = {region: self._client_factory(region) for region in regions}
+        accounts = self.member_accounts(clients[regions[0]]) if include_member_accounts and regions else []
+        targets = accounts or [None]
+
+        tasks = [(t, region, account) for region in regions for t in resource_types for account in targets]
+        records: List[OptimizerRecord] = []
+        errors: List[Dict[str, str]] = []
+        api_calls = 0
+
+        def run(task):
+            resource_type, region, account = task
+            try:
+                return task, self._fetch(clients[region], resource_type, region, account), None
+            except ClientError as e:
+                return task, ([], 1), e.response.get('Error', {}).get('Code', '') or str(e)
+            except AttributeError as e:
+                # Versão do boto3 sem a operação (ex.: recomendações ECS)
+                return task, ([], 0), f"UnsupportedOperation: {e}"
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(tasks)))) as executor:
+            for (resource_type, region, account), (found, calls), error in executor.map(run, tasks):
+                records.extend(found)
+                api_calls += calls
+                if error is not None:
+                    if error == 'OptInRequiredException':
+                        logger.warning(f"Compute Optimizer não está habilitado em {region}")
+                    else:
+                        logger.error(f"Erro ao acessar Compute Optimizer ({resource_type}, {region}): {error}")
+                    errors.append({'resource_type': resource_type, 'region': region,
+                                   'account_id': account or '', 'error': error})
+
+        snapshot = ComputeOptimizerSnapshot(
+            records=records,
+            regions=regions,
+            accounts=accounts,
+            errors=errors,
+            elapsed_seconds=time.perf_counter() - started,
+            api_calls=api_calls
+        )
+        if use_cache and len(errors) < len(tasks):
+            cache.set(cache_key, snapshot, ttl=snapshot.ttl_seconds())
+        return snapshot
+
+
+def get_compute_optimizer_snapshot(regions: Sequence[str],
+                                   resource_types: Sequence[str] = RESOURCE_TYPES,
+                                   use_cache: bool = True,
+                                   client_factory: Optional[Callable[[str], Any]] = None) -> ComputeOptimizerSnapshot:
+    """Snapshot do Compute Optimizer (cacheado até o próximo refresh diário)"""
+    return ComputeOptimizerCollector(client_factory).collect(regions, resource_types, use_cache=use_cache)
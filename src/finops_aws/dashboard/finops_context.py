@@ -0,0 +1,98 @@
+"""
+FinOps Run Context
+
+Contexto compartilhado de uma execução da análise FinOps completa:
+
+- Os dados de custo da janela (cubo de custos) são buscados uma única vez
+  no Cost Explorer, antes das sub-análises
+- Um cubo ativo ainda fresco que cubra a janela é reutilizado sem nenhuma
+  chamada à AWS
+- Cada sub-análise recebe o cubo explicitamente (cost_cube=...) e responde
+  dele as consultas de custo; o que o cubo não cobre segue para o Cost
+  Explorer como antes
+- Falha no prefetch não interrompe a análise: sem cubo, cada serviço
+  consulta o Cost Explorer por conta própria
+- Os clientes boto3 da execução (StageClients) são criados na thread que
+  prepara o contexto e repassados às sub-análises
+- A janela é calculada em UTC, como o Cost Explorer e o cubo de custos
+
+Design Patterns:
+- Context Object: Estado compartilhado passado às sub-análises
+- Materialized View: Custos da janela buscados uma vez e reutilizados
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from ..analytics.cost_cube import DEFAULT_WINDOW_DAYS, CostCube, get_cost_cube, materialize_cost_cube
+from .pipeline import StageClients
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERIOD_DAYS = 30
+
+
+@dataclass
+class FinOpsRunContext:
+    """Dados de custo compartilhados pelas sub-análises de uma execução"""
+    period_days: int = DEFAULT_PERIOD_DAYS
+    cost_cube: Optional[CostCube] = None
+    source: str = 'unavailable'
+    prefetch_seconds: float = 0.0
+    error: Optional[str] = None
+    clients: Optional[StageClients] = field(default=None, repr=False)
+
+    @classmethod
+    def prefetch(
+        cls,
+        ce_client: Any = None,
+        period_days: int = DEFAULT_PERIOD_DAYS,
+        window_days: Optional[int] = None,
+        reuse_active: bool = True,
+        clients: Optional[StageClients] = None
+    ) -> 'FinOpsRunContext':
+        """
+        Prepara o contexto buscando os custos da janela uma única vez
+
+        Args:
+            ce_client: Cliente do Cost Explorer (criado se omitido)
+            period_days: Período analisado pelas sub-análises
+            window_days: Janela do cubo (padrão de materialize_cost_cube);
+                         nunca menor que period_days
+            reuse_active: Reutiliza o cubo ativo se cobrir o período
+            clients: Clientes da execução (criados aqui se omitidos)
+        """
+        started = time.perf_counter()
+        clients = clients or StageClients()
+        end = datetime.utcnow().date() + timedelta(days=1)
+        start = end - timedelta(days=period_days + 1)
+
+        if reuse_active:
+            cube = get_cost_cube()
+            if cube is not None and cube.covers(start, end):
+                return cls(period_days, cube, 'active', time.perf_counter() - started, clients=clients)
+
+        try:
+            client = ce_client or clients.get_client('ce', region_name='us-east-1')
+            days = max(window_days, period_days + 1) if window_days else None
+            if days is None and period_days + 1 > DEFAULT_WINDOW_DAYS:
+                days = period_days + 1
+            cube = materialize_cost_cube(client, days=days, end=end)
+            return cls(period_days, cube, 'prefetched', time.perf_counter() - started, clients=clients)
+        except Exception as e:
+            logger.error(f"Erro ao pré-carregar custos da análise FinOps: {e}")
+            return cls(period_days, None, 'unavailable', time.perf_counter() - started, str(e), clients)
+
+    def to_dict(self) -> Dict[str, Any]:
+        cube = self.cost_cube
+        return {
+            'period_days': self.period_days,
+            'source': self.source,
+            'prefetch_seconds': round(self.prefetch_seconds, 4),
+            'window': {'start': cube.start, 'end': cube.end} if cube else None,
+            'dimensions': cube.dimensions if cube else [],
+            'error': self.error
+        }
@@ -7,21 +7,58 @@ Este módulo integra:
 - WALK: Cost Allocation Engine, Showback, Commitment Dashboard
 - RUN: Unit Economics, Chargeback, Policy Automation, Forecasting
 - FLY: Real-Time Insights, Predictive Optimization, FinOps Culture
+
+A análise completa (get_complete_finops_analysis) busca os custos da
+janela uma única vez (FinOpsRunContext), repassa o cubo de custos a cada
+sub-análise e executa as sub-análises em paralelo (StagePipeline); a
+maturidade usa o resultado das demais em vez de health checks. Os
+clientes boto3 das sub-análises vêm de um StageClients criado na thread
+chamadora (client_factory dos serviços).
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from datetime import datetime, timedelta
 import os
 import logging
 
+from .finops_context import FinOpsRunContext
+from .pipeline import Stage, StageClients, StagePipeline, StageTiming
+
+if TYPE_CHECKING:
+    from ..analytics.cost_cube import CostCube
+
 logger = logging.getLogger(__name__)
 
+MAX_WORKERS = 8
+STAGE_TIMEOUT_SECONDS = 120
+
+# Status assumido para capacidades sem serviço próprio verificável
+DEFAULT_SERVICES_STATUS = {
+    'cost_explorer': True,
+    'budgets': True,
+    'anomaly_detection': True,
+    'tag_governance': True,
+    'savings_plans': True,
+    'reserved_instances': True,
+    'compute_optimizer': True,
+    'idle_detection': True,
+    'forecasting': True,
+    'cur_ingestion': False,
+    'cost_allocation': False,
+    'showback': False,
+    'unit_economics': False,
+    'policy_automation': False,
+    'realtime_insights': False,
+    'predictive_optimization': False,
+    'training': False
+}
+
 
-def get_cur_ingestion_data(days_back: int = 30) -> Dict[str, Any]:
+def get_cur_ingestion_data(days_back: int = 30, client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """Obtém dados do CUR Ingestion Service"""
     try:
         from ..services.cur_ingestion_service import CURIngestionService
         
-        service = CURIngestionService()
+        service = CURIngestionService(client_factory=client_factory)
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days_back)
         
@@ -40,12 +77,16 @@ def get_cur_ingestion_data(days_back: int = 30) -> Dict[str, Any]:
         return {'error': str(e), 'summary': {}}
 
 
-def get_cost_allocation_scorecard(period_days: int = 30) -> Dict[str, Any]:
+def get_cost_allocation_scorecard(
+    period_days: int = 30,
+    cost_cube: Optional['CostCube'] = None,
+    client_factory: Optional[Any] = None
+) -> Dict[str, Any]:
     """Obtém scorecard de alocação de custos"""
     try:
         from ..services.cost_allocation_service import CostAllocationService, AllocationLevel
         
-        service = CostAllocationService()
+        service = CostAllocationService(client_factory=client_factory, cost_cube=cost_cube)
         scorecard = service.calculate_allocation_scorecard(
             period_days=period_days,
             target_level=AllocationLevel.FLY
@@ -58,12 +99,16 @@ def get_cost_allocation_scorecard(period_days: int = 30) -> Dict[str, Any]:
         return {'error': str(e), 'metrics': {}}
 
 
-def get_showback_summary(period_days: int = 30) -> Dict[str, Any]:
+def get_showback_summary(
+    period_days: int = 30,
+    cost_cube: Optional['CostCube'] = None,
+    client_factory: Optional[Any] = None
+) -> Dict[str, Any]:
     """Obtém resumo de showback"""
     try:
         from ..services.showback_chargeback_service import ShowbackChargebackService
         
-        service = ShowbackChargebackService()
+        service = ShowbackChargebackService(client_factory=client_factory, cost_cube=cost_cube)
         summary = service.generate_showback_summary(period_days)
         
         return summary.to_dict()
@@ -73,12 +118,12 @@ def get_showback_summary(period_days: int = 30) -> Dict[str, Any]:
         return {'error': str(e), 'breakdown': {}}
 
 
-def get_chargeback_invoices(business_unit: Optional[str] = None) -> Dict[str, Any]:
+def get_chargeback_invoices(business_unit: Optional[str] = None, client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """Obtém invoices de chargeback"""
     try:
         from ..services.showback_chargeback_service import ShowbackChargebackService
         
-        service = ShowbackChargebackService()
+        service = ShowbackChargebackService(client_factory=client_factory)
         
         if business_unit:
             invoices = service.get_invoices_by_bu(business_unit)
@@ -98,12 +143,16 @@ def get_chargeback_invoices(business_unit: Optional[str] = None) -> Dict[str, An
         return {'error': str(e), 'invoices': []}
 
 
-def get_unit_economics_analysis(period_days: int = 30) -> Dict[str, Any]:
+def get_unit_economics_analysis(
+    period_days: int = 30,
+    cost_cube: Optional['CostCube'] = None,
+    client_factory: Optional[Any] = None
+) -> Dict[str, Any]:
     """Obtém análise de Unit Economics"""
     try:
         from ..services.unit_economics_service import UnitEconomicsService
         
-        service = UnitEconomicsService()
+        service = UnitEconomicsService(client_factory=client_factory, cost_cube=cost_cube)
         result = service.calculate_unit_economics(period_days)
         
         return result.to_dict()
@@ -113,12 +162,12 @@ def get_unit_economics_analysis(period_days: int = 30) -> Dict[str, Any]:
         return {'error': str(e), 'unit_costs': {}}
 
 
-def get_policy_automation_status() -> Dict[str, Any]:
+def get_policy_automation_status(client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """Obtém status da automação de políticas"""
     try:
         from ..services.policy_automation_service import PolicyAutomationService
         
-        service = PolicyAutomationService()
+        service = PolicyAutomationService(client_factory=client_factory)
         stats = service.get_policy_stats()
         pending = service.get_pending_executions()
         history = service.get_execution_history(limit=20)
@@ -135,16 +184,19 @@ def get_policy_automation_status() -> Dict[str, Any]:
         return {'error': str(e), 'stats': {}}
 
 
-def get_realtime_insights() -> Dict[str, Any]:
+def get_realtime_insights(
+    cost_cube: Optional['CostCube'] = None,
+    client_factory: Optional[Any] = None
+) -> Dict[str, Any]:
     """Obtém insights em tempo real"""
     try:
         from ..services.realtime_insights_service import RealTimeInsightsService
         
-        service = RealTimeInsightsService()
+        service = RealTimeInsightsService(client_factory=client_factory, cost_cube=cost_cube)
         snapshot = service.get_current_snapshot()
-        insights = service.get_insights(limit=20)
-        
         service.detect_anomalies()
+        service.detect_streaming_anomalies()
+        insights = service.get_insights(limit=20)
         
         return {
             'snapshot': snapshot.to_dict(),
@@ -157,12 +209,16 @@ def get_realtime_insights() -> Dict[str, Any]:
         return {'error': str(e), 'snapshot': {}}
 
 
-def get_predictive_optimization(include_plan: bool = False) -> Dict[str, Any]:
+def get_predictive_optimization(
+    include_plan: bool = False,
+    cost_cube: Optional['CostCube'] = None,
+    client_factory: Optional[Any] = None
+) -> Dict[str, Any]:
     """Obtém otimização preditiva"""
     try:
         from ..services.predictive_optimization_service import PredictiveOptimizationService
         
-        service = PredictiveOptimizationService()
+        service = PredictiveOptimizationService(client_factory=client_factory, cost_cube=cost_cube)
         forecasts = service.get_cost_forecast(days_ahead=30)
         recommendations = service.generate_optimization_recommendations()
         
@@ -183,12 +239,19 @@ def get_predictive_optimization(include_plan: bool = False) -> Dict[str, Any]:
         return {'error': str(e), 'recommendations': []}
 
 
-def get_finops_maturity_assessment() -> Dict[str, Any]:
-    """Obtém avaliação de maturidade FinOps"""
+def get_finops_maturity_assessment(services_status: Optional[Dict[str, bool]] = None) -> Dict[str, Any]:
+    """
+    Obtém avaliação de maturidade FinOps
+    
+    Args:
+        services_status: Status já conhecido dos serviços; quando omitido,
+                         detectado com health checks
+    """
     try:
         from ..services.finops_maturity_service import FinOpsMaturityService
         
-        services_status = _detect_services_status()
+        if services_status is None:
+            services_status = _detect_services_status()
         
         service = FinOpsMaturityService(services_status=services_status)
         assessment = service.assess_maturity()
@@ -205,94 +268,80 @@ def get_finops_maturity_assessment() -> Dict[str, Any]:
         return {'error': str(e), 'assessment': {}}
 
 
-def _detect_services_status() -> Dict[str, bool]:
-    """Detecta status de cada serviço FinOps"""
-    status = {
-        'cost_explorer': True,
-        'budgets': True,
-        'anomaly_detection': True,
-        'tag_governance': True,
-        'savings_plans': True,
-        'reserved_instances': True,
-        'compute_optimizer': True,
-        'idle_detection': True,
-        'forecasting': True,
-        'cur_ingestion': False,
-        'cost_allocation': False,
-        'showback': False,
-        'unit_economics': False,
-        'policy_automation': False,
-        'realtime_insights': False,
-        'predictive_optimization': False,
-        'training': False
-    }
-    
-    try:
-        from ..services.cur_ingestion_service import CURIngestionService
-        service = CURIngestionService()
-        if service.health_check():
-            status['cur_ingestion'] = True
-    except Exception:
-        pass
-    
-    try:
-        from ..services.cost_allocation_service import CostAllocationService
-        service = CostAllocationService()
-        if service.health_check():
-            status['cost_allocation'] = True
-    except Exception:
-        pass
+def _finops_service_probes(clients: Optional[StageClients] = None) -> Dict[str, Any]:
+    """
+    health_check de cada serviço FinOps
     
-    try:
-        from ..services.showback_chargeback_service import ShowbackChargebackService
-        service = ShowbackChargebackService()
-        if service.health_check():
-            status['showback'] = True
-    except Exception:
-        pass
+    Os serviços são instanciados na thread chamadora com clientes de
+    StageClients; as threads do probe só executam health_check.
+    """
+    import importlib
+    clients = clients or StageClients()
     
-    try:
-        from ..services.unit_economics_service import UnitEconomicsService
-        service = UnitEconomicsService()
-        if service.health_check():
-            status['unit_economics'] = True
-    except Exception:
-        pass
+    def probe(module: str, class_name: str):
+        try:
+            service_class = getattr(importlib.import_module(f'..services.{module}', __package__), class_name)
+            return service_class(client_factory=clients).health_check
+        except Exception as e:
+            def unavailable(error: Exception = e):
+                raise error
+            return unavailable
     
-    try:
-        from ..services.policy_automation_service import PolicyAutomationService
-        service = PolicyAutomationService()
-        if service.health_check():
-            status['policy_automation'] = True
-    except Exception:
-        pass
+    return {
+        'cur_ingestion': probe('cur_ingestion_service', 'CURIngestionService'),
+        'cost_allocation': probe('cost_allocation_service', 'CostAllocationService'),
+        'showback': probe('showback_chargeback_service', 'ShowbackChargebackService'),
+        'unit_economics': probe('unit_economics_service', 'UnitEconomicsService'),
+        'policy_automation': probe('policy_automation_service', 'PolicyAutomationService'),
+        'realtime_insights': probe('realtime_insights_service', 'RealTimeInsightsService'),
+        'predictive_optimization': probe('predictive_optimization_service', 'PredictiveOptimizationService'),
+    }
+
+
+def _detect_services_status() -> Dict[str, bool]:
+    """
+    Detecta status de cada serviço FinOps
     
-    try:
-        from ..services.realtime_insights_service import RealTimeInsightsService
-        service = RealTimeInsightsService()
-        if service.health_check():
-            status['realtime_insights'] = True
-    except Exception:
-        pass
+    Os health checks rodam em paralelo sob prazo global (HealthProbe) e o
+    resultado fica em cache por conta.
+    """
+    status = dict(DEFAULT_SERVICES_STATUS)
     
     try:
-        from ..services.predictive_optimization_service import PredictiveOptimizationService
-        service = PredictiveOptimizationService()
-        if service.health_check():
-            status['predictive_optimization'] = True
-    except Exception:
-        pass
+        from ..core.health_probe import HealthProbe
+        report = HealthProbe(_finops_service_probes()).run()
+        status.update(report.status_map())
+    except Exception as e:
+        logger.error(f"Erro no health probe dos serviços FinOps: {e}")
     
     return status
 
 
-def get_complete_finops_analysis() -> Dict[str, Any]:
+def get_complete_finops_analysis(
+    context: Optional[FinOpsRunContext] = None,
+    max_workers: int = MAX_WORKERS,
+    stage_timeout: float = STAGE_TIMEOUT_SECONDS
+) -> Dict[str, Any]:
     """
     Executa análise FinOps completa integrando todos os serviços.
     
+    Os custos da janela são buscados uma vez (FinOpsRunContext) e o cubo é
+    repassado às sub-análises, que rodam em paralelo; a maturidade roda por
+    último com o status obtido pelas demais.
+    
+    Args:
+        context: Contexto já preparado (padrão: FinOpsRunContext.prefetch())
+        max_workers: Sub-análises executadas simultaneamente
+        stage_timeout: Tempo limite (segundos) de cada sub-análise
+    
     Returns:
         Dict com análise completa de todos os níveis de maturidade
     """
+    context = context or FinOpsRunContext.prefetch()
+    cube = context.cost_cube
+    period_days = context.period_days
+    clients = context.clients or StageClients()
+    
     result = {
         'generated_at': datetime.utcnow().isoformat(),
         'maturity_levels': {
@@ -306,97 +355,40 @@ def get_complete_finops_analysis() -> Dict[str, Any]:
         'integrations_status': {}
     }
     
-    try:
-        cur_data = get_cur_ingestion_data(30)
-        result['services']['cur_ingestion'] = cur_data
-        result['integrations_status']['cur_ingestion'] = 'error' not in cur_data
-    except Exception as e:
-        logger.error(f"Erro CUR: {e}")
-        result['integrations_status']['cur_ingestion'] = False
-    
-    try:
-        allocation_data = get_cost_allocation_scorecard(30)
-        result['services']['cost_allocation'] = allocation_data
-        result['integrations_status']['cost_allocation'] = 'error' not in allocation_data
-        
-        if 'metrics' in allocation_data:
-            crawl_score = min(100, allocation_data['metrics'].get('allocation_percent', 0) * 2)
-            result['maturity_levels']['crawl']['percentage'] = crawl_score
-    except Exception as e:
-        logger.error(f"Erro Allocation: {e}")
-        result['integrations_status']['cost_allocation'] = False
-    
-    try:
-        showback_data = get_showback_summary(30)
-        result['services']['showback'] = showback_data
-        result['integrations_status']['showback'] = 'error' not in showback_data
-    except Exception as e:
-        logger.error(f"Erro Showback: {e}")
-        result['integrations_status']['showback'] = False
-    
-    try:
-        chargeback_data = get_chargeback_invoices()
-        result['services']['chargeback'] = chargeback_data
-        result['integrations_status']['chargeback'] = 'error' not in chargeback_data
-    except Exception as e:
-        logger.error(f"Erro Chargeback: {e}")
-        result['integrations_status']['chargeback'] = False
-    
-    try:
-        unit_economics_data = get_unit_economics_analysis(30)
-        result['services']['unit_economics'] = unit_economics_data
-        result['integrations_status']['unit_economics'] = 'error' not in unit_economics_data
-    except Exception as e:
-        logger.error(f"Erro Unit Economics: {e}")
-        result['integrations_status']['unit_economics'] = False
+    analyses = {
+        'cur_ingestion': lambda deps: get_cur_ingestion_data(period_days, client_factory=clients),
+        'cost_allocation': lambda deps: get_cost_allocation_scorecard(period_days, cost_cube=cube, client_factory=clients),
+        'showback': lambda deps: get_showback_summary(period_days, cost_cube=cube, client_factory=clients),
+        'chargeback': lambda deps: get_chargeback_invoices(client_factory=clients),
+        'unit_economics': lambda deps: get_unit_economics_analysis(period_days, cost_cube=cube, client_factory=clients),
+        'policy_automation': lambda deps: get_policy_automation_status(client_factory=clients),
+        'realtime_insights': lambda deps: get_realtime_insights(cost_cube=cube, client_factory=clients),
+        'predictive_optimization': lambda deps: get_predictive_optimization(
+            include_plan=True, cost_cube=cube, client_factory=clients),
+    }
     
-    try:
-        automation_data = get_policy_automation_status()
-        result['services']['policy_automation'] = automation_data
-        result['integrations_status']['policy_automation'] = 'error' not in automation_data
-    except Exception as e:
-        logger.error(f"Erro Automation: {e}")
-        result['integrations_status']['policy_automation'] = False
+    def maturity(deps: Dict[str, Any]) -> Dict[str, Any]:
+        status = dict(DEFAULT_SERVICES_STATUS)
+        for name in status:
+            if name in deps:
+                status[name] = deps[name] is not None and 'error' not in deps[name]
+        return get_finops_maturity_assessment(services_status=status)
     
-    try:
-        realtime_data = get_realtime_insights()
-        result['services']['realtime_insights'] = realtime_data
-        result['integrations_status']['realtime_insights'] = 'error' not in realtime_data
-    except Exception as e:
-        logger.error(f"Erro Real-Time: {e}")
-        result['integrations_status']['realtime_insights'] = False
+    stages = [Stage(name, run, timeout=stage_timeout) for name, run in analyses.items()]
+    stages.append(Stage('finops_maturity', maturity, requires=tuple(analyses), timeout=stage_timeout))
     
-    try:
-        predictive_data = get_predictive_optimization(include_plan=True)
-        result['services']['predictive_optimization'] = predictive_data
-        result['integrations_status']['predictive_optimization'] = 'error' not in predictive_data
-    except Exception as e:
-        logger.error(f"Erro Predictive: {e}")
-        result['integrations_status']['predictive_optimization'] = False
+    def on_complete(name: str, data: Dict[str, Any], timing: StageTiming) -> None:
+        if timing.status != 'ok' or data is None:
+            result['integrations_status'][name] = False
+            return
+        result['services'][name] = data
+        result['integrations_status'][name] = 'error' not in data
+        if name == 'cost_allocation':
+            _apply_allocation(result, data)
+        elif name == 'finops_maturity':
+            _apply_maturity(result, data)
     
-    try:
-        maturity_data = get_finops_maturity_assessment()
-        result['services']['finops_maturity'] = maturity_data
-        result['integrations_status']['finops_maturity'] = 'error' not in maturity_data
-        
-        if 'level_percentages' in maturity_data:
-            levels = maturity_data['level_percentages']
-            result['maturity_levels']['crawl']['percentage'] = levels.get('crawl', 0)
-            result['maturity_levels']['walk']['percentage'] = levels.get('walk', 0)
-            result['maturity_levels']['run']['percentage'] = levels.get('run', 0)
-            result['maturity_levels']['fly']['percentage'] = levels.get('fly', 0)
-        
-        if 'assessment' in maturity_data and 'top_gaps' in maturity_data['assessment']:
-            for gap in maturity_data['assessment']['top_gaps']:
-                result['recommendations'].append({
-                    'type': 'MATURITY_GAP',
-                    'priority': 'HIGH' if gap.get('gap_percentage', 0) > 50 else 'MEDIUM',
-                    'title': f"Melhorar {gap.get('capability', 'capability')}",
-                    'description': f"Gap de {gap.get('gap_percentage', 0):.0f}%"
-                })
-    except Exception as e:
-        logger.error(f"Erro Maturity: {e}")
-        result['integrations_status']['finops_maturity'] = False
+    run = StagePipeline(stages, max_workers=max_workers).run(on_complete)
     
     for level_name in ['crawl', 'walk', 'run', 'fly']:
         pct = result['maturity_levels'][level_name]['percentage']
@@ -411,9 +403,37 @@ def get_complete_finops_analysis() -> Dict[str, Any]:
         else:
             result['maturity_levels'][level_name]['status'] = 'initial'
     
+    result['metadata'] = {'context': context.to_dict(), 'pipeline': run.to_dict()}
+    
     return result
 
 
+def _apply_allocation(result: Dict[str, Any], allocation_data: Dict[str, Any]) -> None:
+    """Nível crawl estimado pelo percentual de custo alocado"""
+    if 'metrics' in allocation_data:
+        crawl_score = min(100, allocation_data['metrics'].get('allocation_percent', 0) * 2)
+        result['maturity_levels']['crawl']['percentage'] = crawl_score
+
+
+def _apply_maturity(result: Dict[str, Any], maturity_data: Dict[str, Any]) -> None:
+    """Percentuais por nível e gaps da avaliação de maturidade"""
+    if 'level_percentages' in maturity_data:
+        levels = maturity_data['level_percentages']
+        result['maturity_levels']['crawl']['percentage'] = levels.get('crawl', 0)
+        result['maturity_levels']['walk']['percentage'] = levels.get('walk', 0)
+        result['maturity_levels']['run']['percentage'] = levels.get('run', 0)
+        result['maturity_levels']['fly']['percentage'] = levels.get('fly', 0)
+    
+    if 'assessment' in maturity_data and 'top_gaps' in maturity_data['assessment']:
+        for gap in maturity_data['assessment']['top_gaps']:
+            result['recommendations'].append({
+                'type': 'MATURITY_GAP',
+                'priority': 'HIGH' if gap.get('gap_percentage', 0) > 50 else 'MEDIUM',
+                'title': f"Melhorar {gap.get('capability', 'capability')}",
+                'description': f"Gap de {gap.get('gap_percentage', 0):.0f}%"
+            })
+
+
 def get_finops_compliance_summary() -> Dict[str, Any]:
     """
     Obtém resumo de conformidade FinOps com porcentagens por nível.
@@ -0,0 +1,371 @@
+"""
+HTTP Cache for FinOps Dashboard
+
+Cache HTTP das respostas da API do dashboard:
+- ETags por hash de conteúdo, vinculados à versão do snapshot de análise
+- GET condicional (If-None-Match -> 304 Not Modified)
+- Negociação gzip/brotli com corpos pré-comprimidos por snapshot
+- Cache imutável de longa duração para arquivos com hash em frontend/dist
+"""
+
+import gzip
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+NO_STORE = 'no-cache, no-store, must-revalidate'
+REVALIDATE = 'no-cache'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/',
+    'image/svg+xml',
+)
+
+# Vite gera nomes como assets/index-DgR3a_9x.js (hash de 8+ caracteres)
+HASHED_ASSET_PATTERN = re.compile(
+    r'(^|/)assets/[^/]+[-.][A-Za-z0-9_-]{8,}\.'
+    r'(js|mjs|css|woff2?|ttf|otf|png|jpe?g|gif|svg|webp|avif|ico|map)$'
+)
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Gera ETag forte a partir do hash do conteúdo.
+
+    Args:
+        body: Corpo da resposta sem compressão
+
+    Returns:
+        ETag entre aspas
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica se o header If-None-Match corresponde ao ETag.
+
+    Aceita '*', listas separadas por vírgula, ETags fracos (W/) e
+    variantes com sufixo de codificação ("hash-gzip", "hash-br").
+
+    Args:
+        if_none_match: Valor do header If-None-Match
+        etag: ETag da representação sem compressão
+
+    Returns:
+        True se o cliente já possui a representação atual
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    base = etag.strip('"')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        for suffix in ('-gzip', '-br'):
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)]
+                break
+        if candidate == base:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Escolhe a codificação de conteúdo a partir do Accept-Encoding.
+
+    Prefere brotli (quando disponível) e depois gzip, respeitando q=0.
+
+    Args:
+        accept_encoding: Valor do header Accept-Encoding
+
+    Returns:
+        'br', 'gzip' ou None para identidade
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        pieces = part.strip().split(';')
+        name = pieces[0].strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    wildcard = weights.get('*', 0.0)
+    candidates = ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    """Verifica se o tipo de conteúdo se beneficia de compressão."""
+    if not mimetype:
+        return False
+    return any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE_MIMETYPES)
+
+
+def is_immutable_asset(path: str) -> bool:
+    """
+    Verifica se o caminho é um asset com hash de conteúdo no nome.
+
+    Args:
+        path: Caminho relativo ao frontend/dist
+
+    Returns:
+        True se o arquivo pode ser cacheado como imutável
+    """
+    return bool(HASHED_ASSET_PATTERN.search(path))
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """
+    Comprime o corpo na codificação informada.
+
+    Args:
+        body: Corpo sem compressão
+        encoding: 'gzip' ou 'br'
+        level: Nível de compressão gzip
+
+    Returns:
+        Corpo comprimido
+    """
+    if encoding == 'br':
+        if not BROTLI_AVAILABLE:
+            raise ValueError("brotli não está instalado")
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+@dataclass
+class CachedResponse:
+    """Representação cacheada de uma resposta com variantes comprimidas"""
+    body: bytes
+    etag: str
+    mimetype: str
+    version: Optional[int] = None
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def get_body(self, encoding: Optional[str], level: int = 6) -> bytes:
+        """Retorna o corpo na codificação pedida, comprimindo uma única vez"""
+        if encoding is None:
+            return self.body
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(self.body, encoding, level)
+        return self.encoded[encoding]
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag da variante (representações comprimidas têm ETag própria)"""
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + f'-{encoding}"'
+
+    def to_dict(self) -> Dict:
+        return {
+            'etag': self.etag,
+            'mimetype': self.mimetype,
+            'version': self.version,
+            'size': len(self.body),
+            'encoded_sizes': {k: len(v) for k, v in self.encoded.items()}
+        }
+
+
+class HTTPResponseCache:
+    """
+    Cache LRU de respostas HTTP versionado pelo snapshot de análise.
+
+    Entradas com versão só são válidas enquanto o snapshot corrente
+    não mudar; entradas sem versão (assets imutáveis) valem até o
+    despejo pelo LRU.
+    """
+
+    def __init__(self, max_entries: int = 256, min_compress_size: int = 1024,
+                 compress_level: int = 6):
+        self.max_entries = max_entries
+        self.min_compress_size = min_compress_size
+        self.compress_level = compress_level
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def version(self) -> int:
+        """Versão atual do snapshot de análise"""
+        return self._version
+
+    def bump_version(self) -> int:
+        """
+        Avança a versão do snapshot, invalidando respostas derivadas dele.
+
+        Returns:
+            Nova versão
+        """
+        with self._lock:
+            self._version += 1
+            stale = [k for k, v in self._entries.items() if v.version is not None]
+            for key in stale:
+                del self._entries[key]
+            return self._version
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Obtém entrada válida para o snapshot atual"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry.version is not None and entry.version != self._version):
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: str, body: bytes, mimetype: str,
+            versioned: bool = True) -> CachedResponse:
+        """
+        Armazena corpo da resposta e calcula seu ETag.
+
+        Args:
+            key: Chave da resposta (método + caminho + query)
+            body: Corpo sem compressão
+            mimetype: Tipo de conteúdo
+            versioned: Se a entrada depende do snapshot atual
+
+        Returns:
+            Entrada armazenada
+        """
+        entry = CachedResponse(
+            body=body,
+            etag=make_etag(body),
+            mimetype=mimetype,
+            version=self._version if versioned else None
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def negotiate(self, entry: CachedResponse, accept_encoding: Optional[str]) -> Optional[str]:
+        """
+        Codificação da variante servida ao cliente, sem comprimir o corpo.
+
+        Returns:
+            'br', 'gzip' ou None (corpo pequeno ou tipo não compressível)
+        """
+        if len(entry.body) >= self.min_compress_size and is_compressible(entry.mimetype):
+            return negotiate_encoding(accept_encoding)
+        return None
+
+    def encode(self, entry: CachedResponse,
+               accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """
+        Seleciona e retorna o corpo pré-comprimido adequado ao cliente.
+
+        Returns:
+            Tupla (corpo, codificação ou None)
+        """
+        encoding = self.negotiate(entry, accept_encoding)
+        try:
+            with self._lock:
+                return entry.get_body(encoding, self.compress_level), encoding
+        except Exception as e:
+            logger.error(f"Erro ao comprimir resposta: {e}")
+            return entry.body, None
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Estatísticas do cache"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'version': self._version,
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total * 100, 2) if total else 0.0,
+                'brotli_available': BROTLI_AVAILABLE
+            }
+
+
+def apply_cached_response(response, entry: CachedResponse, request_headers,
+                          cache: HTTPResponseCache, cache_control: str = REVALIDATE):
+    """
+    Aplica a entrada cacheada a um objeto de resposta Flask/Werkzeug.
+
+    Responde 304 quando o cliente já possui a representação (a ETag da
+    variante vem só da negociação, sem comprimir o corpo); caso contrário
+    define o corpo na codificação negociada.
+
+    Args:
+        response: Resposta Flask a ser preenchida
+        entry: Entrada do cache
+        request_headers: Headers da requisição
+        cache: Cache que detém a entrada
+        cache_control: Valor do Cache-Control
+
+    Returns:
+        Resposta ajustada
+    """
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = cache_control
+    response.headers.pop('Pragma', None)
+    response.headers.pop('Expires', None)
+
+    if etag_matches(request_headers.get('If-None-Match'), entry.etag):
+        encoding = cache.negotiate(entry, request_headers.get('Accept-Encoding'))
+        response.status_code = 304
+        response.set_data(b'')
+        response.headers['ETag'] = entry.etag_for(encoding)
+        response.headers.pop('Content-Encoding', None)
+        response.headers.pop('Content-Length', None)
+        return response
+
+    body, encoding = cache.encode(entry, request_headers.get('Accept-Encoding'))
+    response.set_data(body)
+    response.headers['ETag'] = entry.etag_for(encoding)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response.headers.pop('Content-Encoding', None)
+    return response
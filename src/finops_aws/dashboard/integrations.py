@@ -2,7 +2,8 @@
 AWS Integrations for FinOps Dashboard
 
 Integração com serviços AWS para recomendações de otimização:
-- AWS Compute Optimizer
+- Rightsizing interno por percentis (EC2, RDS, ElastiCache, ECS/Fargate)
+- AWS Compute Optimizer (EBS, Lambda e Auto Scaling)
 - Cost Explorer (Reserved Instances e Savings Plans)
 - AWS Trusted Advisor
 - Amazon Q Business
@@ -10,6 +11,7 @@ Integração com serviços AWS para recomendações de otimização:
 - Cost Anomaly Detection
 - Savings Plans Analysis
 - Reserved Instances Analysis
+- Commitment Purchase Simulation
 - Tag Governance
 - KPIs Calculator
 
@@ -21,71 +23,88 @@ Design Patterns:
 import os
 import json
 import logging
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
 import boto3
 from botocore.exceptions import ClientError
 
+from .compute_optimizer_collector import ASG, EBS, LAMBDA, get_compute_optimizer_snapshot
+from .trusted_advisor_collector import TrustedAdvisorCollector
+
 logger = logging.getLogger(__name__)
 
+# Tipos sem cobertura do rightsizing interno (EC2 e ECS vêm do RightsizingService)
+COMPUTE_OPTIMIZER_TYPES = (EBS, LAMBDA, ASG)
+
+RIGHTSIZING_LABELS = {'ec2': 'EC2', 'rds': 'RDS', 'elasticache': 'ElastiCache', 'ecs': 'ECS'}
 
-def get_compute_optimizer_recommendations(region: str) -> List[Dict[str, Any]]:
+
+def get_rightsizing_recommendations(region: str, client_factory: Optional[Any] = None) -> List[Dict[str, Any]]:
     """
-    Obtém recomendações do AWS Compute Optimizer para EC2.
+    Obtém recomendações do rightsizing interno (percentis de CPU, memória
+    e rede de 14 dias) para EC2, RDS, ElastiCache e ECS/Fargate.
     
     Args:
         region: Região AWS para análise
+        client_factory: Clientes compartilhados (StageClients), opcional
         
     Returns:
         Lista de recomendações de right-sizing
     """
-    recommendations = []
+    from ..services.rightsizing_service import RightsizingService
     
     try:
-        co = boto3.client('compute-optimizer', region_name=region)
+        service = RightsizingService(client_factory=client_factory, region=region)
+        service.analyze()
+        recommendations = []
+        for rec in service.get_recommendations():
+            label = RIGHTSIZING_LABELS.get(rec.resource_type, rec.resource_type)
+            recommendations.append({
+                'type': f'{rec.recommendation_type}_{rec.resource_type.upper()}',
+                'resource_id': rec.resource_id,
+                'title': f'Right-size {label}: {rec.title}',
+                'description': f'{label} {rec.resource_id}: {rec.description}',
+                'priority': rec.priority,
+                'savings': round(rec.estimated_savings, 2),
+                'service': 'FinOps Rightsizing',
+                'region': region,
+            })
+        return recommendations
+    except Exception as e:
+        logger.error(f"Erro inesperado no rightsizing: {e}")
+        return []
+
+
+def get_compute_optimizer_recommendations(region: str, client_factory: Optional[Any] = None) -> List[Dict[str, Any]]:
+    """
+    Obtém recomendações do AWS Compute Optimizer para os tipos sem
+    rightsizing interno (EBS, Lambda e Auto Scaling), paginadas e
+    coletadas em paralelo.
+    
+    Args:
+        region: Região AWS para análise
+        client_factory: Clientes compartilhados (StageClients), opcional
         
-        ec2_recs = co.get_ec2_instance_recommendations()
-        for rec in ec2_recs.get('instanceRecommendations', []):
-            instance_id = rec.get('instanceArn', '').split('/')[-1]
-            finding = rec.get('finding', '')
-            
-            if finding in ['OVER_PROVISIONED', 'UNDER_PROVISIONED']:
-                current_type = rec.get('currentInstanceType', '')
-                rec_options = rec.get('recommendationOptions', [])
-                
-                if rec_options:
-                    best_option = rec_options[0]
-                    recommended_type = best_option.get('instanceType', '')
-                    savings = best_option.get('estimatedMonthlySavings', {}).get('value', 0)
-                    
-                    recommendations.append({
-                        'type': 'COMPUTE_OPTIMIZER_EC2',
-                        'resource_id': instance_id,
-                        'title': f'Right-size EC2: {current_type} → {recommended_type}',
-                        'description': f'EC2 {instance_id}: {current_type} → {recommended_type} ({finding})',
-                        'priority': 'HIGH',
-                        'savings': round(savings, 2),
-                        'service': 'AWS Compute Optimizer'
-                    })
-                    
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        if error_code == 'OptInRequiredException':
-            logger.warning("Compute Optimizer não está habilitado nesta conta")
-        else:
-            logger.error(f"Erro ao acessar Compute Optimizer: {e}")
+    Returns:
+        Lista de recomendações de right-sizing
+    """
+    try:
+        regional = client_factory.regional('compute-optimizer') if client_factory else None
+        snapshot = get_compute_optimizer_snapshot([region], COMPUTE_OPTIMIZER_TYPES, client_factory=regional)
+        return snapshot.to_recommendations()
     except Exception as e:
         logger.error(f"Erro inesperado no Compute Optimizer: {e}")
-    
-    return recommendations
+        return []
 
 
-def get_cost_explorer_ri_recommendations(region: str) -> List[Dict[str, Any]]:
+def get_cost_explorer_ri_recommendations(region: str, client_factory: Optional[Any] = None) -> List[Dict[str, Any]]:
     """
     Obtém recomendações de Reserved Instances e Savings Plans.
     
     Args:
         region: Região AWS (Cost Explorer usa us-east-1)
+        client_factory: Clientes compartilhados (StageClients), opcional
         
     Returns:
         Lista de recomendações de RI e Savings Plans
@@ -93,7 +112,10 @@ def get_cost_explorer_ri_recommendations(region: str) -> List[Dict[str, Any]]:
     recommendations = []
     
     try:
-        ce = boto3.client('ce', region_name='us-east-1')
+        if client_factory:
+            ce = client_factory.get_client('ce', region_name='us-east-1')
+        else:
+            ce = boto3.client('ce', region_name='us-east-1')
         
         ri_response = ce.get_reservation_purchase_recommendation(
             Service='Amazon Elastic Compute Cloud - Compute',
@@ -156,50 +178,24 @@ def get_cost_explorer_ri_recommendations(region: str) -> List[Dict[str, Any]]:
     return recommendations
 
 
-def get_trusted_advisor_recommendations() -> List[Dict[str, Any]]:
+def get_trusted_advisor_recommendations(client_factory: Optional[Any] = None) -> List[Dict[str, Any]]:
     """
     Obtém recomendações do AWS Trusted Advisor.
     
     Requer AWS Business ou Enterprise Support.
     
+    Args:
+        client_factory: Clientes compartilhados (StageClients), opcional
+    
     Returns:
         Lista de recomendações do Trusted Advisor
     """
     recommendations = []
     
     try:
-        support = boto3.client('support', region_name='us-east-1')
-        
-        checks = support.describe_trusted_advisor_checks(language='en')
-        
-        cost_checks = [c for c in checks.get('checks', []) if c.get('category') == 'cost_optimizing']
-        
-        for check in cost_checks[:10]:
-            check_id = check.get('id')
-            check_name = check.get('name')
-            
-            try:
-                result = support.describe_trusted_advisor_check_result(checkId=check_id, language='en')
-                status = result.get('result', {}).get('status', '')
-                
-                if status in ['warning', 'error']:
-                    flagged = result.get('result', {}).get('flaggedResources', [])
-                    
-                    for resource in flagged[:5]:
-                        metadata = resource.get('metadata', [])
-                        
-                        recommendations.append({
-                            'type': 'TRUSTED_ADVISOR',
-                            'resource_id': metadata[0] if metadata else 'N/A',
-                            'title': check_name,
-                            'description': f'{check_name}',
-                            'priority': 'HIGH' if status == 'error' else 'MEDIUM',
-                            'savings': 0,
-                            'service': 'AWS Trusted Advisor'
-                        })
-            except ClientError:
-                continue
-                
+        client = client_factory.get_client('support', region_name='us-east-1') if client_factory else None
+        recommendations.extend(TrustedAdvisorCollector(client=client).collect().iter_recommendations())
+    
     except ClientError as e:
         error_code = e.response.get('Error', {}).get('Code', '')
         if error_code == 'SubscriptionRequiredException':
@@ -452,7 +448,7 @@ Tom: Analítico e detalhado, foco em dados."""
     return prompt
 
 
-def get_budgets_analysis() -> Dict[str, Any]:
+def get_budgets_analysis(client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """
     Obtém análise completa de AWS Budgets.
     
@@ -462,7 +458,7 @@ def get_budgets_analysis() -> Dict[str, Any]:
     try:
         from ..services.budgets_service import BudgetsService
         
-        service = BudgetsService()
+        service = BudgetsService(client_factory=client_factory)
         if not service.health_check():
             return {'error': 'Budgets service not available', 'budgets': [], 'recommendations': []}
         
@@ -481,12 +477,13 @@ def get_budgets_analysis() -> Dict[str, Any]:
         return {'error': str(e), 'budgets': [], 'recommendations': []}
 
 
-def get_anomaly_detection_analysis(days_back: int = 90) -> Dict[str, Any]:
+def get_anomaly_detection_analysis(days_back: int = 90, client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """
     Obtém análise de anomalias de custo.
     
     Args:
         days_back: Dias para análise histórica
+        client_factory: Clientes compartilhados (StageClients), opcional
         
     Returns:
         Dict com anomalias, métricas e recomendações
@@ -494,7 +491,7 @@ def get_anomaly_detection_analysis(days_back: int = 90) -> Dict[str, Any]:
     try:
         from ..services.costanomalydetection_service import CostAnomalyDetectionService
         
-        service = CostAnomalyDetectionService()
+        service = CostAnomalyDetectionService(client_factory=client_factory)
         if not service.health_check():
             return {'error': 'Cost Anomaly Detection not available', 'anomalies': [], 'recommendations': []}
         
@@ -515,7 +512,7 @@ def get_anomaly_detection_analysis(days_back: int = 90) -> Dict[str, Any]:
         return {'error': str(e), 'anomalies': [], 'recommendations': []}
 
 
-def get_savings_plans_analysis() -> Dict[str, Any]:
+def get_savings_plans_analysis(client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """
     Obtém análise completa de Savings Plans.
     
@@ -525,7 +522,7 @@ def get_savings_plans_analysis() -> Dict[str, Any]:
     try:
         from ..services.savingsplans_service import SavingsPlansService
         
-        service = SavingsPlansService()
+        service = SavingsPlansService(client_factory=client_factory)
         if not service.health_check():
             return {'error': 'Savings Plans service not available', 'savings_plans': [], 'recommendations': []}
         
@@ -550,7 +547,7 @@ def get_savings_plans_analysis() -> Dict[str, Any]:
         return {'error': str(e), 'savings_plans': [], 'recommendations': []}
 
 
-def get_reserved_instances_analysis() -> Dict[str, Any]:
+def get_reserved_instances_analysis(client_factory: Optional[Any] = None) -> Dict[str, Any]:
     """
     Obtém análise completa de Reserved Instances.
     
@@ -560,7 +557,7 @@ def get_reserved_instances_analysis() -> Dict[str, Any]:
     try:
         from ..services.reservedinstances_service import ReservedInstancesService
         
-        service = ReservedInstancesService()
+        service = ReservedInstancesService(client_factory=client_factory)
         if not service.health_check():
             return {'error': 'Reserved Instances service not available', 'reserved_instances': [], 'recommendations': []}
         
@@ -585,12 +582,53 @@ def get_reserved_instances_analysis() -> Dict[str, Any]:
         return {'error': str(e), 'reserved_instances': [], 'recommendations': []}
 
 
-def get_tag_governance_analysis(required_tags: Optional[List[str]] = None) -> Dict[str, Any]:
+def get_commitment_simulation(days: int = 14, num_levels: int = 1000) -> Dict[str, Any]:
+    """
+    Simula compras de compromisso (Savings Plans) sobre o uso horário.
+    
+    O uso coberto por RIs (DiscountedUsage) não faz parte da série simulada,
+    então as RIs EC2 ativas não são descontadas dela; são listadas apenas
+    como contexto em 'reserved_instances'.
+    
+    Args:
+        days: Dias de uso horário simulados
+        num_levels: Níveis de compromisso por prazo/opção de pagamento
+        
+    Returns:
+        Dict com uso, compromissos existentes, fronteira eficiente e
+        recomendações da AWS avaliadas no mesmo uso
+    """
+    try:
+        from ..services.reservedinstances_service import ReservedInstancesService
+        from ..services.savingsplans_service import SavingsPlansService
+        
+        result = SavingsPlansService().simulate_commitments(days=days, num_levels=num_levels)
+        try:
+            window_start = (datetime.utcnow() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+            result['reserved_instances'] = [
+                {'id': c.commitment_id, 'hourly_commitment': round(c.hourly_commitment, 4),
+                 'covered_hourly': round(c.capacity, 4)}
+                for c in ReservedInstancesService().get_existing_commitments(window_start)
+            ]
+        except Exception as e:
+            logger.warning(f"RIs EC2 não listadas na simulação de compromissos: {e}")
+            result['reserved_instances'] = []
+        return result
+    except Exception as e:
+        logger.error(f"Erro na simulação de compromissos: {e}")
+        return {'error': str(e), 'simulation': {}}
+
+
+def get_tag_governance_analysis(
+    required_tags: Optional[List[str]] = None,
+    client_factory: Optional[Any] = None
+) -> Dict[str, Any]:
     """
     Obtém análise de governança de tags.
     
     Args:
         required_tags: Lista de tags obrigatórias (opcional)
+        client_factory: Clientes compartilhados (StageClients), opcional
         
     Returns:
         Dict com cobertura, compliance e recomendações
@@ -598,7 +636,7 @@ def get_tag_governance_analysis(required_tags: Optional[List[str]] = None) -> Di
     try:
         from ..services.tag_governance_service import TagGovernanceService
         
-        service = TagGovernanceService(required_tags=required_tags)
+        service = TagGovernanceService(client_factory=client_factory, required_tags=required_tags)
         if not service.health_check():
             return {'error': 'Tag Governance service not available', 'coverage': {}, 'recommendations': []}
         
@@ -0,0 +1,549 @@
+"""
+Job Queue for FinOps Dashboard
+
+Fila assíncrona de jobs (análise, relatório de IA, exportação) desacoplada
+das requisições HTTP.
+
+- Persistência em SQLite (arquivo local por padrão)
+- Pool limitado de workers locais (threads)
+- Deduplicação de jobs idênticos em andamento
+- Prioridades: requisições interativas passam à frente de varreduras agendadas,
+  com workers reservados para que nunca fiquem atrás de um scan longo
+- Recuperação de jobs interrompidos: cada processo renova um heartbeat dos
+  jobs que executa; só jobs de workers sem heartbeat dentro do lease (processo
+  morto) voltam para a fila, mesmo com vários processos no mesmo banco
+
+Design Patterns:
+- Command: Cada job é um comando serializável (kind + payload)
+- Registry: Handlers registrados por tipo de job
+- Repository: SQLiteJobStore isola a persistência
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum, IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(Enum):
+    """Status de um job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_STATUSES = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+# Jobs RUNNING sem heartbeat há mais que o lease são de um worker morto
+DEFAULT_LEASE = timedelta(seconds=60)
+
+
+class JobPriority(IntEnum):
+    """Prioridade de execução (maior valor executa primeiro)"""
+    SCHEDULED = 0
+    NORMAL = 50
+    INTERACTIVE = 100
+
+    @classmethod
+    def parse(cls, value: Any) -> 'JobPriority':
+        """Converte nome ('interactive') ou número em JobPriority"""
+        if isinstance(value, JobPriority):
+            return value
+        if isinstance(value, str) and not value.isdigit():
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                raise ValueError(f"Prioridade inválida: {value}")
+        if isinstance(value, bool):
+            raise ValueError(f"Prioridade inválida: {value}")
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Prioridade inválida: {value}")
+        return max((p for p in cls if p <= number), default=cls.SCHEDULED)
+
+
+@dataclass
+class Job:
+    """Job da fila"""
+    job_id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: int
+    status: JobStatus
+    dedup_key: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'payload': self.payload,
+            'priority': self.priority,
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_seconds': (
+                round((self.finished_at - self.started_at).total_seconds(), 3)
+                if self.started_at and self.finished_at else None
+            ),
+            'error': self.error,
+            'attempts': self.attempts
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+def make_dedup_key(kind: str, payload: Optional[Dict[str, Any]]) -> str:
+    """Chave determinística para deduplicar jobs idênticos"""
+    canonical = json.dumps({'kind': kind, 'payload': payload or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SQLiteJobStore:
+    """
+    Persistência dos jobs em SQLite.
+
+    Uma única conexão compartilhada protegida por lock; claim_next é
+    atômico (seleção + UPDATE condicional na mesma transação). Cada
+    instância tem um owner (host-pid-sufixo) gravado nos jobs que reserva.
+    """
+
+    def __init__(self, path: Optional[str] = None, owner: Optional[str] = None):
+        self.path = path or os.getenv(
+            'FINOPS_JOBS_DB', os.path.join(tempfile.gettempdir(), 'finops_jobs.db')
+        )
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    dedup_key TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    heartbeat_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority DESC, created_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key, status);
+            """)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column in ('worker_id', 'heartbeat_at'):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        def parse_dt(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+
+        return Job(
+            job_id=row['job_id'],
+            kind=row['kind'],
+            payload=json.loads(row['payload']),
+            priority=row['priority'],
+            status=JobStatus(row['status']),
+            dedup_key=row['dedup_key'],
+            created_at=parse_dt(row['created_at']),
+            started_at=parse_dt(row['started_at']),
+            finished_at=parse_dt(row['finished_at']),
+            result=json.loads(row['result']) if row['result'] is not None else None,
+            error=row['error'],
+            attempts=row['attempts']
+        )
+
+    def insert_unique(self, job: Job, dedup: bool = True) -> Tuple[Job, bool]:
+        """
+        Insere job, ou retorna o job ativo equivalente se dedup=True.
+
+        Returns:
+            Tupla (job, criado)
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                if dedup:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE dedup_key = ? AND status IN (?, ?) "
+                        "ORDER BY created_at LIMIT 1",
+                        (job.dedup_key, *ACTIVE_STATUSES)
+                    ).fetchone()
+                    if row is not None:
+                        existing = self._row_to_job(row)
+                        if job.priority > existing.priority and existing.status == JobStatus.QUEUED:
+                            self._conn.execute(
+                                "UPDATE jobs SET priority = ? WHERE job_id = ?",
+                                (job.priority, existing.job_id)
+                            )
+                            existing.priority = job.priority
+                        self._conn.execute('COMMIT')
+                        return existing, False
+
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, kind, payload, priority, status, dedup_key, created_at, attempts) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (job.job_id, job.kind, json.dumps(job.payload, default=str), int(job.priority),
+                     job.status.value, job.dedup_key, job.created_at.isoformat())
+                )
+                self._conn.execute('COMMIT')
+                return job, True
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def claim_next(self, min_priority: int = -1) -> Optional[Job]:
+        """
+        Reserva o próximo job da fila (maior prioridade, mais antigo).
+
+        Args:
+            min_priority: Prioridade mínima aceita pelo worker
+
+        Returns:
+            Job marcado como RUNNING ou None
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = ? AND priority >= ? "
+                    "ORDER BY priority DESC, created_at ASC LIMIT 1",
+                    (JobStatus.QUEUED.value, min_priority)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute('COMMIT')
+                    return None
+                now = datetime.now().isoformat()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, "
+                    "worker_id = ?, heartbeat_at = ? WHERE job_id = ? AND status = ?",
+                    (JobStatus.RUNNING.value, now, self.owner, now, row['job_id'], JobStatus.QUEUED.value)
+                )
+                claimed = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone()
+                self._conn.execute('COMMIT')
+                return self._row_to_job(claimed)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def finish(self, job_id: str, status: JobStatus, result: Any = None,
+               error: Optional[str] = None) -> None:
+        """Registra o término de um job"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE job_id = ?",
+                (status.value, datetime.now().isoformat(),
+                 json.dumps(result, default=str) if result is not None else None,
+                 error, job_id)
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancela job ainda na fila"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ? AND status = ?",
+                (JobStatus.CANCELLED.value, datetime.now().isoformat(), job_id, JobStatus.QUEUED.value)
+            )
+            return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def count_running(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n FROM jobs WHERE status = ?", (JobStatus.RUNNING.value,)
+            ).fetchone()
+        return row['n']
+
+    def heartbeat(self) -> int:
+        """Renova o lease dos jobs em execução deste owner"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND worker_id = ?",
+                (datetime.now().isoformat(), JobStatus.RUNNING.value, self.owner)
+            )
+            return cursor.rowcount
+
+    def requeue_running(self, lease: timedelta = DEFAULT_LEASE) -> int:
+        """
+        Devolve à fila jobs cujo worker parou (heartbeat mais antigo que o lease)
+
+        Jobs de outros processos vivos (heartbeat recente) e deste owner
+        não são tocados.
+        """
+        cutoff = (datetime.now() - lease).isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, worker_id = NULL, heartbeat_at = NULL "
+                "WHERE status = ? AND (worker_id IS NULL OR worker_id != ?) "
+                "AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value, self.owner, cutoff)
+            )
+            return cursor.rowcount
+
+    def purge_finished(self, older_than: timedelta) -> int:
+        """Remove jobs finalizados antigos"""
+        cutoff = (datetime.now() - older_than).isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?",
+                (*ACTIVE_STATUSES, cutoff)
+            )
+            return cursor.rowcount
+
+
+class JobQueue:
+    """
+    Fila de jobs com pool limitado de workers.
+
+    Workers reservados (reserved_interactive_workers) só executam jobs
+    INTERACTIVE, garantindo que uma requisição do usuário comece mesmo
+    com varreduras agendadas ocupando o restante do pool.
+
+    Uso:
+        queue = JobQueue(max_workers=2)
+        queue.register('analysis', run_analysis)
+        job, created = queue.submit('analysis', {'regions': ['us-east-1']},
+                                    priority=JobPriority.INTERACTIVE)
+        queue.get(job.job_id).status
+    """
+
+    def __init__(self, store: Optional[SQLiteJobStore] = None, max_workers: int = 2,
+                 reserved_interactive_workers: int = 1, poll_interval: float = 1.0,
+                 retention: timedelta = timedelta(days=1), lease: timedelta = DEFAULT_LEASE):
+        self.store = store or SQLiteJobStore()
+        self.lease = lease
+        self.max_workers = max(1, max_workers)
+        self.reserved_interactive_workers = min(max(0, reserved_interactive_workers), self.max_workers - 1)
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._workers: List[threading.Thread] = []
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Registra handler para um tipo de job"""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def start(self) -> None:
+        """Inicia os workers (idempotente)"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._recover()
+            self.store.purge_finished(self.retention)
+            self._stopping.clear()
+            heartbeat = threading.Thread(target=self._heartbeat_loop, name="finops-job-heartbeat", daemon=True)
+            heartbeat.start()
+            self._workers.append(heartbeat)
+            for index in range(self.max_workers):
+                interactive_only = index < self.reserved_interactive_workers
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    args=(interactive_only,),
+                    name=f"finops-job-worker-{index}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            self._started = True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Sinaliza parada e aguarda os workers"""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        self._started = False
+
+    def submit(self, kind: str, payload: Optional[Dict[str, Any]] = None,
+               priority: Any = JobPriority.NORMAL, dedup: bool = True) -> Tuple[Job, bool]:
+        """
+        Enfileira um job.
+
+        Args:
+            kind: Tipo do job (handler registrado)
+            payload: Parâmetros serializáveis em JSON
+            priority: JobPriority, nome ou número
+            dedup: Reaproveitar job idêntico em andamento
+
+        Returns:
+            Tupla (job, criado). criado=False indica job deduplicado
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Tipo de job desconhecido: {kind}. Disponíveis: {', '.join(self.kinds)}")
+
+        payload = payload or {}
+        job = Job(
+            job_id=f"job-{uuid.uuid4().hex[:16]}",
+            kind=kind,
+            payload=payload,
+            priority=int(JobPriority.parse(priority)),
+            status=JobStatus.QUEUED,
+            dedup_key=make_dedup_key(kind, payload),
+            created_at=datetime.now()
+        )
+        job, created = self.store.insert_unique(job, dedup=dedup)
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return job, created
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        return self.store.list(status=status, limit=limit)
+
+    def cancel(self, job_id: str) -> bool:
+        return self.store.cancel(job_id)
+
+    def wait(self, job_id: str, timeout: float = 30.0) -> Optional[Job]:
+        """Aguarda o término de um job (útil em testes e CLIs)"""
+        deadline = datetime.now() + timedelta(seconds=timeout)
+        while datetime.now() < deadline:
+            job = self.get(job_id)
+            if job is None or job.is_finished:
+                return job
+            with self._wakeup:
+                self._wakeup.wait(0.05)
+        return self.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.store.list(limit=1000):
+            counts[job.status.value] = counts.get(job.status.value, 0) + 1
+        return {
+            'workers': self.max_workers,
+            'reserved_interactive_workers': self.reserved_interactive_workers,
+            'running': self.store.count_running(),
+            'by_status': counts,
+            'kinds': self.kinds
+        }
+
+    def _recover(self) -> None:
+        recovered = self.store.requeue_running(self.lease)
+        if recovered:
+            logger.warning(f"{recovered} jobs de workers interrompidos devolvidos à fila")
+
+    def _heartbeat_loop(self) -> None:
+        """Renova o lease dos jobs deste processo e recupera os de processos mortos"""
+        interval = max(self.lease.total_seconds() / 4, 0.01)
+        while not self._stopping.wait(interval):
+            try:
+                self.store.heartbeat()
+                self._recover()
+            except Exception as e:
+                logger.error(f"Erro no heartbeat da fila de jobs: {e}")
+
+    def _next_job(self, interactive_only: bool) -> Optional[Job]:
+        if interactive_only:
+            return self.store.claim_next(min_priority=JobPriority.INTERACTIVE)
+        return self.store.claim_next()
+
+    def _worker_loop(self, interactive_only: bool) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = self._next_job(interactive_only)
+            except Exception as e:
+                logger.error(f"Erro ao obter próximo job: {e}")
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            self._execute(job)
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+    def _execute(self, job: Job) -> None:
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            self.store.finish(job.job_id, JobStatus.FAILED, error=f"Handler não registrado: {job.kind}")
+            return
+        logger.info(f"Executando job {job.job_id} ({job.kind}, prioridade {job.priority})")
+        try:
+            result = handler(job.payload)
+            self.store.finish(job.job_id, JobStatus.SUCCEEDED, result=result)
+        except Exception as e:
+            logger.error(f"Erro no job {job.job_id} ({job.kind}): {e}")
+            self.store.finish(job.job_id, JobStatus.FAILED, error=str(e))
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Retorna a fila global (workers configurados por FINOPS_JOB_WORKERS)"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(max_workers=int(os.getenv('FINOPS_JOB_WORKERS', '2')))
+    return _job_queue
@@ -6,7 +6,7 @@ Análise de custos e recursos em múltiplas regiões AWS.
 
 import os
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Callable, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
@@ -149,12 +149,17 @@ def analyze_region(region: str) -> Tuple[str, Dict[str, Any]]:
     return region, result
 
 
-def get_all_regions_analysis(max_workers: int = 5) -> Dict[str, Any]:
+def get_all_regions_analysis(
+    max_workers: int = 5,
+    on_region_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
     """
     Analisa todas as regiões AWS em paralelo.
     
     Args:
         max_workers: Número máximo de workers paralelos
+        on_region_complete: Callback opcional chamado a cada região concluída
+                            com (região, payload de progresso e recomendações)
         
     Returns:
         Dicionário com análise consolidada de todas as regiões
@@ -197,6 +202,21 @@ def get_all_regions_analysis(max_workers: int = 5) -> Dict[str, Any]:
             except Exception as e:
                 logger.error(f"Erro ao processar região {region}: {e}")
                 results['regions'][region] = {'status': 'error', 'error': str(e)}
+            
+            if on_region_complete:
+                region_result = results['regions'].get(region, {})
+                completed = len(results['regions'])
+                try:
+                    on_region_complete(region, {
+                        'completed_stages': completed,
+                        'total_stages': len(enabled_regions),
+                        'progress_percentage': round(completed / len(enabled_regions) * 100, 2),
+                        'success': region_result.get('status') == 'success',
+                        'resources': region_result.get('resources', {}),
+                        'recommendations': region_result.get('recommendations', [])
+                    })
+                except Exception as e:
+                    logger.error(f"Erro no callback da região {region}: {e}")
     
     results['consolidated_recommendations'].sort(
         key=lambda x: x.get('savings', 0), 
@@ -0,0 +1,273 @@
+"""
+Stage Pipeline for FinOps Dashboard
+
+Executor de estágios com dependências declaradas (DAG):
+
+- Cada estágio (Stage) declara de quais outros estágios depende e recebe
+  as saídas deles; estágios independentes rodam em paralelo, de modo que
+  o tempo total tende ao caminho crítico em vez da soma dos estágios
+- Timeout por estágio: um estágio que estoura o prazo é marcado como
+  'timeout', recebe a saída padrão e não bloqueia os dependentes (a
+  thread é abandonada, sem esperar o fim da chamada)
+- Falha em um estágio é isolada (status 'error', saída padrão)
+- Estágios `inline` rodam na thread chamadora enquanto os demais já
+  executam no pool (útil para o estágio que deve ser reportado primeiro);
+  o tempo limite não se aplica a eles
+- Callback de conclusão sempre chamado na thread chamadora, na ordem de
+  término, o que permite consolidar resultados sem locks
+- PipelineRun traz o tempo de cada estágio, o caminho crítico e a soma
+  dos tempos (o quanto o paralelismo economizou)
+- StageClients entrega clientes boto3 aos estágios: a sessão é criada na
+  thread chamadora e a criação de clientes é serializada, já que
+  boto3.client() na sessão padrão não é thread-safe
+
+Design Patterns:
+- Dependency Graph: Estágios executados na ordem das dependências
+- Observer: Callback notificado a cada estágio concluído
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 8
+POLL_SECONDS = 0.05
+
+
+class StageClients:
+    """
+    Clientes boto3 compartilhados pelos estágios de uma execução
+
+    Compatível com o client_factory dos serviços FinOps
+    (get_client(nome, region_name=...)). Clientes prontos são thread-safe
+    e reutilizados por (serviço, região).
+    """
+
+    def __init__(self, session: Optional[Any] = None):
+        self.session = session or boto3.session.Session()
+        self._clients: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, service_name: str, region_name: Optional[str] = None) -> Any:
+        """Cliente do serviço/região, criado uma única vez sob lock"""
+        key = (service_name, region_name)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self.session.client(service_name, region_name=region_name)
+                self._clients[key] = client
+            return client
+
+    def regional(self, service_name: str) -> Callable[[str], Any]:
+        """Fábrica região -> cliente (formato dos coletores do dashboard)"""
+        return lambda region: self.get_client(service_name, region_name=region)
+
+
+@dataclass
+class Stage:
+    """
+    Estágio do pipeline
+
+    run recebe um dicionário com as saídas dos estágios em `requires`
+    (a saída padrão, se a dependência falhou ou estourou o prazo).
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    requires: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    default: Any = None
+    inline: bool = False
+
+
+@dataclass
+class StageTiming:
+    """Tempo e status de um estágio (offsets em segundos desde o início)"""
+    name: str
+    status: str = 'pending'
+    started: float = 0.0
+    finished: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return max(0.0, self.finished - self.started)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'started': round(self.started, 4),
+            'finished': round(self.finished, 4),
+            'seconds': round(self.seconds, 4),
+            'error': self.error
+        }
+
+
+@dataclass
+class PipelineRun:
+    """Saídas e tempos de uma execução do pipeline"""
+    outputs: Dict[str, Any]
+    timings: Dict[str, StageTiming]
+    requires: Dict[str, Tuple[str, ...]]
+    wall_seconds: float = 0.0
+
+    @property
+    def stage_seconds(self) -> float:
+        """Soma dos tempos dos estágios (tempo da execução sequencial)"""
+        return sum(t.seconds for t in self.timings.values())
+
+    def critical_path(self) -> List[str]:
+        """Cadeia de dependências que terminou por último"""
+        if not self.timings:
+            return []
+        current = max(self.timings.values(), key=lambda t: t.finished).name
+        path = [current]
+        while self.requires.get(current):
+            current = max(self.requires[current], key=lambda name: self.timings[name].finished)
+            path.append(current)
+        return list(reversed(path))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_seconds': round(self.wall_seconds, 4),
+            'stage_seconds': round(self.stage_seconds, 4),
+            'critical_path': self.critical_path(),
+            'stages': {name: timing.to_dict() for name, timing in self.timings.items()}
+        }
+
+
+class StagePipeline:
+    """
+    Executa estágios em paralelo respeitando as dependências
+
+    Example:
+        pipeline = StagePipeline([
+            Stage('costs', lambda deps: fetch_costs(), timeout=30),
+            Stage('insights', lambda deps: insights(deps['costs']), requires=('costs',)),
+        ])
+        run = pipeline.run(on_complete=lambda name, output, timing: ...)
+    """
+
+    def __init__(self, stages: Sequence[Stage], max_workers: int = MAX_WORKERS):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Estágio duplicado: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            unknown = [r for r in stage.requires if r not in self.stages]
+            if unknown:
+                raise ValueError(f"Estágio {stage.name} depende de estágios inexistentes: {unknown}")
+        self._check_cycles()
+        self.max_workers = max_workers
+
+    def _check_cycles(self) -> None:
+        done: set = set()
+        pending = set(self.stages)
+        while pending:
+            ready = {n for n in pending if all(r in done for r in self.stages[n].requires)}
+            if not ready:
+                raise ValueError(f"Dependência circular entre estágios: {sorted(pending)}")
+            done |= ready
+            pending -= ready
+
+    def run(self, on_complete: Optional[Callable[[str, Any, StageTiming], None]] = None) -> PipelineRun:
+        """
+        Executa todos os estágios
+
+        Args:
+            on_complete: Chamado na thread chamadora ao fim de cada estágio
+                         com (nome, saída, tempo)
+
+        Returns:
+            PipelineRun com saídas e tempos
+        """
+        started = time.perf_counter()
+        outputs: Dict[str, Any] = {}
+        timings = {name: StageTiming(name) for name in self.stages}
+        running: Dict[Future, str] = {}
+        begun: Dict[str, float] = {}
+        submitted: set = set()
+        order = list(self.stages)
+
+        def clock() -> float:
+            return time.perf_counter() - started
+
+        def execute(stage: Stage, inputs: Dict[str, Any]) -> Any:
+            begun[stage.name] = timings[stage.name].started = clock()
+            return stage.run(inputs)
+
+        def deadline(name: str) -> float:
+            # O prazo conta a partir do início real (não da espera na fila)
+            timeout = self.stages[name].timeout
+            if timeout is None or name not in begun:
+                return float('inf')
+            return begun[name] + timeout
+
+        def finish(name: str, status: str, output: Any, error: Optional[str] = None) -> None:
+            timing = timings[name]
+            timing.status = status
+            timing.finished = clock()
+            timing.error = error
+            if status != 'ok':
+                logger.error(f"Estágio {name} terminou com status {status}: {error}")
+            outputs[name] = output
+            if on_complete:
+                try:
+                    on_complete(name, output, timing)
+                except Exception as e:
+                    logger.error(f"Erro no callback do estágio {name}: {e}")
+
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        try:
+            while len(outputs) < len(self.stages):
+                ready = [s for s in self.stages.values()
+                         if s.name not in submitted and all(r in outputs for r in s.requires)]
+                for stage in sorted(ready, key=lambda s: s.inline):
+                    submitted.add(stage.name)
+                    inputs = {r: outputs[r] for r in stage.requires}
+                    if not stage.inline:
+                        running[executor.submit(execute, stage, inputs)] = stage.name
+                        continue
+                    try:
+                        output = execute(stage, inputs)
+                    except Exception as e:
+                        finish(stage.name, 'error', stage.default, str(e))
+                    else:
+                        finish(stage.name, 'ok', output)
+                if any(s.inline for s in ready) or not running:
+                    continue
+
+                nearest = min(deadline(name) for name in running.values())
+                timeout = None if nearest == float('inf') else max(0.0, nearest - clock())
+                if any(self.stages[n].timeout is not None and n not in begun for n in running.values()):
+                    timeout = POLL_SECONDS if timeout is None else min(timeout, POLL_SECONDS)
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: order.index(running[f])):
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        finish(name, 'error', self.stages[name].default, str(error))
+                    else:
+                        finish(name, 'ok', future.result())
+                now = clock()
+                for future, name in list(running.items()):
+                    if deadline(name) <= now:
+                        running.pop(future)
+                        finish(name, 'timeout', self.stages[name].default,
+                               f"Tempo limite de {self.stages[name].timeout}s excedido")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return PipelineRun(
+            outputs=outputs,
+            timings=timings,
+            requires={name: stage.requires for name, stage in self.stages.items()},
+            wall_seconds=time.perf_counter() - started
+        )
@@ -0,0 +1,286 @@
+"""
+Progress Stream for FinOps Dashboard
+
+Streaming de progresso de análises via Server-Sent Events (SSE).
+
+Cada execução (análise completa, multi-região) publica eventos em um
+canal à medida que serviços, estágios ou regiões terminam, incluindo
+lotes parciais de recomendações. O dashboard consome o canal e renderiza
+incrementalmente, sem esperar o fim da varredura.
+
+Design Patterns:
+- Observer: Publicadores (callbacks de conclusão) e assinantes (clientes SSE)
+- Adapter: Converte eventos do DynamoDBStateManager e da análise em eventos SSE
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENT_STARTED = 'started'
+EVENT_PROGRESS = 'progress'
+EVENT_RECOMMENDATIONS = 'recommendations'
+EVENT_COMPLETE = 'complete'
+EVENT_ERROR = 'error'
+
+TERMINAL_EVENTS = (EVENT_COMPLETE, EVENT_ERROR)
+
+
+@dataclass
+class ProgressEvent:
+    """Evento de progresso publicado em um canal"""
+    channel: str
+    event: str
+    data: Dict[str, Any]
+    sequence: int = 0
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'channel': self.channel,
+            'event': self.event,
+            'sequence': self.sequence,
+            'timestamp': self.timestamp,
+            'data': self.data
+        }
+
+    def to_sse(self) -> str:
+        """Serializa no formato text/event-stream"""
+        payload = json.dumps(self.to_dict(), default=str, ensure_ascii=False)
+        return f"id: {self.sequence}\nevent: {self.event}\ndata: {payload}\n\n"
+
+
+class ProgressChannel:
+    """Canal de uma execução com histórico para assinantes tardios"""
+
+    def __init__(self, name: str, history_size: int = 500):
+        self.name = name
+        self.history: Deque[ProgressEvent] = deque(maxlen=history_size)
+        self.subscribers: List[queue.Queue] = []
+        self.sequence = 0
+        self.closed = False
+        self.created_at = time.time()
+
+
+class ProgressBroker:
+    """
+    Broker de eventos de progresso em memória (thread-safe).
+
+    Uso:
+        broker = get_progress_broker()
+        broker.open('analysis')
+        broker.publish('analysis', 'progress', {'stage': 'budgets'})
+        for chunk in broker.stream('analysis'):
+            ...
+    """
+
+    def __init__(self, history_size: int = 500, retention_seconds: int = 900):
+        self.history_size = history_size
+        self.retention_seconds = retention_seconds
+        self._channels: Dict[str, ProgressChannel] = {}
+        self._lock = threading.Lock()
+
+    def open(self, channel: str) -> None:
+        """Abre (ou reinicia) um canal para uma nova execução"""
+        with self._lock:
+            self._purge_expired()
+            old = self._channels.get(channel)
+            new = ProgressChannel(channel, self.history_size)
+            if old is not None and not old.closed:
+                new.subscribers = old.subscribers
+            self._channels[channel] = new
+
+    def is_active(self, channel: str) -> bool:
+        """Indica se há execução em andamento no canal"""
+        with self._lock:
+            ch = self._channels.get(channel)
+            return ch is not None and not ch.closed
+
+    def publish(self, channel: str, event: str, data: Optional[Dict[str, Any]] = None) -> ProgressEvent:
+        """
+        Publica evento para todos os assinantes do canal.
+
+        Args:
+            channel: Nome do canal
+            event: Tipo do evento (started, progress, recommendations, complete, error)
+            data: Dados do evento
+
+        Returns:
+            Evento publicado
+        """
+        with self._lock:
+            ch = self._channels.get(channel)
+            if ch is None:
+                ch = ProgressChannel(channel, self.history_size)
+                self._channels[channel] = ch
+            ch.sequence += 1
+            progress_event = ProgressEvent(
+                channel=channel, event=event, data=data or {}, sequence=ch.sequence
+            )
+            ch.history.append(progress_event)
+            if event in TERMINAL_EVENTS:
+                ch.closed = True
+            subscribers = list(ch.subscribers)
+
+        for subscriber in subscribers:
+            subscriber.put(progress_event)
+        return progress_event
+
+    def subscribe(self, channel: str, last_event_id: int = 0) -> queue.Queue:
+        """
+        Registra assinante e reenvia o histórico após last_event_id.
+
+        Args:
+            channel: Nome do canal
+            last_event_id: Último evento já recebido (header Last-Event-ID)
+
+        Returns:
+            Fila que recebe os eventos
+        """
+        subscriber: queue.Queue = queue.Queue()
+        with self._lock:
+            ch = self._channels.get(channel)
+            if ch is None:
+                ch = ProgressChannel(channel, self.history_size)
+                self._channels[channel] = ch
+            for past in ch.history:
+                if past.sequence > last_event_id:
+                    subscriber.put(past)
+            if not ch.closed:
+                ch.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, channel: str, subscriber: queue.Queue) -> None:
+        """Remove assinante do canal"""
+        with self._lock:
+            ch = self._channels.get(channel)
+            if ch is not None and subscriber in ch.subscribers:
+                ch.subscribers.remove(subscriber)
+
+    def stream(self, channel: str, last_event_id: int = 0,
+               heartbeat_seconds: float = 15.0,
+               max_duration_seconds: float = 1800.0) -> Iterator[str]:
+        """
+        Gera blocos SSE até o evento terminal do canal.
+
+        Envia comentários de heartbeat para manter a conexão aberta
+        através de proxies.
+
+        Args:
+            channel: Nome do canal
+            last_event_id: Último evento recebido pelo cliente
+            heartbeat_seconds: Intervalo entre heartbeats
+            max_duration_seconds: Duração máxima da conexão
+
+        Yields:
+            Blocos text/event-stream
+        """
+        subscriber = self.subscribe(channel, last_event_id)
+        deadline = time.time() + max_duration_seconds
+        try:
+            yield "retry: 3000\n\n"
+            while time.time() < deadline:
+                try:
+                    progress_event = subscriber.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield progress_event.to_sse()
+                if progress_event.event in TERMINAL_EVENTS:
+                    break
+        finally:
+            self.unsubscribe(channel, subscriber)
+
+    def get_history(self, channel: str) -> List[Dict[str, Any]]:
+        """Retorna histórico de eventos do canal"""
+        with self._lock:
+            ch = self._channels.get(channel)
+            return [e.to_dict() for e in ch.history] if ch else []
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        expired = [
+            name for name, ch in self._channels.items()
+            if ch.closed and not ch.subscribers and now - ch.created_at > self.retention_seconds
+        ]
+        for name in expired:
+            del self._channels[name]
+
+
+_broker: Optional[ProgressBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_progress_broker() -> ProgressBroker:
+    """Retorna instância global do broker"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = ProgressBroker()
+    return _broker
+
+
+def stage_progress_callback(broker: ProgressBroker, channel: str) -> Callable[[str, Dict[str, Any]], None]:
+    """
+    Cria callback para get_dashboard_analysis / get_all_regions_analysis.
+
+    O callback recebe (nome do estágio, payload) e publica um evento de
+    progresso e, quando houver, um lote parcial de recomendações.
+
+    Args:
+        broker: Broker de destino
+        channel: Canal da execução
+
+    Returns:
+        Callback de conclusão de estágio
+    """
+    def callback(stage: str, payload: Dict[str, Any]) -> None:
+        try:
+            recommendations = payload.get('recommendations') or []
+            progress = {k: v for k, v in payload.items() if k != 'recommendations'}
+            progress['stage'] = stage
+            progress['recommendations_count'] = len(recommendations)
+            broker.publish(channel, EVENT_PROGRESS, progress)
+            if recommendations:
+                broker.publish(channel, EVENT_RECOMMENDATIONS, {
+                    'stage': stage,
+                    'recommendations': recommendations
+                })
+        except Exception as e:
+            logger.error(f"Erro ao publicar progresso do estágio {stage}: {e}")
+
+    return callback
+
+
+def state_manager_listener(broker: ProgressBroker, channel: str) -> Callable[[Dict[str, Any]], None]:
+    """
+    Cria listener para DynamoDBStateManager.add_completion_listener.
+
+    Args:
+        broker: Broker de destino
+        channel: Canal da execução
+
+    Returns:
+        Listener que converte checkpoints em eventos de progresso
+    """
+    def listener(event: Dict[str, Any]) -> None:
+        try:
+            stage = event.get('service_name', 'unknown')
+            summary = event.get('result_summary') or {}
+            payload = {k: v for k, v in event.items() if k != 'result_summary'}
+            payload['summary'] = {k: v for k, v in summary.items() if k != 'recommendations'}
+            payload['recommendations'] = summary.get('recommendations', [])
+            stage_progress_callback(broker, channel)(stage, payload)
+        except Exception as e:
+            logger.error(f"Erro ao publicar checkpoint: {e}")
+
+    return listener
@@ -0,0 +1,342 @@
+"""
+Recommendation Index for FinOps Dashboard
+
+Índices em memória para consulta paginada de recomendações.
+
+Construído uma única vez por snapshot de análise:
+- Arrays ordenados de economia (savings) para filtros por faixa
+- Índices invertidos por tipo, serviço, região e prioridade
+- Índice invertido de termos para busca textual
+- Ordenações pré-computadas (rank) para paginação por cursor (keyset)
+
+Design Patterns:
+- Repository: Consulta de recomendações desacoplada da análise
+- Immutable Snapshot: Índice somente leitura, reconstruído a cada snapshot
+"""
+
+import base64
+import bisect
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
+
+SORT_FIELDS = ('savings', 'priority', 'type', 'service', 'region', 'title')
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+_TOKEN_PATTERN = re.compile(r'[\w\-\.]+', re.UNICODE)
+_REGION_PATTERN = re.compile(r'\b([a-z]{2}(?:-gov)?-[a-z]+-\d)\b')
+
+
+class InvalidCursorError(ValueError):
+    """Cursor inválido ou gerado para outro snapshot"""
+
+
+@dataclass
+class RecommendationQuery:
+    """Parâmetros de consulta de recomendações"""
+    types: List[str] = field(default_factory=list)
+    services: List[str] = field(default_factory=list)
+    regions: List[str] = field(default_factory=list)
+    priorities: List[str] = field(default_factory=list)
+    min_savings: Optional[float] = None
+    max_savings: Optional[float] = None
+    search: Optional[str] = None
+    sort: str = 'savings'
+    order: str = 'desc'
+    limit: int = DEFAULT_LIMIT
+    cursor: Optional[str] = None
+
+    @classmethod
+    def from_args(cls, args: Dict[str, Any]) -> 'RecommendationQuery':
+        """
+        Cria consulta a partir de query string (valores separados por vírgula).
+
+        Args:
+            args: Mapeamento de argumentos (ex.: request.args)
+
+        Returns:
+            RecommendationQuery validada
+        """
+        def split(name: str) -> List[str]:
+            value = args.get(name)
+            if not value:
+                return []
+            return [v.strip() for v in str(value).split(',') if v.strip()]
+
+        def to_float(name: str) -> Optional[float]:
+            value = args.get(name)
+            if value in (None, ''):
+                return None
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parâmetro '{name}' deve ser numérico")
+
+        try:
+            limit = int(args.get('limit', DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            raise ValueError("Parâmetro 'limit' deve ser inteiro")
+
+        sort = args.get('sort', 'savings')
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Ordenação inválida: {sort}. Use: {', '.join(SORT_FIELDS)}")
+        order = str(args.get('order', 'desc')).lower()
+        if order not in ('asc', 'desc'):
+            raise ValueError("Parâmetro 'order' deve ser 'asc' ou 'desc'")
+
+        return cls(
+            types=split('type'),
+            services=split('service'),
+            regions=split('region'),
+            priorities=[p.upper() for p in split('priority')],
+            min_savings=to_float('min_savings'),
+            max_savings=to_float('max_savings'),
+            search=args.get('q') or args.get('search'),
+            sort=sort,
+            order=order,
+            limit=max(1, min(limit, MAX_LIMIT)),
+            cursor=args.get('cursor') or None
+        )
+
+
+def _tokenize(text: str) -> Set[str]:
+    return {t.lower() for t in _TOKEN_PATTERN.findall(text or '')}
+
+
+def _detect_region(rec: Dict[str, Any], default_region: Optional[str]) -> str:
+    region = rec.get('region')
+    if region:
+        return str(region)
+    match = _REGION_PATTERN.search(str(rec.get('resource_id', '')))
+    if match:
+        return match.group(1)
+    return default_region or 'global'
+
+
+class RecommendationIndex:
+    """
+    Índice imutável de recomendações de um snapshot.
+
+    Uso:
+        index = RecommendationIndex(analysis['recommendations'], version=3)
+        page = index.query(RecommendationQuery(services=['EC2'], limit=20))
+        next_page = index.query(RecommendationQuery(cursor=page['next_cursor']))
+    """
+
+    def __init__(self, recommendations: Iterable[Dict[str, Any]],
+                 version: Any = None, default_region: Optional[str] = None):
+        self.version = version
+        self._records: List[Dict[str, Any]] = []
+        self._by_field: Dict[str, Dict[str, List[int]]] = {
+            'type': {}, 'service': {}, 'region': {}, 'priority': {}
+        }
+        self._terms: Dict[str, List[int]] = {}
+
+        for rec in recommendations:
+            doc_id = len(self._records)
+            record = dict(rec)
+            record['region'] = _detect_region(rec, default_region)
+            record['priority'] = str(record.get('priority', 'MEDIUM')).upper()
+            try:
+                record['savings'] = float(record.get('savings') or 0)
+            except (TypeError, ValueError):
+                record['savings'] = 0.0
+            self._records.append(record)
+
+            for name in ('type', 'service', 'region', 'priority'):
+                key = str(record.get(name, '')).lower()
+                self._by_field[name].setdefault(key, []).append(doc_id)
+
+            text = ' '.join(str(record.get(k, '')) for k in ('title', 'description', 'resource_id', 'type', 'service'))
+            for term in _tokenize(text):
+                self._terms.setdefault(term, []).append(doc_id)
+
+        self._term_vocabulary = sorted(self._terms)
+        self._field_sets: Dict[str, Dict[str, frozenset]] = {
+            name: {value: frozenset(ids) for value, ids in index.items()}
+            for name, index in self._by_field.items()
+        }
+
+        savings = [r['savings'] for r in self._records]
+        self._savings_order = sorted(range(len(savings)), key=lambda i: (savings[i], i))
+        self._savings_sorted = [savings[i] for i in self._savings_order]
+
+        self._orders: Dict[str, List[int]] = {}
+        self._ranks: Dict[str, List[int]] = {}
+        for sort_field in SORT_FIELDS:
+            order = self._build_order(sort_field)
+            rank = [0] * len(order)
+            for position, doc_id in enumerate(order):
+                rank[doc_id] = position
+            self._orders[sort_field] = order
+            self._ranks[sort_field] = rank
+
+        logger.info(f"Índice de recomendações construído: {len(self._records)} itens (versão {version})")
+
+    def _build_order(self, sort_field: str) -> List[int]:
+        """Ordem ascendente estável (desempate pelo id) para o campo"""
+        ids = range(len(self._records))
+        if sort_field == 'savings':
+            return list(self._savings_order)
+        if sort_field == 'priority':
+            # Ascendente = menos urgente primeiro; desc = CRITICAL primeiro
+            return sorted(ids, key=lambda i: (-PRIORITY_ORDER.get(self._records[i]['priority'], 99),
+                                              self._records[i]['savings'], i))
+        return sorted(ids, key=lambda i: (str(self._records[i].get(sort_field, '')).lower(), i))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _field_candidates(self, name: str, values: Sequence[str]) -> Set[int]:
+        index = self._field_sets[name]
+        if len(values) == 1:
+            return index.get(values[0].lower(), frozenset())
+        result: Set[int] = set()
+        for value in values:
+            result.update(index.get(value.lower(), ()))
+        return result
+
+    def _search_candidates(self, search: str) -> Set[int]:
+        """Interseção dos termos; termos sem match exato usam prefixo no vocabulário"""
+        result: Optional[Set[int]] = None
+        for token in _tokenize(search):
+            ids = set(self._terms.get(token, ()))
+            if not ids:
+                start = bisect.bisect_left(self._term_vocabulary, token)
+                for term in self._term_vocabulary[start:]:
+                    if not term.startswith(token):
+                        break
+                    ids.update(self._terms[term])
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result if result is not None else set(range(len(self._records)))
+
+    def _savings_candidates(self, min_savings: Optional[float],
+                            max_savings: Optional[float]) -> Set[int]:
+        lo = 0 if min_savings is None else bisect.bisect_left(self._savings_sorted, min_savings)
+        hi = len(self._savings_sorted) if max_savings is None else bisect.bisect_right(self._savings_sorted, max_savings)
+        return set(self._savings_order[lo:hi])
+
+    def _candidates(self, query: RecommendationQuery) -> Optional[Set[int]]:
+        """Conjunto de ids que satisfazem os filtros (None = todos)"""
+        sets: List[Set[int]] = []
+        for name, values in (('type', query.types), ('service', query.services),
+                             ('region', query.regions), ('priority', query.priorities)):
+            if values:
+                sets.append(self._field_candidates(name, values))
+        if query.min_savings is not None or query.max_savings is not None:
+            sets.append(self._savings_candidates(query.min_savings, query.max_savings))
+        if query.search:
+            sets.append(self._search_candidates(query.search))
+
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            result = result & other
+            if not result:
+                break
+        return result
+
+    def _encode_cursor(self, query: RecommendationQuery, position: int) -> str:
+        payload = json.dumps({'v': self.version, 's': query.sort, 'o': query.order, 'p': position},
+                             separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, query: RecommendationQuery) -> int:
+        try:
+            padded = query.cursor + '=' * (-len(query.cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except Exception:
+            raise InvalidCursorError("Cursor inválido")
+        if payload.get('v') != self.version:
+            raise InvalidCursorError("Cursor expirado: o snapshot de análise foi atualizado")
+        if payload.get('s') != query.sort or payload.get('o') != query.order:
+            raise InvalidCursorError("Cursor gerado para outra ordenação")
+        return int(payload.get('p', -1))
+
+    def query(self, query: RecommendationQuery) -> Dict[str, Any]:
+        """
+        Executa consulta paginada.
+
+        A posição do cursor é o índice (na ordenação escolhida) do último
+        item retornado, o que torna cada página independente do offset.
+
+        Args:
+            query: Parâmetros da consulta
+
+        Returns:
+            Dicionário com items, total, next_cursor e metadados
+        """
+        after = self._decode_cursor(query) if query.cursor else -1
+        descending = query.order == 'desc'
+        base_order = self._orders[query.sort]
+        n = len(base_order)
+        candidates = self._candidates(query)
+
+        # Posição lógica p na ordem pedida -> posição física no array ascendente
+        def physical(p: int) -> int:
+            return n - 1 - p if descending else p
+
+        page_ids: List[int] = []
+        last_position = after
+        has_more = False
+
+        if candidates is None or len(candidates) ** 2 > query.limit * n:
+            # Filtros pouco seletivos: percorrer a ordem global a partir do cursor
+            # custa ~limit * n / k posições, menos que ordenar os k candidatos
+            position = after + 1
+            while position < n:
+                doc_id = base_order[physical(position)]
+                if candidates is None or doc_id in candidates:
+                    if len(page_ids) == query.limit:
+                        has_more = True
+                        break
+                    page_ids.append(doc_id)
+                    last_position = position
+                position += 1
+        else:
+            # Filtros seletivos: ordena apenas os candidatos pelo rank pré-computado
+            rank = self._ranks[query.sort]
+            positions = sorted(
+                (n - 1 - rank[i]) if descending else rank[i] for i in candidates
+            )
+            start = bisect.bisect_right(positions, after)
+            window = positions[start:start + query.limit + 1]
+            has_more = len(window) > query.limit
+            window = window[:query.limit]
+            page_ids = [base_order[physical(p)] for p in window]
+            if window:
+                last_position = window[-1]
+
+        total = n if candidates is None else len(candidates)
+        return {
+            'items': [self._records[i] for i in page_ids],
+            'total': total,
+            'limit': query.limit,
+            'sort': query.sort,
+            'order': query.order,
+            'next_cursor': self._encode_cursor(query, last_position) if has_more else None,
+            'snapshot_version': self.version
+        }
+
+    def facets(self) -> Dict[str, Dict[str, int]]:
+        """Contagem de recomendações por tipo, serviço, região e prioridade"""
+        facets: Dict[str, Dict[str, int]] = {}
+        for name, index in self._by_field.items():
+            counts: Dict[str, int] = {}
+            for ids in index.values():
+                label = str(self._records[ids[0]].get(name, ''))
+                counts[label] = counts.get(label, 0) + len(ids)
+            facets[name] = dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+        return facets
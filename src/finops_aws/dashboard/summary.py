@@ -0,0 +1,279 @@
+"""
+Tiered Summary for FinOps Dashboard
+
+Modo "resumo primeiro" do dashboard, com resposta em camadas (tiers):
+
+- Tier 0: gasto total, top serviços e top regiões a partir de UMA consulta
+  cacheada ao Cost Explorer (GroupBy SERVICE + REGION) - sub-segundo
+- Tier 1: integrações baratas (Budgets, anomalias, Savings Plans/RI),
+  executadas em paralelo e cacheadas
+- Tier 2: análise completa (get_dashboard_analysis), preenchida de forma
+  assíncrona pelo job de análise
+
+Cada campo da resposta informa de qual tier veio (field_tiers).
+
+Design Patterns:
+- Facade: Uma chamada compõe as camadas disponíveis
+- Cache-Aside: Tiers 0 e 1 servidos do FinOpsCache
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+from ..utils.cache import FinOpsCache
+
+logger = logging.getLogger(__name__)
+
+TIER0_CACHE_KEY = 'dashboard:summary:tier0'
+TIER1_CACHE_KEY = 'dashboard:summary:tier1'
+TIER0_TTL_SECONDS = 900
+TIER1_TTL_SECONDS = 600
+
+TOP_N = 10
+
+FIELD_TIERS = {
+    'costs': 0,
+    'top_services': 0,
+    'top_regions': 0,
+    'budgets': 1,
+    'anomalies': 1,
+    'savings_plans': 1,
+    'reserved_instances': 1,
+    'commitments': 1,
+    'recommendations': 2,
+    'resources': 2,
+    'summary': 2,
+    'integrations': 2,
+    'account_id': 2,
+}
+
+
+def _top(values: Dict[str, float], total: float, limit: int = TOP_N) -> list:
+    ranked = sorted(values.items(), key=lambda x: x[1], reverse=True)[:limit]
+    return [
+        {
+            'name': name,
+            'cost': round(cost, 2),
+            'percentage': round(cost / total * 100, 1) if total > 0 else 0.0
+        }
+        for name, cost in ranked
+    ]
+
+
+def get_tier0_summary(ce_client: Optional[Any] = None, days: int = 30,
+                      use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Tier 0: custos totais, top serviços e top regiões em uma consulta.
+
+    Usa GroupBy SERVICE + REGION numa única chamada get_cost_and_usage
+    (seguindo NextPageToken quando houver) e agrega os dois eixos localmente.
+
+    Args:
+        ce_client: Cliente Cost Explorer (injeção para testes)
+        days: Janela de dias
+        use_cache: Usar FinOpsCache
+
+    Returns:
+        Dicionário com costs, top_services, top_regions e metadados
+    """
+    cache = FinOpsCache()
+    cache_key = f"{TIER0_CACHE_KEY}:{days}"
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+
+    started = time.perf_counter()
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+    try:
+        ce = ce_client or boto3.client('ce', region_name='us-east-1')
+        by_service: Dict[str, float] = {}
+        by_region: Dict[str, float] = {}
+        total = 0.0
+        currency = 'USD'
+
+        params = {
+            'TimePeriod': {'Start': start_date, 'End': end_date},
+            'Granularity': 'MONTHLY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': [
+                {'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                {'Type': 'DIMENSION', 'Key': 'REGION'}
+            ]
+        }
+        while True:
+            response = ce.get_cost_and_usage(**params)
+            for period in response.get('ResultsByTime', []):
+                for group in period.get('Groups', []):
+                    keys = group.get('Keys', ['Unknown', 'Unknown'])
+                    service = keys[0] if keys else 'Unknown'
+                    region = (keys[1] if len(keys) > 1 else '') or 'global'
+                    metric = group.get('Metrics', {}).get('UnblendedCost', {})
+                    amount = float(metric.get('Amount', 0))
+                    currency = metric.get('Unit', currency)
+                    by_service[service] = by_service.get(service, 0.0) + amount
+                    by_region[region] = by_region.get(region, 0.0) + amount
+                    total += amount
+            token = response.get('NextPageToken')
+            if not token:
+                break
+            params['NextPageToken'] = token
+
+        result = {
+            'costs': {
+                'total': round(total, 2),
+                'currency': currency,
+                'services_count': len(by_service),
+                'regions_count': len(by_region),
+                'period': {'start': start_date, 'end': end_date}
+            },
+            'top_services': _top(by_service, total),
+            'top_regions': _top(by_region, total),
+            'generated_at': datetime.utcnow().isoformat(),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+        cache.set(cache_key, result, ttl_seconds=TIER0_TTL_SECONDS)
+        return {**result, 'cached': False}
+
+    except ClientError as e:
+        logger.error(f"Erro ao obter resumo de custos (tier 0): {e}")
+    except Exception as e:
+        logger.error(f"Erro inesperado no resumo de custos (tier 0): {e}")
+    return {
+        'costs': {'total': 0, 'period': {'start': start_date, 'end': end_date}},
+        'top_services': [],
+        'top_regions': [],
+        'error': 'Cost Explorer indisponível',
+        'cached': False
+    }
+
+
+def get_tier1_summary(use_cache: bool = True, max_workers: int = 4) -> Dict[str, Any]:
+    """
+    Tier 1: integrações baratas executadas em paralelo.
+
+    Args:
+        use_cache: Usar FinOpsCache
+        max_workers: Workers paralelos
+
+    Returns:
+        Dicionário com budgets, anomalies, savings_plans, reserved_instances e commitments
+    """
+    from .integrations import (
+        get_budgets_analysis,
+        get_anomaly_detection_analysis,
+        get_savings_plans_analysis,
+        get_reserved_instances_analysis,
+        get_commitments_summary,
+    )
+
+    cache = FinOpsCache()
+    if use_cache:
+        cached = cache.get(TIER1_CACHE_KEY)
+        if cached is not None:
+            return {**cached, 'cached': True}
+
+    started = time.perf_counter()
+    tasks = {
+        'budgets': get_budgets_analysis,
+        'anomalies': lambda: get_anomaly_detection_analysis(days_back=30),
+        'savings_plans': get_savings_plans_analysis,
+        'reserved_instances': get_reserved_instances_analysis,
+    }
+
+    result: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {name: executor.submit(func) for name, func in tasks.items()}
+        for name, future in futures.items():
+            try:
+                result[name] = future.result()
+            except Exception as e:
+                logger.error(f"Erro no tier 1 ({name}): {e}")
+                result[name] = {'error': str(e)}
+
+    try:
+        sp_data = result.get('savings_plans')
+        ri_data = result.get('reserved_instances')
+        commitments = get_commitments_summary(
+            sp_data=sp_data if sp_data and 'error' not in sp_data else None,
+            ri_data=ri_data if ri_data and 'error' not in ri_data else None
+        )
+        result['commitments'] = commitments.get('summary', {}) if commitments else {}
+    except Exception as e:
+        logger.error(f"Erro no resumo de Commitments (tier 1): {e}")
+        result['commitments'] = {}
+
+    result['generated_at'] = datetime.utcnow().isoformat()
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    cache.set(TIER1_CACHE_KEY, result, ttl_seconds=TIER1_TTL_SECONDS)
+    return {**result, 'cached': False}
+
+
+def build_tiered_dashboard(
+    max_tier: int = 1,
+    full_analysis: Optional[Dict[str, Any]] = None,
+    tier2_status: str = 'pending',
+    ce_client: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Compõe a resposta do dashboard com as camadas disponíveis.
+
+    Args:
+        max_tier: Maior tier a computar de forma síncrona (0 ou 1)
+        full_analysis: Resultado de get_dashboard_analysis, se já disponível
+        tier2_status: Status do tier 2 quando full_analysis é None
+        ce_client: Cliente Cost Explorer (injeção para testes)
+
+    Returns:
+        Dicionário com data, tiers (status por camada) e field_tiers
+    """
+    data: Dict[str, Any] = {}
+    tiers: Dict[str, Dict[str, Any]] = {}
+
+    tier0 = get_tier0_summary(ce_client=ce_client)
+    data['costs'] = tier0.get('costs', {})
+    data['top_services'] = tier0.get('top_services', [])
+    data['top_regions'] = tier0.get('top_regions', [])
+    tiers['0'] = {
+        'status': 'error' if 'error' in tier0 else 'complete',
+        'cached': tier0.get('cached', False),
+        'generated_at': tier0.get('generated_at'),
+        'elapsed_ms': tier0.get('elapsed_ms')
+    }
+
+    if max_tier >= 1:
+        tier1 = get_tier1_summary()
+        for name in ('budgets', 'anomalies', 'savings_plans', 'reserved_instances', 'commitments'):
+            data[name] = tier1.get(name, {})
+        tiers['1'] = {
+            'status': 'complete',
+            'cached': tier1.get('cached', False),
+            'generated_at': tier1.get('generated_at'),
+            'elapsed_ms': tier1.get('elapsed_ms')
+        }
+    else:
+        tiers['1'] = {'status': 'not_requested'}
+
+    if full_analysis is not None:
+        for name in ('recommendations', 'resources', 'summary', 'integrations', 'account_id'):
+            data[name] = full_analysis.get(name)
+        tiers['2'] = {'status': 'complete', 'generated_at': full_analysis.get('generated_at')}
+    else:
+        tiers['2'] = {'status': tier2_status}
+
+    complete = [int(t) for t, info in tiers.items() if info.get('status') == 'complete']
+
+    return {
+        'tier': max(complete, default=-1),
+        'tiers': tiers,
+        'field_tiers': {k: v for k, v in FIELD_TIERS.items() if k in data},
+        'data': data
+    }
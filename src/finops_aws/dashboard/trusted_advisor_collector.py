@@ -0,0 +1,306 @@
+"""
+Trusted Advisor Collector for FinOps Dashboard
+
+Coleta completa dos checks de otimização de custo do AWS Trusted Advisor:
+
+- Lista de checks cacheada (muda raramente)
+- Estado de todos os checks em lotes via
+  describe_trusted_advisor_check_summaries (status, timestamp, recursos
+  sinalizados e economia estimada)
+- Resultados detalhados baixados em paralelo apenas para checks com
+  recursos sinalizados cujo timestamp mudou: o resultado de cada check
+  fica no FinOpsCache sob a chave (checkId, timestamp)
+- Recursos sinalizados emitidos um a um (gerador), sem truncamento, com a
+  economia mensal da coluna "Estimated Monthly Savings"
+- Controle de refresh: checks mais antigos que um limite são
+  re-executados via refresh_trusted_advisor_check
+
+Requer AWS Business ou Enterprise Support.
+
+Design Patterns:
+- Cache-Aside: Resultado por check servido do cache enquanto o timestamp
+  não muda
+- Iterator: Recursos sinalizados emitidos sob demanda
+"""
+
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import boto3
+from botocore.exceptions import ClientError
+
+from ..utils.cache import FinOpsCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'dashboard:trusted_advisor'
+CHECKS_TTL_SECONDS = 24 * 3600
+RESULT_TTL_SECONDS = 7 * 24 * 3600
+SUMMARY_BATCH_SIZE = 50
+MAX_WORKERS = 8
+
+COST_CATEGORY = 'cost_optimizing'
+FLAGGED_STATUSES = ('warning', 'error')
+
+SAVINGS_COLUMN = re.compile(r'estimated monthly savings', re.IGNORECASE)
+RESOURCE_COLUMN = re.compile(r'(\bid\b|\bname\b|\barn\b|\baddress\b)', re.IGNORECASE)
+_AMOUNT = re.compile(r'-?[\d,]*\.?\d+')
+
+
+def _parse_amount(value: Any) -> float:
+    """'$1,234.56' -> 1234.56 (0.0 quando não numérico)"""
+    match = _AMOUNT.search(str(value or ''))
+    if not match:
+        return 0.0
+    try:
+        return float(match.group().replace(',', ''))
+    except ValueError:
+        return 0.0
+
+
+@dataclass
+class CheckSummary:
+    """Estado de um check (describe_trusted_advisor_check_summaries)"""
+    check_id: str
+    name: str
+    status: str
+    timestamp: str
+    resources_flagged: int = 0
+    estimated_monthly_savings: float = 0.0
+
+    @property
+    def flagged(self) -> bool:
+        return self.status in FLAGGED_STATUSES and self.resources_flagged > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'check_id': self.check_id,
+            'name': self.name,
+            'status': self.status,
+            'timestamp': self.timestamp,
+            'resources_flagged': self.resources_flagged,
+            'estimated_monthly_savings': round(self.estimated_monthly_savings, 2),
+        }
+
+
+@dataclass
+class TrustedAdvisorSnapshot:
+    """Checks de custo com os resultados detalhados dos sinalizados"""
+    checks: Dict[str, Dict[str, Any]]
+    summaries: List[CheckSummary]
+    results: Dict[str, Dict[str, Any]]
+    downloaded: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def iter_recommendations(self) -> Iterator[Dict[str, Any]]:
+        """Uma recomendação por recurso sinalizado (todos, sem truncamento)"""
+        for summary in self.summaries:
+            result = self.results.get(summary.check_id)
+            if not result:
+                continue
+            columns = self.checks.get(summary.check_id, {}).get('metadata', []) or []
+            savings_index = next((i for i, c in enumerate(columns) if SAVINGS_COLUMN.search(c)), None)
+            resource_index = next((i for i, c in enumerate(columns) if RESOURCE_COLUMN.search(c)), None)
+            for resource in result.get('flaggedResources', []):
+                if resource.get('isSuppressed') or resource.get('status') == 'ok':
+                    continue
+                metadata = resource.get('metadata') or []
+
+                def column(index):
+                    return metadata[index] if index is not None and index < len(metadata) else None
+
+                resource_id = column(resource_index) or resource.get('resourceId') or 'N/A'
+                status = resource.get('status', summary.status)
+                yield {
+                    'type': 'TRUSTED_ADVISOR',
+                    'resource_id': resource_id,
+                    'title': summary.name,
+                    'description': f'{summary.name}: {resource_id}',
+                    'priority': 'HIGH' if status == 'error' else 'MEDIUM',
+                    'savings': round(_parse_amount(column(savings_index)), 2),
+                    'service': 'AWS Trusted Advisor',
+                    'region': resource.get('region') or 'global',
+                    'check_id': summary.check_id,
+                }
+
+    def to_recommendations(self) -> List[Dict[str, Any]]:
+        return list(self.iter_recommendations())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'checks': len(self.summaries),
+            'flagged_checks': sum(1 for s in self.summaries if s.flagged),
+            'resources_flagged': sum(s.resources_flagged for s in self.summaries),
+            'estimated_monthly_savings': round(sum(s.estimated_monthly_savings for s in self.summaries), 2),
+            'downloaded': len(self.downloaded),
+            'reused': len(self.reused),
+            'errors': len(self.errors),
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'summary': self.summary(),
+            'checks': [s.to_dict() for s in self.summaries],
+            'errors': self.errors,
+        }
+
+
+class TrustedAdvisorCollector:
+    """
+    Coletor paralelo de checks de custo do Trusted Advisor
+
+    Example:
+        collector = TrustedAdvisorCollector()
+        snapshot = collector.collect()
+        for recommendation in snapshot.iter_recommendations():
+            ...
+    """
+
+    def __init__(self, client=None, max_workers: int = MAX_WORKERS,
+                 categories: Sequence[str] = (COST_CATEGORY,), language: str = 'en'):
+        self._client = client
+        self.max_workers = max_workers
+        self.categories = tuple(categories)
+        self.language = language
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client('support', region_name='us-east-1')
+        return self._client
+
+    def get_checks(self, use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Checks das categorias configuradas, por id (cacheado por 24h)"""
+        cache = FinOpsCache()
+        cache_key = f"{CACHE_KEY}:checks:{self.language}:{','.join(self.categories)}"
+        if use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        response = self.client.describe_trusted_advisor_checks(language=self.language)
+        checks = {c['id']: c for c in response.get('checks', []) if c.get('category') in self.categories}
+        cache.set(cache_key, checks, ttl=CHECKS_TTL_SECONDS)
+        return checks
+
+    def get_summaries(self, checks: Dict[str, Dict[str, Any]]) -> List[CheckSummary]:
+        """Estado de todos os checks em lotes de SUMMARY_BATCH_SIZE"""
+        ids = list(checks)
+        summaries = []
+        for start in range(0, len(ids), SUMMARY_BATCH_SIZE):
+            response = self.client.describe_trusted_advisor_check_summaries(
+                checkIds=ids[start:start + SUMMARY_BATCH_SIZE])
+            for item in response.get('summaries', []):
+                cost = item.get('categorySpecificSummary', {}).get('costOptimizing', {})
+                summaries.append(CheckSummary(
+                    check_id=item['checkId'],
+                    name=checks.get(item['checkId'], {}).get('name', item['checkId']),
+                    status=item.get('status', ''),
+                    timestamp=item.get('timestamp', ''),
+                    resources_flagged=int(item.get('resourcesSummary', {}).get('resourcesFlagged', 0) or 0),
+                    estimated_monthly_savings=float(cost.get('estimatedMonthlySavings', 0) or 0)
+                ))
+        return summaries
+
+    def _download(self, summary: CheckSummary) -> Dict[str, Any]:
+        response = self.client.describe_trusted_advisor_check_result(
+            checkId=summary.check_id, language=self.language)
+        return response.get('result', {})
+
+    def collect(self, use_cache: bool = True) -> TrustedAdvisorSnapshot:
+        """
+        Estado de todos os checks e resultados dos sinalizados
+
+        Resultados já baixados para o mesmo (checkId, timestamp) são
+        reutilizados; os demais são baixados em paralelo.
+        """
+        started = time.perf_counter()
+        cache = FinOpsCache()
+        checks = self.get_checks(use_cache)
+        summaries = self.get_summaries(checks)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[CheckSummary] = []
+        reused: List[str] = []
+        for summary in summaries:
+            if not summary.flagged:
+                continue
+            cached = cache.get(f"{CACHE_KEY}:result:{summary.check_id}:{summary.timestamp}") if use_cache else None
+            if cached is not None:
+                results[summary.check_id] = cached
+                reused.append(summary.check_id)
+            else:
+                pending.append(summary)
+
+        errors: List[Dict[str, str]] = []
+
+        def download(summary: CheckSummary):
+            try:
+                return summary, self._download(summary), None
+            except ClientError as e:
+                return summary, None, e.response.get('Error', {}).get('Code', '') or str(e)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending)))) as executor:
+                for summary, result, error in executor.map(download, pending):
+                    if error is not None:
+                        logger.error(f"Erro ao obter resultado do check {summary.name}: {error}")
+                        errors.append({'check_id': summary.check_id, 'error': error})
+                        continue
+                    results[summary.check_id] = result
+                    cache.set(f"{CACHE_KEY}:result:{summary.check_id}:{summary.timestamp}", result,
+                              ttl=RESULT_TTL_SECONDS)
+
+        return TrustedAdvisorSnapshot(
+            checks=checks,
+            summaries=summaries,
+            results=results,
+            downloaded=[s.check_id for s in pending if s.check_id in results],
+            reused=reused,
+            errors=errors,
+            elapsed_seconds=time.perf_counter() - started
+        )
+
+    def refresh(self, check_ids: Optional[Sequence[str]] = None, max_age_seconds: int = 24 * 3600,
+                now: Optional[datetime] = None) -> Dict[str, str]:
+        """
+        Solicita refresh dos checks com resultado mais antigo que max_age_seconds
+
+        Checks não atualizáveis (ex.: atualizados automaticamente pela AWS)
+        são ignorados.
+
+        Returns:
+            Dicionário checkId -> status do refresh
+        """
+        checks = self.get_checks()
+        if check_ids is not None:
+            checks = {k: v for k, v in checks.items() if k in set(check_ids)}
+        now = now or datetime.now(timezone.utc)
+        statuses = {}
+        for summary in self.get_summaries(checks):
+            try:
+                refreshed = datetime.fromisoformat(summary.timestamp.replace('Z', '+00:00'))
+            except ValueError:
+                refreshed = None
+            if refreshed is not None and (now - refreshed).total_seconds() < max_age_seconds:
+                continue
+            try:
+                response = self.client.refresh_trusted_advisor_check(checkId=summary.check_id)
+                statuses[summary.check_id] = response.get('status', {}).get('status', 'enqueued')
+            except ClientError as e:
+                logger.info(f"Check {summary.name} não pode ser atualizado: {e}")
+        return statuses
+
+    def refresh_statuses(self, check_ids: Sequence[str]) -> Dict[str, str]:
+        """Status dos refreshes solicitados (none, enqueued, processing, success, abandoned)"""
+        if not check_ids:
+            return {}
+        response = self.client.describe_trusted_advisor_check_refresh_statuses(checkIds=list(check_ids))
+        return {s['checkId']: s.get('status', '') for s in response.get('statuses', [])}
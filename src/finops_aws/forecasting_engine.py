@@ -1,17 +1,31 @@
 """
 FinOps Forecasting Engine
 Previsões de custos baseadas em ML com detecção de anomalias
+
+BatchForecaster ajusta regressões lineares (OLS em forma fechada) de
+milhares de séries de uma vez em NumPy, sem um modelo por série e sem
+depender de scikit-learn (importação pesada no cold start do Lambda).
+
+ForecastEngine é o motor único usado por CostForecaster, KPICalculator e
+PredictiveOptimizationService: modelos vetorizados (tendência linear,
+perfil por dia da semana e Holt-Winters aditivo), backtest com origem
+móvel (MAPE e tempo de ajuste por modelo) e seleção automática por série.
+
+Design Patterns:
+- Strategy: Modelos de previsão intercambiáveis (fit_predict)
+- Template Method: Backtest e seleção comuns a todos os modelos
 """
 import json
 import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Try to import ML libraries with fallback
-SKLEARN_AVAILABLE = False
 NUMPY_AVAILABLE = False
 
 try:
@@ -19,24 +33,504 @@ try:
     NUMPY_AVAILABLE = True
 except Exception:
     np = None
-    logger.warning("numpy not available")
+    logger.warning("numpy not available - using simple forecasting")
 
-try:
-    from sklearn.linear_model import LinearRegression
-    from sklearn.preprocessing import StandardScaler
-    SKLEARN_AVAILABLE = True
-except Exception:
-    LinearRegression = None
-    StandardScaler = None
-    logger.warning("scikit-learn not available - using simple forecasting")
+MIN_HISTORY_DAYS = 7
+SEASON_LENGTH = 7
+DEFAULT_HISTORY_DAYS = 56
+
+
+@dataclass
+class BatchForecast:
+    """
+    Resultado vetorizado do BatchForecaster (uma linha por série)
+    
+    Arrays 1-D têm uma posição por série; forecast/lower/upper são
+    (séries × horizonte).
+    """
+    slopes: Any
+    intercepts: Any
+    residual_std: Any
+    observations: Any
+    forecast: Any
+    lower: Any
+    upper: Any
+    min_observations: int = MIN_HISTORY_DAYS
+    
+    @property
+    def valid(self) -> Any:
+        """Máscara das séries com histórico suficiente"""
+        return self.observations >= self.min_observations
+    
+    def total_forecast(self) -> Any:
+        """Soma das previsões das séries válidas, por dia"""
+        return self.forecast[self.valid].sum(axis=0)
+    
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """Resultado de uma série no formato de CostForecaster.forecast_service_cost"""
+        if not self.valid[index]:
+            return {
+                'status': 'insufficient_data',
+                'minimum_required_days': self.min_observations,
+                'forecast': None
+            }
+        forecast = self.forecast[index]
+        mean = float(forecast.mean())
+        std = float(self.residual_std[index])
+        slope = float(self.slopes[index])
+        return {
+            'status': 'success',
+            'method': 'linear_regression',
+            'forecast': forecast.tolist(),
+            'forecast_days': int(forecast.shape[0]),
+            'forecast_mean': mean,
+            'forecast_std': std,
+            'confidence_interval_95': {
+                'upper': mean + 1.96 * std,
+                'lower': max(0, mean - 1.96 * std)
+            },
+            'trend': 'increasing' if slope > 0 else 'decreasing',
+            'trend_rate': slope
+        }
+
+
+class BatchForecaster:
+    """
+    Regressão linear em lote sobre uma matriz (séries × dias)
+    
+    Séries mais curtas são alinhadas à direita com NaN à esquerda (o último
+    dia é o mesmo para todas). Slopes, interceptos, desvio dos resíduos e
+    intervalos de confiança saem de somas vetorizadas:
+    
+        slope = (n·Σty - Σt·Σy) / (n·Σt² - (Σt)²)
+        intercept = (Σy - slope·Σt) / n
+    
+    Example:
+        result = BatchForecaster().forecast(matrix, horizon=30)
+        result.total_forecast()
+    """
+    
+    def __init__(self, min_observations: int = MIN_HISTORY_DAYS, z: float = 1.96):
+        if np is None:
+            raise ImportError("numpy é necessário para BatchForecaster")
+        self.min_observations = min_observations
+        self.z = z
+    
+    @staticmethod
+    def to_matrix(series: Sequence[Sequence[float]]) -> Any:
+        """Empilha séries de tamanhos diferentes alinhando o último dia"""
+        width = max((len(values) for values in series), default=0)
+        matrix = np.full((len(series), width), np.nan)
+        for row, values in enumerate(series):
+            if len(values):
+                matrix[row, width - len(values):] = values
+        return matrix
+    
+    def forecast(self, history: Any, horizon: int = 30) -> BatchForecast:
+        """
+        Ajusta todas as séries e projeta horizon dias à frente
+        
+        Args:
+            history: Matriz (séries × dias) ou vetor de uma série; NaN = sem dado
+            horizon: Dias a prever
+        """
+        y = np.asarray(history, dtype=np.float64)
+        if y.ndim == 1:
+            y = y[np.newaxis, :]
+        days = y.shape[1]
+        
+        mask = ~np.isnan(y)
+        weights = mask.astype(np.float64)
+        values = np.where(mask, y, 0.0)
+        t = np.arange(days, dtype=np.float64)
+        
+        n = weights.sum(axis=1)
+        sum_t = weights @ t
+        sum_tt = weights @ (t * t)
+        sum_y = values.sum(axis=1)
+        sum_ty = values @ t
+        
+        denominator = n * sum_tt - sum_t * sum_t
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = np.where(denominator > 0, (n * sum_ty - sum_t * sum_y) / denominator, 0.0)
+            intercepts = np.where(n > 0, (sum_y - slopes * sum_t) / n, 0.0)
+        
+        # Σ(y - a - b·t)² = Σy² - 2a·Σy - 2b·Σty + n·a² + 2ab·Σt + b²·Σt²
+        sum_yy = np.einsum('ij,ij->i', values, values)
+        sse = (sum_yy - 2 * intercepts * sum_y - 2 * slopes * sum_ty + n * intercepts ** 2
+               + 2 * intercepts * slopes * sum_t + slopes ** 2 * sum_tt)
+        residual_std = np.sqrt(np.maximum(sse, 0.0) / np.maximum(n, 1.0))
+        
+        future = np.arange(days, days + horizon, dtype=np.float64)
+        forecast = intercepts[:, np.newaxis] + slopes[:, np.newaxis] * future
+        margin = (self.z * residual_std)[:, np.newaxis]
+        
+        return BatchForecast(
+            slopes=slopes,
+            intercepts=intercepts,
+            residual_std=residual_std,
+            observations=n.astype(np.int64),
+            forecast=forecast,
+            lower=np.maximum(forecast - margin, 0.0),
+            upper=forecast + margin,
+            min_observations=self.min_observations
+        )
+
+
+class LinearTrendModel:
+    """Tendência linear (OLS) sem sazonalidade"""
+    
+    name = 'linear_regression'
+    min_history = MIN_HISTORY_DAYS
+    
+    def fit_predict(self, history: Any, horizon: int) -> Tuple[Any, Any]:
+        """Retorna (previsão séries × horizonte, desvio dos resíduos por série)"""
+        result = BatchForecaster(min_observations=0).forecast(history, horizon)
+        return result.forecast, result.residual_std
+
+
+class DayOfWeekProfileModel:
+    """
+    Tendência linear + efeito aditivo por dia da semana
+    
+    Regressão com dummies da posição no ciclo, contada a partir do último
+    dia (todas as séries terminam no mesmo dia). A matriz de projeto é a
+    mesma para todas as séries, então um único lstsq ajusta a matriz toda.
+    """
+    
+    name = 'day_of_week'
+    
+    def __init__(self, season_length: int = SEASON_LENGTH):
+        self.season_length = season_length
+        self.min_history = 2 * season_length
+    
+    def _design(self, steps: Any, days: int) -> Any:
+        phase = (steps - days) % self.season_length
+        dummies = phase[:, np.newaxis] == np.arange(1, self.season_length)
+        return np.column_stack([np.ones(len(steps)), steps, dummies.astype(np.float64)])
+    
+    def fit_predict(self, history: Any, horizon: int) -> Tuple[Any, Any]:
+        """Retorna (previsão séries × horizonte, desvio dos resíduos por série)"""
+        y = np.asarray(history, dtype=np.float64)
+        days = y.shape[1]
+        design = self._design(np.arange(days, dtype=np.float64), days)
+        
+        coefficients = np.linalg.lstsq(design, y.T, rcond=None)[0]
+        residuals = y - (design @ coefficients).T
+        residual_std = np.sqrt((residuals ** 2).mean(axis=1))
+        
+        future = self._design(np.arange(days, days + horizon, dtype=np.float64), days)
+        return (future @ coefficients).T, residual_std
+
+
+class HoltWintersModel:
+    """
+    Holt-Winters aditivo (nível, tendência e sazonalidade semanal)
+    
+    A recursão percorre os dias uma vez, atualizando todas as séries em
+    paralelo; o desvio vem dos erros de previsão um passo à frente.
+    """
+    
+    name = 'holt_winters'
+    
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        beta: float = 0.05,
+        gamma: float = 0.3,
+        season_length: int = SEASON_LENGTH
+    ):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.season_length = season_length
+        self.min_history = 2 * season_length
+    
+    def fit_predict(self, history: Any, horizon: int) -> Tuple[Any, Any]:
+        """Retorna (previsão séries × horizonte, desvio dos resíduos por série)"""
+        y = np.asarray(history, dtype=np.float64)
+        days = y.shape[1]
+        m = self.season_length
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+        
+        level = y[:, :m].mean(axis=1)
+        trend = (y[:, m:2 * m].mean(axis=1) - level) / m
+        season = y[:, :m] - level[:, np.newaxis]
+        sse = np.zeros(y.shape[0])
+        
+        for t in range(days):
+            observed = y[:, t]
+            seasonal = season[:, t % m]
+            sse += (observed - (level + trend + seasonal)) ** 2
+            new_level = alpha * (observed - seasonal) + (1 - alpha) * (level + trend)
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            season[:, t % m] = gamma * (observed - new_level) + (1 - gamma) * seasonal
+            level = new_level
+        
+        steps = np.arange(1, horizon + 1)
+        forecast = (level[:, np.newaxis] + trend[:, np.newaxis] * steps
+                    + season[:, (days - 1 + steps) % m])
+        return forecast, np.sqrt(sse / max(days, 1))
+
+
+def _mape(actual: Any, forecast: Any) -> Any:
+    """
+    MAPE por série (fração); dias com custo zero ficam fora da média
+    
+    Séries sem nenhum dia com custo usam o erro absoluto médio.
+    """
+    errors = np.abs(actual - forecast)
+    scale = np.abs(actual)
+    nonzero = scale > 1e-9
+    ape = np.divide(errors, scale, out=np.zeros_like(errors), where=nonzero)
+    counts = nonzero.sum(axis=1)
+    return np.where(counts > 0, ape.sum(axis=1) / np.maximum(counts, 1), errors.mean(axis=1))
+
+
+@dataclass
+class BacktestReport:
+    """Resultado do backtest com origem móvel"""
+    models: List[str]
+    mape: Any
+    fit_seconds: Dict[str, float]
+    folds: int
+    horizon: int
+    
+    def best(self) -> Any:
+        """Índice do modelo de menor MAPE por série (o primeiro se nenhum foi avaliado)"""
+        return np.argmin(self.mape, axis=1)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        scored = np.isfinite(self.mape).any(axis=1)
+        selected = np.bincount(self.best()[scored], minlength=len(self.models))
+        models = {}
+        for j, name in enumerate(self.models):
+            scores = self.mape[:, j]
+            scores = scores[np.isfinite(scores)]
+            models[name] = {
+                'mape_percent': round(float(scores.mean()) * 100, 2) if scores.size else None,
+                'series_evaluated': int(scores.size),
+                'fit_seconds': round(self.fit_seconds.get(name, 0.0), 4),
+                'selected': int(selected[j])
+            }
+        return {
+            'folds': self.folds,
+            'horizon': self.horizon,
+            'series': int(len(self.mape)),
+            'models': models
+        }
+
+
+@dataclass
+class EngineForecast:
+    """
+    Previsões do ForecastEngine (uma linha por série)
+    
+    models traz o modelo escolhido de cada série ('' quando o histórico é
+    insuficiente) e mape o erro de backtest desse modelo (inf sem backtest).
+    """
+    forecast: Any
+    lower: Any
+    upper: Any
+    residual_std: Any
+    slopes: Any
+    observations: Any
+    models: Any
+    mape: Any
+    backtest: Optional[BacktestReport] = None
+    min_observations: int = MIN_HISTORY_DAYS
+    
+    @property
+    def valid(self) -> Any:
+        """Máscara das séries com histórico suficiente"""
+        return self.observations >= self.min_observations
+    
+    def total_forecast(self) -> Any:
+        """Soma das previsões das séries válidas, por dia"""
+        return self.forecast[self.valid].sum(axis=0)
+    
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """Resultado de uma série no formato de CostForecaster.forecast_service_cost"""
+        if not self.valid[index]:
+            return {
+                'status': 'insufficient_data',
+                'minimum_required_days': self.min_observations,
+                'forecast': None
+            }
+        forecast = self.forecast[index]
+        mean = float(forecast.mean())
+        std = float(self.residual_std[index])
+        slope = float(self.slopes[index])
+        mape = float(self.mape[index])
+        return {
+            'status': 'success',
+            'method': self.models[index],
+            'forecast': forecast.tolist(),
+            'forecast_days': int(forecast.shape[0]),
+            'forecast_mean': mean,
+            'forecast_std': std,
+            'confidence_interval_95': {
+                'upper': mean + 1.96 * std,
+                'lower': max(0, mean - 1.96 * std)
+            },
+            'trend': 'increasing' if slope > 0 else 'decreasing',
+            'trend_rate': slope,
+            'backtest_mape_percent': round(mape * 100, 2) if np.isfinite(mape) else None
+        }
+
+
+class ForecastEngine:
+    """
+    Motor de previsão com seleção automática de modelo por série
+    
+    Para cada série, o backtest com origem móvel (folds janelas de
+    horizon dias no fim do histórico) mede o MAPE de cada modelo; o de menor
+    erro é reajustado no histórico completo. Séries com o mesmo tamanho são
+    processadas juntas, então cada modelo roda uma vez por grupo.
+    
+    Example:
+        result = ForecastEngine().forecast(matrix, horizon=30)
+        result.models, result.backtest.to_dict()
+    """
+    
+    def __init__(
+        self,
+        models: Optional[List[Any]] = None,
+        backtest_folds: int = 3,
+        backtest_horizon: int = SEASON_LENGTH,
+        z: float = 1.96,
+        min_observations: int = MIN_HISTORY_DAYS
+    ):
+        if np is None:
+            raise ImportError("numpy é necessário para ForecastEngine")
+        self.models = models or [LinearTrendModel(), DayOfWeekProfileModel(), HoltWintersModel()]
+        self.backtest_folds = backtest_folds
+        self.backtest_horizon = backtest_horizon
+        self.z = z
+        self.min_observations = min_observations
+    
+    def backtest(
+        self,
+        history: Any,
+        horizon: Optional[int] = None,
+        folds: Optional[int] = None
+    ) -> BacktestReport:
+        """
+        Backtest com origem móvel sobre uma matriz densa (séries × dias)
+        
+        O fold k treina até T - horizon·(folds - k) e avalia os horizon dias
+        seguintes. Modelos sem histórico mínimo no corte ficam sem nota (inf).
+        """
+        y = np.asarray(history, dtype=np.float64)
+        if y.ndim == 1:
+            y = y[np.newaxis, :]
+        horizon = horizon or self.backtest_horizon
+        folds = self.backtest_folds if folds is None else folds
+        series, days = y.shape
+        
+        error_sum = np.zeros((series, len(self.models)))
+        evaluated = np.zeros(len(self.models))
+        fit_seconds = {model.name: 0.0 for model in self.models}
+        
+        for fold in range(folds):
+            cut = days - horizon * (folds - fold)
+            if cut < self.min_observations:
+                continue
+            train, actual = y[:, :cut], y[:, cut:cut + horizon]
+            for j, model in enumerate(self.models):
+                if cut < model.min_history:
+                    continue
+                started = time.perf_counter()
+                forecast, _ = model.fit_predict(train, horizon)
+                fit_seconds[model.name] += time.perf_counter() - started
+                error_sum[:, j] += _mape(actual, forecast)
+                evaluated[j] += 1
+        
+        mape = np.where(evaluated > 0, error_sum / np.maximum(evaluated, 1), np.inf)
+        return BacktestReport(
+            models=[model.name for model in self.models],
+            mape=mape,
+            fit_seconds=fit_seconds,
+            folds=folds,
+            horizon=horizon
+        )
+    
+    def forecast(self, history: Any, horizon: int = 30) -> EngineForecast:
+        """
+        Prevê todas as séries escolhendo o melhor modelo de cada uma
+        
+        Args:
+            history: Matriz (séries × dias) alinhada ao último dia, NaN à
+                esquerda nas séries mais curtas (ver BatchForecaster.to_matrix),
+                ou vetor de uma série. NaN internos contam como custo zero.
+            horizon: Dias a prever
+        """
+        y = np.asarray(history, dtype=np.float64)
+        if y.ndim == 1:
+            y = y[np.newaxis, :]
+        series, days = y.shape
+        
+        observed = ~np.isnan(y)
+        lengths = np.where(observed.any(axis=1), days - np.argmax(observed, axis=1), 0)
+        
+        forecast = np.zeros((series, horizon))
+        residual_std = np.zeros(series)
+        slopes = np.zeros(series)
+        chosen = np.full(series, '', dtype=object)
+        mape = np.full(series, np.inf)
+        report = BacktestReport(
+            models=[model.name for model in self.models],
+            mape=np.full((series, len(self.models)), np.inf),
+            fit_seconds={model.name: 0.0 for model in self.models},
+            folds=self.backtest_folds,
+            horizon=self.backtest_horizon
+        )
+        
+        for length in np.unique(lengths):
+            if length < self.min_observations:
+                continue
+            rows = np.flatnonzero(lengths == length)
+            dense = np.nan_to_num(y[rows, days - length:])
+            
+            group = self.backtest(dense)
+            report.mape[rows] = group.mape
+            for name, seconds in group.fit_seconds.items():
+                report.fit_seconds[name] += seconds
+            best = group.best()
+            
+            slopes[rows] = BatchForecaster(min_observations=0).forecast(dense, 0).slopes
+            for j in np.unique(best):
+                subset = best == j
+                model = self.models[j]
+                values, std = model.fit_predict(dense[subset], horizon)
+                forecast[rows[subset]] = values
+                residual_std[rows[subset]] = std
+                chosen[rows[subset]] = model.name
+                mape[rows[subset]] = group.mape[subset, j]
+        
+        forecast = np.maximum(forecast, 0.0)
+        margin = (self.z * residual_std)[:, np.newaxis]
+        return EngineForecast(
+            forecast=forecast,
+            lower=np.maximum(forecast - margin, 0.0),
+            upper=forecast + margin,
+            residual_std=residual_std,
+            slopes=slopes,
+            observations=lengths,
+            models=chosen,
+            mape=mape,
+            backtest=report,
+            min_observations=self.min_observations
+        )
 
 
 class CostForecaster:
     """Engine de previsão de custos com ML"""
     
-    def __init__(self, history_days: int = 30):
+    def __init__(self, history_days: int = 30, engine: Optional[ForecastEngine] = None):
         self.history_days = history_days
-        self.ml_available = SKLEARN_AVAILABLE
+        self.ml_available = NUMPY_AVAILABLE
+        self.engine = engine or (ForecastEngine() if NUMPY_AVAILABLE else None)
     
     def forecast_service_cost(self, historical_costs: List[float], forecast_days: int = 30) -> Dict[str, Any]:
         """
@@ -49,56 +543,24 @@ class CostForecaster:
         Returns:
             Dicionário com previsões e métricas
         """
-        if not historical_costs or len(historical_costs) < 7:
+        if not historical_costs or len(historical_costs) < MIN_HISTORY_DAYS:
             return {
                 'status': 'insufficient_data',
-                'minimum_required_days': 7,
+                'minimum_required_days': MIN_HISTORY_DAYS,
                 'forecast': None
             }
         
         if self.ml_available:
-            return self._forecast_with_sklearn(historical_costs, forecast_days)
+            return self._forecast_with_engine(historical_costs, forecast_days)
         else:
             return self._forecast_simple(historical_costs, forecast_days)
     
-    def _forecast_with_sklearn(self, historical_costs: List[float], forecast_days: int) -> Dict[str, Any]:
-        """Previsão com scikit-learn - Linear Regression"""
-        if not SKLEARN_AVAILABLE or np is None or LinearRegression is None:
-            return self._forecast_simple(historical_costs, forecast_days)
-        
+    def _forecast_with_engine(self, historical_costs: List[float], forecast_days: int) -> Dict[str, Any]:
+        """Previsão pelo ForecastEngine (modelo escolhido por backtest)"""
         try:
-            X = np.arange(len(historical_costs)).reshape(-1, 1)
-            y = np.array(historical_costs)
-            
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            future_X = np.arange(len(historical_costs), len(historical_costs) + forecast_days).reshape(-1, 1)
-            forecast = model.predict(future_X)
-            
-            # Calcula intervalo de confiança
-            residuals = y - model.predict(X)
-            std_error = np.std(residuals)
-            
-            forecast_result = {
-                'status': 'success',
-                'method': 'linear_regression',
-                'forecast': forecast.tolist(),
-                'forecast_days': forecast_days,
-                'forecast_mean': float(np.mean(forecast)),
-                'forecast_std': float(std_error),
-                'confidence_interval_95': {
-                    'upper': float(np.mean(forecast) + 1.96 * std_error),
-                    'lower': max(0, float(np.mean(forecast) - 1.96 * std_error))
-                },
-                'trend': 'increasing' if model.coef_[0] > 0 else 'decreasing',
-                'trend_rate': float(model.coef_[0])
-            }
-            
-            return forecast_result
-        
+            return self.engine.forecast(historical_costs, forecast_days).to_dict(0)
         except Exception as e:
-            logger.error(f"sklearn forecasting error: {e}")
+            logger.error(f"Engine forecasting error: {e}")
             return self._forecast_simple(historical_costs, forecast_days)
     
     def _forecast_simple(self, historical_costs: List[float], forecast_days: int) -> Dict[str, Any]:
@@ -199,7 +661,36 @@ class CostForecaster:
         }
     
     def forecast_aggregated_costs(self, service_costs: Dict[str, List[float]], forecast_days: int = 30) -> Dict[str, Any]:
-        """Prevê custos agregados por serviço"""
+        """
+        Prevê custos agregados por serviço
+        
+        Com numpy, todas as séries passam de uma vez pelo ForecastEngine
+        (cada uma com o modelo escolhido no backtest); sem numpy, cada série
+        usa a média móvel.
+        """
+        if not self.ml_available:
+            return self._forecast_aggregated_simple(service_costs, forecast_days)
+        
+        names = list(service_costs)
+        if not names:
+            return self._forecast_aggregated_simple(service_costs, forecast_days)
+        result = self.engine.forecast(
+            BatchForecaster.to_matrix([service_costs[name] for name in names]), forecast_days
+        )
+        total_forecast = result.total_forecast()
+        
+        return {
+            'total_forecast': total_forecast.tolist(),
+            'total_forecast_mean': float(total_forecast.mean()) if forecast_days else 0,
+            'service_forecasts': {
+                name: result.to_dict(i) for i, name in enumerate(names) if result.valid[i]
+            },
+            'model_selection': result.backtest.to_dict(),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    def _forecast_aggregated_simple(self, service_costs: Dict[str, List[float]], forecast_days: int) -> Dict[str, Any]:
+        """Agregação série a série (fallback sem numpy)"""
         forecasts = {}
         total_forecast = [0.0] * forecast_days
         
@@ -212,8 +703,6 @@ class CostForecaster:
                                      for i in range(forecast_days)]
         
         total_mean = sum(total_forecast) / len(total_forecast) if total_forecast else 0
-        if np is not None:
-            total_mean = float(np.mean(total_forecast))
         
         return {
             'total_forecast': total_forecast,
@@ -5,18 +5,21 @@ Divide os 252 servicos AWS em batches para processamento paralelo
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import boto3
 from botocore.exceptions import ClientError
 
 from .utils.logger import setup_logger
 from .core.factories import ServiceFactory
+from .core.health_probe import HealthProbe, get_skipped_services
 
 logger = setup_logger(__name__)
 
 BATCH_SIZE = int(os.getenv('BATCH_SIZE', '20'))
 S3_BUCKET = os.getenv('REPORTS_BUCKET_NAME', 'finops-aws-reports')
 STATE_PREFIX = os.getenv('STATE_PREFIX', 'state/')
+HEALTH_PROBE_ENABLED = os.getenv('HEALTH_PROBE_ENABLED', 'false').lower() == 'true'
+HEALTH_PROBE_DEADLINE_SECONDS = float(os.getenv('HEALTH_PROBE_DEADLINE_SECONDS', '20'))
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -42,6 +45,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         all_services = _get_all_services()
         enabled_services = _filter_services(all_services, input_params)
+        enabled_services, skipped_services = _skip_unavailable_services(enabled_services, input_params)
         
         batches = _create_batches(enabled_services, BATCH_SIZE)
         
@@ -50,6 +54,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'start_time': start_time,
             'total_services': len(enabled_services),
             'total_batches': len(batches),
+            'skipped_services': skipped_services,
             'batch_size': BATCH_SIZE,
             'status': 'RUNNING',
             'input_params': input_params
@@ -64,6 +69,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'start_time': start_time,
             'total_services': len(enabled_services),
             'total_batches': len(batches),
+            'skipped_services': skipped_services,
             'batches': batches
         }
         
@@ -195,6 +201,45 @@ def _filter_services(services: List[Dict[str, Any]], params: Dict[str, Any]) ->
     return filtered
 
 
+def _skip_unavailable_services(
+    services: List[Dict[str, Any]],
+    params: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Remove servicos sabidamente negados ou nao assinados na conta
+    
+    Com HEALTH_PROBE_ENABLED (ou probe_services=True nos parametros), sonda
+    em paralelo os servicos do ServiceFactory ainda sem resultado valido;
+    os resultados ficam persistidos (S3) e as execucoes seguintes so os
+    leem. Sem probe, usa apenas os resultados ja conhecidos. Desativado
+    com include_unavailable=True nos parametros de entrada.
+    
+    Returns:
+        Tupla (servicos mantidos, nomes pulados)
+    """
+    if params.get('include_unavailable'):
+        return services, []
+    account_id = params.get('account_id')
+    try:
+        if params.get('probe_services', HEALTH_PROBE_ENABLED):
+            names = [s['name'] for s in services]
+            probe = HealthProbe.from_service_factory(
+                ServiceFactory(), names=names, account_id=account_id,
+                deadline_seconds=HEALTH_PROBE_DEADLINE_SECONDS
+            )
+            unavailable = probe.run(names).skipped()
+        else:
+            unavailable = get_skipped_services(account_id)
+    except Exception as e:
+        logger.warning(f"Health probe indisponivel: {e}")
+        return services, []
+    kept = [s for s in services if s['name'] not in unavailable]
+    skipped = sorted(s['name'] for s in services if s['name'] in unavailable)
+    if skipped:
+        logger.info(f"{len(skipped)} servicos pulados (sem permissao ou nao assinados): {skipped}")
+    return kept, skipped
+
+
 def _create_batches(services: List[Dict[str, Any]], batch_size: int) -> List[Dict[str, Any]]:
     """
     Cria batches de servicos para processamento paralelo
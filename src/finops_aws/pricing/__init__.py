@@ -0,0 +1,28 @@
+"""
+FinOps AWS Pricing Module
+
+Catálogo de preços AWS offline (Price List bulk offer files):
+- PriceIndex: índice memory-mapped com lookup O(1) por serviço, região e
+  atributos do SKU, com refresh incremental por versão de oferta
+- Leitura dos arquivos de oferta em entradas normalizadas
+- InstanceCatalog: especificações e preços dos tipos candidatos a
+  rightsizing (EC2, RDS, ElastiCache, Fargate)
+"""
+
+from .instance_catalog import CandidateSet, InstanceCatalog, InstanceSpec, fargate_task_name
+from .offers import OfferShard, PriceEntry, read_offer_file
+from .price_index import PriceIndex, PriceQuote, get_price_index, set_price_index
+
+__all__ = [
+    'CandidateSet',
+    'InstanceCatalog',
+    'InstanceSpec',
+    'fargate_task_name',
+    'OfferShard',
+    'PriceEntry',
+    'read_offer_file',
+    'PriceIndex',
+    'PriceQuote',
+    'get_price_index',
+    'set_price_index',
+]
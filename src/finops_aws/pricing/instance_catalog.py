@@ -0,0 +1,216 @@
+"""
+Instance Catalog
+
+Especificações (vCPU, memória, rede) dos tipos candidatos a rightsizing e
+seus preços por hora, em arrays prontos para o casamento vetorizado:
+
+- EC2: famílias de uso geral, computação e memória (x86 e Graviton) e
+  burstable t3
+- RDS (db.*) e ElastiCache (cache.*): mesmos tamanhos das famílias EC2
+- ECS/Fargate: combinações válidas de CPU e memória por tarefa
+
+Preços vêm do PriceIndex (Price List ou referência); tipos sem preço no
+índice usam a estimativa por vCPU da família × multiplicador do serviço.
+
+Design Patterns:
+- Flyweight: Especificações compartilhadas entre EC2, RDS e ElastiCache
+- Repository: Preços dos candidatos cacheados por serviço/região/engine
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .price_index import DEFAULT_REGION, PriceIndex, get_price_index
+
+EC2 = 'ec2'
+RDS = 'rds'
+ELASTICACHE = 'elasticache'
+ECS = 'ecs'
+
+SERVICE_PREFIXES = {EC2: '', RDS: 'db.', ELASTICACHE: 'cache.'}
+
+# Multiplicador aproximado sobre o preço EC2 Linux (estimativa sem índice)
+SERVICE_PRICE_MULTIPLIER = {EC2: 1.0, RDS: 1.8, ELASTICACHE: 1.6}
+
+# Família -> (GiB por vCPU, preço por vCPU-hora us-east-1 Linux, arquitetura)
+FAMILIES: Dict[str, Tuple[float, float, str]] = {
+    'm5': (4.0, 0.048, 'x86_64'),
+    'm6i': (4.0, 0.048, 'x86_64'),
+    'm6g': (4.0, 0.0385, 'arm64'),
+    'c5': (2.0, 0.0425, 'x86_64'),
+    'c6i': (2.0, 0.0425, 'x86_64'),
+    'c6g': (2.0, 0.034, 'arm64'),
+    'r5': (8.0, 0.063, 'x86_64'),
+    'r6i': (8.0, 0.063, 'x86_64'),
+    'r6g': (8.0, 0.0504, 'arm64'),
+}
+
+SIZES = {'large': 2, 'xlarge': 4, '2xlarge': 8, '4xlarge': 16, '8xlarge': 32,
+         '12xlarge': 48, '16xlarge': 64, '24xlarge': 96}
+
+# Banda base aproximada (Gbps) por número de vCPUs
+NETWORK_GBPS = {2: 0.75, 4: 1.25, 8: 2.5, 16: 5.0, 32: 10.0, 48: 12.5, 64: 20.0, 96: 25.0}
+
+# Burstable: tipo -> (vCPU, GiB, Gbps base, preço por hora)
+BURSTABLE = {
+    't3.micro': (2, 1.0, 0.064, 0.0104),
+    't3.small': (2, 2.0, 0.128, 0.0208),
+    't3.medium': (2, 4.0, 0.256, 0.0416),
+    't3.large': (2, 8.0, 0.512, 0.0832),
+    't3.xlarge': (4, 16.0, 1.024, 0.1664),
+    't3.2xlarge': (8, 32.0, 2.048, 0.3328),
+}
+
+# Fargate (us-east-1 Linux/x86): preço por vCPU-hora e por GB-hora
+FARGATE_VCPU_HOUR = 0.04048
+FARGATE_GB_HOUR = 0.004445
+FARGATE_SIZES: Dict[float, Tuple[float, ...]] = {
+    0.25: (0.5, 1.0, 2.0),
+    0.5: (1.0, 2.0, 3.0, 4.0),
+    1.0: tuple(float(gb) for gb in range(2, 9)),
+    2.0: tuple(float(gb) for gb in range(4, 17)),
+    4.0: tuple(float(gb) for gb in range(8, 31)),
+    8.0: tuple(float(gb) for gb in range(16, 61, 4)),
+    16.0: tuple(float(gb) for gb in range(32, 121, 8)),
+}
+
+
+@dataclass(frozen=True)
+class InstanceSpec:
+    """Capacidade de um tipo de instância (ou tamanho de tarefa Fargate)"""
+    name: str
+    vcpu: float
+    memory_gib: float
+    network_gbps: float
+    family: str
+    arch: str = 'x86_64'
+    burstable: bool = False
+    hourly_estimate: float = 0.0
+
+
+@dataclass
+class CandidateSet:
+    """Tipos candidatos de um serviço em arrays (uma posição por tipo)"""
+    names: List[str]
+    vcpu: np.ndarray
+    memory_gib: np.ndarray
+    network_gbps: np.ndarray
+    price: np.ndarray
+    arch: np.ndarray
+    burstable: np.ndarray
+    family: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def index(self, name: str) -> int:
+        try:
+            return self.names.index(name)
+        except ValueError:
+            return -1
+
+
+def fargate_task_name(vcpu: float, memory_gib: float) -> str:
+    """Nome canônico do tamanho de tarefa (ex.: '0.5vCPU-1GB')"""
+    return f"{vcpu:g}vCPU-{memory_gib:g}GB"
+
+
+def _reference_specs() -> List[InstanceSpec]:
+    specs = []
+    for family, (gib_per_vcpu, vcpu_price, arch) in FAMILIES.items():
+        for size, vcpu in SIZES.items():
+            specs.append(InstanceSpec(
+                name=f"{family}.{size}", vcpu=vcpu, memory_gib=vcpu * gib_per_vcpu,
+                network_gbps=NETWORK_GBPS[vcpu], family=family, arch=arch,
+                hourly_estimate=round(vcpu * vcpu_price, 4)
+            ))
+    for name, (vcpu, memory, network, price) in BURSTABLE.items():
+        specs.append(InstanceSpec(name, vcpu, memory, network, 't3', burstable=True, hourly_estimate=price))
+    return specs
+
+
+def _fargate_specs() -> List[InstanceSpec]:
+    return [
+        InstanceSpec(
+            name=fargate_task_name(vcpu, memory), vcpu=vcpu, memory_gib=memory,
+            network_gbps=float('inf'), family='fargate',
+            hourly_estimate=round(vcpu * FARGATE_VCPU_HOUR + memory * FARGATE_GB_HOUR, 6)
+        )
+        for vcpu, memories in FARGATE_SIZES.items() for memory in memories
+    ]
+
+
+class InstanceCatalog:
+    """
+    Especificações e preços dos tipos candidatos por serviço
+
+    Example:
+        catalog = InstanceCatalog()
+        candidates = catalog.candidates('rds', 'us-east-1', engine='MySQL')
+        spec = catalog.spec('rds', 'db.m5.xlarge')
+    """
+
+    def __init__(
+        self,
+        specs: Optional[Iterable[InstanceSpec]] = None,
+        price_index: Optional[PriceIndex] = None
+    ):
+        self._specs = {spec.name: spec for spec in (specs if specs is not None else _reference_specs())}
+        self._fargate = {spec.name: spec for spec in _fargate_specs()}
+        self._price_index = price_index
+        self._candidates: Dict[Tuple[str, str, str], CandidateSet] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def price_index(self) -> PriceIndex:
+        return self._price_index or get_price_index()
+
+    def spec(self, service: str, type_name: str) -> Optional[InstanceSpec]:
+        """Especificação do tipo atual (db./cache. removidos; ECS pelo nome da tarefa)"""
+        if service == ECS:
+            return self._fargate.get(type_name)
+        prefix = SERVICE_PREFIXES.get(service, '')
+        if prefix and type_name.startswith(prefix):
+            type_name = type_name[len(prefix):]
+        return self._specs.get(type_name)
+
+    def type_name(self, service: str, spec: InstanceSpec) -> str:
+        return spec.name if service == ECS else f"{SERVICE_PREFIXES.get(service, '')}{spec.name}"
+
+    def _price(self, service: str, spec: InstanceSpec, region: str, engine: str) -> float:
+        if service == ECS:
+            return spec.hourly_estimate
+        estimate = spec.hourly_estimate * SERVICE_PRICE_MULTIPLIER.get(service, 1.0)
+        name = self.type_name(service, spec)
+        index = self.price_index
+        if service == RDS:
+            return index.rds_hourly(name, region, engine=engine or 'MySQL', default=estimate)
+        if service == ELASTICACHE:
+            return index.elasticache_hourly(name, region, engine=engine or 'Redis', default=estimate)
+        return index.ec2_hourly(name, region, default=estimate)
+
+    def candidates(self, service: str, region: str = DEFAULT_REGION, engine: str = '') -> CandidateSet:
+        """Candidatos do serviço com preço por hora na região (cacheado)"""
+        key = (service, region, engine)
+        with self._lock:
+            cached = self._candidates.get(key)
+        if cached is not None:
+            return cached
+
+        specs = list(self._fargate.values() if service == ECS else self._specs.values())
+        result = CandidateSet(
+            names=[self.type_name(service, spec) for spec in specs],
+            vcpu=np.array([spec.vcpu for spec in specs], dtype=np.float64),
+            memory_gib=np.array([spec.memory_gib for spec in specs], dtype=np.float64),
+            network_gbps=np.array([spec.network_gbps for spec in specs], dtype=np.float64),
+            price=np.array([self._price(service, spec, region, engine) for spec in specs], dtype=np.float64),
+            arch=np.array([spec.arch for spec in specs]),
+            burstable=np.array([spec.burstable for spec in specs]),
+            family=np.array([spec.family for spec in specs])
+        )
+        with self._lock:
+            self._candidates[key] = result
+        return result
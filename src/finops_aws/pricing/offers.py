@@ -0,0 +1,201 @@
+"""
+AWS Price List Offer Files
+
+Leitura dos arquivos bulk de oferta da AWS Price List (JSON, um por
+serviço e região), baixados previamente de:
+
+    https://pricing.us-east-1.amazonaws.com/offers/v1.0/aws/<offerCode>/current/<region>/index.json
+
+Cada produto On-Demand relevante vira uma entrada (serviço, região,
+atributos normalizados, preço em USD, unidade). Só os atributos que
+identificam o SKU para as estimativas do FinOps entram na chave.
+
+Design Patterns:
+- Strategy: Atributos de chave e filtros configurados por oferta
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Atributos da oferta -> nome normalizado na chave do índice
+ATTRIBUTE_NAMES = {
+    'instanceType': 'instance_type',
+    'operatingSystem': 'os',
+    'tenancy': 'tenancy',
+    'volumeApiName': 'volume_type',
+    'volumeType': 'volume_type',
+    'databaseEngine': 'engine',
+    'cacheEngine': 'engine',
+    'deploymentOption': 'deployment',
+    'group': 'group',
+}
+
+# Família de produto -> atributos que compõem a chave, por oferta
+OFFER_ATTRIBUTES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    'AmazonEC2': {
+        'Compute Instance': ('instanceType', 'operatingSystem', 'tenancy'),
+        'Storage': ('volumeApiName',),
+    },
+    'AmazonRDS': {
+        'Database Instance': ('instanceType', 'databaseEngine', 'deploymentOption'),
+        'Database Storage': ('volumeType', 'databaseEngine', 'deploymentOption'),
+    },
+    'AmazonElastiCache': {
+        'Cache Instance': ('instanceType', 'cacheEngine'),
+    },
+    'AmazonDynamoDB': {
+        'Provisioned IOPS': ('group',),
+        'Database Storage': ('volumeType',),
+    },
+}
+
+# Produtos descartados (capacidade reservada/não usada, BYOL, software pré-instalado)
+OFFER_FILTERS: Dict[str, Dict[str, str]] = {
+    'AmazonEC2': {'preInstalledSw': 'NA', 'capacitystatus': 'Used'},
+}
+EXCLUDED_LICENSE = 'bring your own license'
+
+
+@dataclass
+class PriceEntry:
+    """Preço On-Demand de um SKU"""
+    service: str
+    region: str
+    attributes: Dict[str, str]
+    price: float
+    unit: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'service': self.service,
+            'region': self.region,
+            'attributes': self.attributes,
+            'price': self.price,
+            'unit': self.unit
+        }
+
+
+@dataclass
+class OfferShard:
+    """Entradas de um arquivo de oferta (serviço × região) e sua versão"""
+    offer_code: str
+    region: str
+    version: str
+    entries: List[PriceEntry] = field(default_factory=list)
+
+    @property
+    def shard_id(self) -> str:
+        return f"{self.offer_code}__{self.region}"
+
+
+def normalize_attributes(attributes: Dict[str, Any]) -> Dict[str, str]:
+    """Atributos em minúsculas com nomes normalizados (instanceType -> instance_type)"""
+    return {
+        ATTRIBUTE_NAMES.get(name, name): str(value).strip().lower()
+        for name, value in attributes.items()
+        if value is not None and str(value) != ''
+    }
+
+
+def offer_version(offer: Dict[str, Any], raw: Optional[bytes] = None) -> str:
+    """Versão publicada da oferta (ou hash do conteúdo, se ausente)"""
+    version = offer.get('version')
+    if version:
+        return str(version)
+    return hashlib.sha256(raw or json.dumps(offer, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _on_demand_price(terms: Dict[str, Any]) -> Optional[Tuple[float, str]]:
+    """Primeira faixa (beginRange 0) do termo On-Demand em USD"""
+    for term in terms.values():
+        for dimension in term.get('priceDimensions', {}).values():
+            if str(dimension.get('beginRange', '0')) not in ('0', '0.0'):
+                continue
+            usd = dimension.get('pricePerUnit', {}).get('USD')
+            if usd is None:
+                continue
+            return float(usd), dimension.get('unit', '')
+    return None
+
+
+def iter_offer_entries(offer: Dict[str, Any]) -> Iterator[PriceEntry]:
+    """Entradas de preço de uma oferta já carregada"""
+    offer_code = offer.get('offerCode', '')
+    families = OFFER_ATTRIBUTES.get(offer_code, {})
+    filters = OFFER_FILTERS.get(offer_code, {})
+    on_demand = offer.get('terms', {}).get('OnDemand', {})
+
+    for sku, product in offer.get('products', {}).items():
+        key_attributes = families.get(product.get('productFamily', ''))
+        if not key_attributes:
+            continue
+        attributes = product.get('attributes', {})
+        if any(attributes.get(name, expected) != expected for name, expected in filters.items()):
+            continue
+        if str(attributes.get('licenseModel', '')).lower() == EXCLUDED_LICENSE:
+            continue
+        if any(name not in attributes for name in key_attributes):
+            continue
+        quote = _on_demand_price(on_demand.get(sku, {}))
+        if quote is None:
+            continue
+        region = attributes.get('regionCode') or attributes.get('location', '')
+        yield PriceEntry(
+            service=offer_code,
+            region=str(region).lower(),
+            attributes=normalize_attributes({name: attributes[name] for name in key_attributes}),
+            price=quote[0],
+            unit=quote[1]
+        )
+
+
+def read_offer_file(path: str) -> OfferShard:
+    """Lê um arquivo de oferta regional e extrai as entradas"""
+    with open(path, 'rb') as handle:
+        raw = handle.read()
+    offer = json.loads(raw)
+    entries = list(iter_offer_entries(offer))
+    regions = {entry.region for entry in entries}
+    region = regions.pop() if len(regions) == 1 else os.path.basename(os.path.dirname(path)) or 'global'
+    return OfferShard(
+        offer_code=offer.get('offerCode', ''),
+        region=region,
+        version=offer_version(offer, raw),
+        entries=entries
+    )
+
+
+def peek_offer_version(path: str) -> Tuple[str, str]:
+    """
+    (offerCode, versão) lidos do início do arquivo, sem carregar os produtos
+
+    Os arquivos da Price List trazem offerCode e version antes de
+    products; se não estiverem no primeiro bloco, usa o hash do arquivo.
+    """
+    with open(path, 'rb') as handle:
+        head = handle.read(4096).decode('utf-8', errors='ignore')
+    offer_code = _header_value(head, 'offerCode')
+    version = _header_value(head, 'version')
+    if version:
+        return offer_code, version
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return offer_code, digest.hexdigest()[:16]
+
+
+def _header_value(head: str, name: str) -> str:
+    marker = f'"{name}"'
+    position = head.find(marker)
+    if position < 0:
+        return ''
+    start = head.find('"', head.find(':', position + len(marker)) + 1)
+    end = head.find('"', start + 1)
+    return head[start + 1:end] if start >= 0 and end > start else ''
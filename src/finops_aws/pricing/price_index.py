@@ -0,0 +1,385 @@
+"""
+Price Index
+
+Catálogo de preços AWS offline com lookup O(1):
+
+- Arquivos bulk da Price List são ingeridos uma vez em shards compactos
+  (um por oferta × região) com a versão de cada oferta
+- As entradas viram uma tabela hash de endereçamento aberto gravada em
+  .npy e aberta com memory-map: o processo não carrega o catálogo em
+  memória e vários workers compartilham as mesmas páginas
+- refresh() só reprocessa arquivos cuja versão mudou
+- Sem índice (ou SKU ausente), os preços de referência us-east-1 que
+  antes ficavam espalhados pelos serviços são usados como fallback
+
+Chave: (serviço, região, atributos do SKU — instance_type, os, tenancy,
+volume_type, engine, deployment, group).
+
+Design Patterns:
+- Repository: Persistência do índice isolada do restante do código
+- Singleton: Índice global via get_price_index()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .offers import (
+    OfferShard,
+    PriceEntry,
+    normalize_attributes,
+    peek_offer_version,
+    read_offer_file,
+)
+
+logger = logging.getLogger(__name__)
+
+EC2 = 'AmazonEC2'
+RDS = 'AmazonRDS'
+DYNAMODB = 'AmazonDynamoDB'
+ELASTICACHE = 'AmazonElastiCache'
+DEFAULT_REGION = 'us-east-1'
+
+SLOT_DTYPE = np.dtype([
+    ('hash', '<u8'),
+    ('offset', '<u8'),
+    ('length', '<u4'),
+    ('unit', '<u2'),
+    ('price', '<f8'),
+])
+
+# Preços de referência On-Demand us-east-1 (fallback sem índice)
+REFERENCE_PRICES: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+
+def _reference(service: str, price: float, **attributes: str) -> None:
+    REFERENCE_PRICES[(service, tuple(sorted(normalize_attributes(attributes).items())))] = price
+
+
+for _type, _rate in {
+    't3.micro': 0.0104, 't3.small': 0.0208, 't3.medium': 0.0416, 't3.large': 0.0832,
+    't3.xlarge': 0.1664, 'm5.large': 0.096, 'm5.xlarge': 0.192, 'm5.2xlarge': 0.384,
+    'm5.4xlarge': 0.768, 'c5.large': 0.085, 'c5.xlarge': 0.17, 'c5.2xlarge': 0.34,
+    'r5.large': 0.126, 'r5.xlarge': 0.252, 'r5.2xlarge': 0.504,
+}.items():
+    _reference(EC2, _rate, instanceType=_type, operatingSystem='Linux', tenancy='Shared')
+
+for _type, _rate in {'gp2': 0.10, 'gp3': 0.08, 'io1': 0.125, 'io2': 0.125, 'st1': 0.045, 'sc1': 0.015}.items():
+    _reference(EC2, _rate, volumeApiName=_type)
+
+for _class, _rate in {
+    'db.t3.micro': 0.018, 'db.t3.small': 0.036, 'db.t3.medium': 0.072, 'db.t3.large': 0.145,
+    'db.t4g.micro': 0.016, 'db.t4g.small': 0.032, 'db.t4g.medium': 0.065, 'db.t4g.large': 0.129,
+    'db.r5.large': 0.29, 'db.r5.xlarge': 0.58, 'db.r5.2xlarge': 1.16, 'db.r5.4xlarge': 2.32,
+    'db.r6g.large': 0.26, 'db.r6g.xlarge': 0.52, 'db.r6g.2xlarge': 1.04,
+    'db.r6i.large': 0.29, 'db.r6i.xlarge': 0.58, 'db.serverless': 0.12,
+}.items():
+    for _engine in ('Aurora MySQL', 'Aurora PostgreSQL'):
+        _reference(RDS, _rate, instanceType=_class, databaseEngine=_engine, deploymentOption='Single-AZ')
+
+_reference(DYNAMODB, 0.00013, group='DDB-ReadUnits')
+_reference(DYNAMODB, 0.00065, group='DDB-WriteUnits')
+_reference(DYNAMODB, 0.25, volumeType='Amazon DynamoDB - Indexed DataStore')
+
+
+def _canonical_key(service: str, region: str, attributes: Dict[str, str]) -> bytes:
+    parts = ';'.join(f"{name}={value}" for name, value in sorted(attributes.items()))
+    return f"{service.lower()}|{region.lower()}|{parts}".encode()
+
+
+def _hash_key(key: bytes) -> int:
+    value = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+    return value or 1
+
+
+@dataclass
+class PriceQuote:
+    """Preço encontrado no índice (ou na referência)"""
+    price: float
+    unit: str
+    source: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'price': self.price, 'unit': self.unit, 'source': self.source}
+
+
+class PriceIndex:
+    """
+    Índice de preços em disco (diretório com manifest, slots e chaves).
+
+    Layout:
+        manifest.json  versões por shard, unidades, contagens
+        slots.npy      tabela hash (hash, offset, tamanho, unidade, preço)
+        keys.npy       chaves canônicas concatenadas (bytes)
+        shards/        entradas extraídas de cada arquivo de oferta
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            'FINOPS_PRICE_INDEX_DIR', os.path.join(tempfile.gettempdir(), 'finops_price_index')
+        )
+        self._slots: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        self._manifest: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self) -> None:
+        """Abre o índice com memory-map (índice vazio se ainda não foi construído)"""
+        try:
+            with open(self._file('manifest.json')) as handle:
+                manifest = json.load(handle)
+            slots = np.load(self._file('slots.npy'), mmap_mode='r')
+            keys = np.load(self._file('keys.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return
+        self._manifest, self._slots, self._keys = manifest, slots, keys
+
+    def __len__(self) -> int:
+        return int(self._manifest.get('entries', 0))
+
+    @property
+    def versions(self) -> Dict[str, str]:
+        """Versão ingerida de cada shard (oferta__região)"""
+        return dict(self._manifest.get('versions', {}))
+
+    def lookup(self, service: str, region: str, **attributes: Any) -> Optional[PriceQuote]:
+        """
+        Preço de um SKU
+
+        Args:
+            service: Código da oferta (AmazonEC2, AmazonRDS, AmazonDynamoDB)
+            region: Código da região
+            **attributes: Atributos do SKU (instanceType/instance_type, ...)
+
+        Returns:
+            PriceQuote do índice, da referência us-east-1 ou None
+        """
+        normalized = normalize_attributes(attributes)
+        slots, keys = self._slots, self._keys
+        if slots is not None and len(slots):
+            key = _canonical_key(service, region, normalized)
+            hashed = _hash_key(key)
+            mask = len(slots) - 1
+            position = hashed & mask
+            while True:
+                slot = slots[position]
+                stored = int(slot['hash'])
+                if stored == 0:
+                    break
+                if stored == hashed:
+                    offset, length = int(slot['offset']), int(slot['length'])
+                    if keys[offset:offset + length].tobytes() == key:
+                        units = self._manifest.get('units', [])
+                        return PriceQuote(float(slot['price']), units[int(slot['unit'])], 'price_list')
+                position = (position + 1) & mask
+
+        reference = REFERENCE_PRICES.get((service, tuple(sorted(normalized.items()))))
+        if reference is not None:
+            return PriceQuote(reference, '', 'reference')
+        return None
+
+    def price(self, service: str, region: str, default: float = 0.0, **attributes: Any) -> float:
+        """Preço unitário do SKU (default se não encontrado)"""
+        quote = self.lookup(service, region, **attributes)
+        return quote.price if quote else default
+
+    def ec2_hourly(self, instance_type: str, region: str = DEFAULT_REGION, os_name: str = 'Linux',
+                   tenancy: str = 'Shared', default: float = 0.10) -> float:
+        """Preço por hora de instância EC2"""
+        return self.price(EC2, region, default, instanceType=instance_type,
+                          operatingSystem=os_name, tenancy=tenancy)
+
+    def ebs_gb_month(self, volume_type: str, region: str = DEFAULT_REGION, default: float = 0.10) -> float:
+        """Preço por GB-mês de volume EBS"""
+        return self.price(EC2, region, default, volumeApiName=volume_type)
+
+    def rds_hourly(self, instance_class: str, region: str = DEFAULT_REGION, engine: str = 'Aurora MySQL',
+                   deployment: str = 'Single-AZ', default: float = 0.20) -> float:
+        """Preço por hora de instância RDS/Aurora"""
+        return self.price(RDS, region, default, instanceType=instance_class,
+                          databaseEngine=engine, deploymentOption=deployment)
+
+    def elasticache_hourly(self, node_type: str, region: str = DEFAULT_REGION, engine: str = 'Redis',
+                           default: float = 0.20) -> float:
+        """Preço por hora de nó ElastiCache"""
+        return self.price(ELASTICACHE, region, default, instanceType=node_type, cacheEngine=engine)
+
+    def dynamodb_capacity_hourly(self, region: str = DEFAULT_REGION) -> Tuple[float, float]:
+        """(RCU, WCU) provisionadas por hora"""
+        return (self.price(DYNAMODB, region, 0.00013, group='DDB-ReadUnits'),
+                self.price(DYNAMODB, region, 0.00065, group='DDB-WriteUnits'))
+
+    def dynamodb_storage_gb_month(self, region: str = DEFAULT_REGION) -> float:
+        """Preço por GB-mês de armazenamento DynamoDB Standard"""
+        return self.price(DYNAMODB, region, 0.25, volumeType='Amazon DynamoDB - Indexed DataStore')
+
+    def build(
+        self,
+        entries: Iterable[PriceEntry],
+        versions: Optional[Dict[str, str]] = None,
+        sources: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Grava a tabela hash com as entradas e reabre o índice
+
+        Chaves repetidas ficam com o menor preço positivo.
+
+        Returns:
+            Número de entradas no índice
+        """
+        prices: Dict[bytes, Tuple[float, str]] = {}
+        for entry in entries:
+            key = _canonical_key(entry.service, entry.region, entry.attributes)
+            current = prices.get(key)
+            if current is None or (0 < entry.price < current[0]) or current[0] <= 0:
+                prices[key] = (entry.price, entry.unit)
+
+        size = 1
+        while size < 2 * max(len(prices), 1):
+            size <<= 1
+        slots = np.zeros(size, dtype=SLOT_DTYPE)
+        units: List[str] = []
+        unit_ids: Dict[str, int] = {}
+        blob = bytearray()
+        mask = size - 1
+        for key, (price, unit) in prices.items():
+            hashed = _hash_key(key)
+            position = hashed & mask
+            while slots['hash'][position] != 0:
+                position = (position + 1) & mask
+            if unit not in unit_ids:
+                unit_ids[unit] = len(units)
+                units.append(unit)
+            slots[position] = (hashed, len(blob), len(key), unit_ids[unit], price)
+            blob.extend(key)
+
+        os.makedirs(self.path, exist_ok=True)
+        manifest = {
+            'entries': len(prices),
+            'slots': size,
+            'units': units,
+            'versions': versions if versions is not None else self.versions,
+            'sources': sources if sources is not None else self._manifest.get('sources', {}),
+            'built_at': datetime.now().isoformat()
+        }
+        # Arquivos novos substituem os antigos por rename: processos com o
+        # índice mapeado continuam lendo a versão anterior sem erro
+        with self._lock:
+            self._replace('slots.npy', lambda handle: np.save(handle, slots))
+            self._replace('keys.npy', lambda handle: np.save(handle, np.frombuffer(bytes(blob), dtype=np.uint8)))
+            self._replace('manifest.json', lambda handle: handle.write(json.dumps(manifest).encode()))
+            self._open()
+        return len(prices)
+
+    def _replace(self, name: str, write: Any) -> None:
+        temp_path = self._file(f'{name}.tmp')
+        with open(temp_path, 'wb') as handle:
+            write(handle)
+        os.replace(temp_path, self._file(name))
+
+    def _write_shard(self, shard: OfferShard) -> None:
+        os.makedirs(self._file('shards'), exist_ok=True)
+        with open(self._file(f'shards/{shard.shard_id}.json'), 'w') as handle:
+            json.dump({
+                'offer_code': shard.offer_code,
+                'region': shard.region,
+                'version': shard.version,
+                'entries': [[e.service, e.region, e.attributes, e.price, e.unit] for e in shard.entries]
+            }, handle, separators=(',', ':'))
+
+    def _read_shards(self) -> Iterable[PriceEntry]:
+        directory = self._file('shards')
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, name)) as handle:
+                for service, region, attributes, price, unit in json.load(handle)['entries']:
+                    yield PriceEntry(service, region, attributes, price, unit)
+
+    def refresh(self, offer_files: Iterable[str]) -> Dict[str, Any]:
+        """
+        Ingestão incremental de arquivos de oferta baixados
+
+        Arquivos cuja versão (campo version do cabeçalho, ou hash do
+        conteúdo) é a mesma da última ingestão não são lidos; o índice só
+        é regravado se algum shard mudou.
+
+        Returns:
+            Shards atualizados, ignorados e total de entradas
+        """
+        versions = self.versions
+        sources = dict(self._manifest.get('sources', {}))
+        updated, skipped = [], []
+        for path in offer_files:
+            source = os.path.abspath(path)
+            try:
+                _, version = peek_offer_version(path)
+                if sources.get(source) == version:
+                    skipped.append(path)
+                    continue
+                shard = read_offer_file(path)
+                sources[source] = shard.version
+                if versions.get(shard.shard_id) == shard.version:
+                    skipped.append(path)
+                    continue
+                self._write_shard(shard)
+                versions[shard.shard_id] = shard.version
+                updated.append(shard.shard_id)
+            except (OSError, ValueError) as e:
+                logger.error(f"Erro ao ler oferta {path}: {e}")
+
+        if updated:
+            entries = self.build(self._read_shards(), versions, sources)
+        else:
+            entries = len(self)
+        return {'updated': updated, 'skipped': len(skipped), 'entries': entries}
+
+    def refresh_directory(self, directory: str) -> Dict[str, Any]:
+        """refresh() com todos os .json sob o diretório"""
+        files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(directory)
+            for name in sorted(names) if name.endswith('.json')
+        ]
+        return self.refresh(files)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'entries': len(self),
+            'slots': int(self._manifest.get('slots', 0)),
+            'shards': len(self.versions),
+            'built_at': self._manifest.get('built_at')
+        }
+
+
+_price_index: Optional[PriceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_price_index() -> PriceIndex:
+    """Retorna o índice global (diretório em FINOPS_PRICE_INDEX_DIR)"""
+    global _price_index
+    with _index_lock:
+        if _price_index is None:
+            _price_index = PriceIndex()
+        return _price_index
+
+
+def set_price_index(index: Optional[PriceIndex]) -> None:
+    """Substitui o índice global (None recarrega do diretório padrão)"""
+    global _price_index
+    with _index_lock:
+        _price_index = index
@@ -17,6 +17,13 @@ from datetime import datetime, timedelta, timezone
 
 from .base_service import BaseAWSService, ServiceCost, ServiceMetrics, ServiceRecommendation
 from ..utils.logger import setup_logger
+from ..pricing import get_price_index
+
+AURORA_PRICE_ENGINES = {
+    'aurora': 'Aurora MySQL',
+    'aurora-mysql': 'Aurora MySQL',
+    'aurora-postgresql': 'Aurora PostgreSQL',
+}
 
 logger = setup_logger(__name__)
 
@@ -403,7 +410,7 @@ class AuroraService(BaseAWSService):
                 cluster_cost = avg_capacity * acu_rate * 24 * 30
             else:
                 for instance in cluster.instances:
-                    hourly_rate = self._get_instance_hourly_rate(instance.db_instance_class)
+                    hourly_rate = self._get_instance_hourly_rate(instance.db_instance_class, cluster.engine)
                     cluster_cost += hourly_rate * 24 * 30
             
             storage_cost = cluster.allocated_storage * 0.10
@@ -426,29 +433,11 @@ class AuroraService(BaseAWSService):
         
         return costs
     
-    def _get_instance_hourly_rate(self, instance_class: str) -> float:
-        """Retorna taxa horária estimada para classe de instância"""
-        rates = {
-            'db.t3.micro': 0.018,
-            'db.t3.small': 0.036,
-            'db.t3.medium': 0.072,
-            'db.t3.large': 0.145,
-            'db.t4g.micro': 0.016,
-            'db.t4g.small': 0.032,
-            'db.t4g.medium': 0.065,
-            'db.t4g.large': 0.129,
-            'db.r5.large': 0.29,
-            'db.r5.xlarge': 0.58,
-            'db.r5.2xlarge': 1.16,
-            'db.r5.4xlarge': 2.32,
-            'db.r6g.large': 0.26,
-            'db.r6g.xlarge': 0.52,
-            'db.r6g.2xlarge': 1.04,
-            'db.r6i.large': 0.29,
-            'db.r6i.xlarge': 0.58,
-            'db.serverless': 0.12,
-        }
-        return rates.get(instance_class, 0.20)
+    def _get_instance_hourly_rate(self, instance_class: str, engine: str = 'aurora-mysql') -> float:
+        """Retorna taxa horária da classe de instância (catálogo de preços)"""
+        return get_price_index().rds_hourly(
+            instance_class, self.region, engine=AURORA_PRICE_ENGINES.get(engine, 'Aurora MySQL')
+        )
     
     def get_metrics(self) -> List[ServiceMetrics]:
         """Retorna métricas dos clusters Aurora"""
@@ -639,7 +628,7 @@ class AuroraService(BaseAWSService):
         """Estima economia ao migrar para Serverless v2"""
         current_cost = 0.0
         for instance in cluster.instances:
-            hourly_rate = self._get_instance_hourly_rate(instance.db_instance_class)
+            hourly_rate = self._get_instance_hourly_rate(instance.db_instance_class, cluster.engine)
             current_cost += hourly_rate * 24 * 30
         
         avg_acu = 4.0
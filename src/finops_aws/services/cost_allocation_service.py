@@ -13,7 +13,7 @@ Design Patterns:
 - Composite: Agregação hierárquica de custos
 - Observer: Notificação de mudanças em alocação
 """
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -23,6 +23,8 @@ import boto3
 from botocore.exceptions import ClientError
 
 from .base_service import BaseAWSService
+from ..analytics.cost_engine import ColumnarCostFrame
+from ..analytics.cost_cube import SERVICE, CostCube, resolve_cost_cube, tag_dimension
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
 
@@ -112,6 +114,7 @@ class AllocationScorecard:
     by_cost_category: Dict[str, float] = field(default_factory=dict)
     by_owner: Dict[str, float] = field(default_factory=dict)
     unallocated_by_service: Dict[str, float] = field(default_factory=dict)
+    by_allocation_rule: Dict[str, float] = field(default_factory=dict)
     recommendations: List[Dict[str, Any]] = field(default_factory=list)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -136,7 +139,8 @@ class AllocationScorecard:
                 'by_project': {k: round(v, 2) for k, v in self.by_project.items()},
                 'by_cost_category': {k: round(v, 2) for k, v in self.by_cost_category.items()},
                 'by_owner': {k: round(v, 2) for k, v in self.by_owner.items()},
-                'unallocated_by_service': {k: round(v, 2) for k, v in self.unallocated_by_service.items()}
+                'unallocated_by_service': {k: round(v, 2) for k, v in self.unallocated_by_service.items()},
+                'by_allocation_rule': {k: round(v, 2) for k, v in self.by_allocation_rule.items()}
             },
             'recommendations': self.recommendations
         }
@@ -181,6 +185,121 @@ class ShowbackReport:
         }
 
 
+UNALLOCATED_TAG_VALUES = ('', 'untagged', 'none')
+
+
+class CompiledAllocationRules:
+    """
+    Regras de alocação compiladas em índice por tag
+    
+    Cada chave de tag aponta para um dicionário valor -> regra (valores em
+    minúsculas) e para a regra curinga ('*'), de modo que casar um valor de
+    tag é uma consulta O(1). Em conflito vence a regra de menor prioridade.
+    """
+    
+    def __init__(self, rules: List[CostAllocationRule]):
+        self._exact: Dict[str, Dict[str, CostAllocationRule]] = {}
+        self._wildcard: Dict[str, CostAllocationRule] = {}
+        active = sorted((r for r in rules if r.active), key=lambda r: r.priority, reverse=True)
+        for rule in active:
+            for value in rule.tag_values:
+                if value == '*':
+                    self._wildcard[rule.tag_key] = rule
+                else:
+                    self._exact.setdefault(rule.tag_key, {})[value.lower()] = rule
+    
+    @property
+    def tag_keys(self) -> List[str]:
+        return sorted(set(self._exact) | set(self._wildcard))
+    
+    def match(self, tag_key: str, value: str) -> Optional[CostAllocationRule]:
+        """Regra que aloca o valor de tag (None se não alocado)"""
+        if value.lower() in UNALLOCATED_TAG_VALUES:
+            return None
+        rule = self._exact.get(tag_key, {}).get(value.lower())
+        return rule or self._wildcard.get(tag_key)
+
+
+@dataclass
+class AllocationBreakdown:
+    """Custos de um período calculados pelo AllocationEngine"""
+    total_cost: float
+    by_tag: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    allocated_by_tag: Dict[str, float] = field(default_factory=dict)
+    by_rule: Dict[str, float] = field(default_factory=dict)
+    unallocated_by_service: Dict[str, float] = field(default_factory=dict)
+
+
+class AllocationEngine:
+    """
+    Motor de alocação em passagem única
+    
+    Trabalha sobre um CostCube diário SERVICE×TAG com todas as chaves de
+    alocação (carregado uma vez, em paralelo e paginado) e calcula custos
+    por tag, por regra e não alocados de qualquer período contido na janela.
+    """
+    
+    SCORECARD_TAGS = ('BusinessUnit', 'Project', 'CostCenter', 'Owner')
+    UNALLOCATED_TAG = 'CostCenter'
+    
+    def __init__(self, rules: CompiledAllocationRules, cube: CostCube):
+        self.rules = rules
+        self.cube = cube
+    
+    @classmethod
+    def tag_keys_for(cls, rules: CompiledAllocationRules) -> List[str]:
+        """Chaves de tag necessárias para scorecards e regras"""
+        return sorted(set(cls.SCORECARD_TAGS) | set(rules.tag_keys))
+    
+    @classmethod
+    def load(
+        cls,
+        ce_client: Any,
+        rules: CompiledAllocationRules,
+        start: datetime,
+        end: datetime,
+        max_workers: int = 4
+    ) -> 'AllocationEngine':
+        """Busca custos diários SERVICE×TAG de todas as chaves em paralelo"""
+        cube = CostCube.from_cost_explorer(
+            ce_client, start, end,
+            tag_keys=cls.tag_keys_for(rules),
+            tag_top_n=None,
+            dimensions=(),
+            max_workers=max_workers
+        )
+        return cls(rules, cube)
+    
+    def allocate(self, start: datetime, end: datetime) -> AllocationBreakdown:
+        """Calcula o breakdown de alocação do período [start, end)"""
+        breakdown = AllocationBreakdown(total_cost=self.cube.total(start, end))
+        
+        for tag_key in self.tag_keys_for(self.rules):
+            tag = tag_dimension(tag_key)
+            if not self.cube.has_dimensions([tag]):
+                continue
+            by_value = self.cube.group_sum(tag, start, end)
+            allocated = {
+                value: cost for value, cost in by_value.items()
+                if value.lower() not in UNALLOCATED_TAG_VALUES
+            }
+            breakdown.by_tag[tag_key] = allocated
+            breakdown.allocated_by_tag[tag_key] = sum(allocated.values())
+            for value, cost in allocated.items():
+                rule = self.rules.match(tag_key, value)
+                if rule:
+                    breakdown.by_rule[rule.rule_id] = breakdown.by_rule.get(rule.rule_id, 0.0) + cost
+        
+        unallocated_tag = tag_dimension(self.UNALLOCATED_TAG)
+        if self.cube.has_dimensions([SERVICE, unallocated_tag]):
+            frame = self.cube.select([SERVICE, unallocated_tag], start, end).where(
+                unallocated_tag, predicate=lambda v: v.lower() in ('', 'untagged')
+            )
+            breakdown.unallocated_by_service = dict(frame.top_k(SERVICE, k=10))
+        
+        return breakdown
+
+
 class CostAllocationService(BaseAWSService):
     """
     Serviço de Alocação de Custos
@@ -215,9 +334,13 @@ class CostAllocationService(BaseAWSService):
         'BusinessUnit'
     ]
     
-    def __init__(self, client_factory=None):
+    # Janela mínima carregada pelo motor de alocação (atende vários períodos)
+    ALLOCATION_WINDOW_DAYS = 90
+    
+    def __init__(self, client_factory=None, cost_cube: Optional[CostCube] = None):
         super().__init__()
         self._client_factory = client_factory
+        self._cost_cube = cost_cube
         self.logger = setup_logger(self.__class__.__name__)
         self.service_name = "cost_allocation"
         self._cache = FinOpsCache(default_ttl=300)
@@ -315,40 +438,112 @@ class CostAllocationService(BaseAWSService):
         Returns:
             AllocationScorecard com métricas de alocação
         """
-        cache_key = f"allocation_scorecard_{period_days}_{target_level.value}"
-        cached = self._cache.get(cache_key)
-        if cached:
-            return cached
+        return self.calculate_allocation_scorecards([period_days], target_level)[period_days]
+    
+    def calculate_allocation_scorecards(
+        self,
+        periods: Sequence[int] = (7, 30, 90),
+        target_level: AllocationLevel = AllocationLevel.WALK
+    ) -> Dict[int, AllocationScorecard]:
+        """
+        Calcula scorecards de vários períodos a partir de uma única carga
         
+        Os custos SERVICE×TAG de todas as chaves de alocação são buscados
+        uma vez para o maior período; cada scorecard é derivado desses dados.
+        
+        Args:
+            periods: Períodos de análise em dias
+            target_level: Nível de maturidade alvo
+            
+        Returns:
+            Dicionário período -> AllocationScorecard
+        """
         end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=period_days)
+        scorecards: Dict[int, AllocationScorecard] = {}
+        missing = []
+        for period_days in periods:
+            cached = self._cache.get(f"allocation_scorecard_{period_days}_{target_level.value}")
+            if cached:
+                scorecards[period_days] = cached
+            else:
+                missing.append(period_days)
+        if not missing:
+            return scorecards
         
-        total_cost = self._get_total_cost(start_date, end_date)
+        engine = self._get_allocation_engine(end_date - timedelta(days=max(missing)), end_date)
         
-        by_business_unit, allocated_by_bu = self._get_costs_by_tag(
-            start_date, end_date, 'BusinessUnit'
-        )
-        by_project, allocated_by_project = self._get_costs_by_tag(
-            start_date, end_date, 'Project'
-        )
-        by_cost_category, allocated_by_cc = self._get_costs_by_tag(
-            start_date, end_date, 'CostCenter'
-        )
-        by_owner, allocated_by_owner = self._get_costs_by_tag(
-            start_date, end_date, 'Owner'
-        )
+        for period_days in missing:
+            start_date = end_date - timedelta(days=period_days)
+            try:
+                breakdown = engine.allocate(start_date, end_date) if engine else AllocationBreakdown(0.0)
+            except Exception as e:
+                self.logger.error(f"Erro ao calcular alocação: {e}")
+                breakdown = AllocationBreakdown(0.0)
+            scorecard = self._build_scorecard(start_date, end_date, target_level, breakdown)
+            self._cache.set(f"allocation_scorecard_{period_days}_{target_level.value}", scorecard, ttl=1800)
+            scorecards[period_days] = scorecard
         
-        max_allocated = max(
-            allocated_by_bu,
-            allocated_by_project,
-            allocated_by_cc,
-            allocated_by_owner
+        return scorecards
+    
+    def _get_allocation_engine(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Optional[AllocationEngine]:
+        """
+        Motor de alocação sobre o cubo ativo ou sobre uma carga própria
+        
+        A carga própria cobre ALLOCATION_WINDOW_DAYS (ou o período pedido,
+        se maior) e fica no cache, atendendo outros períodos e níveis.
+        """
+        rules = CompiledAllocationRules(self._allocation_rules)
+        tag_keys = AllocationEngine.tag_keys_for(rules)
+        dimensions = [SERVICE] + [tag_dimension(key) for key in tag_keys]
+        
+        cube = resolve_cost_cube(self._cost_cube, start_date, end_date, dimensions)
+        if cube:
+            return AllocationEngine(rules, cube)
+        
+        cache_key = f"allocation_cube_{','.join(tag_keys)}"
+        cube = self._cache.get(cache_key)
+        if cube and cube.covers(start_date, end_date):
+            return AllocationEngine(rules, cube)
+        
+        try:
+            window_end = end_date + timedelta(days=1)
+            window_days = max((window_end - start_date).days + 1, self.ALLOCATION_WINDOW_DAYS)
+            engine = AllocationEngine.load(
+                self._get_ce_client(), rules,
+                window_end - timedelta(days=window_days), window_end,
+                max_workers=len(tag_keys)
+            )
+            self._cache.set(cache_key, engine.cube, ttl=1800)
+            return engine
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar custos de alocação: {e}")
+            return None
+    
+    def _build_scorecard(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        target_level: AllocationLevel,
+        breakdown: AllocationBreakdown
+    ) -> AllocationScorecard:
+        """Monta o scorecard a partir do breakdown do período"""
+        total_cost = breakdown.total_cost
+        by_business_unit = breakdown.by_tag.get('BusinessUnit', {})
+        by_project = breakdown.by_tag.get('Project', {})
+        by_cost_category = breakdown.by_tag.get('CostCenter', {})
+        by_owner = breakdown.by_tag.get('Owner', {})
+        
+        allocated_cost = max(
+            [breakdown.allocated_by_tag.get(key, 0.0) for key in AllocationEngine.SCORECARD_TAGS]
         )
         
         if not by_business_unit:
             by_business_unit = by_cost_category if by_cost_category else {'Unallocated': total_cost}
         
-        allocated_cost = max_allocated
         unallocated_cost = total_cost - allocated_cost
         
         if total_cost > 0:
@@ -368,15 +563,13 @@ class CostAllocationService(BaseAWSService):
         else:
             maturity_level = AllocationLevel.CRAWL.value
         
-        unallocated_by_service = self._get_unallocated_by_service(start_date, end_date)
-        
         recommendations = self._generate_allocation_recommendations(
             allocation_percent,
             target_percent,
-            unallocated_by_service
+            breakdown.unallocated_by_service
         )
         
-        scorecard = AllocationScorecard(
+        return AllocationScorecard(
             period_start=start_date,
             period_end=end_date,
             total_cost=total_cost,
@@ -390,12 +583,10 @@ class CostAllocationService(BaseAWSService):
             by_project=by_project,
             by_cost_category=by_cost_category,
             by_owner=by_owner,
-            unallocated_by_service=unallocated_by_service,
+            unallocated_by_service=breakdown.unallocated_by_service,
+            by_allocation_rule=breakdown.by_rule,
             recommendations=recommendations
         )
-        
-        self._cache.set(cache_key, scorecard, ttl=1800)
-        return scorecard
     
     def _get_total_cost(
         self,
@@ -404,6 +595,10 @@ class CostAllocationService(BaseAWSService):
     ) -> float:
         """Obtém custo total do período"""
         try:
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+            if cube:
+                return cube.total(start_date, end_date)
+            
             client = self._get_ce_client()
             
             response = client.get_cost_and_usage(
@@ -438,36 +633,29 @@ class CostAllocationService(BaseAWSService):
             Tuple (dict por valor de tag, custo total alocado)
         """
         try:
-            client = self._get_ce_client()
-            
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'TAG', 'Key': tag_key}
-                ]
-            )
+            tag = tag_dimension(tag_key)
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, [tag])
+            if cube:
+                frame = cube.select([tag], start_date, end_date)
+            else:
+                client = self._get_ce_client()
+                
+                response = client.get_cost_and_usage(
+                    TimePeriod={
+                        'Start': start_date.strftime('%Y-%m-%d'),
+                        'End': end_date.strftime('%Y-%m-%d')
+                    },
+                    Granularity='MONTHLY',
+                    Metrics=['UnblendedCost'],
+                    GroupBy=[
+                        {'Type': 'TAG', 'Key': tag_key}
+                    ]
+                )
+                frame = ColumnarCostFrame.from_cost_explorer(response, [tag], tag_dimensions=[tag])
             
-            by_tag: Dict[str, float] = {}
-            total_allocated = 0.0
+            frame = frame.where(tag, predicate=lambda v: v.lower() not in UNALLOCATED_TAG_VALUES)
             
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    tag_value = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    
-                    if tag_value.startswith(f'{tag_key}$'):
-                        tag_value = tag_value.split('$', 1)[1] or 'Untagged'
-                    
-                    if tag_value and tag_value.lower() not in ['', 'untagged', 'none']:
-                        by_tag[tag_value] = by_tag.get(tag_value, 0) + cost
-                        total_allocated += cost
-            
-            return by_tag, total_allocated
+            return frame.group_sum(tag), frame.total()
             
         except Exception as e:
             self.logger.error(f"Erro ao obter custos por tag {tag_key}: {e}")
@@ -480,34 +668,32 @@ class CostAllocationService(BaseAWSService):
     ) -> Dict[str, float]:
         """Obtém custos não alocados por serviço"""
         try:
-            client = self._get_ce_client()
-            
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'SERVICE'},
-                    {'Type': 'TAG', 'Key': 'CostCenter'}
-                ]
-            )
-            
-            unallocated: Dict[str, float] = {}
+            cost_center = tag_dimension('CostCenter')
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, ['service', cost_center])
+            if cube:
+                frame = cube.select(['service', cost_center], start_date, end_date)
+            else:
+                client = self._get_ce_client()
+                
+                response = client.get_cost_and_usage(
+                    TimePeriod={
+                        'Start': start_date.strftime('%Y-%m-%d'),
+                        'End': end_date.strftime('%Y-%m-%d')
+                    },
+                    Granularity='MONTHLY',
+                    Metrics=['UnblendedCost'],
+                    GroupBy=[
+                        {'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                        {'Type': 'TAG', 'Key': 'CostCenter'}
+                    ]
+                )
+                frame = ColumnarCostFrame.from_cost_explorer(
+                    response, ['service', cost_center], tag_dimensions=[cost_center]
+                )
             
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    keys = group['Keys']
-                    service = keys[0]
-                    tag_value = keys[1] if len(keys) > 1 else ''
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    
-                    if not tag_value or tag_value.lower() in ['', 'costcenter$', 'untagged']:
-                        unallocated[service] = unallocated.get(service, 0) + cost
+            frame = frame.where(cost_center, predicate=lambda v: v.lower() in ('', 'untagged'))
             
-            return dict(sorted(unallocated.items(), key=lambda x: x[1], reverse=True)[:10])
+            return dict(frame.top_k('service', k=10))
             
         except Exception as e:
             self.logger.error(f"Erro ao obter custos não alocados: {e}")
@@ -626,6 +812,11 @@ class CostAllocationService(BaseAWSService):
     ) -> Dict[str, float]:
         """Obtém custos por serviço filtrados por BU"""
         try:
+            filters = {tag_dimension('BusinessUnit'): [business_unit]} if business_unit else None
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, ['service'], filters)
+            if cube:
+                return cube.group_sum('service', start_date, end_date, filters)
+            
             client = self._get_ce_client()
             
             filter_expression = None
@@ -3,7 +3,10 @@ FinOps AWS - CUR Ingestion Service
 Serviço de ingestão de dados do Cost and Usage Report (CUR)
 
 Este serviço implementa:
-- Ingestão de dados CUR via S3/Athena (simulado quando não disponível)
+- Ingestão de arquivos Parquet do CUR / Data Exports (CUR 2.0) via S3,
+  com leitura em streaming por row group, projeção de colunas e poda
+  por período de cobrança
+- Fallback para Cost Explorer quando o CUR não está disponível
 - Normalização de dados de custo
 - Cache de dados para performance
 - Reconciliação com Cost Explorer
@@ -12,13 +15,25 @@ Design Patterns:
 - Strategy: Implementa interface BaseAWSService
 - Repository: Abstrai fonte de dados (CUR vs Cost Explorer)
 - Cache: Dados normalizados em memória com TTL
+- Iterator: Leitura incremental de row groups com memória limitada
 """
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import os
+import re
 import json
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 import boto3
 from botocore.exceptions import ClientError
@@ -27,6 +42,9 @@ from .base_service import BaseAWSService
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
 
+if TYPE_CHECKING:
+    from ..analytics.cost_engine import ColumnarCostFrame
+
 
 class CURDataSource(Enum):
     """Fonte de dados CUR"""
@@ -131,12 +149,593 @@ class CURSummary:
         }
 
 
+CUR_COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'line_item_id': ('identity_line_item_id',),
+    'usage_start': ('line_item_usage_start_date',),
+    'usage_end': ('line_item_usage_end_date',),
+    'line_item_type': ('line_item_line_item_type',),
+    'product_code': ('line_item_product_code', 'product_servicecode'),
+    'usage_type': ('line_item_usage_type',),
+    'operation': ('line_item_operation',),
+    'resource_id': ('line_item_resource_id',),
+    'usage_amount': ('line_item_usage_amount',),
+    'region': ('product_region_code', 'product_region'),
+    'availability_zone': ('line_item_availability_zone',),
+    'account_id': ('line_item_usage_account_id',),
+    'account_name': ('line_item_usage_account_name',),
+    'pricing_term': ('pricing_term',),
+    'unblended': ('line_item_unblended_cost',),
+    'blended': ('line_item_blended_cost',),
+    'net_unblended': ('line_item_net_unblended_cost',),
+    'sp_arn': ('savings_plan_savings_plan_a_r_n',),
+    'sp_effective': ('savings_plan_savings_plan_effective_cost',),
+    'sp_net_effective': ('savings_plan_net_savings_plan_effective_cost',),
+    'sp_total_commitment': ('savings_plan_total_commitment_to_date',),
+    'sp_used_commitment': ('savings_plan_used_commitment',),
+    'ri_arn': ('reservation_reservation_a_r_n',),
+    'ri_effective': ('reservation_effective_cost',),
+    'ri_net_effective': ('reservation_net_effective_cost',),
+    'ri_unused_upfront': ('reservation_unused_amortized_upfront_fee_for_billing_period',),
+    'ri_unused_recurring': ('reservation_unused_recurring_fee',),
+    'ri_net_unused_upfront': ('reservation_net_unused_amortized_upfront_fee_for_billing_period',),
+    'ri_net_unused_recurring': ('reservation_net_unused_recurring_fee',),
+    'tags': ('resource_tags',),
+    'cost_category': ('cost_category',),
+}
+
+LEGACY_TAG_PREFIX = 'resource_tags_user_'
+LEGACY_COST_CATEGORY_PREFIX = 'cost_category_'
+
+_BILLING_PERIOD_PATTERNS = (
+    re.compile(r'BILLING_PERIOD=(\d{4})-(\d{2})'),
+    re.compile(r'year=(\d{4})/month=(\d{1,2})(?:/|$)'),
+    re.compile(r'(?:^|/)(\d{4})(\d{2})01-\d{8}(?:/|$)'),
+)
+
+
+def billing_period_of(key: str) -> Optional[str]:
+    """Extrai o período de cobrança (YYYY-MM) da chave, se particionada"""
+    for pattern in _BILLING_PERIOD_PATTERNS:
+        match = pattern.search(key)
+        if match:
+            return f"{match.group(1)}-{int(match.group(2)):02d}"
+    return None
+
+
+def billing_periods_between(start_date: datetime, end_date: datetime) -> List[str]:
+    """Períodos de cobrança (YYYY-MM) cobertos por [start_date, end_date)"""
+    last = end_date - timedelta(microseconds=1)
+    year, month = start_date.year, start_date.month
+    periods = []
+    while (year, month) <= (last.year, last.month):
+        periods.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _as_datetime(value: Any, default: datetime) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return default
+    return default
+
+
+def _key_from_uri(uri: str) -> str:
+    """Converte s3://bucket/chave em chave relativa ao bucket"""
+    if uri.startswith('s3://'):
+        return uri[5:].split('/', 1)[1] if '/' in uri[5:] else ''
+    return uri.lstrip('/')
+
+
+class LocalCURSource:
+    """
+    Fonte CUR em diretório local com a mesma estrutura de chaves do bucket
+    
+    Usada em testes, benchmarks e ambientes on-premise que sincronizam
+    o bucket de exports.
+    """
+    
+    def __init__(self, root: str, prefix: str = ''):
+        self.root = os.path.abspath(root)
+        self.prefix = prefix.strip('/')
+    
+    def is_available(self) -> bool:
+        return os.path.isdir(os.path.join(self.root, self.prefix))
+    
+    def list_keys(self) -> List[str]:
+        base = os.path.join(self.root, self.prefix)
+        keys = []
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                keys.append(os.path.relpath(full, self.root).replace(os.sep, '/'))
+        return sorted(keys)
+    
+    def read_text(self, key: str) -> str:
+        with open(os.path.join(self.root, key), encoding='utf-8') as f:
+            return f.read()
+    
+    @contextmanager
+    def open_parquet(self, key: str) -> Iterator[str]:
+        yield os.path.join(self.root, key)
+
+
+class S3CURSource:
+    """
+    Fonte CUR no S3 (bucket de Data Exports / CUR legado)
+    
+    Cada Parquet é baixado para um arquivo temporário em disco antes da
+    leitura, mantendo apenas um arquivo por vez fora da memória.
+    """
+    
+    def __init__(self, s3_client: Any, bucket: str, prefix: str = ''):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+    
+    def is_available(self) -> bool:
+        try:
+            self.s3.head_bucket(Bucket=self.bucket)
+            return True
+        except Exception:
+            return False
+    
+    def list_keys(self) -> List[str]:
+        keys = []
+        paginator = self.s3.get_paginator('list_objects_v2')
+        prefix = f"{self.prefix}/" if self.prefix else ''
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return sorted(keys)
+    
+    def read_text(self, key: str) -> str:
+        response = self.s3.get_object(Bucket=self.bucket, Key=key)
+        return response['Body'].read().decode('utf-8')
+    
+    @contextmanager
+    def open_parquet(self, key: str) -> Iterator[str]:
+        with tempfile.NamedTemporaryFile(suffix='.parquet') as tmp:
+            self.s3.download_fileobj(self.bucket, key, tmp)
+            tmp.flush()
+            yield tmp.name
+
+
+class _CURAggregator:
+    """Acumula agregações por lote (memória proporcional à cardinalidade)"""
+    
+    def __init__(self):
+        self.totals = {'unblended': 0.0, 'blended': 0.0, 'amortized': 0.0, 'net_amortized': 0.0}
+        self.record_count = 0
+        self.by_service: Dict[str, float] = {}
+        self.by_region: Dict[str, float] = {}
+        self.by_account: Dict[str, float] = {}
+        self.by_cost_category: Dict[str, float] = {}
+        self.by_tag: Dict[str, Dict[str, float]] = {}
+    
+    @staticmethod
+    def _group_sum(keys: Any, values: Any) -> List[Tuple[Any, float]]:
+        grouped = pa.table({'k': keys, 'v': values}).group_by('k').aggregate([('v', 'sum')])
+        return list(zip(grouped.column('k').to_pylist(), grouped.column('v_sum').to_pylist()))
+    
+    def _merge(self, target: Dict[str, float], keys: Any, values: Any, default: str) -> None:
+        for key, amount in self._group_sum(keys, values):
+            key = key or default
+            target[key] = target.get(key, 0.0) + (amount or 0.0)
+    
+    def _merge_map(self, column: Any, values: Any) -> List[Tuple[str, str, float]]:
+        struct_type = pa.struct([('key', pa.string()), ('value', pa.string())])
+        as_list = column.cast(pa.list_(struct_type))
+        flat = pc.list_flatten(as_list)
+        costs = pc.take(values, pc.list_parent_indices(as_list))
+        grouped = pa.table({
+            'key': flat.field('key'), 'value': flat.field('value'), 'v': costs
+        }).group_by(['key', 'value']).aggregate([('v', 'sum')])
+        return [
+            (k, v, amount or 0.0)
+            for k, v, amount in zip(grouped.column('key').to_pylist(),
+                                    grouped.column('value').to_pylist(),
+                                    grouped.column('v_sum').to_pylist())
+            if k and v
+        ]
+    
+    def add(self, batch: Any, columns: Dict[str, Any], costs: Dict[str, Any]) -> None:
+        if batch.num_rows == 0:
+            return
+        self.record_count += batch.num_rows
+        for name in self.totals:
+            self.totals[name] += pc.sum(costs[name]).as_py() or 0.0
+        
+        unblended = costs['unblended']
+        for target, logical, default in (
+            (self.by_service, 'product_code', 'Unknown'),
+            (self.by_region, 'region', 'global'),
+            (self.by_account, 'account_id', 'Unknown'),
+        ):
+            name = columns.get(logical)
+            if name:
+                self._merge(target, batch.column(name), unblended, default)
+        
+        tags = columns.get('tags')
+        if tags:
+            for key, value, amount in self._merge_map(batch.column(tags), unblended):
+                bucket = self.by_tag.setdefault(key, {})
+                bucket[value] = bucket.get(value, 0.0) + amount
+        for key, name in columns.get('legacy_tags', {}).items():
+            bucket = self.by_tag.setdefault(key, {})
+            for value, amount in self._group_sum(batch.column(name), unblended):
+                if value:
+                    bucket[value] = bucket.get(value, 0.0) + (amount or 0.0)
+        
+        categories = columns.get('cost_category')
+        if categories:
+            for key, value, amount in self._merge_map(batch.column(categories), unblended):
+                label = f"{key}={value}"
+                self.by_cost_category[label] = self.by_cost_category.get(label, 0.0) + amount
+        for key, name in columns.get('legacy_cost_categories', {}).items():
+            for value, amount in self._group_sum(batch.column(name), unblended):
+                if value:
+                    label = f"{key}={value}"
+                    self.by_cost_category[label] = self.by_cost_category.get(label, 0.0) + (amount or 0.0)
+    
+    def to_summary(self, start_date: datetime, end_date: datetime) -> 'CURSummary':
+        return CURSummary(
+            period_start=start_date,
+            period_end=end_date,
+            total_unblended_cost=self.totals['unblended'],
+            total_blended_cost=self.totals['blended'],
+            total_amortized_cost=self.totals['amortized'],
+            total_net_amortized_cost=self.totals['net_amortized'],
+            record_count=self.record_count,
+            data_source=CURDataSource.S3_DIRECT.value,
+            by_service=self.by_service,
+            by_region=self.by_region,
+            by_account=self.by_account,
+            by_cost_category=self.by_cost_category,
+            by_tag={k: v for k, v in self.by_tag.items() if v}
+        )
+
+
+class CURParquetReader:
+    """
+    Leitor de arquivos Parquet do CUR 2.0 (Data Exports) e do CUR legado
+    
+    - Descobre arquivos pelo manifest (dataFiles / reportKeys) ou, na
+      ausência dele, pelas partições BILLING_PERIOD=/year=/month=
+    - Poda partições fora do período e row groups pelas estatísticas de
+      line_item_usage_start_date
+    - Lê em lotes (iter_batches) apenas as colunas necessárias e agrega
+      de forma vetorizada, mantendo memória limitada
+    
+    Custo amortizado segue as regras do CUR por line_item_line_item_type
+    (SavingsPlanCoveredUsage, DiscountedUsage, RIFee, etc.).
+    """
+    
+    DEFAULT_BATCH_SIZE = 65536
+    
+    AGGREGATION_COLUMNS = (
+        'usage_start', 'line_item_type', 'product_code', 'region', 'account_id',
+        'unblended', 'blended', 'net_unblended',
+        'sp_effective', 'sp_net_effective', 'sp_total_commitment', 'sp_used_commitment',
+        'ri_arn', 'ri_effective', 'ri_net_effective',
+        'ri_unused_upfront', 'ri_unused_recurring',
+        'ri_net_unused_upfront', 'ri_net_unused_recurring',
+        'tags', 'cost_category',
+    )
+    
+    def __init__(self, source: Any, batch_size: int = DEFAULT_BATCH_SIZE):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow é necessário para ler o CUR em Parquet")
+        self.source = source
+        self.batch_size = batch_size
+        self.logger = setup_logger(self.__class__.__name__)
+    
+    def discover_files(self, start_date: datetime, end_date: datetime) -> List[str]:
+        """Lista os Parquet do período, priorizando o manifest"""
+        periods = set(billing_periods_between(start_date, end_date))
+        keys = self.source.list_keys()
+        
+        files = set()
+        for key in keys:
+            if not key.endswith('Manifest.json'):
+                continue
+            period = billing_period_of(key)
+            if period is not None and period not in periods:
+                continue
+            try:
+                manifest = json.loads(self.source.read_text(key))
+            except Exception as e:
+                self.logger.warning(f"Manifest CUR inválido ignorado ({key}): {e}")
+                continue
+            entries = manifest.get('dataFiles') or manifest.get('reportKeys') or []
+            for entry in entries:
+                data_key = _key_from_uri(entry)
+                if data_key.endswith('.parquet'):
+                    files.add(data_key)
+        
+        if not files:
+            for key in keys:
+                if not key.endswith('.parquet'):
+                    continue
+                period = billing_period_of(key)
+                if period is None or period in periods:
+                    files.add(key)
+        
+        return sorted(files)
+    
+    def _resolve_columns(self, schema: Any) -> Dict[str, Any]:
+        names = set(schema.names)
+        columns: Dict[str, Any] = {}
+        for logical, aliases in CUR_COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in names:
+                    columns[logical] = alias
+                    break
+        for logical in ('tags', 'cost_category'):
+            name = columns.get(logical)
+            if name and not pa.types.is_map(schema.field(name).type):
+                del columns[logical]
+        columns['legacy_tags'] = {
+            f"user:{n[len(LEGACY_TAG_PREFIX):]}": n
+            for n in schema.names if n.startswith(LEGACY_TAG_PREFIX)
+        }
+        columns['legacy_cost_categories'] = {
+            n[len(LEGACY_COST_CATEGORY_PREFIX):]: n
+            for n in schema.names
+            if n.startswith(LEGACY_COST_CATEGORY_PREFIX) and n != columns.get('cost_category')
+        }
+        return columns
+    
+    def _projection(self, columns: Dict[str, Any], logical_names: Tuple[str, ...]) -> List[str]:
+        projected = [columns[n] for n in logical_names if n in columns]
+        projected.extend(columns['legacy_tags'].values())
+        projected.extend(columns['legacy_cost_categories'].values())
+        return list(dict.fromkeys(projected))
+    
+    def _prune_row_groups(self, parquet_file: Any, column: Optional[str],
+                          start_date: datetime, end_date: datetime) -> List[int]:
+        """Descarta row groups cujas estatísticas de data estão fora do período"""
+        metadata = parquet_file.metadata
+        selected = []
+        for index in range(metadata.num_row_groups):
+            row_group = metadata.row_group(index)
+            keep = True
+            if column:
+                for c in range(row_group.num_columns):
+                    chunk = row_group.column(c)
+                    if chunk.path_in_schema != column:
+                        continue
+                    stats = chunk.statistics
+                    if stats is not None and stats.has_min_max:
+                        try:
+                            low, high = stats.min, stats.max
+                            if isinstance(low, str):
+                                keep = (high >= start_date.strftime('%Y-%m-%dT%H:%M:%S')
+                                        and low < end_date.strftime('%Y-%m-%dT%H:%M:%S'))
+                            else:
+                                keep = _naive_utc(high) >= start_date and _naive_utc(low) < end_date
+                        except Exception:
+                            keep = True
+                    break
+            if keep:
+                selected.append(index)
+        return selected
+    
+    def _filter_period(self, batch: Any, column: Optional[str],
+                       start_date: datetime, end_date: datetime) -> Any:
+        if not column:
+            return batch
+        values = batch.column(column)
+        if pa.types.is_timestamp(values.type):
+            values = pc.cast(values, pa.timestamp('us'))
+            low = pa.scalar(start_date, type=pa.timestamp('us'))
+            high = pa.scalar(end_date, type=pa.timestamp('us'))
+        else:
+            values = pc.cast(values, pa.string())
+            low = start_date.strftime('%Y-%m-%dT%H:%M:%S')
+            high = end_date.strftime('%Y-%m-%dT%H:%M:%S')
+        mask = pc.and_(pc.greater_equal(values, low), pc.less(values, high))
+        return batch.filter(mask)
+    
+    @staticmethod
+    def _float_column(batch: Any, columns: Dict[str, Any], logical: str) -> Any:
+        name = columns.get(logical)
+        if not name:
+            return pa.scalar(0.0)
+        return pc.fill_null(pc.cast(batch.column(name), pa.float64()), 0.0)
+    
+    def _compute_costs(self, batch: Any, columns: Dict[str, Any]) -> Dict[str, Any]:
+        """Custos unblended, blended, amortizado e líquido amortizado do lote"""
+        def col(logical):
+            return self._float_column(batch, columns, logical)
+        
+        unblended = col('unblended')
+        blended = col('blended') if columns.get('blended') else unblended
+        
+        def amortize(base, sp_effective, ri_effective, ri_unused_upfront, ri_unused_recurring):
+            if not columns.get('line_item_type'):
+                return base
+            line_type = pc.fill_null(batch.column(columns['line_item_type']), '')
+            ri_arn = columns.get('ri_arn')
+            has_ri = (pc.not_equal(pc.fill_null(batch.column(ri_arn), ''), '')
+                      if ri_arn else pa.scalar(False))
+            sp_unused = pc.max_element_wise(
+                pc.subtract(col('sp_total_commitment'), col('sp_used_commitment')), 0.0
+            )
+            rules = [
+                (pc.equal(line_type, 'SavingsPlanCoveredUsage'), sp_effective),
+                (pc.is_in(line_type, value_set=pa.array(['SavingsPlanNegation', 'SavingsPlanUpfrontFee'])),
+                 pa.scalar(0.0)),
+                (pc.equal(line_type, 'SavingsPlanRecurringFee'), sp_unused),
+                (pc.equal(line_type, 'DiscountedUsage'), ri_effective),
+                (pc.equal(line_type, 'RIFee'), pc.add(ri_unused_upfront, ri_unused_recurring)),
+                (pc.and_(pc.equal(line_type, 'Fee'), has_ri), pa.scalar(0.0)),
+            ]
+            result = base
+            for condition, value in reversed(rules):
+                result = pc.if_else(condition, value, result)
+            return result
+        
+        amortized = amortize(unblended, col('sp_effective'), col('ri_effective'),
+                             col('ri_unused_upfront'), col('ri_unused_recurring'))
+        if columns.get('net_unblended'):
+            net_amortized = amortize(col('net_unblended'), col('sp_net_effective'),
+                                     col('ri_net_effective'), col('ri_net_unused_upfront'),
+                                     col('ri_net_unused_recurring'))
+        else:
+            net_amortized = amortized
+        
+        return {
+            'unblended': unblended,
+            'blended': blended,
+            'amortized': amortized,
+            'net_amortized': net_amortized
+        }
+    
+    def _iter_batches(self, start_date: datetime, end_date: datetime,
+                      logical_names: Tuple[str, ...]) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        for key in self.discover_files(start_date, end_date):
+            with self.source.open_parquet(key) as path:
+                parquet_file = pq.ParquetFile(path)
+                columns = self._resolve_columns(parquet_file.schema_arrow)
+                if 'unblended' not in columns:
+                    self.logger.warning(f"Arquivo CUR sem line_item_unblended_cost ignorado: {key}")
+                    continue
+                date_column = columns.get('usage_start')
+                row_groups = self._prune_row_groups(parquet_file, date_column, start_date, end_date)
+                if not row_groups:
+                    continue
+                for batch in parquet_file.iter_batches(
+                    batch_size=self.batch_size,
+                    row_groups=row_groups,
+                    columns=self._projection(columns, logical_names)
+                ):
+                    yield self._filter_period(batch, date_column, start_date, end_date), columns
+    
+    def summarize(self, start_date: datetime, end_date: datetime) -> 'CURSummary':
+        """
+        Agrega o CUR do período em um CURSummary
+        
+        Args:
+            start_date: Data inicial (inclusiva)
+            end_date: Data final (exclusiva)
+        """
+        aggregator = _CURAggregator()
+        for batch, columns in self._iter_batches(start_date, end_date, self.AGGREGATION_COLUMNS):
+            aggregator.add(batch, columns, self._compute_costs(batch, columns))
+        return aggregator.to_summary(start_date, end_date)
+    
+    @staticmethod
+    def _usage_day(values: Any) -> Any:
+        """Dia (YYYY-MM-DD) do início de uso"""
+        if pa.types.is_timestamp(values.type):
+            return pc.strftime(pc.cast(values, pa.timestamp('us')), format='%Y-%m-%d')
+        return pc.utf8_slice_codeunits(pc.cast(values, pa.string()), 0, 10)
+    
+    def load_frame(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        dimensions: Tuple[str, ...] = ('product_code', 'region', 'account_id', 'usage_type')
+    ) -> 'ColumnarCostFrame':
+        """
+        Carrega o CUR do período como ColumnarCostFrame (sem CURRecord por linha)
+        
+        Dimensões ausentes no arquivo viram string vazia; 'usage_day' é
+        derivada de line_item_usage_start_date. Métricas: unblended,
+        amortized e net_amortized.
+        """
+        from ..analytics.cost_engine import ColumnarCostFrame
+        
+        frames = []
+        logical_names = self.AGGREGATION_COLUMNS + tuple(dimensions)
+        for batch, columns in self._iter_batches(start_date, end_date, logical_names):
+            if batch.num_rows == 0:
+                continue
+            costs = self._compute_costs(batch, columns)
+            empty = pa.nulls(batch.num_rows, type=pa.string())
+            arrays = {name: batch.column(columns[name]) if name in columns else empty
+                      for name in dimensions}
+            if 'usage_day' in dimensions and 'usage_start' in columns:
+                arrays['usage_day'] = self._usage_day(batch.column(columns['usage_start']))
+            arrays.update(costs)
+            table = pa.table(arrays)
+            frames.append(ColumnarCostFrame.from_arrow(
+                table,
+                dimensions={name: name for name in dimensions},
+                metrics={name: name for name in costs}
+            ))
+        return ColumnarCostFrame.concat(frames)
+    
+    def iter_records(self, start_date: datetime, end_date: datetime,
+                     resource_id: Optional[str] = None) -> Iterator['CURRecord']:
+        """Itera os line items do período como CURRecord"""
+        logical_names = tuple(CUR_COLUMN_ALIASES.keys())
+        for batch, columns in self._iter_batches(start_date, end_date, logical_names):
+            if resource_id and columns.get('resource_id'):
+                batch = batch.filter(pc.equal(batch.column(columns['resource_id']), resource_id))
+            if batch.num_rows == 0:
+                continue
+            costs = {k: v.to_pylist() for k, v in self._compute_costs(batch, columns).items()}
+            values = {
+                logical: batch.column(name).to_pylist()
+                for logical, name in columns.items()
+                if isinstance(name, str)
+            }
+            legacy_tags = {key: batch.column(name).to_pylist()
+                           for key, name in columns['legacy_tags'].items()}
+            
+            for i in range(batch.num_rows):
+                def get(logical, default=''):
+                    column = values.get(logical)
+                    value = column[i] if column is not None else None
+                    return default if value is None else value
+                
+                tags = dict(get('tags', None) or [])
+                tags.update({k: v[i] for k, v in legacy_tags.items() if v[i]})
+                categories = dict(get('cost_category', None) or [])
+                
+                yield CURRecord(
+                    line_item_id=str(get('line_item_id')),
+                    usage_start_date=_as_datetime(get('usage_start', None), start_date),
+                    usage_end_date=_as_datetime(get('usage_end', None), end_date),
+                    product_code=get('product_code'),
+                    usage_type=get('usage_type'),
+                    operation=get('operation'),
+                    resource_id=get('resource_id'),
+                    usage_amount=float(get('usage_amount', 0.0)),
+                    unblended_cost=costs['unblended'][i],
+                    blended_cost=costs['blended'][i],
+                    amortized_cost=costs['amortized'][i],
+                    net_amortized_cost=costs['net_amortized'][i],
+                    region=get('region'),
+                    availability_zone=get('availability_zone'),
+                    linked_account_id=get('account_id'),
+                    linked_account_name=get('account_name'),
+                    tags=tags,
+                    cost_category=','.join(f"{k}={v}" for k, v in categories.items()),
+                    pricing_term=get('pricing_term'),
+                    reservation_arn=get('ri_arn'),
+                    savings_plan_arn=get('sp_arn')
+                )
+
+
 class CURIngestionService(BaseAWSService):
     """
     Serviço de Ingestão CUR
     
     Funcionalidades:
-    - Ingestão de dados CUR via Athena ou S3
+    - Ingestão de dados CUR em Parquet via S3 (ou diretório local espelho)
     - Fallback para Cost Explorer quando CUR não disponível
     - Normalização e cache de dados
     - Reconciliação automática
@@ -151,10 +750,13 @@ class CURIngestionService(BaseAWSService):
     CUR_DATABASE = os.environ.get('CUR_DATABASE', 'cur_database')
     CUR_TABLE = os.environ.get('CUR_TABLE', 'cost_and_usage_report')
     CUR_S3_BUCKET = os.environ.get('CUR_S3_BUCKET', '')
+    CUR_S3_PREFIX = os.environ.get('CUR_S3_PREFIX', '')
+    CUR_LOCAL_PATH = os.environ.get('CUR_LOCAL_PATH', '')
     
-    def __init__(self, client_factory=None):
+    def __init__(self, client_factory=None, cur_source=None):
         super().__init__()
         self._client_factory = client_factory
+        self._cur_source = cur_source
         self.logger = setup_logger(self.__class__.__name__)
         self.service_name = "cur_ingestion"
         self._cache = FinOpsCache(default_ttl=300)
@@ -179,16 +781,32 @@ class CURIngestionService(BaseAWSService):
             return self._client_factory.get_client('s3')
         return boto3.client('s3')
     
+    def _get_cur_source(self):
+        """Obtém a fonte dos arquivos CUR (injetada, diretório local ou S3)"""
+        if self._cur_source is not None:
+            return self._cur_source
+        if self.CUR_LOCAL_PATH:
+            return LocalCURSource(self.CUR_LOCAL_PATH, self.CUR_S3_PREFIX)
+        if self.CUR_S3_BUCKET:
+            return S3CURSource(self._get_s3_client(), self.CUR_S3_BUCKET, self.CUR_S3_PREFIX)
+        return None
+    
+    def get_parquet_reader(self) -> Optional[CURParquetReader]:
+        """Leitor do CUR em Parquet, ou None se o CUR não está configurado/disponível"""
+        if not self._check_s3_cur_available():
+            return None
+        return CURParquetReader(self._get_cur_source())
+    
     def health_check(self) -> bool:
         """Verifica saúde do serviço e determina fonte de dados"""
-        if self._check_athena_available():
-            self._data_source = CURDataSource.ATHENA
-            return True
-        
         if self._check_s3_cur_available():
             self._data_source = CURDataSource.S3_DIRECT
             return True
         
+        if self._check_athena_available():
+            self._data_source = CURDataSource.ATHENA
+            return True
+        
         if self._check_cost_explorer_available():
             self._data_source = CURDataSource.COST_EXPLORER_FALLBACK
             self.logger.info("Usando Cost Explorer como fallback (CUR não configurado)")
@@ -211,16 +829,17 @@ class CURIngestionService(BaseAWSService):
             return False
     
     def _check_s3_cur_available(self) -> bool:
-        """Verifica se CUR em S3 está disponível"""
-        if not self.CUR_S3_BUCKET:
+        """Verifica se CUR em Parquet (S3 ou diretório local) está disponível"""
+        source = self._get_cur_source()
+        if source is None:
             return False
         
-        try:
-            client = self._get_s3_client()
-            client.head_bucket(Bucket=self.CUR_S3_BUCKET)
-            return True
-        except ClientError:
+        if not PYARROW_AVAILABLE:
+            self.logger.warning("pyarrow não instalado - ingestão Parquet do CUR indisponível")
             return False
+        
+        try:
+            return source.is_available()
         except Exception:
             return False
     
@@ -305,8 +924,20 @@ class CURIngestionService(BaseAWSService):
         start_date: datetime,
         end_date: datetime
     ) -> CURSummary:
-        """Ingere dados diretamente do S3"""
-        self.logger.info("Ingestão via S3 não implementada - usando fallback")
+        """
+        Ingere arquivos Parquet do CUR diretamente do S3
+        
+        Lê em streaming por row group com projeção de colunas e poda por
+        período; sem arquivos no período usa o Cost Explorer.
+        """
+        try:
+            reader = CURParquetReader(self._get_cur_source())
+            summary = reader.summarize(start_date, end_date)
+            if summary.record_count > 0:
+                return summary
+            self.logger.info("Nenhum line item CUR no período - usando fallback")
+        except Exception as e:
+            self.logger.error(f"Erro na ingestão CUR via S3: {e}")
         return self._ingest_from_cost_explorer(start_date, end_date)
     
     def _ingest_from_cost_explorer(
@@ -503,6 +1134,39 @@ class CURIngestionService(BaseAWSService):
         
         return summary
     
+    def get_line_items(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        resource_id: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[CURRecord]:
+        """
+        Obtém line items do CUR com granularidade de recurso e tags
+        
+        Args:
+            start_date: Data inicial
+            end_date: Data final
+            resource_id: Filtra por ID de recurso
+            limit: Máximo de registros
+            
+        Returns:
+            Lista de CURRecord (vazia sem CUR em Parquet)
+        """
+        if not self._check_s3_cur_available():
+            return []
+        
+        records = []
+        try:
+            reader = CURParquetReader(self._get_cur_source())
+            for record in reader.iter_records(start_date, end_date, resource_id=resource_id):
+                records.append(record)
+                if len(records) >= limit:
+                    break
+        except Exception as e:
+            self.logger.error(f"Erro ao ler line items do CUR: {e}")
+        return records
+    
     def get_daily_costs(
         self,
         days_back: int = 30
@@ -24,6 +24,7 @@ from .base_service import (
 )
 from ..utils.logger import setup_logger
 from ..utils.aws_helpers import handle_aws_error, get_aws_region
+from ..pricing import get_price_index
 
 logger = setup_logger(__name__)
 
@@ -341,7 +342,7 @@ class DynamoDBFinOpsService(BaseAWSService):
                 access_frequency = self._estimate_access_frequency(table)
                 if access_frequency == 'INFREQUENT':
                     size_gb = table.table_size_bytes / (1024 ** 3)
-                    estimated_savings = size_gb * 0.25 * 0.60
+                    estimated_savings = size_gb * get_price_index().dynamodb_storage_gb_month(self.region) * 0.60
                     
                     recommendations.append(ServiceRecommendation(
                         resource_id=table.table_name,
@@ -364,8 +365,9 @@ class DynamoDBFinOpsService(BaseAWSService):
     
     def _estimate_on_demand_savings(self, table: DynamoDBTable) -> float:
         """Estima economia ao migrar para On-Demand"""
-        rcu_cost_provisioned = table.read_capacity * 0.00013 * 24 * 30
-        wcu_cost_provisioned = table.write_capacity * 0.00065 * 24 * 30
+        rcu_rate, wcu_rate = get_price_index().dynamodb_capacity_hourly(self.region)
+        rcu_cost_provisioned = table.read_capacity * rcu_rate * 24 * 30
+        wcu_cost_provisioned = table.write_capacity * wcu_rate * 24 * 30
         current_cost = rcu_cost_provisioned + wcu_cost_provisioned
         
         estimated_on_demand = current_cost * 0.3
@@ -408,6 +410,7 @@ class DynamoDBFinOpsService(BaseAWSService):
             'optimal': [],
             'total_wasted_capacity_cost': 0.0
         }
+        rcu_rate, wcu_rate = get_price_index().dynamodb_capacity_hourly(self.region)
         
         for table in tables:
             if table.billing_mode != 'PROVISIONED':
@@ -434,8 +437,8 @@ class DynamoDBFinOpsService(BaseAWSService):
             
             if avg_util < 30:
                 analysis['over_provisioned'].append(table_info)
-                wasted_rcu = (table.read_capacity - consumed_rcu) * 0.00013 * 24 * 30
-                wasted_wcu = (table.write_capacity - consumed_wcu) * 0.00065 * 24 * 30
+                wasted_rcu = (table.read_capacity - consumed_rcu) * rcu_rate * 24 * 30
+                wasted_wcu = (table.write_capacity - consumed_wcu) * wcu_rate * 24 * 30
                 analysis['total_wasted_capacity_cost'] += wasted_rcu + wasted_wcu
             elif avg_util > 80:
                 analysis['under_provisioned'].append(table_info)
@@ -21,6 +21,7 @@ from .base_service import (
 )
 from ..utils.logger import setup_logger
 from ..utils.aws_helpers import handle_aws_error, get_aws_region
+from ..pricing import get_price_index
 
 logger = setup_logger(__name__)
 
@@ -280,11 +281,7 @@ class EBSService(BaseAWSService):
         
         unattached = [v for v in volumes if not v.attached]
         for vol in unattached:
-            type_costs = {
-                'gp2': 0.10, 'gp3': 0.08, 'io1': 0.125,
-                'io2': 0.125, 'st1': 0.045, 'sc1': 0.015
-            }
-            monthly_cost = vol.size_gb * type_costs.get(vol.volume_type, 0.10)
+            monthly_cost = vol.size_gb * get_price_index().ebs_gb_month(vol.volume_type, self.region)
             
             recommendations.append(ServiceRecommendation(
                 resource_id=vol.volume_id,
@@ -17,6 +17,7 @@ from datetime import datetime, timedelta, timezone
 
 from .base_service import BaseAWSService, ServiceCost, ServiceMetrics, ServiceRecommendation
 from ..utils.logger import setup_logger
+from ..pricing import get_price_index
 
 logger = setup_logger(__name__)
 
@@ -548,25 +549,8 @@ class EKSService(BaseAWSService):
         )
     
     def _estimate_instance_hourly_rate(self, instance_type: str) -> float:
-        """Estima custo por hora de um tipo de instância"""
-        rates = {
-            't3.micro': 0.0104,
-            't3.small': 0.0208,
-            't3.medium': 0.0416,
-            't3.large': 0.0832,
-            't3.xlarge': 0.1664,
-            'm5.large': 0.096,
-            'm5.xlarge': 0.192,
-            'm5.2xlarge': 0.384,
-            'm5.4xlarge': 0.768,
-            'c5.large': 0.085,
-            'c5.xlarge': 0.17,
-            'c5.2xlarge': 0.34,
-            'r5.large': 0.126,
-            'r5.xlarge': 0.252,
-            'r5.2xlarge': 0.504,
-        }
-        return rates.get(instance_type, 0.10)
+        """Estima custo por hora de um tipo de instância (catálogo de preços)"""
+        return get_price_index().ec2_hourly(instance_type, self.region)
     
     def get_metrics(self) -> ServiceMetrics:
         """Retorna métricas dos clusters EKS"""
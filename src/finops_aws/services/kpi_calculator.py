@@ -15,8 +15,11 @@ Implementa os 12+ KPIs do framework FinOps:
 - RI/SP Coverage & Utilization
 - MoM/YoY Growth
 - Economic Health Index
+
+Os KPIs são derivados localmente pelo KPIEngine a partir de fontes
+buscadas uma única vez, em paralelo.
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import os
@@ -25,8 +28,90 @@ import boto3
 from botocore.exceptions import ClientError
 
 from ..utils.logger import setup_logger
+from ..analytics.cost_cube import CostCube, resolve_cost_cube
+from ..analytics.kpi_engine import DataSource, KPIDefinition, KPIEngine, KPIEvaluation
+from ..forecasting_engine import DEFAULT_HISTORY_DAYS, MIN_HISTORY_DAYS, ForecastEngine
 from ..models.finops_models import FinOpsKPIs
 
+FORECAST_HORIZONS = (7, 30, 90)
+HISTORY_DAYS = 396
+
+
+def _period_bounds(months_back: int, now: Optional[datetime] = None) -> Tuple[str, str]:
+    """Janela de 30 dias de N meses atrás (início, fim exclusivo)"""
+    end = (now or datetime.utcnow()).replace(day=1) - timedelta(days=1)
+    end = end.replace(day=1) - timedelta(days=30 * (months_back - 1))
+    return (end - timedelta(days=30)).strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+
+def _window_sum(costs: Dict[str, float], start: str, end: str) -> float:
+    """Soma dos custos diários em [start, end)"""
+    return sum(cost for day, cost in costs.items() if start <= day < end)
+
+
+def _horizon_totals(
+    daily: Sequence[float],
+    horizons: Sequence[int],
+    total: Optional[float] = None
+) -> Dict[int, float]:
+    """Custo acumulado por horizonte (total informado vale para o maior)"""
+    longest = max(horizons)
+    return {
+        days: round(total if total is not None and days == longest else float(sum(daily[:days])), 2)
+        for days in horizons
+    }
+
+
+def _economic_health_index(
+    waste_percent: float,
+    ri_metrics: Tuple[float, float],
+    sp_metrics: Tuple[float, float],
+    cost_growth_mom: float
+) -> int:
+    """Índice 0-100: desperdício, utilização e cobertura de compromissos, crescimento MoM"""
+    health_factors = []
+    
+    if waste_percent <= 5:
+        health_factors.append(25)
+    elif waste_percent <= 10:
+        health_factors.append(20)
+    elif waste_percent <= 20:
+        health_factors.append(10)
+    else:
+        health_factors.append(0)
+    
+    (ri_utilization, ri_coverage), (sp_utilization, sp_coverage) = ri_metrics, sp_metrics
+    avg_commitment = (ri_utilization + sp_utilization) / 2 if (ri_utilization > 0 or sp_utilization > 0) else 0
+    if avg_commitment >= 80:
+        health_factors.append(25)
+    elif avg_commitment >= 60:
+        health_factors.append(20)
+    elif avg_commitment >= 40:
+        health_factors.append(10)
+    else:
+        health_factors.append(5)
+    
+    avg_coverage = (ri_coverage + sp_coverage) / 2 if (ri_coverage > 0 or sp_coverage > 0) else 0
+    if avg_coverage >= 70:
+        health_factors.append(25)
+    elif avg_coverage >= 50:
+        health_factors.append(20)
+    elif avg_coverage >= 30:
+        health_factors.append(10)
+    else:
+        health_factors.append(5)
+    
+    if cost_growth_mom <= 5:
+        health_factors.append(25)
+    elif cost_growth_mom <= 15:
+        health_factors.append(20)
+    elif cost_growth_mom <= 30:
+        health_factors.append(10)
+    else:
+        health_factors.append(0)
+    
+    return sum(health_factors)
+
 
 @dataclass
 class KPIResult:
@@ -37,6 +122,7 @@ class KPIResult:
     period_end: datetime
     data_sources: List[str]
     warnings: List[str]
+    evaluation: Optional[KPIEvaluation] = None
     
     def to_dict(self) -> Dict[str, Any]:
         result = self.kpis.to_dict()
@@ -47,6 +133,14 @@ class KPIResult:
             'data_sources': self.data_sources,
             'warnings': self.warnings
         }
+        if self.evaluation is not None:
+            evaluation = self.evaluation.to_dict()
+            result['metadata'].update({
+                'compute_ms': evaluation['compute_ms'],
+                'lineage': evaluation['lineage'],
+                'sources': evaluation['sources'],
+                'fetch_seconds': evaluation['fetch_seconds']
+            })
         return result
 
 
@@ -62,8 +156,9 @@ class KPICalculator:
     - Analyzers (idle cost, savings potential)
     """
     
-    def __init__(self, client_factory=None):
+    def __init__(self, client_factory=None, cost_cube: Optional[CostCube] = None):
         self._client_factory = client_factory
+        self._cost_cube = cost_cube
         self.logger = setup_logger(self.__class__.__name__)
     
     def _get_ce_client(self):
@@ -75,11 +170,15 @@ class KPICalculator:
     def get_total_spend(self, days_back: int = 30) -> float:
         """Obtém custo total do período"""
         try:
-            client = self._get_ce_client()
-            
             end_date = datetime.utcnow().strftime('%Y-%m-%d')
             start_date = (datetime.utcnow() - timedelta(days=days_back)).strftime('%Y-%m-%d')
             
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+            if cube:
+                return round(cube.total(start_date, end_date), 2)
+            
+            client = self._get_ce_client()
+            
             response = client.get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date,
@@ -102,6 +201,70 @@ class KPICalculator:
     
     def get_cost_forecast(self, days_forward: int = 30) -> float:
         """Obtém previsão de custos"""
+        return self.get_cost_forecasts((days_forward,))[days_forward]
+    
+    def get_cost_forecasts(self, horizons=FORECAST_HORIZONS) -> Dict[int, float]:
+        """
+        Previsões de custo acumulado para vários horizontes
+        
+        Um único histórico diário e um único ajuste do ForecastEngine
+        atendem todos os horizontes; sem histórico suficiente, usa uma
+        única consulta de forecast do Cost Explorer.
+        """
+        try:
+            daily = self._forecast_from_history(self._get_daily_history(DEFAULT_HISTORY_DAYS), max(horizons))
+            if daily is not None:
+                return _horizon_totals(daily, horizons)
+        except Exception as e:
+            self.logger.error(f"Erro no forecast estatístico: {e}")
+        
+        daily, total = self._get_ce_daily_forecast(max(horizons))
+        return _horizon_totals(daily, horizons, total)
+    
+    def _forecast_from_history(self, history: List[float], days_forward: int) -> Optional[List[float]]:
+        """Previsão diária do ForecastEngine (None se o histórico for curto)"""
+        if len(history) < MIN_HISTORY_DAYS:
+            return None
+        result = ForecastEngine().forecast(history, days_forward)
+        return result.forecast[0].tolist()
+    
+    def _get_daily_history(self, days: int) -> List[float]:
+        """Custos diários dos últimos N dias (cubo ativo ou Cost Explorer)"""
+        end_date = datetime.utcnow().strftime('%Y-%m-%d')
+        start_date = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d')
+        
+        cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+        if cube:
+            return [point['cost'] for point in cube.daily_series(start_date, end_date)]
+        
+        return [cost for _, cost in self._query_daily_costs(start_date, end_date)]
+    
+    def _query_daily_costs(self, start_date: str, end_date: str) -> List[Tuple[str, float]]:
+        """(dia, custo) DAILY do Cost Explorer, com paginação"""
+        client = self._get_ce_client()
+        params = {
+            'TimePeriod': {'Start': start_date, 'End': end_date},
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost']
+        }
+        costs = []
+        while True:
+            response = client.get_cost_and_usage(**params)
+            for result in response.get('ResultsByTime', []):
+                day = result.get('TimePeriod', {}).get('Start', '')[:10]
+                costs.append((day, float(result.get('Total', {}).get('UnblendedCost', {}).get('Amount', 0))))
+            token = response.get('NextPageToken')
+            if not token:
+                return costs
+            params['NextPageToken'] = token
+    
+    def _get_ce_daily_forecast(self, days_forward: int) -> Tuple[List[float], Optional[float]]:
+        """
+        Previsão DAILY do Cost Explorer para o maior horizonte
+        
+        Returns:
+            (previsão por dia, total do período ou None)
+        """
         try:
             client = self._get_ce_client()
             
@@ -114,36 +277,39 @@ class KPICalculator:
                     'End': end_date
                 },
                 Metric='UNBLENDED_COST',
-                Granularity='MONTHLY'
+                Granularity='DAILY'
             )
             
-            total_forecast = float(response.get('Total', {}).get('Amount', 0))
-            return round(total_forecast, 2)
-            
+            daily = [float(result.get('MeanValue', 0)) for result in response.get('ForecastResultsByTime', [])]
+            total = response.get('Total', {}).get('Amount')
+            return daily, float(total) if total is not None else None
+        
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', '')
             if error_code == 'DataUnavailableException':
                 self.logger.info("Dados insuficientes para forecast")
             else:
                 self.logger.error(f"Erro ao obter forecast: {e}")
-            return 0.0
+            return [], None
         except Exception as e:
             self.logger.error(f"Erro ao obter forecast: {e}")
-            return 0.0
+            return [], None
     
     def get_cost_by_period(self, months_back: int) -> float:
         """Obtém custo de N meses atrás"""
         try:
-            client = self._get_ce_client()
+            start_date, end_date = _period_bounds(months_back)
+            
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+            if cube:
+                return round(cube.total(start_date, end_date), 2)
             
-            end_date = (datetime.utcnow().replace(day=1) - timedelta(days=1))
-            end_date = end_date.replace(day=1) - timedelta(days=30 * (months_back - 1))
-            start_date = end_date - timedelta(days=30)
+            client = self._get_ce_client()
             
             response = client.get_cost_and_usage(
                 TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
+                    'Start': start_date,
+                    'End': end_date
                 },
                 Granularity='MONTHLY',
                 Metrics=['UnblendedCost']
@@ -155,88 +321,221 @@ class KPICalculator:
                 total += float(amount)
             
             return round(total, 2)
-            
+        
         except Exception as e:
             self.logger.debug(f"Erro ao obter custo histórico: {e}")
             return 0.0
     
+    def _commitment_period(self) -> Dict[str, str]:
+        return {
+            'Start': (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%d'),
+            'End': datetime.utcnow().strftime('%Y-%m-%d')
+        }
+    
+    def _fetch_ri_utilization(self, _: Optional[Dict[str, Any]] = None) -> float:
+        response = self._get_ce_client().get_reservation_utilization(
+            TimePeriod=self._commitment_period(),
+            Granularity='MONTHLY'
+        )
+        return round(float(response.get('Total', {}).get('UtilizationPercentage', 0)), 2)
+    
+    def _fetch_ri_coverage(self, _: Optional[Dict[str, Any]] = None) -> float:
+        response = self._get_ce_client().get_reservation_coverage(
+            TimePeriod=self._commitment_period(),
+            Granularity='MONTHLY'
+        )
+        return round(float(response.get('Total', {}).get('CoverageHours', {}).get('CoverageHoursPercentage', 0)), 2)
+    
+    def _fetch_sp_utilization(self, _: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        response = self._get_ce_client().get_savings_plans_utilization(
+            TimePeriod=self._commitment_period(),
+            Granularity='MONTHLY'
+        )
+        total = response.get('Total', {}).get('Utilization', {})
+        return {
+            'utilization': round(float(total.get('UtilizationPercentage', 0)), 2),
+            'unused_commitment': round(float(total.get('UnusedCommitment', 0)), 2)
+        }
+    
+    def _fetch_sp_coverage(self, _: Optional[Dict[str, Any]] = None) -> float:
+        response = self._get_ce_client().get_savings_plans_coverage(
+            TimePeriod=self._commitment_period(),
+            Granularity='MONTHLY'
+        )
+        return round(float(response.get('Total', {}).get('Coverage', {}).get('CoveragePercentage', 0)), 2)
+    
+    def _safe_fetch(self, fetch, default):
+        try:
+            return fetch()
+        except Exception:
+            return default
+    
     def get_ri_utilization_and_coverage(self) -> Dict[str, float]:
         """Obtém utilização e cobertura de RIs"""
-        try:
-            client = self._get_ce_client()
-            
-            end_date = datetime.utcnow().strftime('%Y-%m-%d')
-            start_date = (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%d')
-            
-            utilization = 0.0
-            try:
-                util_response = client.get_reservation_utilization(
-                    TimePeriod={'Start': start_date, 'End': end_date},
-                    Granularity='MONTHLY'
-                )
-                utilization = float(util_response.get('Total', {}).get('UtilizationPercentage', 0))
-            except Exception:
-                pass
-            
-            coverage = 0.0
-            try:
-                cov_response = client.get_reservation_coverage(
-                    TimePeriod={'Start': start_date, 'End': end_date},
-                    Granularity='MONTHLY'
-                )
-                coverage = float(cov_response.get('Total', {}).get('CoverageHours', {}).get('CoverageHoursPercentage', 0))
-            except Exception:
-                pass
-            
-            return {
-                'utilization': round(utilization, 2),
-                'coverage': round(coverage, 2)
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao obter RI metrics: {e}")
-            return {'utilization': 0.0, 'coverage': 0.0}
+        return {
+            'utilization': self._safe_fetch(self._fetch_ri_utilization, 0.0),
+            'coverage': self._safe_fetch(self._fetch_ri_coverage, 0.0)
+        }
     
     def get_sp_utilization_and_coverage(self) -> Dict[str, float]:
         """Obtém utilização e cobertura de Savings Plans"""
-        try:
-            client = self._get_ce_client()
-            
-            end_date = datetime.utcnow().strftime('%Y-%m-%d')
-            start_date = (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%d')
-            
-            utilization = 0.0
-            unused = 0.0
-            try:
-                util_response = client.get_savings_plans_utilization(
-                    TimePeriod={'Start': start_date, 'End': end_date},
-                    Granularity='MONTHLY'
-                )
-                total = util_response.get('Total', {}).get('Utilization', {})
-                utilization = float(total.get('UtilizationPercentage', 0))
-                unused = float(total.get('UnusedCommitment', 0))
-            except Exception:
-                pass
-            
-            coverage = 0.0
+        utilization = self._safe_fetch(self._fetch_sp_utilization, {'utilization': 0.0, 'unused_commitment': 0.0})
+        return {
+            'utilization': utilization['utilization'],
+            'coverage': self._safe_fetch(self._fetch_sp_coverage, 0.0),
+            'unused_commitment': utilization['unused_commitment']
+        }
+    
+    def _fetch_daily_costs(self, _: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Série DAILY única que atende todos os KPIs de custo
+        
+        Cobre 13 meses (e o período de comparação YoY): gasto de 30 dias,
+        MoM, YoY e o histórico do forecast saem dela.
+        """
+        today = datetime.utcnow()
+        end_date = today.strftime('%Y-%m-%d')
+        start_date = min(
+            (today - timedelta(days=HISTORY_DAYS)).strftime('%Y-%m-%d'),
+            _period_bounds(12, today)[0]
+        )
+        
+        cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+        if cube:
+            costs = {point['date']: point['cost'] for point in cube.daily_series(start_date, end_date)}
+            origin = 'cost_cube'
+        else:
+            costs = dict(self._query_daily_costs(start_date, end_date))
+            origin = 'cost_explorer'
+        return {'origin': origin, 'start': start_date, 'end': end_date, 'costs': costs}
+    
+    def _fetch_forecast(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Previsão diária do maior horizonte (local; CE só sem histórico)"""
+        horizon = max(FORECAST_HORIZONS)
+        daily_costs = data.get('daily_costs') or {}
+        if daily_costs.get('costs'):
+            end_date = daily_costs['end']
+            start_date = (datetime.utcnow() - timedelta(days=DEFAULT_HISTORY_DAYS)).strftime('%Y-%m-%d')
+            history = [cost for day, cost in sorted(daily_costs['costs'].items()) if start_date <= day < end_date]
             try:
-                cov_response = client.get_savings_plans_coverage(
-                    TimePeriod={'Start': start_date, 'End': end_date},
-                    Granularity='MONTHLY'
-                )
-                coverage = float(cov_response.get('Total', {}).get('Coverage', {}).get('CoveragePercentage', 0))
-            except Exception:
-                pass
-            
-            return {
-                'utilization': round(utilization, 2),
-                'coverage': round(coverage, 2),
-                'unused_commitment': round(unused, 2)
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao obter SP metrics: {e}")
-            return {'utilization': 0.0, 'coverage': 0.0, 'unused_commitment': 0.0}
+                daily = self._forecast_from_history(history, horizon)
+                if daily is not None:
+                    return {'origin': 'forecast_engine', 'daily': daily, 'total': None}
+            except Exception as e:
+                self.logger.error(f"Erro no forecast estatístico: {e}")
+        
+        daily, total = self._get_ce_daily_forecast(horizon)
+        return {'origin': 'cost_explorer_forecast', 'daily': daily, 'total': total}
+    
+    def build_kpi_engine(self, inputs: Optional[Dict[str, Any]] = None) -> KPIEngine:
+        """
+        Motor de KPIs com as fontes e derivações declaradas
+        
+        Fontes: série diária de 13 meses, forecast, utilização/cobertura
+        de RI e SP e as entradas do chamador (idle, shadow, receita, ...).
+        """
+        inputs = dict(inputs or {})
+        
+        def caller_inputs(_):
+            return {'origin': 'caller', **inputs}
+        
+        sources = [
+            DataSource('daily_costs', self._fetch_daily_costs),
+            DataSource('forecast', self._fetch_forecast, requires=('daily_costs',)),
+            DataSource('ri_utilization', self._fetch_ri_utilization, origin='cost_explorer'),
+            DataSource('ri_coverage', self._fetch_ri_coverage, origin='cost_explorer'),
+            DataSource('sp_utilization', self._fetch_sp_utilization, origin='cost_explorer'),
+            DataSource('sp_coverage', self._fetch_sp_coverage, origin='cost_explorer'),
+            DataSource('inputs', caller_inputs),
+        ]
+        
+        def window_cost(context):
+            daily_costs = context['daily_costs'] or {'costs': {}}
+            return daily_costs['costs']
+        
+        def total_spend(context):
+            end = datetime.utcnow()
+            return round(_window_sum(window_cost(context), (end - timedelta(days=30)).strftime('%Y-%m-%d'),
+                                     end.strftime('%Y-%m-%d')), 2)
+        
+        def period_cost(months_back):
+            def compute(context):
+                return round(_window_sum(window_cost(context), *_period_bounds(months_back)), 2)
+            return compute
+        
+        def forecast(days):
+            def compute(context):
+                result = context['forecast'] or {'daily': [], 'total': None}
+                return _horizon_totals(result['daily'], (days,),
+                                       result['total'] if days == max(FORECAST_HORIZONS) else None)[days]
+            return compute
+        
+        def value(source, key=None):
+            def compute(context):
+                result = context[source]
+                if result is None:
+                    return 0.0
+                return result.get(key, 0.0) if key else result
+            return compute
+        
+        def growth(previous):
+            def compute(context):
+                base = context[previous]
+                return round((context['total_spend'] - base) / base * 100, 2) if base > 0 else 0
+            return compute
+        
+        def per_unit(count_key, digits):
+            def compute(context):
+                count = context['inputs'].get(count_key, 0)
+                return round(context['total_spend'] / count, digits) if count > 0 else 0
+            return compute
+        
+        def waste_percent(context):
+            waste = (context['inputs'].get('idle_cost', 0.0) + context['commitment_loss']
+                     + context['inputs'].get('shadow_cost', 0.0))
+            return (waste / context['total_spend'] * 100) if context['total_spend'] > 0 else 0
+        
+        def margin(context):
+            revenue = context['inputs'].get('revenue', 0.0)
+            return round((revenue - context['total_spend']) / revenue * 100, 2) if revenue > 0 else 0
+        
+        def health_index(context):
+            return _economic_health_index(
+                context['waste_percent'],
+                (context['ri_utilization_percent'], context['ri_coverage_percent']),
+                (context['sp_utilization_percent'], context['sp_coverage_percent']),
+                context['cost_growth_mom']
+            )
+        
+        commitments = ('ri_utilization_percent', 'ri_coverage_percent',
+                       'sp_utilization_percent', 'sp_coverage_percent')
+        kpis = [
+            KPIDefinition('total_spend', total_spend, sources=('daily_costs',)),
+            KPIDefinition('last_month_cost', period_cost(1), sources=('daily_costs',)),
+            KPIDefinition('last_year_cost', period_cost(12), sources=('daily_costs',)),
+            KPIDefinition('forecast_7d', forecast(7), sources=('forecast',)),
+            KPIDefinition('forecast_30d', forecast(30), sources=('forecast',)),
+            KPIDefinition('forecast_90d', forecast(90), sources=('forecast',)),
+            KPIDefinition('ri_utilization_percent', value('ri_utilization'), sources=('ri_utilization',)),
+            KPIDefinition('ri_coverage_percent', value('ri_coverage'), sources=('ri_coverage',)),
+            KPIDefinition('sp_utilization_percent', value('sp_utilization', 'utilization'),
+                          sources=('sp_utilization',)),
+            KPIDefinition('sp_coverage_percent', value('sp_coverage'), sources=('sp_coverage',)),
+            KPIDefinition('commitment_loss', value('sp_utilization', 'unused_commitment'),
+                          sources=('sp_utilization',)),
+            KPIDefinition('waste_percent', waste_percent, sources=('inputs',),
+                          kpis=('total_spend', 'commitment_loss')),
+            KPIDefinition('cost_per_transaction', per_unit('transactions_count', 6), sources=('inputs',),
+                          kpis=('total_spend',)),
+            KPIDefinition('cost_per_customer', per_unit('customers_count', 4), sources=('inputs',),
+                          kpis=('total_spend',)),
+            KPIDefinition('margin', margin, sources=('inputs',), kpis=('total_spend',)),
+            KPIDefinition('cost_growth_mom', growth('last_month_cost'), kpis=('total_spend', 'last_month_cost')),
+            KPIDefinition('cost_growth_yoy', growth('last_year_cost'), kpis=('total_spend', 'last_year_cost')),
+            KPIDefinition('economic_health_index', health_index, default=0,
+                          kpis=('waste_percent', 'cost_growth_mom') + commitments),
+        ]
+        return KPIEngine(sources, kpis)
     
     def calculate_all_kpis(
         self,
@@ -252,6 +551,9 @@ class KPICalculator:
         """
         Calcula todos os KPIs FinOps
         
+        As fontes (série diária de 13 meses, forecast, RI/SP) são buscadas
+        uma vez, em paralelo, e todos os KPIs são derivados localmente.
+        
         Args:
             idle_cost: Custo de recursos ociosos (de analyzers)
             shadow_cost: Custo de recursos sem tags (de tag governance)
@@ -264,102 +566,45 @@ class KPICalculator:
         warnings = []
         data_sources = []
         
-        total_spend = self.get_total_spend(30)
-        if total_spend > 0:
+        evaluation = self.build_kpi_engine({
+            'idle_cost': idle_cost,
+            'shadow_cost': shadow_cost,
+            'transactions_count': transactions_count,
+            'customers_count': customers_count,
+            'revenue': revenue
+        }).evaluate()
+        values = evaluation.values
+        
+        if values['total_spend'] > 0:
             data_sources.append('Cost Explorer')
         else:
             warnings.append('Dados de Cost Explorer não disponíveis')
         
-        forecast_7d = self.get_cost_forecast(7)
-        forecast_30d = self.get_cost_forecast(30)
-        forecast_90d = self.get_cost_forecast(90)
-        if forecast_30d > 0:
+        if values['forecast_30d'] > 0:
             data_sources.append('Cost Forecast')
         
-        ri_metrics = self.get_ri_utilization_and_coverage()
-        sp_metrics = self.get_sp_utilization_and_coverage()
-        
-        if ri_metrics['utilization'] > 0 or sp_metrics['utilization'] > 0:
+        if values['ri_utilization_percent'] > 0 or values['sp_utilization_percent'] > 0:
             data_sources.append('Commitment Metrics')
         
-        commitment_loss = sp_metrics.get('unused_commitment', 0)
-        
-        waste_cost = idle_cost + commitment_loss + shadow_cost
-        waste_percent = (waste_cost / total_spend * 100) if total_spend > 0 else 0
-        
-        cost_per_transaction = total_spend / transactions_count if transactions_count > 0 else 0
-        cost_per_customer = total_spend / customers_count if customers_count > 0 else 0
-        
-        margin = ((revenue - total_spend) / revenue * 100) if revenue > 0 else 0
-        
-        current_month_cost = self.get_total_spend(30)
-        last_month_cost = self.get_cost_by_period(1)
-        last_year_cost = self.get_cost_by_period(12)
-        
-        cost_growth_mom = ((current_month_cost - last_month_cost) / last_month_cost * 100) if last_month_cost > 0 else 0
-        cost_growth_yoy = ((current_month_cost - last_year_cost) / last_year_cost * 100) if last_year_cost > 0 else 0
-        
-        health_factors = []
-        
-        if waste_percent <= 5:
-            health_factors.append(25)
-        elif waste_percent <= 10:
-            health_factors.append(20)
-        elif waste_percent <= 20:
-            health_factors.append(10)
-        else:
-            health_factors.append(0)
-        
-        avg_commitment = (ri_metrics['utilization'] + sp_metrics['utilization']) / 2 if (ri_metrics['utilization'] > 0 or sp_metrics['utilization'] > 0) else 0
-        if avg_commitment >= 80:
-            health_factors.append(25)
-        elif avg_commitment >= 60:
-            health_factors.append(20)
-        elif avg_commitment >= 40:
-            health_factors.append(10)
-        else:
-            health_factors.append(5)
-        
-        avg_coverage = (ri_metrics['coverage'] + sp_metrics['coverage']) / 2 if (ri_metrics['coverage'] > 0 or sp_metrics['coverage'] > 0) else 0
-        if avg_coverage >= 70:
-            health_factors.append(25)
-        elif avg_coverage >= 50:
-            health_factors.append(20)
-        elif avg_coverage >= 30:
-            health_factors.append(10)
-        else:
-            health_factors.append(5)
-        
-        if cost_growth_mom <= 5:
-            health_factors.append(25)
-        elif cost_growth_mom <= 15:
-            health_factors.append(20)
-        elif cost_growth_mom <= 30:
-            health_factors.append(10)
-        else:
-            health_factors.append(0)
-        
-        economic_health_index = sum(health_factors)
-        
         kpis = FinOpsKPIs(
-            total_spend=total_spend,
-            waste_percent=waste_percent,
+            total_spend=values['total_spend'],
+            waste_percent=values['waste_percent'],
             idle_cost=idle_cost,
             shadow_cost=shadow_cost,
-            commitment_loss=commitment_loss,
-            cost_per_customer=round(cost_per_customer, 4),
-            cost_per_transaction=round(cost_per_transaction, 6),
-            margin=round(margin, 2),
-            forecast_7d=forecast_7d,
-            forecast_30d=forecast_30d,
-            forecast_90d=forecast_90d,
-            ri_coverage_percent=ri_metrics['coverage'],
-            ri_utilization_percent=ri_metrics['utilization'],
-            sp_coverage_percent=sp_metrics['coverage'],
-            sp_utilization_percent=sp_metrics['utilization'],
-            cost_growth_mom=round(cost_growth_mom, 2),
-            cost_growth_yoy=round(cost_growth_yoy, 2),
-            economic_health_index=economic_health_index,
+            commitment_loss=values['commitment_loss'],
+            cost_per_customer=values['cost_per_customer'],
+            cost_per_transaction=values['cost_per_transaction'],
+            margin=values['margin'],
+            forecast_7d=values['forecast_7d'],
+            forecast_30d=values['forecast_30d'],
+            forecast_90d=values['forecast_90d'],
+            ri_coverage_percent=values['ri_coverage_percent'],
+            ri_utilization_percent=values['ri_utilization_percent'],
+            sp_coverage_percent=values['sp_coverage_percent'],
+            sp_utilization_percent=values['sp_utilization_percent'],
+            cost_growth_mom=values['cost_growth_mom'],
+            cost_growth_yoy=values['cost_growth_yoy'],
+            economic_health_index=values['economic_health_index'],
             tag_coverage_percent=tag_coverage_percent,
             savings_captured=savings_captured,
             savings_potential=savings_potential
@@ -371,7 +616,8 @@ class KPICalculator:
             period_start=datetime.utcnow() - timedelta(days=30),
             period_end=datetime.utcnow(),
             data_sources=data_sources,
-            warnings=warnings
+            warnings=warnings,
+            evaluation=evaluation
         )
     
     def get_kpis_summary(self) -> Dict[str, Any]:
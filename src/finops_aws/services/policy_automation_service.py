@@ -7,6 +7,7 @@ Este serviço implementa:
 - Ações baseadas em regras (throttling, cleanup, alertas)
 - Integração com AWS Systems Manager
 - Workflow de aprovação para ações destrutivas
+- Avaliação compilada e vetorizada das políticas (PolicyEngine)
 
 Design Patterns:
 - Strategy: Diferentes tipos de ações
@@ -24,6 +25,7 @@ import boto3
 from botocore.exceptions import ClientError
 
 from .base_service import BaseAWSService
+from ..analytics.policy_engine import PolicyEngine
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
 
@@ -367,28 +369,40 @@ class PolicyAutomationService(BaseAWSService):
         Returns:
             Lista de execuções pendentes ou completadas
         """
+        if not isinstance(resources, list):
+            resources = list(resources)
+        
+        policies = [
+            p for p in sorted(self._policies.values(), key=lambda p: p.priority)
+            if p.enabled
+        ]
+        matches = PolicyEngine(policies).evaluate(resources)
+        created_at = datetime.utcnow()
         pending_actions = []
         
-        for policy in sorted(self._policies.values(), key=lambda p: p.priority):
-            if not policy.enabled:
-                continue
-            
-            for resource in resources:
-                if self._policy_matches(policy, resource):
-                    for action in policy.actions:
-                        execution = self._create_execution(
-                            policy,
-                            action,
-                            resource
-                        )
-                        
-                        if not dry_run and action.approval_level == ApprovalLevel.AUTO:
-                            self._execute_action(execution, action)
-                        
-                        pending_actions.append(execution)
+        for plan, indices in matches:
+            policy = plan.policy
+            for index in indices.tolist():
+                resource = resources[index]
+                for action in policy.actions:
+                    execution = self._create_execution(
+                        policy,
+                        action,
+                        resource,
+                        created_at
+                    )
+                    
+                    if not dry_run and action.approval_level == ApprovalLevel.AUTO:
+                        self._execute_action(execution, action)
+                    
+                    pending_actions.append(execution)
             
             policy.last_evaluated = datetime.utcnow()
         
+        self.logger.info(
+            f"Políticas avaliadas: {len(policies)} x {matches.resource_count} recursos, "
+            f"{matches.total_matches} casamentos em {matches.seconds:.3f}s"
+        )
         return pending_actions
     
     def _policy_matches(
@@ -396,7 +410,7 @@ class PolicyAutomationService(BaseAWSService):
         policy: FinOpsPolicy,
         resource: Dict[str, Any]
     ) -> bool:
-        """Verifica se política se aplica ao recurso"""
+        """Verifica se política se aplica a um único recurso (referência do PolicyEngine)"""
         for condition in policy.conditions:
             metric_value = resource.get('metrics', {}).get(condition.metric, 0)
             
@@ -416,7 +430,8 @@ class PolicyAutomationService(BaseAWSService):
         self,
         policy: FinOpsPolicy,
         action: PolicyAction,
-        resource: Dict[str, Any]
+        resource: Dict[str, Any],
+        created_at: Optional[datetime] = None
     ) -> ActionExecution:
         """Cria registro de execução"""
         execution = ActionExecution(
@@ -426,7 +441,7 @@ class PolicyAutomationService(BaseAWSService):
             status=ActionStatus.PENDING,
             resource_id=resource.get('resource_id', 'unknown'),
             resource_type=resource.get('resource_type', 'unknown'),
-            created_at=datetime.utcnow(),
+            created_at=created_at or datetime.utcnow(),
             rollback_available=action.rollback_action is not None
         )
         
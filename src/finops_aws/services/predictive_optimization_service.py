@@ -27,6 +27,8 @@ from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
+from ..analytics.cost_cube import SERVICE, CostCube, resolve_cost_cube
+from ..forecasting_engine import DEFAULT_HISTORY_DAYS, MIN_HISTORY_DAYS, ForecastEngine
 
 
 class OptimizationType(Enum):
@@ -184,9 +186,10 @@ class PredictiveOptimizationService(BaseAWSService):
         'high': 0.5
     }
     
-    def __init__(self, client_factory=None):
+    def __init__(self, client_factory=None, cost_cube: Optional[CostCube] = None):
         super().__init__()
         self._client_factory = client_factory
+        self._cost_cube = cost_cube
         self.logger = setup_logger(self.__class__.__name__)
         self.service_name = "predictive_optimization"
         self._cache = FinOpsCache(default_ttl=1800)
@@ -298,32 +301,27 @@ class PredictiveOptimizationService(BaseAWSService):
         self,
         days_ahead: int
     ) -> List[CostForecast]:
-        """Gera forecast usando método estatístico simples"""
+        """Gera forecast com o ForecastEngine (modelo escolhido por backtest)"""
         try:
-            history = self._get_historical_costs(30)
-            if not history:
+            history = self._get_historical_costs(DEFAULT_HISTORY_DAYS)
+            if len(history) < MIN_HISTORY_DAYS:
+                self.logger.info("Histórico insuficiente para forecast estatístico")
                 return []
             
-            avg_daily = sum(history) / len(history)
-            std_dev = math.sqrt(sum((x - avg_daily) ** 2 for x in history) / len(history))
-            
-            trend = 0.0
-            if len(history) >= 7:
-                first_week = sum(history[:7]) / 7
-                last_week = sum(history[-7:]) / 7
-                if first_week > 0:
-                    trend = (last_week - first_week) / first_week
+            result = ForecastEngine().forecast(history, days_ahead)
+            model = result.models[0]
+            mape = float(result.mape[0])
+            base_confidence = min(0.9, max(0.1, 1 - mape)) if math.isfinite(mape) else 0.7
             
             forecasts = []
-            for i in range(1, days_ahead + 1):
-                predicted = avg_daily * (1 + trend * (i / 30))
+            for i in range(days_ahead):
                 forecast = CostForecast(
-                    forecast_date=datetime.utcnow() + timedelta(days=i),
-                    predicted_cost=predicted,
-                    lower_bound=max(0, predicted - 2 * std_dev),
-                    upper_bound=predicted + 2 * std_dev,
-                    confidence=0.7 - (i * 0.01),
-                    model_used='Statistical (EMA + Trend)'
+                    forecast_date=datetime.utcnow() + timedelta(days=i + 1),
+                    predicted_cost=float(result.forecast[0, i]),
+                    lower_bound=float(result.lower[0, i]),
+                    upper_bound=float(result.upper[0, i]),
+                    confidence=max(0.1, base_confidence - (i * 0.01)),
+                    model_used=f'Statistical ({model})'
                 )
                 forecasts.append(forecast)
             
@@ -336,11 +334,15 @@ class PredictiveOptimizationService(BaseAWSService):
     def _get_historical_costs(self, days: int) -> List[float]:
         """Obtém custos históricos diários"""
         try:
-            client = self._get_ce_client()
-            
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=days)
             
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+            if cube:
+                return [day['cost'] for day in cube.daily_series(start_date, end_date)]
+            
+            client = self._get_ce_client()
+            
             response = client.get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date.strftime('%Y-%m-%d'),
@@ -407,50 +409,54 @@ class PredictiveOptimizationService(BaseAWSService):
     def _analyze_savings_opportunities(self) -> List[PredictiveRecommendation]:
         """Analisa oportunidades de economia gerais"""
         try:
-            client = self._get_ce_client()
-            
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=30)
             
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'SERVICE'}
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, [SERVICE])
+            if cube:
+                service_costs = list(cube.group_sum(SERVICE, start_date, end_date).items())
+            else:
+                client = self._get_ce_client()
+                response = client.get_cost_and_usage(
+                    TimePeriod={
+                        'Start': start_date.strftime('%Y-%m-%d'),
+                        'End': end_date.strftime('%Y-%m-%d')
+                    },
+                    Granularity='MONTHLY',
+                    Metrics=['UnblendedCost'],
+                    GroupBy=[
+                        {'Type': 'DIMENSION', 'Key': 'SERVICE'}
+                    ]
+                )
+                service_costs = [
+                    (group['Keys'][0], float(group['Metrics']['UnblendedCost']['Amount']))
+                    for result in response.get('ResultsByTime', [])
+                    for group in result.get('Groups', [])
                 ]
-            )
             
             recommendations = []
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    
-                    if cost > 100:
-                        potential_savings = cost * 0.15
-                        rec = PredictiveRecommendation(
-                            recommendation_id=f"savings_{service.replace(' ', '_')}_{datetime.utcnow().strftime('%Y%m%d')}",
-                            optimization_type=OptimizationType.RIGHTSIZING,
-                            title=f"Otimizar custos de {service}",
-                            description=f"Potencial de economia de ${potential_savings:.2f}/mês em {service} através de rightsizing e eliminação de recursos ociosos",
-                            resource_id=service,
-                            resource_type="service",
-                            service=service,
-                            current_cost=cost,
-                            predicted_savings=potential_savings,
-                            implementation_effort="medium",
-                            risk_level="low",
-                            confidence=ConfidenceLevel.MEDIUM,
-                            roi_score=0,
-                            payback_days=0,
-                            auto_implementable=False,
-                            ai_reasoning=f"Análise de {service} indica oportunidades de otimização baseadas em padrões de uso e benchmarks do setor"
-                        )
-                        recommendations.append(rec)
+            for service, cost in service_costs:
+                if cost > 100:
+                    potential_savings = cost * 0.15
+                    rec = PredictiveRecommendation(
+                        recommendation_id=f"savings_{service.replace(' ', '_')}_{datetime.utcnow().strftime('%Y%m%d')}",
+                        optimization_type=OptimizationType.RIGHTSIZING,
+                        title=f"Otimizar custos de {service}",
+                        description=f"Potencial de economia de ${potential_savings:.2f}/mês em {service} através de rightsizing e eliminação de recursos ociosos",
+                        resource_id=service,
+                        resource_type="service",
+                        service=service,
+                        current_cost=cost,
+                        predicted_savings=potential_savings,
+                        implementation_effort="medium",
+                        risk_level="low",
+                        confidence=ConfidenceLevel.MEDIUM,
+                        roi_score=0,
+                        payback_days=0,
+                        auto_implementable=False,
+                        ai_reasoning=f"Análise de {service} indica oportunidades de otimização baseadas em padrões de uso e benchmarks do setor"
+                    )
+                    recommendations.append(rec)
             
             return recommendations[:10]
             
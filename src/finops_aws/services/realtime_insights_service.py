@@ -13,9 +13,9 @@ Design Patterns:
 - Publisher-Subscriber: Streaming de eventos
 - Singleton: Cache compartilhado
 """
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Sequence, Set
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import os
 import json
@@ -28,6 +28,9 @@ from botocore.exceptions import ClientError
 from .base_service import BaseAWSService
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
+from ..analytics.cost_cube import ACCOUNT, DAY, SERVICE, CostCube, resolve_cost_cube
+from ..analytics.anomaly_stream import StreamingAnomalyDetector, get_anomaly_detector
+from ..analytics.cost_window import RollingCostWindow
 
 
 class InsightType(Enum):
@@ -149,14 +152,25 @@ class RealTimeInsightsService(BaseAWSService):
     
     DEFAULT_REFRESH_INTERVAL = 300
     MAX_INSIGHTS = 100
+    STREAM_BACKFILL_DAYS = 30
     
-    def __init__(self, client_factory=None):
+    def __init__(
+        self,
+        client_factory=None,
+        cost_cube: Optional[CostCube] = None,
+        anomaly_detector: Optional[StreamingAnomalyDetector] = None,
+        cost_window: Optional[RollingCostWindow] = None
+    ):
         super().__init__()
         self._client_factory = client_factory
+        self._cost_cube = cost_cube
+        self._anomaly_detector = anomaly_detector
+        self._cost_window = cost_window
         self.logger = setup_logger(self.__class__.__name__)
         self.service_name = "realtime_insights"
         self._cache = FinOpsCache(default_ttl=60)
         self._insights: List[RealTimeInsight] = []
+        self._insight_ids: Set[str] = set()
         self._subscribers: List[Callable[[RealTimeInsight], None]] = []
         self._config = StreamConfig(
             alert_thresholds={
@@ -231,6 +245,9 @@ class RealTimeInsightsService(BaseAWSService):
         """
         Obtém snapshot atual de custos
         
+        Todos os números vêm da janela móvel de custos diários por serviço,
+        atualizada com uma única consulta incremental ao Cost Explorer.
+        
         Args:
             force_refresh: Se True, ignora cache
             
@@ -244,15 +261,19 @@ class RealTimeInsightsService(BaseAWSService):
             if cached:
                 return cached
         
+        window = self._refresh_cost_window()
+        
         now = datetime.utcnow()
+        today = now.date()
+        tomorrow = today + timedelta(days=1)
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        month_start = today.replace(day=1)
         
-        today_cost = self._get_cost_for_period(today_start, now)
-        mtd_cost = self._get_cost_for_period(month_start, now)
+        today_cost = window.total(today, tomorrow)
+        mtd_cost = window.total(month_start, tomorrow)
         
         days_in_month = 30
-        days_elapsed = (now - month_start).days + 1
+        days_elapsed = (today - month_start).days + 1
         if days_elapsed > 0:
             projected = (mtd_cost / days_elapsed) * days_in_month
         else:
@@ -261,17 +282,14 @@ class RealTimeInsightsService(BaseAWSService):
         hours_today = max(1, (now - today_start).seconds / 3600)
         hourly_rate = today_cost / hours_today
         
-        top_services = self._get_top_services(today_start, now)
+        top_services = window.top_services(today, tomorrow, limit=5)
         
-        yesterday_start = today_start - timedelta(days=1)
-        yesterday_cost = self._get_cost_for_period(yesterday_start, today_start)
+        yesterday_cost = window.total(today - timedelta(days=1), today)
         vs_yesterday = 0.0
         if yesterday_cost > 0:
             vs_yesterday = ((today_cost - yesterday_cost) / yesterday_cost) * 100
         
-        week_ago_start = today_start - timedelta(days=7)
-        week_ago_end = today_start - timedelta(days=6)
-        week_ago_cost = self._get_cost_for_period(week_ago_start, week_ago_end)
+        week_ago_cost = window.total(today - timedelta(days=7), today - timedelta(days=6))
         vs_last_week = 0.0
         if week_ago_cost > 0:
             vs_last_week = ((today_cost - week_ago_cost) / week_ago_cost) * 100
@@ -291,87 +309,21 @@ class RealTimeInsightsService(BaseAWSService):
         )
         
         self._cache.set(cache_key, snapshot, ttl=60)
-        self._last_snapshot = snapshot
         
         self._check_for_alerts(snapshot)
+        self._last_snapshot = snapshot
         
         return snapshot
     
-    def _get_cost_for_period(
-        self,
-        start: datetime,
-        end: datetime
-    ) -> float:
-        """Obtém custo para período específico"""
+    def _refresh_cost_window(self) -> RollingCostWindow:
+        """Atualiza a janela móvel (só os dias recentes após a primeira carga)"""
+        if self._cost_window is None:
+            self._cost_window = RollingCostWindow.load()
         try:
-            client = self._get_ce_client()
-            
-            start_str = start.strftime('%Y-%m-%d')
-            end_str = end.strftime('%Y-%m-%d')
-            
-            if start_str == end_str:
-                end_str = (end + timedelta(days=1)).strftime('%Y-%m-%d')
-            
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_str,
-                    'End': end_str
-                },
-                Granularity='DAILY',
-                Metrics=['UnblendedCost']
-            )
-            
-            total = 0.0
-            for result in response.get('ResultsByTime', []):
-                total += float(result.get('Total', {}).get('UnblendedCost', {}).get('Amount', 0))
-            
-            return total
-            
+            self._cost_window.refresh(self._get_ce_client())
         except Exception as e:
-            self.logger.error(f"Erro ao obter custo: {e}")
-            return 0.0
-    
-    def _get_top_services(
-        self,
-        start: datetime,
-        end: datetime,
-        limit: int = 5
-    ) -> Dict[str, float]:
-        """Obtém top serviços por custo"""
-        try:
-            client = self._get_ce_client()
-            
-            start_str = start.strftime('%Y-%m-%d')
-            end_str = end.strftime('%Y-%m-%d')
-            
-            if start_str == end_str:
-                end_str = (end + timedelta(days=1)).strftime('%Y-%m-%d')
-            
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_str,
-                    'End': end_str
-                },
-                Granularity='DAILY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-                ]
-            )
-            
-            by_service: Dict[str, float] = {}
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    by_service[service] = by_service.get(service, 0) + cost
-            
-            sorted_services = sorted(by_service.items(), key=lambda x: x[1], reverse=True)
-            return dict(sorted_services[:limit])
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao obter top serviços: {e}")
-            return {}
+            self.logger.error(f"Erro ao atualizar janela de custos: {e}")
+        return self._cost_window
     
     def _check_for_alerts(self, snapshot: CostSnapshot):
         """Verifica thresholds e gera alertas"""
@@ -420,13 +372,23 @@ class RealTimeInsightsService(BaseAWSService):
             metadata=metadata or {}
         )
         
+        if self._add_insight(insight):
+            self._notify_subscribers(insight)
+            self.logger.info(f"Insight criado: {title}")
+    
+    def _add_insight(self, insight: RealTimeInsight) -> bool:
+        """Insere insight no topo se o ID ainda não existe (dedup por hash set)"""
+        if insight.insight_id in self._insight_ids:
+            return False
+        
         self._insights.insert(0, insight)
+        self._insight_ids.add(insight.insight_id)
         
         if len(self._insights) > self.MAX_INSIGHTS:
+            for dropped in self._insights[self.MAX_INSIGHTS:]:
+                self._insight_ids.discard(dropped.insight_id)
             self._insights = self._insights[:self.MAX_INSIGHTS]
-        
-        self._notify_subscribers(insight)
-        self.logger.info(f"Insight criado: {title}")
+        return True
     
     def detect_anomalies(self) -> List[RealTimeInsight]:
         """Detecta anomalias de custo via AWS API"""
@@ -436,48 +398,183 @@ class RealTimeInsightsService(BaseAWSService):
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=7)
             
-            response = client.get_anomalies(
-                DateInterval={
+            params = {
+                'DateInterval': {
                     'StartDate': start_date.strftime('%Y-%m-%d'),
                     'EndDate': end_date.strftime('%Y-%m-%d')
                 },
-                MaxResults=10
-            )
+                'MaxResults': 100
+            }
             
             new_insights = []
-            for anomaly in response.get('Anomalies', []):
-                impact = anomaly.get('Impact', {})
-                total_impact = float(impact.get('TotalImpact', 0))
-                
-                if total_impact > 10:
-                    root_causes = anomaly.get('RootCauses', [])
-                    service = root_causes[0].get('Service', 'Unknown') if root_causes else 'Unknown'
+            while True:
+                response = client.get_anomalies(**params)
+                for anomaly in response.get('Anomalies', []):
+                    impact = anomaly.get('Impact', {})
+                    total_impact = float(impact.get('TotalImpact', 0))
                     
+                    if total_impact > 10:
+                        root_causes = anomaly.get('RootCauses', [])
+                        service = root_causes[0].get('Service', 'Unknown') if root_causes else 'Unknown'
+                        
+                        insight = RealTimeInsight(
+                            insight_id=anomaly.get('AnomalyId', ''),
+                            insight_type=InsightType.ANOMALY,
+                            severity=InsightSeverity.WARNING if total_impact < 100 else InsightSeverity.CRITICAL,
+                            title=f"Anomalia detectada: ${total_impact:.2f}",
+                            description=f"Anomalia de custo detectada em {service}",
+                            detected_at=datetime.utcnow(),
+                            service=service,
+                            impact_amount=total_impact
+                        )
+                        
+                        if self._add_insight(insight):
+                            new_insights.append(insight)
+                
+                token = response.get('NextPageToken')
+                if not token:
+                    return new_insights
+                params['NextPageToken'] = token
+            
+        except ClientError as e:
+            if 'AccessDenied' not in str(e):
+                self.logger.error(f"Erro ao detectar anomalias: {e}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Erro ao detectar anomalias: {e}")
+            return []
+    
+    def _get_anomaly_detector(self) -> StreamingAnomalyDetector:
+        if self._anomaly_detector is None:
+            self._anomaly_detector = get_anomaly_detector()
+        return self._anomaly_detector
+    
+    def detect_streaming_anomalies(
+        self,
+        backfill_days: int = STREAM_BACKFILL_DAYS,
+        persist: bool = True
+    ) -> List[RealTimeInsight]:
+        """
+        Detecta anomalias por (serviço, conta) com o detector online
+        
+        Busca os dias fechados ainda não vistos pelo detector (na primeira
+        execução, os últimos backfill_days para aquecer o estado) mais os
+        últimos dias ainda revisáveis, já que o Cost Explorer completa o
+        custo dos dias recentes depois; processa um lote por dia e grava o
+        estado ao final. Séries conhecidas ausentes num dia entram com
+        custo 0.
+        
+        Returns:
+            Novos insights de custo acima do esperado
+        """
+        try:
+            detector = self._get_anomaly_detector()
+            today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            start = today - timedelta(days=backfill_days)
+            latest = detector.latest_timestamp()
+            if latest is not None:
+                latest_day = datetime.fromtimestamp(latest, tz=timezone.utc).replace(tzinfo=None)
+                start = max(start, latest_day + timedelta(days=1 - detector.revisions))
+            if start >= today:
+                return []
+            
+            new_insights = []
+            costs_by_day = self._get_daily_costs_by_series(start, today, known=detector.series())
+            for day in sorted(costs_by_day):
+                costs = costs_by_day[day]
+                for event in detector.update_batch(list(costs), list(costs.values()), day):
+                    if event.impact <= 0:
+                        continue
+                    service, account = event.series
                     insight = RealTimeInsight(
-                        insight_id=anomaly.get('AnomalyId', ''),
+                        insight_id=f"stream_{event.event_id}",
                         insight_type=InsightType.ANOMALY,
-                        severity=InsightSeverity.WARNING if total_impact < 100 else InsightSeverity.CRITICAL,
-                        title=f"Anomalia detectada: ${total_impact:.2f}",
-                        description=f"Anomalia de custo detectada em {service}",
+                        severity=InsightSeverity(event.severity),
+                        title=f"Custo acima do esperado em {service}: ${event.value:.2f}",
+                        description=(f"{service} na conta {account} custou ${event.value:.2f} em {day} "
+                                     f"(esperado ${event.expected:.2f}, z={event.z_score:.1f})"),
                         detected_at=datetime.utcnow(),
+                        resource_id=account,
+                        resource_type='account',
                         service=service,
-                        impact_amount=total_impact
+                        impact_amount=event.impact,
+                        metadata=event.to_dict()
                     )
-                    
-                    if insight.insight_id not in [i.insight_id for i in self._insights]:
-                        self._insights.insert(0, insight)
+                    if self._add_insight(insight):
                         new_insights.append(insight)
+                        self._notify_subscribers(insight)
             
+            if persist:
+                detector.save()
             return new_insights
             
-        except ClientError as e:
-            if 'AccessDenied' not in str(e):
-                self.logger.error(f"Erro ao detectar anomalias: {e}")
-            return []
         except Exception as e:
-            self.logger.error(f"Erro ao detectar anomalias: {e}")
+            self.logger.error(f"Erro ao detectar anomalias em streaming: {e}")
             return []
     
+    def _get_daily_costs_by_series(
+        self,
+        start: datetime,
+        end: datetime,
+        known: Sequence[tuple] = ()
+    ) -> Dict[str, Dict[tuple, float]]:
+        """
+        Custo diário por (serviço, conta): {dia: {(serviço, conta): custo}}
+        
+        O Cost Explorer omite grupos sem custo; cada dia do intervalo traz
+        custo 0 para as séries `known` e para as já vistas em dias
+        anteriores do intervalo que não aparecerem nele.
+        """
+        by_day = self._fetch_daily_costs_by_series(start, end)
+        series = set(known)
+        for offset in range((end - start).days):
+            day = (start + timedelta(days=offset)).strftime('%Y-%m-%d')
+            costs = by_day.setdefault(day, {})
+            for key in series.difference(costs):
+                costs[key] = 0.0
+            series.update(costs)
+        return by_day
+    
+    def _fetch_daily_costs_by_series(
+        self,
+        start: datetime,
+        end: datetime
+    ) -> Dict[str, Dict[tuple, float]]:
+        """Custo diário por (serviço, conta) como retornado pela fonte"""
+        by_day: Dict[str, Dict[tuple, float]] = {}
+        
+        cube = resolve_cost_cube(self._cost_cube, start, end, [SERVICE, ACCOUNT])
+        if cube:
+            for (day, service, account), cost in cube.group_sum([DAY, SERVICE, ACCOUNT], start, end).items():
+                by_day.setdefault(day, {})[(service, account)] = cost
+            return by_day
+        
+        client = self._get_ce_client()
+        params = {
+            'TimePeriod': {
+                'Start': start.strftime('%Y-%m-%d'),
+                'End': end.strftime('%Y-%m-%d')
+            },
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': [
+                {'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                {'Type': 'DIMENSION', 'Key': 'LINKED_ACCOUNT'}
+            ]
+        }
+        while True:
+            response = client.get_cost_and_usage(**params)
+            for result in response.get('ResultsByTime', []):
+                day = result.get('TimePeriod', {}).get('Start', '')
+                costs = by_day.setdefault(day, {})
+                for group in result.get('Groups', []):
+                    service, account = group['Keys'][0], group['Keys'][1]
+                    costs[(service, account)] = float(group['Metrics']['UnblendedCost']['Amount'])
+            token = response.get('NextPageToken')
+            if not token:
+                return by_day
+            params['NextPageToken'] = token
+    
     def get_insights(
         self,
         limit: int = 20,
@@ -23,6 +23,8 @@ from botocore.exceptions import ClientError
 import os
 
 from .base_service import BaseAWSService, ServiceCost, ServiceMetrics, ServiceRecommendation
+from ..analytics.commitment_simulator import ExistingCommitment
+from ..pricing import get_price_index
 from ..utils.logger import setup_logger
 
 
@@ -593,6 +595,23 @@ class ReservedInstancesService(BaseAWSService):
             self.logger.error(f"Erro ao obter recomendações de RI: {e}")
             return []
     
+    def get_existing_commitments(self, window_start: datetime,
+                                 region: str = None) -> List[ExistingCommitment]:
+        """
+        RIs EC2 ativas como compromissos para o CommitmentSimulator
+        
+        A capacidade coberta usa o preço On-Demand do catálogo de preços;
+        RIs de outros serviços não cobrem o uso de computação simulado.
+        """
+        commitments = []
+        for ri in self.get_ec2_reserved_instances(region):
+            if ri.state != 'active':
+                continue
+            os_name = 'Windows' if 'windows' in ri.platform.lower() else 'Linux'
+            on_demand = get_price_index().ec2_hourly(ri.instance_type, region or self.region, os_name)
+            commitments.append(ExistingCommitment.from_reserved_instance(ri, window_start, on_demand))
+        return commitments
+    
     def get_resources(self) -> List[Dict[str, Any]]:
         """Obtém Reserved Instances como recursos"""
         ris = self.get_all_reserved_instances()
@@ -0,0 +1,435 @@
+"""
+FinOps AWS - Rightsizing Service
+Rightsizing interno por percentis de utilização
+
+Descoberta paginada da frota e séries horárias de 14-30 dias via
+CloudWatch GetMetricData em lote (até 500 consultas por chamada):
+- EC2: CPU, memória (CloudWatch Agent, com as dimensões que o agente
+  realmente publica) e rede
+- RDS: CPU, memória livre e throughput de rede
+- ElastiCache: CPU, memória do engine e rede
+- ECS/Fargate: CPU e memória por serviço (tamanho da tarefa)
+
+As séries alimentam o RightsizingEngine (p50/p95/p99 vetorizados e o
+tipo mais barato que atende, com preços do PriceIndex).
+
+Design Patterns:
+- Strategy: Implementa interface BaseAWSService
+- Batch: Consultas de métricas agrupadas por chamada e paralelizadas
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import boto3
+import numpy as np
+from botocore.exceptions import ClientError
+
+from .base_service import BaseAWSService, ServiceMetrics, ServiceRecommendation
+from ..analytics.rightsizing import (
+    DOWNSIZE,
+    UPSIZE,
+    RightsizingEngine,
+    RightsizingPolicy,
+    RightsizingResult,
+    UtilizationBatch,
+)
+from ..pricing.instance_catalog import EC2, ECS, ELASTICACHE, RDS, InstanceCatalog, fargate_task_name
+from ..utils.logger import setup_logger
+
+PERIOD_SECONDS = 3600
+MAX_QUERIES_PER_CALL = 500
+MAX_DATAPOINTS_PER_CALL = 100800
+METRIC_WORKERS = 8
+
+# Engine RDS -> databaseEngine da Price List
+RDS_PRICE_ENGINES = {
+    'mysql': 'MySQL',
+    'postgres': 'PostgreSQL',
+    'mariadb': 'MariaDB',
+    'aurora': 'Aurora MySQL',
+    'aurora-mysql': 'Aurora MySQL',
+    'aurora-postgresql': 'Aurora PostgreSQL',
+    'oracle-se2': 'Oracle',
+    'oracle-ee': 'Oracle',
+    'sqlserver-se': 'SQL Server',
+    'sqlserver-ee': 'SQL Server',
+    'sqlserver-ex': 'SQL Server',
+    'sqlserver-web': 'SQL Server',
+}
+
+ELASTICACHE_PRICE_ENGINES = {'redis': 'Redis', 'memcached': 'Memcached', 'valkey': 'Valkey'}
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """Métrica CloudWatch e sua conversão para o papel (cpu, memory, network)"""
+    role: str
+    namespace: str
+    metric_name: str
+    stat: str = 'Average'
+    unit: str = 'percent'
+
+
+METRICS: Dict[str, Tuple[MetricSpec, ...]] = {
+    EC2: (
+        MetricSpec('cpu', 'AWS/EC2', 'CPUUtilization'),
+        MetricSpec('memory', 'CWAgent', 'mem_used_percent'),
+        MetricSpec('network', 'AWS/EC2', 'NetworkIn', 'Sum', 'bytes_per_period'),
+        MetricSpec('network', 'AWS/EC2', 'NetworkOut', 'Sum', 'bytes_per_period'),
+    ),
+    RDS: (
+        MetricSpec('cpu', 'AWS/RDS', 'CPUUtilization'),
+        MetricSpec('memory', 'AWS/RDS', 'FreeableMemory', 'Minimum', 'free_bytes'),
+        MetricSpec('network', 'AWS/RDS', 'NetworkReceiveThroughput', 'Average', 'bytes_per_second'),
+        MetricSpec('network', 'AWS/RDS', 'NetworkTransmitThroughput', 'Average', 'bytes_per_second'),
+    ),
+    ELASTICACHE: (
+        MetricSpec('cpu', 'AWS/ElastiCache', 'CPUUtilization'),
+        MetricSpec('memory', 'AWS/ElastiCache', 'DatabaseMemoryUsagePercentage'),
+        MetricSpec('network', 'AWS/ElastiCache', 'NetworkBytesIn', 'Sum', 'bytes_per_period'),
+        MetricSpec('network', 'AWS/ElastiCache', 'NetworkBytesOut', 'Sum', 'bytes_per_period'),
+    ),
+    ECS: (
+        MetricSpec('cpu', 'AWS/ECS', 'CPUUtilization'),
+        MetricSpec('memory', 'AWS/ECS', 'MemoryUtilization'),
+    ),
+}
+
+
+@dataclass
+class FleetResource:
+    """Recurso descoberto para rightsizing"""
+    resource_id: str
+    current_type: str
+    dimensions: Tuple[Tuple[str, str], ...]
+    engine: str = ''
+    count: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'resource_id': self.resource_id,
+            'current_type': self.current_type,
+            'engine': self.engine,
+            'count': self.count,
+        }
+
+
+class RightsizingService(BaseAWSService):
+    """
+    Rightsizing de EC2, RDS, ElastiCache e ECS/Fargate
+
+    Example:
+        service = RightsizingService()
+        results = service.analyze(days=30)
+        results['ec2'].recommendations(limit=20)
+    """
+
+    SERVICE_NAME = "Rightsizing"
+    SUPPORTED_SERVICES = (EC2, RDS, ELASTICACHE, ECS)
+
+    def __init__(
+        self,
+        client_factory=None,
+        catalog: Optional[InstanceCatalog] = None,
+        policy: Optional[RightsizingPolicy] = None,
+        days: int = 14,
+        region: Optional[str] = None
+    ):
+        super().__init__()
+        if region:
+            self.region = region
+        self._client_factory = client_factory
+        self.logger = setup_logger(self.__class__.__name__)
+        self.service_name = "rightsizing"
+        self.engine = RightsizingEngine(catalog, policy)
+        self.days = days
+        self._results: Dict[str, RightsizingResult] = {}
+
+    def _get_client(self, name: str):
+        """Obtém cliente boto3 na região do serviço"""
+        if self._client_factory:
+            return self._client_factory.get_client(name, self.region)
+        return boto3.client(name, region_name=self.region)
+
+    def _discover_ec2(self) -> List[FleetResource]:
+        paginator = self._get_client('ec2').get_paginator('describe_instances')
+        resources = []
+        for page in paginator.paginate(Filters=[{'Name': 'instance-state-name', 'Values': ['running']}]):
+            for reservation in page.get('Reservations', []):
+                for instance in reservation.get('Instances', []):
+                    resources.append(FleetResource(
+                        instance['InstanceId'], instance.get('InstanceType', ''),
+                        (('InstanceId', instance['InstanceId']),)
+                    ))
+        return resources
+
+    def _discover_rds(self) -> List[FleetResource]:
+        paginator = self._get_client('rds').get_paginator('describe_db_instances')
+        resources = []
+        for page in paginator.paginate():
+            for db in page.get('DBInstances', []):
+                if db.get('DBInstanceStatus', 'available') != 'available':
+                    continue
+                engine = db.get('Engine', '')
+                resources.append(FleetResource(
+                    db['DBInstanceIdentifier'], db.get('DBInstanceClass', ''),
+                    (('DBInstanceIdentifier', db['DBInstanceIdentifier']),),
+                    engine=RDS_PRICE_ENGINES.get(engine, 'MySQL')
+                ))
+        return resources
+
+    def _discover_elasticache(self) -> List[FleetResource]:
+        paginator = self._get_client('elasticache').get_paginator('describe_cache_clusters')
+        resources = []
+        for page in paginator.paginate():
+            for cluster in page.get('CacheClusters', []):
+                if cluster.get('CacheClusterStatus', 'available') != 'available':
+                    continue
+                resources.append(FleetResource(
+                    cluster['CacheClusterId'], cluster.get('CacheNodeType', ''),
+                    (('CacheClusterId', cluster['CacheClusterId']),),
+                    engine=ELASTICACHE_PRICE_ENGINES.get(cluster.get('Engine', ''), 'Redis'),
+                    count=float(cluster.get('NumCacheNodes', 1) or 1)
+                ))
+        return resources
+
+    def _discover_ecs(self) -> List[FleetResource]:
+        client = self._get_client('ecs')
+        task_sizes: Dict[str, str] = {}
+        resources = []
+        for cluster_page in client.get_paginator('list_clusters').paginate():
+            for cluster_arn in cluster_page.get('clusterArns', []):
+                service_arns = [
+                    arn
+                    for page in client.get_paginator('list_services').paginate(
+                        cluster=cluster_arn, launchType='FARGATE')
+                    for arn in page.get('serviceArns', [])
+                ]
+                for start in range(0, len(service_arns), 10):
+                    described = client.describe_services(cluster=cluster_arn, services=service_arns[start:start + 10])
+                    for service in described.get('services', []):
+                        definition = service.get('taskDefinition', '')
+                        if definition not in task_sizes:
+                            task = client.describe_task_definition(taskDefinition=definition).get('taskDefinition', {})
+                            task_sizes[definition] = fargate_task_name(
+                                int(task.get('cpu', 0) or 0) / 1024, int(task.get('memory', 0) or 0) / 1024)
+                        cluster_name = cluster_arn.split('/')[-1]
+                        resources.append(FleetResource(
+                            f"{cluster_name}/{service['serviceName']}", task_sizes[definition],
+                            (('ClusterName', cluster_name), ('ServiceName', service['serviceName'])),
+                            count=float(service.get('desiredCount', 1) or 0)
+                        ))
+        return resources
+
+    def discover(self, service: str) -> List[FleetResource]:
+        """Recursos ativos do serviço (todas as páginas)"""
+        discover = {
+            EC2: self._discover_ec2,
+            RDS: self._discover_rds,
+            ELASTICACHE: self._discover_elasticache,
+            ECS: self._discover_ecs,
+        }[service]
+        return discover()
+
+    def _metric_batch(self, queries: List[Dict[str, Any]], start: datetime,
+                      end: datetime) -> List[Dict[str, Any]]:
+        client = self._get_client('cloudwatch')
+        results = []
+        params = {'MetricDataQueries': queries, 'StartTime': start, 'EndTime': end, 'ScanBy': 'TimestampAscending'}
+        while True:
+            response = client.get_metric_data(**params)
+            results.extend(response.get('MetricDataResults', []))
+            token = response.get('NextToken')
+            if not token:
+                return results
+            params['NextToken'] = token
+
+    def fetch_series(self, queries: List[Tuple[str, MetricSpec, Tuple[Tuple[str, str], ...]]],
+                     start: datetime, hours: int) -> Dict[str, np.ndarray]:
+        """
+        Séries horárias por Id de consulta via GetMetricData em lote
+
+        Consultas são agrupadas respeitando 500 consultas e 100.800 pontos
+        por chamada; os lotes rodam em paralelo.
+        """
+        end = start + timedelta(hours=hours)
+        per_call = max(1, min(MAX_QUERIES_PER_CALL, MAX_DATAPOINTS_PER_CALL // max(hours, 1)))
+        metric_queries = [{
+            'Id': query_id,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': spec.namespace,
+                    'MetricName': spec.metric_name,
+                    'Dimensions': [{'Name': name, 'Value': value} for name, value in dimensions],
+                },
+                'Period': PERIOD_SECONDS,
+                'Stat': spec.stat,
+            },
+            'ReturnData': True,
+        } for query_id, spec, dimensions in queries]
+        batches = [metric_queries[i:i + per_call] for i in range(0, len(metric_queries), per_call)]
+
+        series: Dict[str, np.ndarray] = {}
+        with ThreadPoolExecutor(max_workers=min(METRIC_WORKERS, max(len(batches), 1))) as executor:
+            for results in executor.map(lambda batch: self._metric_batch(batch, start, end), batches):
+                for result in results:
+                    values = series.setdefault(result['Id'], np.full(hours, np.nan))
+                    for timestamp, value in zip(result.get('Timestamps', []), result.get('Values', [])):
+                        if timestamp.tzinfo is not None:
+                            timestamp = timestamp.replace(tzinfo=None)
+                        index = int((timestamp - start).total_seconds() // PERIOD_SECONDS)
+                        if 0 <= index < hours:
+                            values[index] = value
+        return series
+
+    def agent_dimensions(self, spec: MetricSpec) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+        """
+        Dimensões publicadas pelo CloudWatch Agent por InstanceId
+
+        O agente acrescenta ImageId, InstanceType e AutoScalingGroupName
+        (append_dimensions) e a métrica só casa com o conjunto completo;
+        quando há vários conjuntos para a instância, vale o mais completo.
+        """
+        paginator = self._get_client('cloudwatch').get_paginator('list_metrics')
+        found: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        for page in paginator.paginate(Namespace=spec.namespace, MetricName=spec.metric_name):
+            for metric in page.get('Metrics', []):
+                dimensions = tuple((d['Name'], d['Value']) for d in metric.get('Dimensions', []))
+                instance_id = dict(dimensions).get('InstanceId')
+                if instance_id and len(dimensions) > len(found.get(instance_id, ())):
+                    found[instance_id] = dimensions
+        return found
+
+    def _convert(self, spec: MetricSpec, values: np.ndarray, memory_gib: np.ndarray) -> np.ndarray:
+        if spec.unit == 'bytes_per_period':
+            return values * 8 / PERIOD_SECONDS / 1e6
+        if spec.unit == 'bytes_per_second':
+            return values * 8 / 1e6
+        if spec.unit == 'free_bytes':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.clip(100.0 * (1 - values / (memory_gib[:, None] * 2 ** 30)), 0.0, 100.0)
+        return values
+
+    def collect(self, service: str, days: Optional[int] = None,
+                resources: Optional[List[FleetResource]] = None) -> UtilizationBatch:
+        """Descobre a frota e monta as matrizes recursos × horas"""
+        days = days or self.days
+        resources = self.discover(service) if resources is None else resources
+        hours = days * 24
+        end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(hours=hours)
+        specs = METRICS[service]
+
+        published = {
+            j: self.agent_dimensions(spec)
+            for j, spec in enumerate(specs) if spec.namespace == 'CWAgent' and resources
+        }
+        queries = [
+            (f"m{i}_{j}", spec, published[j].get(resource.resource_id, resource.dimensions)
+             if j in published else resource.dimensions)
+            for i, resource in enumerate(resources) for j, spec in enumerate(specs)
+        ]
+        series = self.fetch_series(queries, start, hours) if queries else {}
+
+        catalog = self.engine.catalog
+        memory_gib = np.array([
+            getattr(catalog.spec(service, r.current_type), 'memory_gib', np.nan) for r in resources
+        ], dtype=np.float64)
+        roles: Dict[str, np.ndarray] = {}
+        for j, spec in enumerate(specs):
+            matrix = np.full((len(resources), hours), np.nan)
+            for i in range(len(resources)):
+                values = series.get(f"m{i}_{j}")
+                if values is not None:
+                    matrix[i] = values
+            matrix = self._convert(spec, matrix, memory_gib)
+            if spec.role in roles:
+                previous = roles[spec.role]
+                both_missing = np.isnan(previous) & np.isnan(matrix)
+                matrix = np.where(both_missing, np.nan, np.nan_to_num(previous) + np.nan_to_num(matrix))
+            roles[spec.role] = matrix
+
+        return UtilizationBatch(
+            service=service,
+            resource_ids=[r.resource_id for r in resources],
+            current_types=[r.current_type for r in resources],
+            cpu=roles.get('cpu', np.full((len(resources), hours), np.nan)),
+            memory=roles.get('memory'),
+            network_mbps=roles.get('network'),
+            counts=np.array([r.count for r in resources], dtype=np.float64),
+            engines=[r.engine for r in resources],
+            region=self.region
+        )
+
+    def analyze(self, services: Optional[Sequence[str]] = None,
+                days: Optional[int] = None) -> Dict[str, RightsizingResult]:
+        """Rightsizing por serviço (falhas de um serviço não interrompem os demais)"""
+        results = {}
+        for service in services or self.SUPPORTED_SERVICES:
+            try:
+                results[service] = self.engine.analyze(self.collect(service, days))
+            except ClientError as e:
+                self.logger.error(f"Erro ao analisar rightsizing de {service}: {e}")
+        self._results = results
+        return results
+
+    def _cached_results(self) -> Dict[str, RightsizingResult]:
+        return self._results or self.analyze()
+
+    def health_check(self) -> bool:
+        """Verifica acesso ao CloudWatch"""
+        try:
+            self._get_client('cloudwatch').list_metrics(Namespace='AWS/EC2', MetricName='CPUUtilization')
+            return True
+        except ClientError as e:
+            self.logger.error(f"Erro no health check do Rightsizing: {e}")
+            return False
+
+    def get_resources(self) -> List[Dict[str, Any]]:
+        """Recursos avaliados pelo rightsizing"""
+        resources = []
+        for service in self.SUPPORTED_SERVICES:
+            try:
+                resources.extend({'service': service, **r.to_dict()} for r in self.discover(service))
+            except ClientError as e:
+                self.logger.error(f"Erro ao listar recursos de {service}: {e}")
+        return resources
+
+    def get_metrics(self) -> ServiceMetrics:
+        """Resumo do rightsizing por serviço"""
+        results = self._cached_results()
+        summaries = {service: result.summary() for service, result in results.items()}
+        return ServiceMetrics(
+            service_name=self.SERVICE_NAME,
+            resource_count=sum(s['resources_analyzed'] for s in summaries.values()),
+            metrics={
+                'by_service': summaries,
+                'monthly_savings': round(sum(s['monthly_savings'] for s in summaries.values()), 2),
+            }
+        )
+
+    def get_recommendations(self, limit: int = 100) -> List[ServiceRecommendation]:
+        """Downsize/upsize por recurso, maior economia primeiro"""
+        recommendations = []
+        for service, result in self._cached_results().items():
+            for rec in result.recommendations(limit=limit):
+                downsize = rec.action == DOWNSIZE
+                recommendations.append(ServiceRecommendation(
+                    resource_id=rec.resource_id,
+                    resource_type=service,
+                    recommendation_type='RIGHTSIZING_DOWNSIZE' if downsize else 'RIGHTSIZING_UPSIZE',
+                    title=f"{'Reduzir' if downsize else 'Aumentar'} {rec.current_type} para {rec.recommended_type}",
+                    description=(
+                        f"CPU p95 {rec.cpu_percentiles['p95']}% / p99 {rec.cpu_percentiles['p99']}%, "
+                        f"memória p95 {rec.memory_percentiles['p95']}%"
+                    ),
+                    estimated_savings=max(rec.monthly_savings, 0.0),
+                    priority='HIGH' if rec.action == UPSIZE or rec.monthly_savings >= 100 else 'MEDIUM',
+                    implementation_effort='MEDIUM' if service in (RDS, ELASTICACHE) else 'LOW',
+                    action=f"Alterar tipo para {rec.recommended_type}",
+                    details=rec.to_dict()
+                ))
+        recommendations.sort(key=lambda r: r.estimated_savings, reverse=True)
+        return recommendations
@@ -21,6 +21,12 @@ import boto3
 from botocore.exceptions import ClientError
 
 from .base_service import BaseAWSService, ServiceCost, ServiceMetrics, ServiceRecommendation
+from ..analytics.commitment_simulator import (
+    CommitmentOffer,
+    CommitmentSimulator,
+    ExistingCommitment,
+    hourly_usage_from_cost_explorer,
+)
 from ..utils.logger import setup_logger
 
 
@@ -394,6 +400,8 @@ class SavingsPlansService(BaseAWSService):
                     
                     rec = response.get('SavingsPlansPurchaseRecommendation', {})
                     details = rec.get('SavingsPlansPurchaseRecommendationDetails', [])
+                    term = rec.get('TermInYears', 'ONE_YEAR')
+                    payment_option = rec.get('PaymentOption', 'NO_UPFRONT')
                     
                     for detail in details[:5]:
                         hourly_commitment = float(detail.get('HourlyCommitmentToPurchase', 0))
@@ -404,6 +412,8 @@ class SavingsPlansService(BaseAWSService):
                         if monthly_savings > 0:
                             recommendations.append({
                                 'type': sp_type,
+                                'term': term,
+                                'payment_option': payment_option,
                                 'hourly_commitment': hourly_commitment,
                                 'monthly_savings': monthly_savings,
                                 'roi_percentage': roi * 100,
@@ -422,6 +432,61 @@ class SavingsPlansService(BaseAWSService):
             self.logger.error(f"Erro ao obter recomendações de SP: {e}")
             return []
     
+    def simulate_commitments(
+        self,
+        days: int = 14,
+        num_levels: int = 1000,
+        additional_commitments: Optional[List[ExistingCommitment]] = None,
+        offers: Optional[List[CommitmentOffer]] = None
+    ) -> Dict[str, Any]:
+        """
+        Simula compras de Savings Plans sobre o uso horário de computação
+        
+        Os Savings Plans ativos (e compromissos adicionais) cobrem o uso
+        primeiro; níveis de compromisso × prazos × opções de pagamento são
+        avaliados sobre o residual. As recomendações da AWS são avaliadas no
+        mesmo uso, cada uma com seu prazo e opção de pagamento.
+        
+        Args:
+            days: Dias de uso horário (o CE guarda 14 dias em HOURLY)
+            num_levels: Níveis de compromisso por oferta
+            additional_commitments: Compromissos ativos além dos SPs cujo
+                uso coberto esteja na série (não RIs: DiscountedUsage fica
+                fora dela)
+            offers: Ofertas a simular (padrão: 1/3 anos × 3 pagamentos)
+        """
+        try:
+            usage = hourly_usage_from_cost_explorer(self._get_ce_client(), days=days)
+            existing = [ExistingCommitment.from_savings_plan(sp, usage.start)
+                        for sp in self.get_savings_plans(states=['active'])]
+            existing.extend(additional_commitments or [])
+            
+            simulator = CommitmentSimulator(offers)
+            result = simulator.simulate(usage, existing, num_levels=num_levels)
+            
+            aws_candidates = [
+                (CommitmentOffer.from_aws(rec.get('term', 'ONE_YEAR'), rec.get('payment_option', 'NO_UPFRONT')),
+                 rec['hourly_commitment'])
+                for rec in self.get_purchase_recommendations() if rec['hourly_commitment'] > 0
+            ]
+            aws_evaluated = []
+            if aws_candidates:
+                evaluated = simulator.simulate(usage, existing, candidates=aws_candidates)
+                aws_evaluated = [evaluated.candidate(i, 0) for i in range(len(aws_candidates))]
+            
+            return {
+                'usage': usage.to_dict(),
+                'existing_commitments': [
+                    {'id': c.commitment_id, 'kind': c.kind, 'hourly_commitment': round(c.hourly_commitment, 4)}
+                    for c in existing
+                ],
+                'simulation': result.to_dict(),
+                'aws_recommendations_simulated': aws_evaluated
+            }
+        except Exception as e:
+            self.logger.error(f"Erro na simulação de compromissos: {e}")
+            return {'error': str(e)}
+    
     def get_resources(self) -> List[Dict[str, Any]]:
         """Obtém Savings Plans como recursos"""
         savings_plans = self.get_savings_plans(states=['active', 'queued'])
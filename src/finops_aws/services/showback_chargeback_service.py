@@ -17,14 +17,25 @@ from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 import os
 import uuid
 import json
 
 import boto3
+import numpy as np
 from botocore.exceptions import ClientError
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 from .base_service import BaseAWSService
+from ..analytics.cost_engine import ColumnarCostFrame
+from ..analytics.cost_cube import SERVICE, CostCube, resolve_cost_cube, tag_dimension
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
 
@@ -90,6 +101,7 @@ class ChargebackInvoice:
     total: float
     currency: str = "USD"
     line_items: List[Dict[str, Any]] = field(default_factory=list)
+    by_project: Dict[str, float] = field(default_factory=dict)
     notes: str = ""
     approved_by: str = ""
     approved_at: Optional[datetime] = None
@@ -112,6 +124,7 @@ class ChargebackInvoice:
             },
             'currency': self.currency,
             'line_items': self.line_items,
+            'by_project': {k: round(v, 2) for k, v in self.by_project.items()},
             'notes': self.notes,
             'approval': {
                 'approved_by': self.approved_by,
@@ -166,9 +179,10 @@ class ShowbackChargebackService(BaseAWSService):
     - ce:GetCostAndUsageWithResources
     """
     
-    def __init__(self, client_factory=None):
+    def __init__(self, client_factory=None, cost_cube: Optional[CostCube] = None):
         super().__init__()
         self._client_factory = client_factory
+        self._cost_cube = cost_cube
         self.logger = setup_logger(self.__class__.__name__)
         self.service_name = "showback_chargeback"
         self._cache = FinOpsCache(default_ttl=300)
@@ -294,33 +308,32 @@ class ShowbackChargebackService(BaseAWSService):
     ) -> Dict[str, float]:
         """Obtém custos agrupados por tag"""
         try:
-            client = self._get_ce_client()
-            
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'TAG', 'Key': tag_key}
-                ]
-            )
+            tag = tag_dimension(tag_key)
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, [tag])
+            if cube:
+                frame = cube.select([tag], start_date, end_date)
+            else:
+                client = self._get_ce_client()
+                
+                response = client.get_cost_and_usage(
+                    TimePeriod={
+                        'Start': start_date.strftime('%Y-%m-%d'),
+                        'End': end_date.strftime('%Y-%m-%d')
+                    },
+                    Granularity='MONTHLY',
+                    Metrics=['UnblendedCost'],
+                    GroupBy=[
+                        {'Type': 'TAG', 'Key': tag_key}
+                    ]
+                )
+                frame = ColumnarCostFrame.from_cost_explorer(response, [tag], tag_dimensions=[tag])
             
             by_tag: Dict[str, float] = {}
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    tag_value = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    
-                    if tag_value.startswith(f'{tag_key}$'):
-                        tag_value = tag_value.split('$', 1)[1] or 'Untagged'
-                    
-                    if tag_value and cost > 0:
-                        by_tag[tag_value] = by_tag.get(tag_value, 0) + cost
+            for tag_value, cost in frame.top_k(tag, k=None):
+                if cost > 0:
+                    by_tag[tag_value or 'Untagged'] = by_tag.get(tag_value or 'Untagged', 0) + cost
             
-            return dict(sorted(by_tag.items(), key=lambda x: x[1], reverse=True))
+            return by_tag
             
         except Exception as e:
             self.logger.error(f"Erro ao obter custos por tag {tag_key}: {e}")
@@ -333,6 +346,10 @@ class ShowbackChargebackService(BaseAWSService):
     ) -> float:
         """Obtém custo total do período"""
         try:
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+            if cube:
+                return cube.total(start_date, end_date)
+            
             client = self._get_ce_client()
             
             response = client.get_cost_and_usage(
@@ -371,9 +388,6 @@ class ShowbackChargebackService(BaseAWSService):
         Returns:
             ChargebackInvoice criada
         """
-        invoice_id = str(uuid.uuid4())
-        invoice_number = f"CB-{business_unit[:3].upper()}-{period_end.strftime('%Y%m')}-{invoice_id[:8].upper()}"
-        
         by_service = self._get_costs_by_service_for_bu(business_unit, period_start, period_end)
         by_project = self._get_costs_by_project_for_bu(business_unit, period_start, period_end)
         
@@ -382,17 +396,42 @@ class ShowbackChargebackService(BaseAWSService):
         
         for service, cost in by_service.items():
             if cost > 0:
-                line_items.append({
-                    'description': f'AWS {service}',
-                    'category': 'compute' if 'EC2' in service or 'Lambda' in service else 'storage' if 'S3' in service else 'other',
-                    'quantity': 1,
-                    'unit_price': round(cost, 2),
-                    'total': round(cost, 2)
-                })
+                line_items.append(self._line_item(service, cost))
                 subtotal += cost
         
         adjustments = self._calculate_adjustments(business_unit, subtotal)
-        total = subtotal + adjustments
+        
+        invoice = self._build_invoice(
+            business_unit, period_start, period_end, line_items, subtotal, adjustments
+        )
+        self.logger.info(f"Invoice criada: {invoice.invoice_number} para {business_unit}: ${invoice.total:.2f}")
+        
+        return invoice
+    
+    @staticmethod
+    def _line_item(service: str, cost: float) -> Dict[str, Any]:
+        """Linha de invoice para o custo de um serviço"""
+        return {
+            'description': f'AWS {service}',
+            'category': 'compute' if 'EC2' in service or 'Lambda' in service else 'storage' if 'S3' in service else 'other',
+            'quantity': 1,
+            'unit_price': round(cost, 2),
+            'total': round(cost, 2)
+        }
+    
+    def _build_invoice(
+        self,
+        business_unit: str,
+        period_start: datetime,
+        period_end: datetime,
+        line_items: List[Dict[str, Any]],
+        subtotal: float,
+        adjustments: float,
+        by_project: Optional[Dict[str, float]] = None
+    ) -> ChargebackInvoice:
+        """Cria a invoice em DRAFT e a registra no serviço"""
+        invoice_id = str(uuid.uuid4())
+        invoice_number = f"CB-{business_unit[:3].upper()}-{period_end.strftime('%Y%m')}-{invoice_id[:8].upper()}"
         
         invoice = ChargebackInvoice(
             invoice_id=invoice_id,
@@ -404,15 +443,135 @@ class ShowbackChargebackService(BaseAWSService):
             status=InvoiceStatus.DRAFT,
             subtotal=subtotal,
             adjustments=adjustments,
-            total=total,
-            line_items=line_items
+            total=subtotal + adjustments,
+            line_items=line_items,
+            by_project=by_project or {}
         )
         
         self._invoices[invoice_id] = invoice
-        self.logger.info(f"Invoice criada: {invoice_number} para {business_unit}: ${total:.2f}")
-        
         return invoice
     
+    def create_chargeback_invoices(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        business_units: Optional[List[str]] = None
+    ) -> List[ChargebackInvoice]:
+        """
+        Cria invoices de chargeback de todas as BUs em uma única execução
+        
+        Busca uma vez os custos BusinessUnit×SERVICE e BusinessUnit×Project
+        do período (paginados, em paralelo), divide o conjunto entre as BUs
+        em memória e aplica os ajustes das regras de forma vetorizada.
+        
+        Args:
+            period_start: Início do período
+            period_end: Fim do período
+            business_units: BUs a faturar (padrão: todas com custo tagueado)
+            
+        Returns:
+            Lista de ChargebackInvoice criadas (uma por BU)
+        """
+        by_service_frame, by_project_frame = self._get_bulk_chargeback_frames(period_start, period_end)
+        
+        if business_units is None:
+            business_units = sorted(
+                bu for bu in by_service_frame.categories('business_unit') if bu
+            )
+        index = {bu: i for i, bu in enumerate(business_units)}
+        subtotals = np.zeros(len(business_units))
+        line_items: List[List[Dict[str, Any]]] = [[] for _ in business_units]
+        
+        for (bu, service), cost in by_service_frame.top_k(('business_unit', SERVICE), k=None):
+            position = index.get(bu)
+            if position is not None and cost > 0:
+                line_items[position].append(self._line_item(service, cost))
+                subtotals[position] += cost
+        
+        by_project: List[Dict[str, float]] = [{} for _ in business_units]
+        for (bu, project), cost in by_project_frame.group_sum(('business_unit', 'project')).items():
+            position = index.get(bu)
+            if position is not None and project and cost > 0:
+                by_project[position][project] = cost
+        
+        adjustments = self._calculate_adjustments_batch(business_units, subtotals)
+        
+        invoices = [
+            self._build_invoice(
+                bu, period_start, period_end, line_items[i],
+                float(subtotals[i]), float(adjustments[i]), by_project[i]
+            )
+            for i, bu in enumerate(business_units)
+        ]
+        self.logger.info(
+            f"{len(invoices)} invoices criadas: ${float((subtotals + adjustments).sum()):.2f}"
+        )
+        return invoices
+    
+    def _get_bulk_chargeback_frames(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Tuple[ColumnarCostFrame, ColumnarCostFrame]:
+        """
+        Custos BusinessUnit×SERVICE e BusinessUnit×Project do período
+        
+        BusinessUnit×SERVICE vem do cubo ativo quando ele cobre o período
+        com todos os valores de BU (sem agrupamento em 'Other').
+        """
+        bu_tag = tag_dimension('BusinessUnit')
+        group_bys = {
+            'project': [{'Type': 'TAG', 'Key': 'BusinessUnit'}, {'Type': 'TAG', 'Key': 'Project'}],
+        }
+        by_service = None
+        cube = resolve_cost_cube(self._cost_cube, start_date, end_date, [SERVICE, bu_tag])
+        if cube and bu_tag not in cube.folded_dimensions:
+            by_service = cube.select([SERVICE, bu_tag], start_date, end_date).project(
+                {'business_unit': bu_tag, SERVICE: SERVICE}, {'cost': 'cost'}
+            )
+        else:
+            group_bys[SERVICE] = [{'Type': 'TAG', 'Key': 'BusinessUnit'}, {'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+        
+        client = self._get_ce_client()
+        period = {'Start': start_date.strftime('%Y-%m-%d'), 'End': end_date.strftime('%Y-%m-%d')}
+        with ThreadPoolExecutor(max_workers=len(group_bys)) as executor:
+            futures = {
+                name: executor.submit(self._fetch_grouped_costs, client, period, group_by)
+                for name, group_by in group_bys.items()
+            }
+        
+        if by_service is None:
+            by_service = ColumnarCostFrame.from_cost_explorer(
+                futures[SERVICE].result(), ['business_unit', SERVICE], tag_dimensions=['business_unit']
+            )
+        by_project = ColumnarCostFrame.from_cost_explorer(
+            futures['project'].result(), ['business_unit', 'project'],
+            tag_dimensions=['business_unit', 'project']
+        )
+        return by_service, by_project
+    
+    @staticmethod
+    def _fetch_grouped_costs(
+        client: Any,
+        period: Dict[str, str],
+        group_by: List[Dict[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Todas as páginas de uma consulta MONTHLY agrupada"""
+        params = {
+            'TimePeriod': period,
+            'Granularity': 'MONTHLY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': group_by
+        }
+        pages = []
+        while True:
+            response = client.get_cost_and_usage(**params)
+            pages.append(response)
+            token = response.get('NextPageToken')
+            if not token:
+                return pages
+            params['NextPageToken'] = token
+    
     def _get_costs_by_service_for_bu(
         self,
         business_unit: str,
@@ -421,6 +580,11 @@ class ShowbackChargebackService(BaseAWSService):
     ) -> Dict[str, float]:
         """Obtém custos por serviço para uma BU"""
         try:
+            filters = {tag_dimension('BusinessUnit'): [business_unit]}
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, ['service'], filters)
+            if cube:
+                return cube.group_sum('service', start_date, end_date, filters)
+            
             client = self._get_ce_client()
             
             response = client.get_cost_and_usage(
@@ -442,14 +606,7 @@ class ShowbackChargebackService(BaseAWSService):
                 }
             )
             
-            by_service: Dict[str, float] = {}
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    by_service[service] = by_service.get(service, 0) + cost
-            
-            return by_service
+            return ColumnarCostFrame.from_cost_explorer(response, ['service']).group_sum('service')
             
         except ClientError as e:
             if e.response.get('Error', {}).get('Code') == 'ValidationException':
@@ -481,14 +638,7 @@ class ShowbackChargebackService(BaseAWSService):
                 ]
             )
             
-            by_service: Dict[str, float] = {}
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    by_service[service] = by_service.get(service, 0) + cost
-            
-            return by_service
+            return ColumnarCostFrame.from_cost_explorer(response, ['service']).group_sum('service')
             
         except Exception as e:
             self.logger.error(f"Erro no fallback de custos por serviço: {e}")
@@ -520,6 +670,87 @@ class ShowbackChargebackService(BaseAWSService):
         
         return adjustments
     
+    def _calculate_adjustments_batch(
+        self,
+        business_units: List[str],
+        subtotals: np.ndarray
+    ) -> np.ndarray:
+        """
+        Ajustes de todas as BUs de uma vez (mesmas regras de _calculate_adjustments)
+        
+        Cada regra ativa soma seu valor fixo ou sua taxa às posições das BUs
+        a que se aplica; o ajuste final é fixo + subtotal × taxa.
+        """
+        index = {bu: i for i, bu in enumerate(business_units)}
+        fixed = np.zeros(len(business_units))
+        rate = np.zeros(len(business_units))
+        
+        for rule in self._chargeback_rules:
+            if not rule.active:
+                continue
+            if rule.business_unit == "*":
+                target = slice(None)
+            elif rule.business_unit in index:
+                target = index[rule.business_unit]
+            else:
+                continue
+            if rule.chargeback_type == ChargebackType.FIXED:
+                fixed[target] += rule.fixed_amount
+            elif rule.chargeback_type == ChargebackType.PROPORTIONAL:
+                rate[target] += rule.rate_multiplier - 1.0
+        
+        return fixed + subtotals * rate
+    
+    def export_invoices(
+        self,
+        path: str,
+        invoices: Optional[List[ChargebackInvoice]] = None
+    ) -> int:
+        """
+        Exporta invoices em um único arquivo Parquet (uma linha por line item)
+        
+        Args:
+            path: Caminho do arquivo
+            invoices: Invoices a exportar (padrão: todas do serviço)
+            
+        Returns:
+            Número de linhas gravadas
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow é necessário para exportar invoices em Parquet")
+        
+        invoices = list(self._invoices.values()) if invoices is None else invoices
+        columns: Dict[str, List[Any]] = {name: [] for name in (
+            'invoice_id', 'invoice_number', 'business_unit', 'period_start', 'period_end',
+            'status', 'description', 'category', 'amount',
+            'invoice_subtotal', 'invoice_adjustments', 'invoice_total'
+        )}
+        for invoice in invoices:
+            for item in invoice.line_items or [{}]:
+                columns['invoice_id'].append(invoice.invoice_id)
+                columns['invoice_number'].append(invoice.invoice_number)
+                columns['business_unit'].append(invoice.business_unit)
+                columns['period_start'].append(invoice.period_start)
+                columns['period_end'].append(invoice.period_end)
+                columns['status'].append(invoice.status.value)
+                columns['description'].append(item.get('description', ''))
+                columns['category'].append(item.get('category', ''))
+                columns['amount'].append(float(item.get('total', 0.0)))
+                columns['invoice_subtotal'].append(round(invoice.subtotal, 2))
+                columns['invoice_adjustments'].append(round(invoice.adjustments, 2))
+                columns['invoice_total'].append(round(invoice.total, 2))
+        
+        table = pa.table(columns, schema=pa.schema([
+            ('invoice_id', pa.string()), ('invoice_number', pa.string()),
+            ('business_unit', pa.string()), ('period_start', pa.timestamp('us')),
+            ('period_end', pa.timestamp('us')), ('status', pa.string()),
+            ('description', pa.string()), ('category', pa.string()), ('amount', pa.float64()),
+            ('invoice_subtotal', pa.float64()), ('invoice_adjustments', pa.float64()),
+            ('invoice_total', pa.float64()),
+        ]))
+        pq.write_table(table, path)
+        return table.num_rows
+    
     def submit_invoice_for_approval(self, invoice_id: str) -> bool:
         """Submete invoice para aprovação"""
         if invoice_id not in self._invoices:
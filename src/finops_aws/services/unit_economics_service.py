@@ -23,6 +23,8 @@ import boto3
 from botocore.exceptions import ClientError
 
 from .base_service import BaseAWSService, ServiceCost, ServiceMetrics, ServiceRecommendation
+from ..analytics.cost_engine import ColumnarCostFrame
+from ..analytics.cost_cube import CostCube, resolve_cost_cube
 from ..utils.logger import setup_logger
 from ..utils.cache import FinOpsCache
 
@@ -170,9 +172,10 @@ class UnitEconomicsService(BaseAWSService):
         'needs_improvement': 0.50
     }
     
-    def __init__(self, client_factory=None):
+    def __init__(self, client_factory=None, cost_cube: Optional[CostCube] = None):
         super().__init__()
         self._client_factory = client_factory
+        self._cost_cube = cost_cube
         self.logger = setup_logger(self.__class__.__name__)
         self.service_name = "unit_economics"
         self._cache = FinOpsCache(default_ttl=300)
@@ -454,6 +457,10 @@ class UnitEconomicsService(BaseAWSService):
     ) -> float:
         """Obtém custo total do período"""
         try:
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date)
+            if cube:
+                return cube.total(start_date, end_date)
+            
             client = self._get_ce_client()
             
             response = client.get_cost_and_usage(
@@ -570,35 +577,36 @@ class UnitEconomicsService(BaseAWSService):
     ) -> Dict[str, Dict[str, float]]:
         """Calcula custos unitários por serviço"""
         try:
-            client = self._get_ce_client()
-            
-            response = client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-                ]
-            )
+            cube = resolve_cost_cube(self._cost_cube, start_date, end_date, ['service'])
+            if cube:
+                frame = cube.select(['service'], start_date, end_date)
+            else:
+                client = self._get_ce_client()
+                
+                response = client.get_cost_and_usage(
+                    TimePeriod={
+                        'Start': start_date.strftime('%Y-%m-%d'),
+                        'End': end_date.strftime('%Y-%m-%d')
+                    },
+                    Granularity='MONTHLY',
+                    Metrics=['UnblendedCost'],
+                    GroupBy=[
+                        {'Type': 'DIMENSION', 'Key': 'SERVICE'}
+                    ]
+                )
+                frame = ColumnarCostFrame.from_cost_explorer(response, ['service'])
             
             by_service = {}
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    
-                    if cost > 0:
-                        by_service[service] = {
-                            'total_cost': round(cost, 2),
-                            'cost_per_customer': round(cost / customers, 4) if customers > 0 else 0,
-                            'cost_per_transaction': round(cost / transactions, 6) if transactions > 0 else 0,
-                            'percentage_of_total': round((cost / total_cost) * 100, 2) if total_cost > 0 else 0
-                        }
+            for service, cost in frame.top_k('service', k=10):
+                if cost > 0:
+                    by_service[service] = {
+                        'total_cost': round(cost, 2),
+                        'cost_per_customer': round(cost / customers, 4) if customers > 0 else 0,
+                        'cost_per_transaction': round(cost / transactions, 6) if transactions > 0 else 0,
+                        'percentage_of_total': round((cost / total_cost) * 100, 2) if total_cost > 0 else 0
+                    }
             
-            return dict(sorted(by_service.items(), key=lambda x: x[1]['total_cost'], reverse=True)[:10])
+            return by_service
             
         except Exception as e:
             self.logger.error(f"Erro ao calcular custos por serviço: {e}")
@@ -0,0 +1,27 @@
+"""
+Configuração compartilhada dos testes
+
+Benchmarks de tempo de parede (marcador `benchmark`) dependem da carga da
+máquina e ficam fora da execução padrão; use --benchmark para incluí-los.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--benchmark', action='store_true', default=False,
+        help='Executa também os testes marcados com @pytest.mark.benchmark'
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: benchmark de tempo de parede (requer --benchmark)')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmark: execute com --benchmark')
+    for item in items:
+        if item.get_closest_marker('benchmark'):
+            item.add_marker(skip)
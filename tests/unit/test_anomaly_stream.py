@@ -0,0 +1,250 @@
+"""
+Testes unitários para o detector online de anomalias
+
+Cobertura: EWMA por série, saltos em séries constantes, reprocessamento
+idempotente, revisão dos últimos pontos, persistência do estado e
+RealTimeInsightsService com deduplicação de insights e custo 0 para
+séries omitidas
+"""
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.finops_aws.analytics import StreamingAnomalyDetector, set_cost_cube
+from src.finops_aws.services.realtime_insights_service import RealTimeInsightsService
+
+
+def _days(count, end=None):
+    end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [(end - timedelta(days=count - i)).strftime('%Y-%m-%d') for i in range(count)]
+
+
+class TestStreamingAnomalyDetector:
+    """Testes para StreamingAnomalyDetector"""
+
+    def test_spike_after_warmup(self):
+        """Spike acima de 3 desvios gera evento; ruído normal não"""
+        rng = np.random.default_rng(1)
+        detector = StreamingAnomalyDetector()
+        events = []
+        for day, value in zip(_days(30), 100 + rng.normal(0, 2, 30)):
+            events += [detector.update(('EC2', '111'), value, day)]
+        spike = detector.update(('EC2', '111'), 160.0, datetime.utcnow())
+
+        assert [e for e in events if e] == []
+        assert spike.series == ('EC2', '111')
+        assert spike.impact > 50
+        assert spike.severity == 'critical'
+
+    def test_constant_series_and_winsorized_state(self):
+        """Salto em série constante é detectado sem distorcer a média"""
+        detector = StreamingAnomalyDetector(warmup=3)
+        for day in _days(10):
+            detector.update('S3', 10.0, day)
+
+        event = detector.update('S3', 50.0, datetime.utcnow())
+
+        assert event is not None and event.expected == pytest.approx(10.0)
+        assert detector.state('S3')['mean'] < 11.0
+
+    def test_replayed_points_are_ignored(self):
+        """Reprocessar o mesmo dia não altera o estado nem repete eventos"""
+        detector = StreamingAnomalyDetector(warmup=2)
+        for day in _days(5):
+            detector.update_batch([('A', '1'), ('B', '1')], [10.0, 20.0], day)
+        day = datetime.utcnow().strftime('%Y-%m-%d')
+
+        first = detector.update_batch([('A', '1'), ('B', '1')], [90.0, 20.0], day)
+        state = detector.state(('A', '1'))
+        again = detector.update_batch([('A', '1'), ('B', '1')], [90.0, 20.0], day)
+
+        assert [e.series for e in first] == [('A', '1')]
+        assert again == []
+        assert detector.state(('A', '1')) == state
+
+    def test_latest_points_revised(self):
+        """Dia parcial revisado recalcula o estado e pode virar anomalia"""
+        days = _days(10)
+        revised, reference = StreamingAnomalyDetector(warmup=3), StreamingAnomalyDetector(warmup=3)
+        for day in days[:-1]:
+            revised.update('EC2', 10.0, day)
+            reference.update('EC2', 10.0, day)
+
+        assert revised.update('EC2', 9.0, days[-1]) is None
+        event = revised.update('EC2', 60.0, days[-1])
+        reference.update('EC2', 60.0, days[-1])
+
+        assert event is not None and event.expected == pytest.approx(10.0)
+        assert revised.state('EC2') == reference.state('EC2')
+
+    def test_points_before_revision_window_ignored(self):
+        """Só os últimos `revisions` pontos aceitam revisão"""
+        detector = StreamingAnomalyDetector(revisions=2)
+        days = _days(5)
+        for day in days:
+            detector.update('S3', 10.0, day)
+        state = detector.state('S3')
+
+        detector.update('S3', 99.0, days[-3])
+        assert detector.state('S3') == state
+        detector.update('S3', 12.0, days[-2])
+        assert detector.state('S3') != state
+
+    def test_state_persisted_between_runs(self, tmp_path):
+        """Estado gravado em SQLite é recarregado na próxima execução"""
+        path = str(tmp_path / 'state.db')
+        detector = StreamingAnomalyDetector()
+        for day in _days(15):
+            detector.update_batch([('EC2', '111'), ('S3', '222')], [100.0, 5.0], day)
+
+        assert detector.save(path) == 2
+        loaded = StreamingAnomalyDetector.load(path)
+
+        assert len(loaded) == 2
+        assert loaded.state(('EC2', '111')) == detector.state(('EC2', '111'))
+        assert loaded.latest_timestamp() == detector.latest_timestamp()
+        assert loaded.update(('EC2', '111'), 400.0, datetime.utcnow()) is not None
+
+    def test_pending_points_persisted(self, tmp_path):
+        """Pontos ainda revisáveis continuam revisáveis após recarregar"""
+        path = str(tmp_path / 'state.db')
+        days = _days(15)
+        detector = StreamingAnomalyDetector()
+        for day in days:
+            detector.update('EC2', 100.0, day)
+        detector.save(path)
+
+        loaded = StreamingAnomalyDetector.load(path)
+        event = loaded.update('EC2', 400.0, days[-1])
+        detector.update('EC2', 400.0, days[-1])
+
+        assert event is not None
+        assert loaded.state('EC2') == detector.state('EC2')
+
+    def test_loads_state_without_pending_column(self, tmp_path):
+        """Estado gravado sem a coluna pending é carregado como consolidado"""
+        path = str(tmp_path / 'state.db')
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("CREATE TABLE anomaly_state (series TEXT PRIMARY KEY, mean REAL NOT NULL, "
+                         "var REAL NOT NULL, count INTEGER NOT NULL, last_ts REAL NOT NULL) WITHOUT ROWID")
+            conn.execute("INSERT INTO anomaly_state VALUES ('EC2', 100.0, 4.0, 20, 1700000000.0)")
+        conn.close()
+
+        loaded = StreamingAnomalyDetector.load(path)
+
+        assert loaded.state('EC2') == {'mean': 100.0, 'std': 2.0, 'count': 20, 'last_timestamp': 1700000000.0}
+        assert loaded.save(path) == 1
+        assert StreamingAnomalyDetector.load(path).state('EC2') == loaded.state('EC2')
+
+
+class TestRealTimeStreamingAnomalies:
+    """RealTimeInsightsService com detector online"""
+
+    @staticmethod
+    def _ce(days, spike_day, costs=None):
+        ce = MagicMock()
+
+        def get_cost_and_usage(**params):
+            start = params['TimePeriod']['Start']
+            results = []
+            for day in days:
+                if day < start:
+                    continue
+                day_costs = (costs or {}).get(day) or {'EC2': 300.0 if day == spike_day else 100.0, 'S3': 5.0}
+                results.append({'TimePeriod': {'Start': day}, 'Groups': [
+                    {'Keys': [service, '111'], 'Metrics': {'UnblendedCost': {'Amount': str(cost)}}}
+                    for service, cost in day_costs.items()
+                ]})
+            return {'ResultsByTime': results}
+        ce.get_cost_and_usage.side_effect = get_cost_and_usage
+        return ce
+
+    def test_incremental_detection_and_dedup(self, tmp_path, monkeypatch):
+        """Primeira execução aquece e detecta; a seguinte só rebusca os dias revisáveis"""
+        monkeypatch.setenv('FINOPS_ANOMALY_STATE_DB', str(tmp_path / 'state.db'))
+        set_cost_cube(None)
+        days = _days(20)
+        ce = self._ce(days, spike_day=days[-1])
+        factory = MagicMock()
+        factory.get_client.return_value = ce
+        service = RealTimeInsightsService(client_factory=factory,
+                                          anomaly_detector=StreamingAnomalyDetector())
+        received = []
+        service.subscribe(received.append)
+
+        insights = service.detect_streaming_anomalies(backfill_days=20)
+        again = service.detect_streaming_anomalies(backfill_days=20)
+
+        assert [i.service for i in insights] == ['EC2']
+        assert insights[0].impact_amount == pytest.approx(200.0)
+        assert received == insights
+        assert again == []
+        assert ce.get_cost_and_usage.call_count == 2
+        assert ce.get_cost_and_usage.call_args.kwargs['TimePeriod']['Start'] == days[-2]
+        assert len(StreamingAnomalyDetector.load()) == 2
+
+    def test_partial_day_revised_and_missing_series_zeroed(self, tmp_path, monkeypatch):
+        """Dia parcial revisado gera o insight; série omitida entra com custo 0"""
+        monkeypatch.setenv('FINOPS_ANOMALY_STATE_DB', str(tmp_path / 'state.db'))
+        set_cost_cube(None)
+        days = _days(20)
+        costs = {days[-1]: {'EC2': 100.0}}
+        factory = MagicMock()
+        factory.get_client.return_value = self._ce(days, spike_day=None, costs=costs)
+        detector = StreamingAnomalyDetector()
+        service = RealTimeInsightsService(client_factory=factory, anomaly_detector=detector)
+
+        assert service.detect_streaming_anomalies(backfill_days=20) == []
+        assert detector.state(('S3', '111'))['last_timestamp'] == detector.latest_timestamp()
+
+        costs[days[-1]] = {'EC2': 300.0}
+        insights = service.detect_streaming_anomalies(backfill_days=20)
+
+        assert [i.service for i in insights] == ['EC2']
+        assert insights[0].impact_amount == pytest.approx(200.0)
+
+    def test_aws_anomalies_paginated_and_deduped(self):
+        """Todas as páginas de anomalias; IDs repetidos não duplicam"""
+        ce = MagicMock()
+        ce.get_anomalies.side_effect = lambda **p: (
+            {'Anomalies': [{'AnomalyId': 'b', 'Impact': {'TotalImpact': 500}}]}
+            if 'NextPageToken' in p else
+            {'Anomalies': [{'AnomalyId': 'a', 'Impact': {'TotalImpact': 50}}], 'NextPageToken': 'n'}
+        )
+        factory = MagicMock()
+        factory.get_client.return_value = ce
+        service = RealTimeInsightsService(client_factory=factory)
+
+        first = service.detect_anomalies()
+        second = service.detect_anomalies()
+
+        assert [i.insight_id for i in first] == ['a', 'b']
+        assert second == []
+        assert [i.insight_id for i in service.get_insights()] == ['b', 'a']
+
+
+class TestStreamingAnomalyBenchmark:
+    """Benchmark de atualização em lote"""
+
+    @pytest.mark.benchmark
+    def test_ten_thousand_series_per_batch(self):
+        """10k séries × 30 lotes diários processados em menos de 1s"""
+        rng = np.random.default_rng(3)
+        keys = [(f'svc{i % 200}', f'{i // 200:012d}') for i in range(10_000)]
+        detector = StreamingAnomalyDetector()
+        values = rng.normal(100.0, 10.0, (30, 10_000))
+
+        started = time.perf_counter()
+        events = 0
+        for day, row in zip(_days(30), values):
+            events += len(detector.update_batch(keys, row, day))
+        elapsed = time.perf_counter() - started
+
+        assert len(detector) == 10_000
+        assert events < 0.02 * 10_000 * (30 - detector.warmup)
+        assert elapsed < 1.0
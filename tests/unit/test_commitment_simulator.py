@@ -0,0 +1,191 @@
+"""
+Testes unitários para o simulador de compromissos
+
+Cobertura: cobertura/utilização/economia vetorizadas contra cálculo
+ingênuo, compromissos existentes com expiração, break-even, fronteira
+eficiente, fontes de uso do Cost Explorer e SavingsPlansService
+"""
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.finops_aws.analytics import (
+    CommitmentOffer,
+    CommitmentSimulator,
+    ExistingCommitment,
+    hourly_usage_from_cost_explorer,
+)
+from src.finops_aws.dashboard import integrations
+from src.finops_aws.services.savingsplans_service import SavingsPlansService
+
+HALF = CommitmentOffer('1yr', 'No Upfront', 0.5)
+
+
+class TestCommitmentSimulator:
+    """Testes para CommitmentSimulator"""
+
+    def test_metrics_for_single_level(self):
+        """Compromisso de 5/h com 50% de desconto cobre 10/h de uso"""
+        usage = np.array([10.0] * 12 + [20.0] * 12)
+
+        result = CommitmentSimulator([HALF]).simulate(usage, levels=[5.0])
+        candidate = result.candidate(0, 0)
+
+        assert candidate['utilization_percent'] == pytest.approx(100.0)
+        assert candidate['coverage_percent'] == pytest.approx(240 / 360 * 100, abs=0.01)
+        assert candidate['monthly_net_savings'] == pytest.approx((240 - 120) * 730 / 24, abs=0.01)
+        assert candidate['break_even_months'] == 0
+        assert candidate['break_even_utilization_percent'] == 50.0
+
+    def test_matches_naive_simulation(self):
+        """Resultado vetorizado igual ao cálculo hora a hora"""
+        rng = np.random.default_rng(7)
+        usage = rng.gamma(4.0, 5.0, 24 * 30)
+        existing = [ExistingCommitment(4.0, 0.3, start_hour=0, end_hour=200)]
+        simulator = CommitmentSimulator()
+
+        result = simulator.simulate(usage, existing, num_levels=50)
+
+        residual = usage - np.minimum(usage, np.where(np.arange(len(usage)) < 200, 4.0 / 0.7, 0.0))
+        for i, offer in enumerate(simulator.offers):
+            for j in (0, 17, 49):
+                level = result.commitment[i, j]
+                covered = np.minimum(residual, level / (1 - offer.discount)).sum()
+                expected = (covered - level * len(usage)) * 730 / len(usage)
+                assert result.monthly_net_savings[i, j] == pytest.approx(expected)
+
+    def test_existing_commitments_expire(self):
+        """Compromisso existente só cobre as horas em que está ativo"""
+        usage = np.full(48, 10.0)
+        existing = [ExistingCommitment(5.0, 0.5, start_hour=0, end_hour=24, commitment_id='sp-1')]
+
+        result = CommitmentSimulator([HALF]).simulate(usage, existing, levels=[0.0, 5.0])
+
+        assert result.baseline['coverage'] == pytest.approx(0.5)
+        assert result.baseline['utilization'] == pytest.approx(1.0)
+        assert result.coverage[0, 1] == pytest.approx(1.0)
+        assert result.utilization[0, 1] == pytest.approx(0.5)
+
+    def test_upfront_break_even_and_frontier(self):
+        """Pagamento antecipado tem break-even em meses; fronteira é monotônica"""
+        usage = np.random.default_rng(1).normal(100.0, 15.0, 24 * 14).clip(0)
+        simulator = CommitmentSimulator()
+
+        result = simulator.simulate(usage, num_levels=400)
+        frontier = result.frontier()
+        all_upfront = [i for i, o in enumerate(simulator.offers) if o.payment_option == 'All Upfront']
+        best_upfront = int(np.argmax(result.monthly_net_savings[all_upfront[0]]))
+
+        assert 0 < result.break_even_months[all_upfront[0], best_upfront] < 12
+        obligations = [point['total_obligation'] for point in frontier]
+        savings = [point['annual_net_savings'] for point in frontier]
+        assert obligations == sorted(obligations)
+        assert savings == sorted(savings)
+        assert frontier[-1]['annual_net_savings'] == result.best()['annual_net_savings']
+        assert {p['term'] for p in frontier} == {'1yr', '3yr'}
+
+    def test_explicit_candidates(self):
+        """Compras explícitas são avaliadas uma a uma"""
+        usage = np.full(24, 10.0)
+
+        result = CommitmentSimulator().simulate(usage, candidates=[(HALF, 5.0), (HALF, 10.0)])
+
+        assert result.candidate(0, 0)['utilization_percent'] == pytest.approx(100.0)
+        assert result.candidate(1, 0)['utilization_percent'] == pytest.approx(50.0)
+        assert result.candidate(1, 0)['monthly_net_savings'] == 0.0
+
+
+class TestUsageSources:
+    """Uso horário a partir do Cost Explorer"""
+
+    def test_hourly_then_daily_fallback(self):
+        """HOURLY quando disponível; sem opt-in, DAILY distribuído por hora"""
+        end = datetime(2024, 3, 3)
+        ce = MagicMock()
+        ce.get_cost_and_usage.return_value = {'ResultsByTime': [
+            {'TimePeriod': {'Start': f'2024-03-0{1 + h // 24}T{h % 24:02d}:00:00Z'},
+             'Total': {'UnblendedCost': {'Amount': str(h)}}} for h in range(48)
+        ]}
+
+        hourly = hourly_usage_from_cost_explorer(ce, days=2, end=end)
+
+        ce.get_cost_and_usage.side_effect = [
+            Exception('hourly not enabled'),
+            {'ResultsByTime': [{'TimePeriod': {'Start': '2024-03-01'}, 'Total': {'UnblendedCost': {'Amount': '48'}}},
+                               {'TimePeriod': {'Start': '2024-03-02'}, 'Total': {'UnblendedCost': {'Amount': '24'}}}]}
+        ]
+        daily = hourly_usage_from_cost_explorer(ce, days=2, end=end)
+
+        assert hourly.granularity == 'HOURLY' and list(hourly.values) == list(range(48))
+        assert daily.granularity == 'DAILY'
+        assert daily.values[:24] == pytest.approx(2.0) and daily.values[24:] == pytest.approx(1.0)
+
+
+class TestSavingsPlansSimulation:
+    """SavingsPlansService.simulate_commitments"""
+
+    def test_simulation_with_existing_plan_and_aws_recommendation(self):
+        """SP ativo cobre primeiro; recomendação da AWS avaliada no mesmo uso"""
+        ce, sp = MagicMock(), MagicMock()
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=2)
+        ce.get_cost_and_usage.return_value = {'ResultsByTime': [
+            {'TimePeriod': {'Start': (start + timedelta(hours=h)).strftime('%Y-%m-%dT%H:00:00Z')},
+             'Total': {'UnblendedCost': {'Amount': '20'}}} for h in range(48)
+        ]}
+        ce.get_savings_plans_purchase_recommendation.return_value = {'SavingsPlansPurchaseRecommendation': {
+            'TermInYears': 'THREE_YEARS', 'PaymentOption': 'ALL_UPFRONT',
+            'SavingsPlansPurchaseRecommendationDetails': [
+                {'HourlyCommitmentToPurchase': '5', 'EstimatedMonthlySavingsAmount': '100'}]}}
+        sp.describe_savings_plans.return_value = {'savingsPlans': [{
+            'savingsPlanId': 'sp-1', 'commitment': '3.65', 'paymentOption': 'No Upfront',
+            'termDurationInSeconds': 31536000}]}
+        factory = MagicMock()
+        factory.get_client.side_effect = lambda name: sp if name == 'savingsplans' else ce
+
+        result = SavingsPlansService(client_factory=factory).simulate_commitments(days=2, num_levels=200)
+
+        assert result['usage']['hours'] == 48 and result['usage']['granularity'] == 'HOURLY'
+        assert result['existing_commitments'][0]['id'] == 'sp-1'
+        assert result['simulation']['baseline']['coverage'] == pytest.approx(0.25)
+        assert result['simulation']['candidates_evaluated'] == 6 * 200
+        assert result['simulation']['best']['coverage_percent'] == pytest.approx(100.0, abs=1.0)
+        assert len(result['aws_recommendations_simulated']) == 2
+        assert result['aws_recommendations_simulated'][0]['hourly_commitment'] == 5.0
+        assert result['aws_recommendations_simulated'][0]['term'] == '3yr'
+        assert result['aws_recommendations_simulated'][0]['payment_option'] == 'All Upfront'
+
+    def test_reserved_instances_not_applied_to_usage_series(self):
+        """RIs não cobrem a série (DiscountedUsage fica fora dela); só são listadas"""
+        ri = ExistingCommitment(2.0, 0.4, kind='reserved_instance', commitment_id='ri-1')
+
+        with patch('src.finops_aws.services.savingsplans_service.SavingsPlansService') as sp_service, \
+             patch('src.finops_aws.services.reservedinstances_service.ReservedInstancesService') as ri_service:
+            sp_service.return_value.simulate_commitments.return_value = {'simulation': {}}
+            ri_service.return_value.get_existing_commitments.return_value = [ri]
+            result = integrations.get_commitment_simulation(days=2, num_levels=10)
+
+        sp_service.return_value.simulate_commitments.assert_called_once_with(days=2, num_levels=10)
+        assert result['reserved_instances'] == [
+            {'id': 'ri-1', 'hourly_commitment': 2.0, 'covered_hourly': pytest.approx(3.3333, abs=1e-4)}]
+
+
+class TestCommitmentSimulatorBenchmark:
+    """Benchmark da simulação vetorizada"""
+
+    @pytest.mark.benchmark
+    def test_thousands_of_candidates(self):
+        """90 dias horários × 5000 níveis × 6 ofertas em menos de 1s"""
+        usage = np.random.default_rng(5).gamma(9.0, 20.0, 24 * 90)
+
+        started = time.perf_counter()
+        result = CommitmentSimulator().simulate(usage, num_levels=5000)
+        frontier = result.frontier()
+        elapsed = time.perf_counter() - started
+
+        assert result.monthly_net_savings.shape == (6, 5000)
+        assert frontier
+        assert elapsed < 1.0
@@ -0,0 +1,188 @@
+"""
+Testes unitários para o coletor do Compute Optimizer
+
+Cobertura: paginação dos cinco tipos de recurso, normalização, contas-membro,
+execução paralela por região, erros por tarefa e cache com TTL até o
+próximo refresh diário
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.finops_aws.dashboard import integrations
+from src.finops_aws.dashboard.compute_optimizer_collector import (
+    RESOURCE_TYPES,
+    ComputeOptimizerCollector,
+    ComputeOptimizerSnapshot,
+    OptimizerRecord,
+)
+from src.finops_aws.utils.cache import FinOpsCache
+
+REFRESHED = datetime.now(timezone.utc) - timedelta(hours=6)
+
+PAGES = {
+    'get_ec2_instance_recommendations': ('instanceRecommendations', [
+        {'instanceArn': 'arn:aws:ec2:us-east-1:111:instance/i-1', 'accountId': '111',
+         'currentInstanceType': 'm5.2xlarge', 'finding': 'OVER_PROVISIONED', 'lastRefreshTimestamp': REFRESHED,
+         'recommendationOptions': [{'instanceType': 'm5.large', 'savingsOpportunity': {
+             'savingsOpportunityPercentage': 60.0, 'estimatedMonthlySavings': {'value': 150.0}}}]},
+        {'instanceArn': 'arn:aws:ec2:us-east-1:111:instance/i-2', 'accountId': '111',
+         'currentInstanceType': 't3.micro', 'finding': 'OPTIMIZED', 'recommendationOptions': []},
+    ]),
+    'get_ebs_volume_recommendations': ('volumeRecommendations', [
+        {'volumeArn': 'arn:aws:ec2:us-east-1:111:volume/vol-1', 'accountId': '111', 'finding': 'NotOptimized',
+         'currentConfiguration': {'volumeType': 'gp2', 'volumeSize': 100},
+         'volumeRecommendationOptions': [{'configuration': {'volumeType': 'gp3', 'volumeSize': 100},
+                                          'savingsOpportunity': {'estimatedMonthlySavings': {'value': 2.0}}}]},
+    ]),
+    'get_lambda_function_recommendations': ('lambdaFunctionRecommendations', [
+        {'functionArn': 'arn:aws:lambda:us-east-1:111:function:api:$LATEST', 'accountId': '111',
+         'finding': 'NotOptimized', 'currentMemorySize': 1024,
+         'memorySizeRecommendationOptions': [{'memorySize': 512, 'savingsOpportunity': {
+             'estimatedMonthlySavings': {'value': 5.0}}}]},
+    ]),
+    'get_auto_scaling_group_recommendations': ('autoScalingGroupRecommendations', [
+        {'autoScalingGroupName': 'web', 'accountId': '111', 'finding': 'NOT_OPTIMIZED',
+         'currentConfiguration': {'instanceType': 'c5.xlarge'},
+         'recommendationOptions': [{'configuration': {'instanceType': 'c6g.xlarge'},
+                                    'savingsOpportunity': {'estimatedMonthlySavings': {'value': 40.0}}}]},
+    ]),
+    'get_ecs_service_recommendations': ('ecsServiceRecommendations', [
+        {'serviceArn': 'arn:aws:ecs:us-east-1:111:service/prod/api', 'accountId': '111',
+         'finding': 'Overprovisioned', 'currentServiceConfiguration': {'cpu': 1024, 'memory': 4096},
+         'serviceRecommendationOptions': [{'cpu': 512, 'memory': 2048, 'savingsOpportunity': {
+             'estimatedMonthlySavings': {'value': 20.0}}}]},
+    ]),
+}
+
+
+def paged_client(barrier=None):
+    """
+    Cliente que devolve cada item em uma página própria (nextToken)
+
+    Com `barrier`, a primeira página espera as demais regiões chegarem,
+    o que só acontece se elas forem consultadas em paralelo.
+    """
+    client = MagicMock()
+    client.get_enrollment_statuses_for_organization.side_effect = ClientError(
+        {'Error': {'Code': 'AccessDeniedException'}}, 'GetEnrollmentStatusesForOrganization')
+
+    def operation(name):
+        key, items = PAGES[name]
+
+        def call(**params):
+            index = int(params.get('nextToken', 0))
+            if barrier and index == 0:
+                barrier.wait()
+            response = {key: items[index:index + 1]}
+            if index + 1 < len(items):
+                response['nextToken'] = str(index + 1)
+            return response
+        return call
+
+    for name in PAGES:
+        getattr(client, name).side_effect = operation(name)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    FinOpsCache().clear()
+    yield
+    FinOpsCache().clear()
+
+
+class TestComputeOptimizerCollector:
+    """Testes para ComputeOptimizerCollector"""
+
+    def test_all_types_paginated_and_normalized(self):
+        """Cinco tipos, todas as páginas, findings e configurações normalizados"""
+        client = paged_client()
+
+        snapshot = ComputeOptimizerCollector(lambda region: client).collect(['us-east-1'])
+        by_id = {r.resource_id: r for r in snapshot.records}
+
+        assert client.get_ec2_instance_recommendations.call_count == 2
+        assert client.get_ec2_instance_recommendations.call_args.kwargs == {'nextToken': '1'}
+        assert {r.resource_type for r in snapshot.records} == set(RESOURCE_TYPES)
+        assert snapshot.api_calls == 6
+        assert by_id['i-1'] == OptimizerRecord('EC2', 'i-1', '111', 'us-east-1', 'OVER_PROVISIONED',
+                                               'm5.2xlarge', 'm5.large', 150.0, 60.0, REFRESHED)
+        assert by_id['vol-1'].finding == 'NOT_OPTIMIZED' and by_id['vol-1'].recommended == 'gp3 100GiB'
+        assert by_id['api'].recommended == '512MB'
+        assert by_id['prod/api'].recommended == '512 CPU / 2048 MiB'
+        assert by_id['web'].recommended == 'c6g.xlarge'
+        assert not by_id['i-2'].actionable
+
+        recommendations = snapshot.to_recommendations()
+        assert [r['type'] for r in recommendations][:2] == ['COMPUTE_OPTIMIZER_EC2', 'COMPUTE_OPTIMIZER_ASG']
+        assert len(recommendations) == 5
+        assert snapshot.summary()['monthly_savings'] == pytest.approx(217.0)
+
+    def test_member_accounts_queried_per_account(self):
+        """Delegated admin: uma consulta por conta-membro ativa"""
+        client = paged_client()
+        client.get_enrollment_statuses_for_organization.side_effect = None
+        client.get_enrollment_statuses_for_organization.return_value = {'accountEnrollmentStatuses': [
+            {'accountId': '111', 'status': 'Active'}, {'accountId': '222', 'status': 'Active'},
+            {'accountId': '333', 'status': 'Inactive'}]}
+
+        snapshot = ComputeOptimizerCollector(lambda region: client).collect(['us-east-1'], ['ASG'])
+
+        accounts = [c.kwargs['accountIds'] for c in client.get_auto_scaling_group_recommendations.call_args_list]
+        assert snapshot.accounts == ['111', '222']
+        assert sorted(accounts) == [['111'], ['222']]
+
+    def test_regions_in_parallel_with_partial_failure(self):
+        """Regiões consultadas em paralelo; opt-in ausente não derruba as demais"""
+        regions = ['us-east-1', 'us-west-2', 'eu-west-1', 'sa-east-1']
+        barrier = threading.Barrier(3, timeout=5)
+        clients = {region: paged_client(barrier) for region in regions}
+        clients['sa-east-1'].get_ec2_instance_recommendations.side_effect = ClientError(
+            {'Error': {'Code': 'OptInRequiredException'}}, 'GetEC2InstanceRecommendations')
+        created_in = set()
+
+        def factory(region):
+            created_in.add(threading.current_thread().name)
+            return clients[region]
+
+        snapshot = ComputeOptimizerCollector(factory, max_workers=8).collect(regions, ['EC2'])
+
+        assert not barrier.broken
+        assert created_in == {threading.current_thread().name}
+        assert {r.region for r in snapshot.records} == set(regions[:3])
+        assert snapshot.errors == [{'resource_type': 'EC2', 'region': 'sa-east-1',
+                                    'account_id': '', 'error': 'OptInRequiredException'}]
+
+
+class TestComputeOptimizerCache:
+    """Cache com TTL do refresh diário"""
+
+    def test_cached_until_next_refresh(self):
+        """Segunda coleta vem do cache; TTL = lastRefresh + 24h"""
+        client = paged_client()
+        collector = ComputeOptimizerCollector(lambda region: client)
+
+        first = collector.collect(['us-east-1'], ['EC2'])
+        second = collector.collect(['us-east-1'], ['EC2'])
+
+        assert second is first
+        assert client.get_ec2_instance_recommendations.call_count == 2
+        assert first.ttl_seconds(now=REFRESHED + timedelta(hours=6)) == 18 * 3600
+        assert first.ttl_seconds(now=REFRESHED + timedelta(hours=30)) == 3600
+        assert ComputeOptimizerSnapshot([], [], []).ttl_seconds() == 24 * 3600
+
+    def test_dashboard_integration(self):
+        """get_compute_optimizer_recommendations só repassa os tipos sem rightsizing interno"""
+        client = paged_client()
+
+        with patch('src.finops_aws.dashboard.compute_optimizer_collector.boto3.client', return_value=client):
+            recommendations = integrations.get_compute_optimizer_recommendations('us-east-1')
+
+        assert {r['type'] for r in recommendations} == {
+            f'COMPUTE_OPTIMIZER_{t}' for t in integrations.COMPUTE_OPTIMIZER_TYPES}
+        assert client.get_ec2_instance_recommendations.call_count == 0
+        assert all(r['service'] == 'AWS Compute Optimizer' for r in recommendations)
@@ -0,0 +1,137 @@
+"""
+Testes unitários para o motor de alocação do CostAllocationService
+
+Cobertura: índice de regras por tag, carga única paralela e paginada,
+scorecards de vários períodos e custos não alocados por serviço
+"""
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.finops_aws.analytics import set_cost_cube
+from src.finops_aws.services.cost_allocation_service import (
+    AllocationLevel,
+    CompiledAllocationRules,
+    CostAllocationRule,
+    CostAllocationService,
+)
+from src.finops_aws.utils.cache import FinOpsCache
+
+
+def _rule(rule_id, tag_key, values, priority=1, active=True):
+    return CostAllocationRule(rule_id=rule_id, name=rule_id, tag_key=tag_key, tag_values=values,
+                              cost_category='direct', business_unit='', project='', owner='',
+                              priority=priority, active=active)
+
+
+def _day(days_ago):
+    return (datetime.utcnow() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+
+
+# Custos diários SERVICE×TAG por chave: (dias atrás, serviço, valor da tag, custo)
+TAG_COSTS = {
+    'BusinessUnit': [(1, 'EC2', 'Finance', 60), (1, 'S3', '', 40), (20, 'EC2', 'Ops', 100)],
+    'CostCenter': [(1, 'EC2', 'cc-1', 30), (1, 'S3', 'untagged', 70), (20, 'EC2', '', 100)],
+    'Project': [(1, 'EC2', 'alpha', 90), (1, 'S3', '', 10), (20, 'EC2', 'beta', 50), (20, 'EC2', '', 50)],
+    'Owner': [(1, 'EC2', '', 100), (20, 'EC2', '', 100)],
+    'Environment': [(1, 'EC2', 'Prod', 80), (1, 'S3', 'sandbox', 20), (20, 'EC2', 'dev', 100)],
+}
+
+
+def _ce_client():
+    """Cliente CE que pagina a resposta de cada chave de tag em duas páginas"""
+    ce = MagicMock()
+
+    def get_cost_and_usage(**params):
+        tag_key = params['GroupBy'][1]['Key']
+        rows = TAG_COSTS[tag_key]
+        page = 1 if 'NextPageToken' in params else 0
+        half = rows[page::2]
+        response = {'ResultsByTime': [
+            {'TimePeriod': {'Start': _day(days_ago)},
+             'Groups': [{'Keys': [service, f'{tag_key}${value}'],
+                         'Metrics': {'UnblendedCost': {'Amount': str(cost)}}}]}
+            for days_ago, service, value, cost in half
+        ]}
+        if page == 0:
+            response['NextPageToken'] = 'next'
+        return response
+    ce.get_cost_and_usage.side_effect = get_cost_and_usage
+    return ce
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    FinOpsCache().clear()
+    set_cost_cube(None)
+    yield
+    FinOpsCache().clear()
+
+
+@pytest.fixture
+def service():
+    factory = MagicMock()
+    factory.get_client.return_value = _ce_client()
+    return CostAllocationService(client_factory=factory)
+
+
+class TestCompiledAllocationRules:
+    """Testes para o índice de regras"""
+
+    def test_exact_wildcard_and_priority(self):
+        """Valor exato (sem caixa) vence curinga; menor prioridade vence conflito"""
+        rules = CompiledAllocationRules([
+            _rule('env_any', 'Environment', ['*'], priority=5),
+            _rule('env_prod', 'Environment', ['prod', 'production'], priority=3),
+            _rule('env_prod_low', 'Environment', ['prod'], priority=9),
+            _rule('inactive', 'Team', ['*'], active=False),
+        ])
+
+        assert rules.match('Environment', 'PROD').rule_id == 'env_prod'
+        assert rules.match('Environment', 'qa').rule_id == 'env_any'
+        assert rules.match('Environment', 'untagged') is None
+        assert rules.match('Team', 'core') is None
+        assert rules.tag_keys == ['Environment']
+
+
+class TestAllocationEngine:
+    """Testes para o cálculo de alocação em passagem única"""
+
+    def test_single_paginated_load_per_tag(self, service):
+        """Uma carga paginada por chave de tag atende todos os períodos"""
+        ce = service._client_factory.get_client.return_value
+
+        scorecards = service.calculate_allocation_scorecards([7, 30], AllocationLevel.WALK)
+        service.calculate_allocation_scorecard(14, AllocationLevel.FLY)
+
+        tag_keys = {call.kwargs['GroupBy'][1]['Key'] for call in ce.get_cost_and_usage.call_args_list}
+        assert tag_keys == set(TAG_COSTS)
+        assert ce.get_cost_and_usage.call_count == 2 * len(TAG_COSTS)
+        assert scorecards[7].total_cost == pytest.approx(100.0)
+        assert scorecards[30].total_cost == pytest.approx(200.0)
+
+    def test_scorecard_breakdown(self, service):
+        """Breakdown por tag, alocado pelo melhor tag e não alocado por serviço"""
+        scorecard = service.calculate_allocation_scorecard(7)
+
+        assert scorecard.by_business_unit == {'Finance': 60.0}
+        assert scorecard.by_project == {'alpha': 90.0}
+        assert scorecard.allocated_cost == pytest.approx(90.0)
+        assert scorecard.maturity_level == AllocationLevel.RUN.value
+        assert scorecard.unallocated_by_service == {'S3': 70.0}
+        assert scorecard.by_allocation_rule == {'rule_project': 90.0, 'rule_costcenter': 30.0,
+                                                'rule_environment': 80.0}
+
+    def test_longer_period_and_cache(self, service):
+        """Período maior inclui dias antigos; resultado fica em cache"""
+        ce = service._client_factory.get_client.return_value
+
+        scorecard = service.calculate_allocation_scorecard(30)
+        calls = ce.get_cost_and_usage.call_count
+        again = service.calculate_allocation_scorecard(30)
+
+        assert scorecard.by_business_unit == {'Finance': 60.0, 'Ops': 100.0}
+        assert scorecard.allocation_percent == pytest.approx(80.0)
+        assert again is scorecard
+        assert ce.get_cost_and_usage.call_count == calls
@@ -0,0 +1,201 @@
+"""
+Testes unitários para o cubo de custos em memória
+
+Cobertura: roll-ups, slice/dice/pivot, montagem a partir do Cost Explorer,
+top-N de tags, registro do cubo ativo e serviços lendo do cubo
+"""
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.finops_aws.analytics import (
+    ColumnarCostFrame,
+    CostCube,
+    get_cost_cube,
+    materialize_cost_cube,
+    set_cost_cube,
+    tag_dimension,
+)
+from src.finops_aws.analytics.cost_cube import OTHER_VALUE
+from src.finops_aws.services.cost_allocation_service import CostAllocationService
+from src.finops_aws.services.kpi_calculator import KPICalculator
+from src.finops_aws.services.showback_chargeback_service import ShowbackChargebackService
+
+
+@pytest.fixture(autouse=True)
+def no_active_cube():
+    set_cost_cube(None)
+    yield
+    set_cost_cube(None)
+
+
+@pytest.fixture
+def cube():
+    frame = ColumnarCostFrame.from_columns(
+        {
+            'usage_day': ['2024-03-01', '2024-03-01', '2024-03-02', '2024-03-02', '2024-03-03'],
+            'product_code': ['EC2', 'S3', 'EC2', 'RDS', 'EC2'],
+            'region': ['us-east-1', 'us-east-1', 'sa-east-1', 'us-east-1', 'us-east-1'],
+            'account_id': ['111', '222', '111', '111', '222'],
+            'team': ['core', '', 'core', 'data', 'data'],
+        },
+        {'unblended': [10.0, 2.0, 5.0, 7.0, 3.0]}
+    )
+    dimensions = {'day': 'usage_day', 'service': 'product_code', 'region': 'region',
+                  'account': 'account_id', 'tag:Team': 'team'}
+    return CostCube.from_frame(frame, '2024-03-01', '2024-03-04', dimensions=dimensions)
+
+
+def _ce_day(day, groups):
+    return {
+        'TimePeriod': {'Start': day},
+        'Groups': [{'Keys': keys, 'Metrics': {'UnblendedCost': {'Amount': str(amount)}}}
+                   for keys, amount in groups]
+    }
+
+
+def _ce_client(by_second_key):
+    """Cliente CE que responde conforme a segunda dimensão do GroupBy"""
+    ce = MagicMock()
+
+    def get_cost_and_usage(**params):
+        return {'ResultsByTime': by_second_key[params['GroupBy'][1]['Key']]}
+    ce.get_cost_and_usage.side_effect = get_cost_and_usage
+    return ce
+
+
+class TestCostCube:
+    """Testes para CostCube"""
+
+    def test_rollups_answer_from_smallest_cuboid(self, cube):
+        """Roll-ups pré-calculados e consulta pelo menor cuboide"""
+        summary = {tuple(c['dimensions']): c['cells'] for c in cube.to_dict()['cuboids']}
+
+        assert summary[('day',)] == 3
+        assert summary[('day', 'service')] == 5
+        assert len(cube._cuboid({'service'})) == 5
+        assert cube.total() == pytest.approx(27.0)
+        assert cube.group_sum('service') == {'EC2': 18.0, 'S3': 2.0, 'RDS': 7.0}
+
+    def test_period_slice_dice_and_pivot(self, cube):
+        """Recorte de período, filtros e tabela cruzada"""
+        assert cube.total('2024-03-02', '2024-03-02') == pytest.approx(12.0)
+        assert cube.top_k('service', k=1, start='2024-03-02', end='2024-03-04') == [('EC2', 8.0)]
+        assert cube.pivot('service', 'region')['EC2'] == {'us-east-1': 13.0, 'sa-east-1': 5.0}
+        assert cube.slice('region', 'us-east-1').group_sum('account') == {'111': 17.0, '222': 5.0}
+        assert cube.dice({tag_dimension('Team'): ['core', 'data']}).total() == pytest.approx(25.0)
+        assert [p['cost'] for p in cube.daily_series(filters={'service': 'EC2'})] == [10.0, 5.0, 3.0]
+
+    def test_can_answer(self, cube):
+        """Recusa período fora da janela e dimensão não materializada"""
+        assert cube.can_answer('2024-03-01', '2024-03-04', ['service', 'tag:Team']) is True
+        assert cube.can_answer('2024-02-28', '2024-03-04') is False
+        assert cube.can_answer('2024-03-01', '2024-03-04', ['usage_type']) is False
+
+
+class TestCostCubeFromCostExplorer:
+    """Montagem do cubo com projeções do Cost Explorer"""
+
+    def test_projections_and_tag_top_n(self):
+        """Uma consulta por projeção; valores de tag fora do top-N viram Other"""
+        ce = _ce_client({
+            'REGION': [_ce_day('2024-03-01', [(['EC2', 'us-east-1'], 10), (['S3', ''], 2)])],
+            'LINKED_ACCOUNT': [_ce_day('2024-03-01', [(['EC2', '111'], 10), (['S3', '222'], 2)])],
+            'Team': [_ce_day('2024-03-01', [(['EC2', 'Team$core'], 6), (['EC2', 'Team$web'], 3),
+                                             (['EC2', 'Team$ml'], 1), (['S3', 'Team$'], 2)])],
+        })
+
+        cube = CostCube.from_cost_explorer(ce, '2024-03-01', '2024-03-02', tag_keys=['Team'], tag_top_n=1)
+
+        assert ce.get_cost_and_usage.call_count == 3
+        assert cube.group_sum('tag:Team') == {'core': 6.0, OTHER_VALUE: 4.0, '': 2.0}
+        assert cube.group_sum('account', filters={'service': 'EC2'}) == {'111': 10.0}
+        assert cube.can_answer('2024-03-01', '2024-03-02', filters={'tag:Team': 'core'}) is True
+        assert cube.can_answer('2024-03-01', '2024-03-02', filters={'tag:Team': 'web'}) is False
+
+    def test_materialize_publishes_active_cube(self):
+        """Cubo materializado fica ativo até expirar"""
+        ce = _ce_client({'REGION': [], 'LINKED_ACCOUNT': []})
+
+        cube = materialize_cost_cube(ce, days=7, tag_keys=[], end='2024-03-08')
+
+        assert get_cost_cube() is cube
+        assert cube.start == '2024-03-01'
+        cube.built_at = datetime.now() - timedelta(hours=2)
+        assert get_cost_cube(max_age=timedelta(minutes=15)) is None
+
+
+class TestServicesUseCube:
+    """Serviços respondem a partir do cubo ativo sem chamar o Cost Explorer"""
+
+    @pytest.fixture
+    def recent_cube(self):
+        today = datetime.utcnow().date()
+        days = [(today - timedelta(days=i)).isoformat() for i in range(5)]
+        frame = ColumnarCostFrame.from_columns(
+            {
+                'day': days * 2,
+                'service': ['EC2'] * 5 + ['S3'] * 5,
+                'tag:CostCenter': ['fin'] * 5 + [''] * 5,
+                'tag:BusinessUnit': ['Finance'] * 5 + ['Ops'] * 5,
+            },
+            {'cost': [10.0] * 5 + [1.0] * 5}
+        )
+        cube = CostCube([frame], today - timedelta(days=4), today + timedelta(days=1))
+        set_cost_cube(cube)
+        return cube
+
+    def test_allocation_and_showback(self, recent_cube):
+        """Alocação por tag, não alocado por serviço e chargeback por BU"""
+        factory = MagicMock()
+        start, end = datetime.utcnow() - timedelta(days=2), datetime.utcnow()
+
+        allocation = CostAllocationService(client_factory=factory)
+        showback = ShowbackChargebackService(client_factory=factory)
+
+        assert allocation._get_costs_by_tag(start, end, 'CostCenter') == ({'fin': 20.0}, 20.0)
+        assert allocation._get_unallocated_by_service(start, end) == {'S3': 2.0}
+        assert showback._get_costs_by_service_for_bu('Finance', start, end) == {'EC2': 20.0}
+        factory.get_client.return_value.get_cost_and_usage.assert_not_called()
+
+    def test_kpis(self, recent_cube):
+        """Total spend do período"""
+        factory = MagicMock()
+
+        assert KPICalculator(client_factory=factory).get_total_spend(days_back=4) == pytest.approx(44.0)
+        factory.get_client.return_value.get_cost_and_usage.assert_not_called()
+
+
+class TestCostCubeBenchmark:
+    """Benchmark de consultas sobre o cubo"""
+
+    @pytest.mark.benchmark
+    def test_dashboard_queries(self):
+        """Cubo de 90 dias × 300 serviços × 20 regiões consultado em milissegundos"""
+        rng = np.random.default_rng(7)
+        rows = 90 * 300 * 20
+        frame = ColumnarCostFrame(
+            {
+                'day': (np.repeat(np.arange(90, dtype=np.int32), 6000),
+                        [(date(2024, 1, 1) + timedelta(days=i)).isoformat() for i in range(90)]),
+                'service': (np.tile(np.repeat(np.arange(300, dtype=np.int32), 20), 90),
+                            [f's{i}' for i in range(300)]),
+                'region': (np.tile(np.arange(20, dtype=np.int32), 90 * 300), [f'r{i}' for i in range(20)]),
+            },
+            {'cost': rng.random(rows)}
+        )
+        cube = CostCube([frame], '2024-01-01', '2024-03-31')
+
+        started = time.perf_counter()
+        top = cube.top_k('service', k=10, start='2024-03-01', end='2024-03-31')
+        series = cube.daily_series()
+        pivot = cube.pivot('region', 'service', start='2024-03-01')
+        elapsed = time.perf_counter() - started
+
+        assert len(top) == 10
+        assert len(series) == 90
+        assert len(pivot) == 20
+        assert elapsed < 0.5
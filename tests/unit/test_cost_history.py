@@ -0,0 +1,290 @@
+"""
+Testes unitários para o histórico local de custos
+
+Cobertura: gravação idempotente, consultas por período, comparação,
+sincronização incremental com o Cost Explorer (projeções por região,
+conta e usage_type) e com o CUR, migração do schema e retenção mensal
+"""
+import sqlite3
+import time
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.finops_aws.analytics.cost_engine import ColumnarCostFrame
+from src.finops_aws.analytics.cost_history import CostHistoryStore, SOURCE_COST_EXPLORER, SOURCE_CUR
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CostHistoryStore(str(tmp_path / 'history.db'), daily_retention_days=60,
+                            monthly_retention_months=12)
+
+
+def _rows(first_day, days, services):
+    start = date.fromisoformat(first_day)
+    return [
+        {'day': (start + timedelta(days=i)).isoformat(), 'service': service, 'region': 'us-east-1', 'cost': cost}
+        for i in range(days) for service, cost in services.items()
+    ]
+
+
+def _ce_day(day, groups):
+    return {
+        'TimePeriod': {'Start': day},
+        'Groups': [{'Keys': keys, 'Metrics': {'UnblendedCost': {'Amount': str(amount)}}}
+                   for keys, amount in groups]
+    }
+
+
+class TestCostHistoryStore:
+    """Testes para CostHistoryStore"""
+
+    def test_write_is_idempotent_per_day(self, store):
+        """Regravar um dia substitui os fatos anteriores"""
+        store.write_daily(_rows('2024-03-01', 2, {'EC2': 10.0}), source='cur')
+        store.write_daily(_rows('2024-03-01', 1, {'EC2': 4.0, 'S3': 1.0}), source=SOURCE_COST_EXPLORER)
+
+        assert store.query_totals('2024-03-01', '2024-03-03') == {'EC2': 14.0, 'S3': 1.0}
+        assert store.total('2024-03-02', '2024-03-03') == 10.0
+
+    def test_compare_with_previous_period(self, store):
+        """Compara com período anterior de mesma duração"""
+        store.write_daily(_rows('2024-03-01', 7, {'EC2': 10.0, 'S3': 2.0}), source='cur')
+        store.write_daily(_rows('2024-03-08', 7, {'EC2': 15.0, 'S3': 1.0}), source='cur')
+
+        result = store.compare('2024-03-08', '2024-03-15')
+
+        assert result['total'] == pytest.approx(112.0)
+        assert result['previous_total'] == pytest.approx(84.0)
+        assert result['items'][0] == {'key': 'EC2', 'cost': 105.0, 'previous': 70.0,
+                                      'change_percent': 50.0, 'trend': 'up'}
+        assert result['items'][1]['trend'] == 'down'
+
+    def test_filters_and_daily_series(self, store):
+        """Filtra por serviço e preenche dias sem dados"""
+        store.write_daily(_rows('2024-03-01', 2, {'EC2': 3.0, 'S3': 1.0}), source='cur')
+
+        series = store.daily_series('2024-03-01', '2024-03-04', filters={'service': ['EC2']})
+
+        assert [p['cost'] for p in series] == [3.0, 3.0, 0.0]
+        with pytest.raises(ValueError):
+            store.query_totals('2024-03-01', '2024-03-04', group_by='1; DROP TABLE daily_costs')
+
+    def test_retention_downsamples_to_monthly(self, store):
+        """Dias além da retenção viram totais mensais"""
+        store.write_daily(_rows('2024-01-01', 31, {'EC2': 1.0}), source='cur')
+        store.write_daily(_rows('2024-04-01', 5, {'EC2': 2.0}), source='cur')
+        store.write_daily_tags('team', [{'day': '2024-01-05', 'tag_value': 'core', 'cost': 5.0}])
+
+        result = store.apply_retention(today='2024-04-06')
+
+        assert result['compacted_daily_rows'] == 31
+        assert store.coverage()['monthly']['first'] == '2024-01'
+        assert store.total('2024-01-01', '2024-02-01') == pytest.approx(31.0)
+        assert store.total('2024-04-01', '2024-04-06') == pytest.approx(10.0)
+        assert store.tag_totals('2024-01-01', '2024-02-01', 'team') == {'core': 5.0}
+
+    @pytest.mark.benchmark
+    def test_query_latency(self, store):
+        """Consulta de um ano com centenas de serviços em milissegundos"""
+        services = {f'service-{i}': 1.0 for i in range(200)}
+        store.write_daily(_rows('2023-01-01', 365, services), source='cur')
+
+        started = time.perf_counter()
+        result = store.compare('2023-07-01', '2024-01-01')
+        elapsed = time.perf_counter() - started
+
+        assert len(result['items']) == 200
+        assert elapsed < 0.5
+
+
+class TestCostExplorerSync:
+    """Testes para sincronização incremental"""
+
+    def test_incremental_sync(self, store):
+        """Primeira carga faz backfill; próximas só reapuram os últimos dias"""
+        pages = {
+            ('2024-03-01', None): {'ResultsByTime': [_ce_day('2024-03-01', [(['EC2', 'us-east-1'], 5)])],
+                                   'NextPageToken': 't'},
+            ('2024-03-01', 't'): {'ResultsByTime': [_ce_day('2024-03-02', [(['S3', ''], 1)])]},
+            ('2024-03-03', None): {'ResultsByTime': [_ce_day('2024-03-05', [(['EC2', 'us-east-1'], 7)])]},
+        }
+
+        def get_cost_and_usage(**params):
+            if params['GroupBy'][1]['Key'] != 'REGION':
+                return {'ResultsByTime': []}
+            return pages[(params['TimePeriod']['Start'], params.get('NextPageToken'))]
+
+        ce = MagicMock()
+        ce.get_cost_and_usage.side_effect = get_cost_and_usage
+
+        first = store.sync_from_cost_explorer(ce, end_date='2024-03-06', backfill_days=5)
+        second = store.sync_from_cost_explorer(ce, end_date='2024-03-08', backfill_days=5, restate_days=3)
+
+        assert first['start'] == '2024-03-01'
+        assert second['start'] == '2024-03-03'
+        assert store.query_totals('2024-03-01', '2024-03-08', group_by='region') == {
+            'us-east-1': 12.0, 'global': 1.0}
+        assert store.sync_state()['last_day'] == '2024-03-07'
+        assert store.needs_sync() is False
+        assert store.covers('2024-03-01', '2024-03-08') is True
+        assert store.covers('2024-02-01', '2024-03-08') is False
+
+    def test_ninety_day_comparison_has_previous_window(self, store):
+        """Backfill padrão cobre 90d e o período anterior; sem ele a tendência fica indisponível"""
+        def get_cost_and_usage(**params):
+            first = date.fromisoformat(params['TimePeriod']['Start'])
+            last = date.fromisoformat(params['TimePeriod']['End'])
+            return {'ResultsByTime': [
+                _ce_day((first + timedelta(days=i)).isoformat(), [(['EC2', 'us-east-1'], 10)])
+                for i in range((last - first).days)
+            ]}
+
+        ce = MagicMock()
+        ce.get_cost_and_usage.side_effect = get_cost_and_usage
+        end = date(2024, 6, 30)
+        start = end - timedelta(days=90)
+
+        store.sync_from_cost_explorer(ce, end_date=end)
+        result = store.compare(start, end)
+
+        assert store.covers(start - timedelta(days=90), end)
+        assert result['previous_available'] is True
+        assert result['previous_total'] == pytest.approx(900.0)
+        assert result['items'][0]['trend'] == 'stable'
+
+        partial = CostHistoryStore(':memory:')
+        partial.sync_from_cost_explorer(ce, end_date=end, backfill_days=90)
+        unavailable = partial.compare(start, end)
+
+        assert partial.covers(start, end)
+        assert unavailable['previous_available'] is False
+        assert unavailable['previous_total'] is None
+        assert unavailable['items'][0] == {'key': 'EC2', 'cost': 900.0, 'previous': None,
+                                           'change_percent': None, 'trend': 'unavailable'}
+
+    def test_default_backfill_covers_one_year(self, store):
+        """Backfill padrão cobre 1y; histórico curto antigo é rebuscado e conta nova conta como coberta"""
+        account_start = date(2024, 1, 1)
+
+        def get_cost_and_usage(**params):
+            first = max(date.fromisoformat(params['TimePeriod']['Start']), account_start)
+            last = date.fromisoformat(params['TimePeriod']['End'])
+            return {'ResultsByTime': [
+                _ce_day((first + timedelta(days=i)).isoformat(), [(['EC2', 'us-east-1'], 1)])
+                for i in range((last - first).days)
+            ]}
+
+        ce = MagicMock()
+        ce.get_cost_and_usage.side_effect = get_cost_and_usage
+        end = date(2024, 6, 30)
+        year_start = end - timedelta(days=365)
+
+        store.sync_from_cost_explorer(ce, end_date=end, backfill_days=180)
+        assert store.covers(year_start, end) is False
+
+        result = store.sync_from_cost_explorer(ce, end_date=end)
+
+        assert result['start'] == (end - timedelta(days=395)).isoformat()
+        assert store.covers(year_start, end) is True
+        assert store.total(year_start, end) == pytest.approx((end - account_start).days)
+
+        again = store.sync_from_cost_explorer(ce, end_date=end + timedelta(days=1))
+        assert again['start'] == (end - timedelta(days=3)).isoformat()
+
+    def test_projections_by_account_and_usage_type(self, store):
+        """Conta e usage_type vêm de projeções próprias, sem somar projeções entre si"""
+        groups = {
+            'REGION': [(['EC2', 'us-east-1'], 6), (['EC2', 'sa-east-1'], 4), (['S3', ''], 2)],
+            'LINKED_ACCOUNT': [(['EC2', '111'], 7), (['EC2', '222'], 3), (['S3', '111'], 2)],
+            'USAGE_TYPE': [(['EC2', 'BoxUsage'], 10), (['S3', 'TimedStorage'], 2)],
+        }
+        ce = MagicMock()
+        ce.get_cost_and_usage.side_effect = lambda **params: {
+            'ResultsByTime': [_ce_day('2024-03-01', groups[params['GroupBy'][1]['Key']])]}
+
+        store.sync_from_cost_explorer(ce, end_date='2024-03-02', backfill_days=1)
+
+        assert ce.get_cost_and_usage.call_count == 3
+        assert store.total('2024-03-01', '2024-03-02') == pytest.approx(12.0)
+        assert store.query_totals('2024-03-01', '2024-03-02') == {'EC2': 10.0, 'S3': 2.0}
+        assert store.query_totals('2024-03-01', '2024-03-02', group_by='account') == {'111': 9.0, '222': 3.0}
+        assert store.query_totals('2024-03-01', '2024-03-02', group_by='usage_type',
+                                  filters={'service': ['EC2']}) == {'BoxUsage': 10.0}
+        assert store.query_totals('2024-03-01', '2024-03-02', group_by='region') == {
+            'us-east-1': 6.0, 'sa-east-1': 4.0, 'global': 2.0}
+        assert [p['cost'] for p in store.daily_series('2024-03-01', '2024-03-02')] == [12.0]
+        with pytest.raises(ValueError):
+            store.query_totals('2024-03-01', '2024-03-02', group_by=('region', 'account'))
+
+
+class TestCURSync:
+    """Testes para ingestão do CUR em Parquet"""
+
+    @staticmethod
+    def _reader(rows):
+        reader = MagicMock()
+        reader.load_frame.side_effect = lambda start, end, dimensions: ColumnarCostFrame.from_columns(
+            {name: [row[name] for row in rows if start.date().isoformat() <= row['usage_day'] < end.date().isoformat()]
+             for name in dimensions},
+            {'unblended': [row['cost'] for row in rows
+                           if start.date().isoformat() <= row['usage_day'] < end.date().isoformat()]}
+        )
+        return reader
+
+    def test_cur_days_replace_cost_explorer_projections(self, store):
+        """Dias do CUR trazem todas as dimensões e substituem as projeções do Cost Explorer"""
+        ce = MagicMock()
+        keys = {'REGION': 'us-east-1', 'LINKED_ACCOUNT': '333', 'USAGE_TYPE': 'BoxUsage'}
+        ce.get_cost_and_usage.side_effect = lambda **params: {'ResultsByTime': [
+            _ce_day(day, [(['EC2', keys[params['GroupBy'][1]['Key']]], 5)]) for day in ('2024-03-30', '2024-03-31')]}
+        store.sync_from_cost_explorer(ce, end_date='2024-04-01', backfill_days=2)
+
+        reader = self._reader([
+            {'usage_day': '2024-03-30', 'product_code': 'EC2', 'region': 'us-east-1',
+             'account_id': '111', 'usage_type': 'BoxUsage', 'cost': 3.0},
+            {'usage_day': '2024-03-30', 'product_code': 'EC2', 'region': '',
+             'account_id': '222', 'usage_type': 'DataTransfer', 'cost': 2.0},
+        ])
+        result = store.sync_from_cur(reader, end_date='2024-04-01', backfill_days=2)
+
+        assert result == {'start': '2024-03-30', 'end': '2024-04-01', 'rows': 2}
+        assert store.query_totals('2024-03-30', '2024-04-01', group_by='account') == {
+            '111': 3.0, '222': 2.0, '333': 5.0}
+        assert store.query_totals('2024-03-30', '2024-04-01', group_by='region') == {
+            'us-east-1': 8.0, 'global': 2.0}
+        assert store.total('2024-03-30', '2024-04-01') == pytest.approx(10.0)
+        assert store.sync_state(SOURCE_CUR)['last_day'] == '2024-03-30'
+
+        store.sync_from_cur(reader, end_date='2024-04-03')
+        assert reader.load_frame.call_args.args[0].date() == date(2024, 3, 1)
+
+
+class TestSchemaMigration:
+    """Testes para migração do schema sem granularidade"""
+
+    def test_legacy_rows_become_region_projection(self, tmp_path):
+        """Linhas antigas só com região viram a projeção SERVICE×REGION"""
+        path = str(tmp_path / 'legacy.db')
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE daily_costs (day TEXT, service TEXT, region TEXT, account TEXT,
+                                      usage_type TEXT, cost REAL, source TEXT,
+                                      PRIMARY KEY (day, service, region, account, usage_type));
+            CREATE INDEX idx_daily_service ON daily_costs (service, day, cost);
+            CREATE TABLE monthly_costs (month TEXT, service TEXT, region TEXT, account TEXT,
+                                        usage_type TEXT, cost REAL,
+                                        PRIMARY KEY (month, service, region, account, usage_type));
+            CREATE TABLE sync_state (source TEXT PRIMARY KEY, last_day TEXT, synced_at TEXT NOT NULL);
+            INSERT INTO daily_costs VALUES ('2024-03-01', 'EC2', 'us-east-1', '', '', 4.0, 'cost_explorer');
+            INSERT INTO monthly_costs VALUES ('2024-01', 'EC2', 'us-east-1', '111', 'BoxUsage', 9.0);
+        """)
+        conn.close()
+
+        store = CostHistoryStore(path)
+
+        assert store.query_totals('2024-01-01', '2024-03-02', group_by='region') == {'us-east-1': 13.0}
+        assert store.query_totals('2024-01-01', '2024-03-02', group_by='account') == {'111': 9.0}
+        assert store.sync_state() is None
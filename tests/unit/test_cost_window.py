@@ -0,0 +1,113 @@
+"""
+Testes unitários para a janela móvel de custos
+
+Cobertura: carga inicial e incremental, descarte de dias antigos,
+persistência e snapshot do RealTimeInsightsService calculado localmente
+"""
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.finops_aws.analytics import RollingCostWindow
+from src.finops_aws.services.realtime_insights_service import RealTimeInsightsService
+from src.finops_aws.utils.cache import FinOpsCache
+
+
+def _ce(daily):
+    """CE que responde DAILY×SERVICE a partir de {dia: {serviço: custo}}"""
+    ce = MagicMock()
+
+    def get_cost_and_usage(**params):
+        start, end = params['TimePeriod']['Start'], params['TimePeriod']['End']
+        return {'ResultsByTime': [
+            {'TimePeriod': {'Start': day},
+             'Groups': [{'Keys': [service], 'Metrics': {'UnblendedCost': {'Amount': str(cost)}}}
+                        for service, cost in services.items()]}
+            for day, services in sorted(daily.items()) if start <= day < end
+        ]}
+    ce.get_cost_and_usage.side_effect = get_cost_and_usage
+    return ce
+
+
+def _history(today, days=40):
+    return {(today - timedelta(days=i)).isoformat(): {'EC2': 100.0, 'S3': 10.0} for i in range(days)}
+
+
+class TestRollingCostWindow:
+    """Testes para RollingCostWindow"""
+
+    def test_initial_then_incremental_refresh(self):
+        """Primeira carga busca 35 dias; a seguinte rebusca os últimos dias gravados"""
+        today = date(2024, 3, 20)
+        ce = _ce(_history(today))
+        window = RollingCostWindow()
+
+        first = window.refresh(ce, today)
+        second = window.refresh(ce, today + timedelta(days=1))
+
+        assert first == {'start': '2024-02-15', 'end': '2024-03-21', 'days': 35}
+        assert second['start'] == '2024-03-18'
+        assert window.total('2024-03-01', '2024-03-21') == pytest.approx(20 * 110.0)
+        assert window.daily_totals()[0][0] == '2024-02-16'
+        assert window.top_services('2024-03-20', limit=1) == {'EC2': 100.0}
+
+    def test_persisted_between_runs(self, tmp_path):
+        """Janela gravada é recarregada e continua incremental"""
+        path = str(tmp_path / 'window.json')
+        today = date(2024, 3, 20)
+        ce = _ce(_history(today))
+        RollingCostWindow(path=path).refresh(ce, today)
+
+        loaded = RollingCostWindow.load(path)
+        result = loaded.refresh(ce, today)
+
+        assert loaded.covered_from == date(2024, 2, 15)
+        assert result['start'] == '2024-03-18'
+        assert loaded.total('2024-02-15', '2024-03-21') == pytest.approx(35 * 110.0)
+
+    def test_partial_days_revised(self):
+        """Custo parcial de ontem é substituído pelo valor final na atualização seguinte"""
+        today = date(2024, 3, 20)
+        daily = _history(today)
+        daily['2024-03-20'] = {'EC2': 30.0}
+        window = RollingCostWindow()
+        window.refresh(_ce(daily), today)
+
+        daily['2024-03-20'] = {'EC2': 100.0, 'S3': 10.0}
+        daily['2024-03-21'] = {'EC2': 5.0}
+        window.refresh(_ce(daily), today + timedelta(days=1))
+
+        assert window.by_service('2024-03-20') == {'EC2': 100.0, 'S3': 10.0}
+        assert window.total('2024-03-21', '2024-03-22') == pytest.approx(5.0)
+
+
+class TestRealTimeSnapshotFromWindow:
+    """Snapshot do RealTimeInsightsService a partir da janela"""
+
+    def test_single_query_per_refresh(self, tmp_path):
+        """Um GetCostAndUsage por atualização; métricas derivadas localmente"""
+        FinOpsCache().clear()
+        today = datetime.utcnow().date()
+        daily = _history(today)
+        daily[today.isoformat()] = {'EC2': 200.0, 'S3': 40.0}
+        ce = _ce(daily)
+        factory = MagicMock()
+        factory.get_client.return_value = ce
+        service = RealTimeInsightsService(
+            client_factory=factory, cost_window=RollingCostWindow(path=str(tmp_path / 'w.json')))
+        received = []
+        service.subscribe(received.append)
+
+        snapshot = service.get_current_snapshot()
+        service.get_current_snapshot(force_refresh=True)
+
+        assert ce.get_cost_and_usage.call_count == 2
+        assert ce.get_cost_and_usage.call_args.kwargs['TimePeriod']['Start'] == (today - timedelta(days=2)).isoformat()
+        assert snapshot.total_cost_today == pytest.approx(240.0)
+        assert snapshot.total_cost_mtd == pytest.approx(240.0 + 110.0 * (today.day - 1))
+        assert snapshot.top_services == {'EC2': 200.0, 'S3': 40.0}
+        assert snapshot.vs_yesterday == pytest.approx(118.18, abs=0.01)
+        assert snapshot.vs_last_week == pytest.approx(118.18, abs=0.01)
+        assert received and received[0].title.startswith('Aumento de 118.2%')
+        FinOpsCache().clear()
@@ -0,0 +1,250 @@
+"""
+Testes unitários para a ingestão CUR em Parquet
+
+Cobertura: descoberta por manifest e partições, poda por período,
+agregação por serviço/região/conta/tag/cost category, custo amortizado
+e benchmark sobre diretório local de Parquet sintéticos
+"""
+import json
+import os
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from src.finops_aws.services.cur_ingestion_service import (
+    CURDataSource,
+    CURIngestionService,
+    CURParquetReader,
+    LocalCURSource,
+    billing_period_of,
+    billing_periods_between,
+)
+
+TAG_TYPE = pa.map_(pa.string(), pa.string())
+
+
+def _cur2_table(rows):
+    """Tabela no schema CUR 2.0 (subconjunto de colunas)"""
+    return pa.table({
+        'identity_line_item_id': [r.get('id', str(i)) for i, r in enumerate(rows)],
+        'line_item_usage_start_date': pa.array(
+            [r['start'] for r in rows], type=pa.timestamp('ms', tz='UTC')),
+        'line_item_line_item_type': [r.get('type', 'Usage') for r in rows],
+        'line_item_product_code': [r['service'] for r in rows],
+        'line_item_resource_id': [r.get('resource', '') for r in rows],
+        'line_item_usage_account_id': [r.get('account', '111111111111') for r in rows],
+        'product_region_code': [r.get('region', 'us-east-1') for r in rows],
+        'line_item_unblended_cost': [r['cost'] for r in rows],
+        'line_item_blended_cost': [r['cost'] for r in rows],
+        'savings_plan_savings_plan_effective_cost': [r.get('sp_effective', 0.0) for r in rows],
+        'reservation_effective_cost': [r.get('ri_effective', 0.0) for r in rows],
+        'reservation_reservation_a_r_n': [r.get('ri_arn', '') for r in rows],
+        'resource_tags': pa.array([list(r.get('tags', {}).items()) for r in rows], type=TAG_TYPE),
+        'cost_category': pa.array([list(r.get('categories', {}).items()) for r in rows], type=TAG_TYPE),
+    })
+
+
+def _write_export(root, period, rows, name='part-0', manifest=True, row_group_size=None):
+    """Grava Parquet e manifest no layout de Data Exports"""
+    data_dir = os.path.join(root, 'exports', 'finops', 'data', f'BILLING_PERIOD={period}')
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'{name}.parquet')
+    pq.write_table(_cur2_table(rows), path, row_group_size=row_group_size)
+    key = os.path.relpath(path, root).replace(os.sep, '/')
+    if manifest:
+        meta_dir = os.path.join(root, 'exports', 'finops', 'metadata', f'BILLING_PERIOD={period}')
+        os.makedirs(meta_dir, exist_ok=True)
+        with open(os.path.join(meta_dir, 'finops-Manifest.json'), 'w') as f:
+            json.dump({'dataFiles': [f's3://cur-bucket/{key}']}, f)
+    return key
+
+
+def _dt(day, month=1):
+    return datetime(2024, month, day, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def cur_dir(tmp_path):
+    root = str(tmp_path)
+    _write_export(root, '2024-01', [
+        {'start': _dt(1), 'service': 'AmazonEC2', 'cost': 100.0, 'resource': 'i-1',
+         'tags': {'user:env': 'prod'}, 'categories': {'team': 'core'}},
+        {'start': _dt(2), 'service': 'AmazonEC2', 'cost': 40.0, 'region': 'sa-east-1',
+         'type': 'SavingsPlanCoveredUsage', 'sp_effective': 25.0, 'tags': {'user:env': 'dev'}},
+        {'start': _dt(3), 'service': 'AmazonS3', 'cost': 10.0, 'account': '222222222222',
+         'type': 'SavingsPlanNegation'},
+        {'start': _dt(20), 'service': 'AmazonRDS', 'cost': 50.0, 'type': 'Fee',
+         'ri_arn': 'arn:aws:rds:ri'},
+    ])
+    _write_export(root, '2024-02', [
+        {'start': _dt(5, 2), 'service': 'AmazonEC2', 'cost': 999.0},
+    ])
+    return root
+
+
+class TestBillingPeriods:
+    """Testes para helpers de partição"""
+
+    def test_period_from_key(self):
+        """Reconhece partições CUR 2.0, legado e diretório de período"""
+        assert billing_period_of('x/data/BILLING_PERIOD=2024-03/a.parquet') == '2024-03'
+        assert billing_period_of('x/year=2024/month=3/a.parquet') == '2024-03'
+        assert billing_period_of('x/20240301-20240401/x-Manifest.json') == '2024-03'
+        assert billing_period_of('x/a.parquet') is None
+
+    def test_periods_between(self):
+        """Fim exclusivo não inclui o mês seguinte"""
+        assert billing_periods_between(datetime(2023, 12, 15), datetime(2024, 2, 1)) == ['2023-12', '2024-01']
+
+
+class TestCURParquetReader:
+    """Testes para CURParquetReader"""
+
+    def test_manifest_prunes_other_periods(self, cur_dir):
+        """Somente arquivos do manifest do período são lidos"""
+        reader = CURParquetReader(LocalCURSource(cur_dir))
+
+        files = reader.discover_files(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert files == ['exports/finops/data/BILLING_PERIOD=2024-01/part-0.parquet']
+
+    def test_summary_aggregations(self, cur_dir):
+        """Agrega por serviço, região, conta, tag e cost category"""
+        reader = CURParquetReader(LocalCURSource(cur_dir))
+
+        summary = reader.summarize(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert summary.record_count == 4
+        assert summary.total_unblended_cost == pytest.approx(200.0)
+        assert summary.by_service == {'AmazonEC2': 140.0, 'AmazonS3': 10.0, 'AmazonRDS': 50.0}
+        assert summary.by_region['sa-east-1'] == 40.0
+        assert summary.by_account['222222222222'] == 10.0
+        assert summary.by_tag == {'user:env': {'prod': 100.0, 'dev': 40.0}}
+        assert summary.by_cost_category == {'team=core': 100.0}
+        assert summary.data_source == CURDataSource.S3_DIRECT.value
+
+    def test_amortized_cost_rules(self, cur_dir):
+        """Amortizado usa custo efetivo de SP e zera negação e fee de RI"""
+        reader = CURParquetReader(LocalCURSource(cur_dir))
+
+        summary = reader.summarize(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert summary.total_amortized_cost == pytest.approx(100.0 + 25.0)
+
+    def test_row_filter_and_row_group_pruning(self, tmp_path):
+        """Filtra linhas fora do intervalo e poda row groups pelas estatísticas"""
+        rows = [{'start': _dt(d), 'service': 'AmazonEC2', 'cost': 1.0} for d in range(1, 29)]
+        _write_export(str(tmp_path), '2024-01', rows, row_group_size=7)
+        reader = CURParquetReader(LocalCURSource(str(tmp_path)), batch_size=4)
+        path = os.path.join(str(tmp_path), reader.discover_files(datetime(2024, 1, 1), datetime(2024, 2, 1))[0])
+
+        groups = reader._prune_row_groups(pq.ParquetFile(path), 'line_item_usage_start_date',
+                                          datetime(2024, 1, 10), datetime(2024, 1, 12))
+        summary = reader.summarize(datetime(2024, 1, 10), datetime(2024, 1, 12))
+
+        assert groups == [1]
+        assert summary.record_count == 2
+
+    def test_legacy_schema_without_manifest(self, tmp_path):
+        """CUR legado: partições year=/month= e colunas resource_tags_user_*"""
+        data_dir = tmp_path / 'cur' / 'report' / 'year=2024' / 'month=1'
+        data_dir.mkdir(parents=True)
+        pq.write_table(pa.table({
+            'line_item_usage_start_date': ['2024-01-05T00:00:00Z', '2024-01-06T00:00:00Z'],
+            'line_item_product_code': ['AmazonEC2', 'AWSLambda'],
+            'product_region': ['us-east-1', 'us-east-1'],
+            'line_item_unblended_cost': [3.0, 2.0],
+            'resource_tags_user_project': ['alpha', None],
+        }), str(data_dir / 'report-00001.parquet'))
+
+        summary = CURParquetReader(LocalCURSource(str(tmp_path))).summarize(
+            datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert summary.by_region == {'us-east-1': 5.0}
+        assert summary.by_tag == {'user:project': {'alpha': 3.0}}
+
+    def test_iter_records_populates_cur_record(self, cur_dir):
+        """Line items viram CURRecord com recurso e tags"""
+        reader = CURParquetReader(LocalCURSource(cur_dir))
+
+        records = list(reader.iter_records(datetime(2024, 1, 1), datetime(2024, 2, 1), resource_id='i-1'))
+
+        assert len(records) == 1
+        assert records[0].tags == {'user:env': 'prod'}
+        assert records[0].cost_category == 'team=core'
+        assert records[0].to_dict()['unblended_cost'] == 100.0
+
+
+class TestCURFrame:
+    """Testes para carga colunar do CUR"""
+
+    def test_load_frame_matches_summary(self, cur_dir):
+        """Frame colunar agrega igual ao CURSummary"""
+        reader = CURParquetReader(LocalCURSource(cur_dir))
+
+        frame = reader.load_frame(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert frame.num_rows == 4
+        assert frame.group_sum('product_code', metric='unblended') == {
+            'AmazonEC2': 140.0, 'AmazonS3': 10.0, 'AmazonRDS': 50.0}
+        assert frame.total('amortized') == pytest.approx(125.0)
+        assert frame.categories('usage_type') == ['']
+
+
+class TestCURIngestionServiceParquet:
+    """Testes para CURIngestionService com fonte Parquet"""
+
+    def _service(self, cur_dir):
+        factory = MagicMock()
+        factory.get_client.return_value.get_cost_and_usage.return_value = {
+            'ResultsByTime': [{'Total': {'UnblendedCost': {'Amount': '200.0'}}}]
+        }
+        return CURIngestionService(client_factory=factory, cur_source=LocalCURSource(cur_dir))
+
+    def test_ingest_uses_parquet_and_reconciles(self, cur_dir):
+        """Usa Parquet como fonte e reconcilia com o Cost Explorer"""
+        service = self._service(cur_dir)
+
+        summary = service.ingest_cur_data(datetime(2024, 1, 1), datetime(2024, 2, 1), force_refresh=True)
+
+        assert summary.data_source == CURDataSource.S3_DIRECT.value
+        assert summary.reconciliation_status == 'reconciled'
+        assert service.get_metrics()['cur_available'] is True
+
+    def test_get_line_items_limit(self, cur_dir):
+        """Respeita o limite de line items"""
+        service = self._service(cur_dir)
+
+        assert len(service.get_line_items(datetime(2024, 1, 1), datetime(2024, 2, 1), limit=2)) == 2
+
+
+class TestCURIngestionBenchmark:
+    """Benchmark de ingestão sobre diretório local"""
+
+    @pytest.mark.benchmark
+    def test_streaming_throughput(self, tmp_path):
+        """Agrega 200 mil line items em poucos segundos"""
+        services = ['AmazonEC2', 'AmazonS3', 'AmazonRDS', 'AWSLambda']
+        for part in range(4):
+            rows = [
+                {'start': _dt(1 + i % 28), 'service': services[i % 4], 'cost': 0.5,
+                 'region': f'region-{i % 7}', 'tags': {'user:team': f't{i % 11}'}}
+                for i in range(50000)
+            ]
+            _write_export(str(tmp_path), '2024-01', rows, name=f'part-{part}',
+                          manifest=False, row_group_size=16384)
+        reader = CURParquetReader(LocalCURSource(str(tmp_path)))
+
+        started = time.perf_counter()
+        summary = reader.summarize(datetime(2024, 1, 1), datetime(2024, 2, 1))
+        elapsed = time.perf_counter() - started
+
+        assert summary.record_count == 200000
+        assert summary.total_unblended_cost == pytest.approx(100000.0)
+        assert len(summary.by_tag['user:team']) == 11
+        assert elapsed < 5.0
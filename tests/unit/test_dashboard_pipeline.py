@@ -0,0 +1,171 @@
+"""
+Testes unitários para o pipeline de estágios do dashboard
+
+Cobertura: execução paralela dos estágios independentes, passagem de
+saídas entre dependências, timeout e falha isolados por estágio, validação
+do grafo e detalhamento de tempos em get_dashboard_analysis
+"""
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.finops_aws.dashboard import analysis
+from src.finops_aws.dashboard.pipeline import Stage, StageClients, StagePipeline
+
+
+def waiter(sync=None, value=None):
+    """Estágio que espera `sync` (Barrier ou Event) e devolve `value`"""
+    def run(deps):
+        if sync is not None:
+            sync.wait(timeout=5) if isinstance(sync, threading.Event) else sync.wait()
+        return value
+    return run
+
+
+class TestStagePipeline:
+    """Testes para StagePipeline"""
+
+    def test_independent_stages_run_concurrently(self):
+        """Estágios independentes em paralelo; o dependente roda depois deles"""
+        barrier = threading.Barrier(6, timeout=5)
+        stages = [Stage(f's{n}', waiter(barrier, n)) for n in range(6)]
+        stages.append(Stage('final', lambda deps: sum(deps.values()), requires=('s0', 's5')))
+
+        run = StagePipeline(stages, max_workers=8).run()
+
+        assert not barrier.broken
+        assert all(run.timings[f's{n}'].status == 'ok' for n in range(6))
+        assert run.outputs['final'] == 5
+        assert run.critical_path()[-1] == 'final'
+        assert run.critical_path()[0] in ('s0', 's5')
+
+    def test_timeout_and_error_use_default(self):
+        """Estágio lento ou com erro recebe a saída padrão sem bloquear os dependentes"""
+        def broken(deps):
+            raise RuntimeError('boom')
+
+        release = threading.Event()
+        stages = [
+            Stage('slow', waiter(release, 'late'), timeout=0.1, default='fallback'),
+            Stage('broken', broken, default=0),
+            Stage('after', lambda deps: (deps['slow'], deps['broken']), requires=('slow', 'broken')),
+        ]
+
+        try:
+            run = StagePipeline(stages).run()
+            assert not release.is_set()
+        finally:
+            release.set()
+
+        assert run.outputs['after'] == ('fallback', 0)
+        assert run.timings['slow'].status == 'timeout'
+        assert run.timings['broken'].status == 'error'
+        assert run.timings['broken'].error == 'boom'
+        assert run.timings['after'].status == 'ok'
+
+    def test_inline_stage_reported_first(self):
+        """Estágio inline roda na thread chamadora e é notificado primeiro"""
+        completed = []
+        stages = [Stage('fast', lambda deps: 1), Stage('first', waiter(value=0), inline=True)]
+
+        StagePipeline(stages).run(on_complete=lambda name, output, timing: completed.append(name))
+
+        assert completed == ['first', 'fast']
+
+    def test_invalid_graphs_rejected(self):
+        """Dependências inexistentes, ciclos e nomes duplicados são rejeitados"""
+        with pytest.raises(ValueError):
+            StagePipeline([Stage('a', waiter(), requires=('missing',))])
+        with pytest.raises(ValueError):
+            StagePipeline([Stage('a', waiter(), requires=('b',)), Stage('b', waiter(), requires=('a',))])
+        with pytest.raises(ValueError):
+            StagePipeline([Stage('a', waiter()), Stage('a', waiter())])
+
+
+class TestStageClients:
+    """Testes para StageClients"""
+
+    def test_clients_created_once_from_one_session(self):
+        """Estágios concorrentes recebem o mesmo cliente, criado uma vez na sessão da execução"""
+        session = MagicMock()
+        session.client.side_effect = lambda name, region_name=None: (name, region_name, object())
+        clients = StageClients(session)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def stage():
+            barrier.wait()
+            results.append(clients.get_client('ce', region_name='us-east-1'))
+
+        threads = [threading.Thread(target=stage) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert session.client.call_count == 1
+        assert len({id(r) for r in results}) == 1
+        assert clients.regional('compute-optimizer')('eu-west-1')[:2] == ('compute-optimizer', 'eu-west-1')
+
+
+class TestDashboardAnalysisPipeline:
+    """get_dashboard_analysis executada como DAG de estágios"""
+
+    def test_integrations_run_concurrently_with_timing_breakdown(self):
+        """Integrações independentes em paralelo; dependências e metadados de tempo"""
+        # As nove integrações independentes só passam da barreira juntas
+        barrier = threading.Barrier(9, timeout=5)
+        release = threading.Event()
+
+        def slow(value, sync=barrier):
+            def call(*args, **kwargs):
+                sync.wait(timeout=5) if sync is release else sync.wait()
+                return value
+            return call
+
+        sp_data = {'recommendations': [{'type': 'SAVINGS_PLAN', 'resource_id': 'sp', 'savings': 30}]}
+        tag_data = {'recommendations': [], 'coverage': {'compliance_percent': 80.0}}
+        co_recs = [{'type': 'EC2_IDLE', 'resource_id': 'i-1', 'savings': 10}]
+        captured = {}
+
+        def commitments(sp_data=None, ri_data=None):
+            captured['commitments'] = (sp_data, ri_data)
+            return {'summary': {'total': 1}}
+
+        def kpis(**kwargs):
+            captured['kpis'] = kwargs
+            return {'score': 1}
+
+        with patch.object(analysis, '_get_cost_data', return_value={'total': 100.0, 'by_service': {}}), \
+             patch.object(analysis, 'boto3'), \
+             patch.object(analysis, 'get_analyzers_analysis', side_effect=slow(([], {}))), \
+             patch.object(analysis, 'get_rightsizing_recommendations', side_effect=slow([])), \
+             patch.object(analysis, 'get_compute_optimizer_recommendations', side_effect=slow(co_recs)), \
+             patch.object(analysis, 'get_cost_explorer_ri_recommendations', side_effect=slow([])), \
+             patch.object(analysis, 'get_trusted_advisor_recommendations', side_effect=slow([], sync=release)), \
+             patch.object(analysis, 'get_amazon_q_insights', return_value=[]), \
+             patch.object(analysis, 'get_budgets_analysis', side_effect=slow({'error': 'disabled'})), \
+             patch.object(analysis, 'get_anomaly_detection_analysis', side_effect=slow({'error': 'disabled'})), \
+             patch.object(analysis, 'get_savings_plans_analysis', side_effect=slow(sp_data)), \
+             patch.object(analysis, 'get_reserved_instances_analysis', side_effect=slow({'error': 'x'})), \
+             patch.object(analysis, 'get_commitments_summary', side_effect=commitments), \
+             patch.object(analysis, 'get_tag_governance_analysis', side_effect=slow(tag_data)), \
+             patch.object(analysis, 'get_finops_kpis', side_effect=kpis):
+            try:
+                result = analysis.get_dashboard_analysis(stage_timeouts={'trusted_advisor': 0.5}, max_workers=16)
+            finally:
+                release.set()
+
+        pipeline = result['metadata']['pipeline']
+        assert not barrier.broken
+        assert pipeline['stages']['trusted_advisor']['status'] == 'timeout'
+        assert pipeline['critical_path'][-1] == 'kpis'
+        assert captured['commitments'] == (sp_data, {'error': 'x'})
+        assert captured['kpis']['idle_cost'] == 10
+        assert captured['kpis']['savings_potential'] == 40
+        assert captured['kpis']['tag_coverage_percent'] == 80.0
+        assert result['finops']['commitments'] == {'total': 1}
+        assert result['integrations']['savings_plans'] and not result['integrations']['trusted_advisor']
+        assert [r['resource_id'] for r in result['recommendations']] == ['sp', 'i-1']
+        assert result['summary']['total_potential_savings'] == 40
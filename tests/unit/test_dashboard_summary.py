@@ -0,0 +1,146 @@
+"""
+Testes unitários para o dashboard em camadas (resumo primeiro)
+
+Cobertura: tier 0 a partir de uma consulta ao Cost Explorer,
+tier 1 com integrações em paralelo e composição com o tier 2
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.finops_aws.dashboard.summary import (
+    build_tiered_dashboard,
+    get_tier0_summary,
+    get_tier1_summary,
+)
+from src.finops_aws.utils.cache import FinOpsCache
+
+
+def _group(service, region, amount):
+    return {
+        'Keys': [service, region],
+        'Metrics': {'UnblendedCost': {'Amount': str(amount), 'Unit': 'USD'}}
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    FinOpsCache().clear()
+    yield
+    FinOpsCache().clear()
+
+
+@pytest.fixture
+def ce_client():
+    client = MagicMock()
+    client.get_cost_and_usage.side_effect = [
+        {
+            'ResultsByTime': [{'Groups': [
+                _group('Amazon EC2', 'us-east-1', 100),
+                _group('Amazon EC2', 'sa-east-1', 50),
+                _group('Amazon S3', 'us-east-1', 30),
+            ]}],
+            'NextPageToken': 'page-2'
+        },
+        {
+            'ResultsByTime': [{'Groups': [
+                _group('AWS Lambda', 'sa-east-1', 20),
+                _group('Tax', 'NoRegion', 0),
+            ]}]
+        },
+    ]
+    return client
+
+
+@pytest.fixture
+def tier1_integrations():
+    with patch('src.finops_aws.dashboard.integrations.get_budgets_analysis',
+               return_value={'budgets': [{'name': 'b1'}]}), \
+         patch('src.finops_aws.dashboard.integrations.get_anomaly_detection_analysis',
+               return_value={'anomalies': []}), \
+         patch('src.finops_aws.dashboard.integrations.get_savings_plans_analysis',
+               return_value={'error': 'not available'}), \
+         patch('src.finops_aws.dashboard.integrations.get_reserved_instances_analysis',
+               return_value={'reserved_instances': []}), \
+         patch('src.finops_aws.dashboard.integrations.get_commitments_summary',
+               return_value={'summary': {'total_commitments': 0}}) as commitments:
+        yield commitments
+
+
+class TestTier0Summary:
+    """Testes para o tier 0"""
+
+    def test_single_query_aggregates_services_and_regions(self, ce_client):
+        """Agrega serviços e regiões de uma única consulta paginada"""
+        result = get_tier0_summary(ce_client=ce_client)
+
+        call = ce_client.get_cost_and_usage.call_args_list[0].kwargs
+        assert [g['Key'] for g in call['GroupBy']] == ['SERVICE', 'REGION']
+        assert ce_client.get_cost_and_usage.call_count == 2
+        assert result['costs']['total'] == 200.0
+        assert result['top_services'][0] == {'name': 'Amazon EC2', 'cost': 150.0, 'percentage': 75.0}
+        assert [r['name'] for r in result['top_regions'][:2]] == ['us-east-1', 'sa-east-1']
+        assert result['cached'] is False
+
+    def test_result_is_cached(self, ce_client):
+        """Segunda chamada não consulta o Cost Explorer"""
+        get_tier0_summary(ce_client=ce_client)
+        again = get_tier0_summary(ce_client=ce_client)
+
+        assert again['cached'] is True
+        assert ce_client.get_cost_and_usage.call_count == 2
+
+    def test_error_returns_empty_summary(self):
+        """Falha no Cost Explorer retorna resumo vazio com erro"""
+        client = MagicMock()
+        client.get_cost_and_usage.side_effect = Exception('AccessDenied')
+
+        result = get_tier0_summary(ce_client=client)
+
+        assert result['costs']['total'] == 0
+        assert 'error' in result
+
+
+class TestTier1Summary:
+    """Testes para o tier 1"""
+
+    def test_collects_cheap_integrations(self, tier1_integrations):
+        """Executa integrações baratas e resume commitments"""
+        result = get_tier1_summary()
+
+        assert result['budgets'] == {'budgets': [{'name': 'b1'}]}
+        assert result['commitments'] == {'total_commitments': 0}
+        assert tier1_integrations.call_args.kwargs['sp_data'] is None
+
+
+class TestBuildTieredDashboard:
+    """Testes para composição das camadas"""
+
+    def test_tier0_only(self, ce_client):
+        """Tier 0 sem integrações nem análise completa"""
+        result = build_tiered_dashboard(max_tier=0, ce_client=ce_client, tier2_status='not_requested')
+
+        assert result['tier'] == 0
+        assert result['tiers']['1']['status'] == 'not_requested'
+        assert result['field_tiers'] == {'costs': 0, 'top_services': 0, 'top_regions': 0}
+
+    def test_full_analysis_marks_tier2(self, ce_client, tier1_integrations):
+        """Campos da análise completa são marcados como tier 2"""
+        full = {'recommendations': [{'type': 'EC2_IDLE'}], 'summary': {'total': 1},
+                'resources': {}, 'integrations': {}, 'account_id': '123', 'generated_at': 'x'}
+
+        result = build_tiered_dashboard(max_tier=1, full_analysis=full, ce_client=ce_client)
+
+        assert result['tier'] == 2
+        assert result['tiers']['2']['status'] == 'complete'
+        assert result['field_tiers']['recommendations'] == 2
+        assert result['field_tiers']['budgets'] == 1
+        assert result['data']['recommendations'] == [{'type': 'EC2_IDLE'}]
+
+    def test_pending_tier2(self, ce_client, tier1_integrations):
+        """Tier 2 pendente enquanto a análise completa roda"""
+        result = build_tiered_dashboard(max_tier=1, tier2_status='queued', ce_client=ce_client)
+
+        assert result['tier'] == 1
+        assert result['tiers']['2'] == {'status': 'queued'}
+        assert 'recommendations' not in result['data']
@@ -350,6 +350,35 @@ class TestDynamoDBStateManager:
         checkpoint = self.manager.current_execution.checkpoints['ecs']
         assert checkpoint.status == TaskStatus.SKIPPED
 
+    def test_completion_listener_notified(self):
+        """Testa callback de conclusão de serviço"""
+        events = []
+        self.manager.add_completion_listener(events.append)
+        self.manager.create_execution('123456789012', services=['ec2', 's3'])
+        self.manager.start_service('ec2')
+        
+        self.manager.complete_service('ec2', result_summary={'instances': 3})
+        self.manager.fail_service('s3', 'Access denied')
+        
+        assert [e['service_name'] for e in events] == ['ec2', 's3']
+        assert events[0]['status'] == 'completed'
+        assert events[0]['result_summary'] == {'instances': 3}
+        assert events[0]['progress_percentage'] == 50.0
+        assert events[1]['status'] == 'failed'
+
+    def test_completion_listener_errors_are_isolated(self):
+        """Testa que falha no listener não interrompe o checkpoint"""
+        listener = Mock(side_effect=RuntimeError('boom'))
+        self.manager.add_completion_listener(listener)
+        self.manager.create_execution('123456789012', services=['ec2'])
+        
+        assert self.manager.complete_service('ec2') is True
+        listener.assert_called_once()
+        
+        self.manager.remove_completion_listener(listener)
+        self.manager.skip_service('ec2')
+        listener.assert_called_once()
+
     def test_get_pending_services(self):
         """Testa obtenção de serviços pendentes"""
         account_id = '123456789012'
@@ -0,0 +1,142 @@
+"""
+Testes unitários para o contexto compartilhado da análise FinOps completa
+
+Cobertura: prefetch único dos custos da janela, reuso do cubo ativo,
+sub-análises em paralelo recebendo o cubo, maturidade alimentada pelo
+status das demais e serviços respondendo do cubo sem chamar o Cost Explorer
+"""
+import threading
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.finops_aws.analytics import set_cost_cube
+from src.finops_aws.analytics.cost_cube import DEFAULT_TAG_KEYS
+from src.finops_aws.dashboard import finops_full_integration as integration
+from src.finops_aws.dashboard.finops_context import FinOpsRunContext
+from src.finops_aws.services.predictive_optimization_service import PredictiveOptimizationService
+from src.finops_aws.utils.cache import FinOpsCache
+
+
+def ce_client(days=40, daily=(('AmazonEC2', 200.0), ('AmazonS3', 50.0))):
+    """Cliente CE com custos diários por serviço para qualquer projeção"""
+    ce = MagicMock()
+    today = date.today()
+
+    def get_cost_and_usage(**params):
+        second = params['GroupBy'][1]
+        value = 'us-east-1' if second['Type'] == 'DIMENSION' else f"{second['Key']}$"
+        return {'ResultsByTime': [
+            {'TimePeriod': {'Start': (today - timedelta(days=n)).isoformat()},
+             'Groups': [{'Keys': [service, value], 'Metrics': {'UnblendedCost': {'Amount': str(cost)}}}
+                        for service, cost in daily]}
+            for n in range(days)
+        ]}
+
+    ce.get_cost_and_usage.side_effect = get_cost_and_usage
+    return ce
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    set_cost_cube(None)
+    FinOpsCache().clear()
+    yield
+    set_cost_cube(None)
+    FinOpsCache().clear()
+
+
+class TestFinOpsRunContext:
+    """Testes para FinOpsRunContext"""
+
+    def test_prefetch_once_and_reuse_active_cube(self):
+        """Custos buscados uma vez por projeção; segunda execução reutiliza o cubo"""
+        ce = ce_client()
+
+        first = FinOpsRunContext.prefetch(ce)
+        calls = ce.get_cost_and_usage.call_count
+        second = FinOpsRunContext.prefetch(ce)
+
+        assert calls == 2 + len(DEFAULT_TAG_KEYS)
+        assert ce.get_cost_and_usage.call_count == calls
+        assert first.source == 'prefetched' and second.source == 'active'
+        assert second.cost_cube is first.cost_cube
+        assert 'service' in first.to_dict()['dimensions']
+
+    def test_prefetch_failure_leaves_services_on_cost_explorer(self):
+        """Falha no prefetch não interrompe: contexto sem cubo"""
+        ce = MagicMock()
+        ce.get_cost_and_usage.side_effect = RuntimeError('throttled')
+
+        context = FinOpsRunContext.prefetch(ce)
+
+        assert context.cost_cube is None
+        assert context.source == 'unavailable'
+        assert context.error == 'throttled'
+
+    def test_predictive_service_reads_from_cube(self):
+        """Histórico e custo por serviço respondidos do cubo, sem Cost Explorer"""
+        context = FinOpsRunContext.prefetch(ce_client())
+        factory = MagicMock()
+        service = PredictiveOptimizationService(client_factory=factory, cost_cube=context.cost_cube)
+
+        history = service._get_historical_costs(14)
+        opportunities = service._analyze_savings_opportunities()
+
+        assert len(history) >= 14 and max(history) == pytest.approx(250.0)
+        assert [r.service for r in opportunities] == ['AmazonEC2', 'AmazonS3']
+        assert opportunities[0].current_cost == pytest.approx(200.0 * 30, rel=0.1)
+        factory.get_client.assert_not_called()
+
+
+class TestCompleteFinOpsAnalysis:
+    """get_complete_finops_analysis com contexto compartilhado"""
+
+    def test_sub_analyses_parallel_with_shared_cube(self):
+        """Sub-análises em paralelo recebem o mesmo cubo; maturidade usa o status delas"""
+        context = FinOpsRunContext.prefetch(ce_client())
+        seen = {}
+        factories = {}
+        maturity_status = {}
+        # As oito sub-análises só passam da barreira se rodarem juntas
+        barrier = threading.Barrier(8, timeout=5)
+
+        def slow(name, value):
+            def call(*args, cost_cube=None, client_factory=None, **kwargs):
+                seen[name] = cost_cube
+                factories[name] = client_factory
+                barrier.wait()
+                return value
+            return call
+
+        def maturity(services_status=None):
+            maturity_status.update(services_status)
+            return {'level_percentages': {'crawl': 100, 'walk': 80, 'run': 30, 'fly': 0},
+                    'assessment': {'top_gaps': [{'capability': 'Chargeback', 'gap_percentage': 70}]}}
+
+        with patch.object(integration, 'get_cur_ingestion_data', side_effect=slow('cur', {'error': 'no CUR'})), \
+             patch.object(integration, 'get_cost_allocation_scorecard', side_effect=slow('allocation', {'metrics': {}})), \
+             patch.object(integration, 'get_showback_summary', side_effect=slow('showback', {})), \
+             patch.object(integration, 'get_chargeback_invoices', side_effect=slow('chargeback', {'invoices': []})), \
+             patch.object(integration, 'get_unit_economics_analysis', side_effect=slow('unit', {})), \
+             patch.object(integration, 'get_policy_automation_status', side_effect=slow('policy', {})), \
+             patch.object(integration, 'get_realtime_insights', side_effect=slow('realtime', {})), \
+             patch.object(integration, 'get_predictive_optimization', side_effect=slow('predictive', {})), \
+             patch.object(integration, 'get_finops_maturity_assessment', side_effect=maturity), \
+             patch.object(integration, '_detect_services_status') as detect:
+            result = integration.get_complete_finops_analysis(context, max_workers=8)
+
+        assert not barrier.broken
+        assert all(seen[name] is context.cost_cube
+                   for name in ('allocation', 'showback', 'unit', 'realtime', 'predictive'))
+        assert len(factories) == 8 and all(f is context.clients for f in factories.values())
+        detect.assert_not_called()
+        assert maturity_status['cur_ingestion'] is False
+        assert maturity_status['showback'] is True and maturity_status['cost_explorer'] is True
+        assert result['integrations_status']['cur_ingestion'] is False
+        assert result['integrations_status']['finops_maturity'] is True
+        assert result['maturity_levels']['crawl'] == {'status': 'complete', 'percentage': 100}
+        assert result['recommendations'][0]['priority'] == 'HIGH'
+        assert result['metadata']['context']['source'] == 'prefetched'
+        assert result['metadata']['pipeline']['critical_path'][-1] == 'finops_maturity'
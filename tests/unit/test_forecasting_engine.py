@@ -0,0 +1,221 @@
+"""
+Testes unitários para o motor de previsão de custos
+
+Cobertura: regressão linear em lote (BatchForecaster), modelos sazonais,
+backtest e seleção por série (ForecastEngine), formato de resultado do
+CostForecaster, serviços usando o motor e benchmark de 10k séries
+"""
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.finops_aws.analytics import set_cost_cube
+from src.finops_aws.forecasting_engine import (
+    BatchForecaster,
+    CostForecaster,
+    DayOfWeekProfileModel,
+    ForecastEngine,
+    HoltWintersModel,
+)
+from src.finops_aws.services.kpi_calculator import KPICalculator
+from src.finops_aws.services.predictive_optimization_service import PredictiveOptimizationService
+from src.finops_aws.utils.cache import FinOpsCache
+
+
+def _weekly(weeks, weekday=100.0, weekend=20.0, growth=0.0):
+    """Série diária com fim de semana barato nos dois últimos dias de cada ciclo"""
+    pattern = np.array([weekday] * 5 + [weekend] * 2)
+    return np.tile(pattern, weeks) + growth * np.arange(7 * weeks)
+
+
+class TestBatchForecaster:
+    """Testes para BatchForecaster"""
+
+    def test_matches_polyfit(self):
+        """Slopes, interceptos e desvio dos resíduos iguais ao ajuste série a série"""
+        rng = np.random.default_rng(3)
+        history = np.arange(30) * rng.random((5, 1)) + rng.normal(100, 5, (5, 30))
+
+        result = BatchForecaster().forecast(history, horizon=10)
+
+        for row in range(5):
+            slope, intercept = np.polyfit(np.arange(30), history[row], 1)
+            residuals = history[row] - (intercept + slope * np.arange(30))
+            assert result.slopes[row] == pytest.approx(slope)
+            assert result.intercepts[row] == pytest.approx(intercept)
+            assert result.residual_std[row] == pytest.approx(np.std(residuals))
+            assert result.forecast[row] == pytest.approx(intercept + slope * np.arange(30, 40))
+        assert (result.lower >= 0).all()
+        assert (result.upper >= result.forecast).all()
+
+    def test_ragged_series_aligned_to_last_day(self):
+        """Série curta alinhada à direita; menos de 7 dias fica de fora"""
+        matrix = BatchForecaster.to_matrix([[1.0] * 10, [2.0, 4.0, 6.0, 8.0, 10.0, 12.0, 14.0], [5.0, 5.0]])
+
+        result = BatchForecaster().forecast(matrix, horizon=2)
+
+        assert matrix.shape == (3, 10)
+        assert np.isnan(matrix[1, :3]).all()
+        assert result.valid.tolist() == [True, True, False]
+        assert result.forecast[1] == pytest.approx([16.0, 18.0])
+        assert result.total_forecast() == pytest.approx([17.0, 19.0])
+        assert result.to_dict(2)['status'] == 'insufficient_data'
+
+
+class TestSeasonalModels:
+    """Testes para os modelos sazonais e o ForecastEngine"""
+
+    @pytest.mark.parametrize('model', [DayOfWeekProfileModel(), HoltWintersModel()])
+    def test_models_reproduce_weekly_pattern(self, model):
+        """Próxima semana mantém dias úteis caros e fim de semana barato"""
+        forecast, std = model.fit_predict(_weekly(8)[np.newaxis, :], 7)
+
+        assert forecast[0] == pytest.approx([100.0] * 5 + [20.0] * 2, abs=1.0)
+        assert std[0] < 5.0
+
+    def test_backtest_reports_mape_and_fit_time(self):
+        """Modelos sazonais vencem a reta em série semanal"""
+        history = np.stack([_weekly(8), _weekly(8, growth=0.5)])
+
+        report = ForecastEngine().backtest(history)
+        summary = report.to_dict()
+
+        assert report.mape.shape == (2, 3)
+        assert summary['folds'] == 3
+        assert summary['models']['linear_regression']['mape_percent'] > 50
+        assert summary['models']['day_of_week']['mape_percent'] < 1
+        assert set(summary['models']) == {'linear_regression', 'day_of_week', 'holt_winters'}
+        assert all(m['fit_seconds'] >= 0 for m in summary['models'].values())
+        assert report.best().tolist() != [0, 0]
+
+    def test_per_series_model_selection(self):
+        """Cada série recebe seu modelo; séries curtas ficam com a reta ou de fora"""
+        matrix = BatchForecaster.to_matrix([
+            _weekly(8).tolist(),
+            [50.0 + 2 * i for i in range(56)],
+            [10.0 + i for i in range(10)],
+            [1.0, 2.0],
+        ])
+
+        result = ForecastEngine().forecast(matrix, horizon=14)
+
+        assert result.models[0] in ('day_of_week', 'holt_winters')
+        assert result.models[1] == 'linear_regression'
+        assert result.models[2] == 'linear_regression'
+        assert result.models[3] == ''
+        assert result.valid.tolist() == [True, True, True, False]
+        assert result.forecast[1] == pytest.approx(50.0 + 2 * np.arange(56, 70))
+        assert result.to_dict(0)['backtest_mape_percent'] < 1
+        assert (result.lower <= result.forecast).all()
+
+
+class TestCostForecaster:
+    """Testes para CostForecaster sobre o BatchForecaster"""
+
+    def test_service_forecast_shape(self):
+        """Mesmas chaves do modelo linear anterior"""
+        forecast = CostForecaster().forecast_service_cost([100 + i for i in range(14)], forecast_days=5)
+
+        assert forecast['method'] == 'linear_regression'
+        assert forecast['trend'] == 'increasing'
+        assert forecast['trend_rate'] == pytest.approx(1.0)
+        assert forecast['forecast'] == pytest.approx([114.0, 115.0, 116.0, 117.0, 118.0])
+        assert forecast['confidence_interval_95']['lower'] == pytest.approx(116.0)
+
+    def test_aggregated_matches_per_service(self):
+        """Total em lote igual à soma das previsões individuais"""
+        forecaster = CostForecaster()
+        service_costs = {
+            'EC2': [100.0 + 2 * i for i in range(60)],
+            'S3': [20.0 - 0.1 * i for i in range(30)],
+            'Lambda': [1.0, 2.0],
+        }
+
+        aggregated = forecaster.forecast_aggregated_costs(service_costs, forecast_days=7)
+
+        assert set(aggregated['service_forecasts']) == {'EC2', 'S3'}
+        expected = np.add(forecaster.forecast_service_cost(service_costs['EC2'], 7)['forecast'],
+                          forecaster.forecast_service_cost(service_costs['S3'], 7)['forecast'])
+        assert aggregated['total_forecast'] == pytest.approx(expected.tolist())
+        assert aggregated['total_forecast_mean'] == pytest.approx(float(expected.mean()))
+
+
+class TestServicesUseEngine:
+    """KPICalculator e PredictiveOptimizationService prevêem com o ForecastEngine"""
+
+    @staticmethod
+    def _factory(daily_costs):
+        ce = MagicMock()
+        ce.get_cost_and_usage.return_value = {'ResultsByTime': [
+            {'Total': {'UnblendedCost': {'Amount': str(cost)}}} for cost in daily_costs
+        ]}
+        factory = MagicMock()
+        factory.get_client.return_value = ce
+        return factory, ce
+
+    def test_kpi_horizons_from_single_fit(self):
+        """Uma consulta de histórico atende 7/30/90 dias sem forecast do CE"""
+        set_cost_cube(None)
+        factory, ce = self._factory(_weekly(8))
+
+        forecasts = KPICalculator(client_factory=factory).get_cost_forecasts()
+
+        assert ce.get_cost_and_usage.call_count == 1
+        ce.get_cost_forecast.assert_not_called()
+        assert forecasts[7] == pytest.approx(540.0, rel=0.02)
+        assert forecasts[30] > forecasts[7]
+
+    def test_kpi_falls_back_to_cost_explorer(self):
+        """Histórico curto usa o forecast do Cost Explorer"""
+        set_cost_cube(None)
+        factory, ce = self._factory([10.0, 12.0])
+        ce.get_cost_forecast.return_value = {'Total': {'Amount': '321.5'}}
+
+        assert KPICalculator(client_factory=factory).get_cost_forecast(30) == pytest.approx(321.5)
+
+    def test_predictive_statistical_forecast(self):
+        """Forecast estatístico segue o padrão semanal e informa o modelo"""
+        FinOpsCache().clear()
+        factory, _ = self._factory(_weekly(8))
+
+        forecasts = PredictiveOptimizationService(client_factory=factory)._generate_statistical_forecast(7)
+
+        assert len(forecasts) == 7
+        assert [round(f.predicted_cost) for f in forecasts] == pytest.approx([100] * 5 + [20] * 2, abs=1)
+        assert forecasts[0].model_used in ('Statistical (day_of_week)', 'Statistical (holt_winters)')
+        assert forecasts[0].confidence > forecasts[-1].confidence
+
+
+class TestBatchForecasterBenchmark:
+    """Benchmark de previsão em lote"""
+
+    @pytest.mark.benchmark
+    def test_ten_thousand_series(self):
+        """10k séries × 90 dias previstas em uma única passagem"""
+        rng = np.random.default_rng(11)
+        history = rng.gamma(2.0, 50.0, (10_000, 90))
+
+        started = time.perf_counter()
+        result = BatchForecaster().forecast(history, horizon=30)
+        total = result.total_forecast()
+        elapsed = time.perf_counter() - started
+
+        assert result.forecast.shape == (10_000, 30)
+        assert total.shape == (30,)
+        assert elapsed < 1.0
+
+    @pytest.mark.benchmark
+    def test_engine_backtest_and_selection(self):
+        """10k séries × 90 dias com backtest dos três modelos e seleção por série"""
+        rng = np.random.default_rng(5)
+        history = _weekly(13)[:90] * rng.random((10_000, 1)) + rng.gamma(2.0, 5.0, (10_000, 90))
+
+        started = time.perf_counter()
+        result = ForecastEngine().forecast(history, horizon=30)
+        elapsed = time.perf_counter() - started
+
+        assert result.forecast.shape == (10_000, 30)
+        assert set(result.models) <= {'linear_regression', 'day_of_week', 'holt_winters'}
+        assert elapsed < 1.5
@@ -0,0 +1,257 @@
+"""
+Testes unitários para o health probe concorrente
+
+Cobertura: execução paralela sob prazo global, classificação dos
+resultados (ok, denied, not_subscribed, timeout, unavailable, error),
+captura do código de erro via eventos do botocore, cache por conta e
+uso do cache pelo scan (lambda_mapper) e pela detecção de maturidade
+"""
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+from src.finops_aws import lambda_mapper
+from src.finops_aws.core.health_probe import HealthProbe, ProbeStatus, S3ProbeStore, get_skipped_services
+from src.finops_aws.dashboard import finops_full_integration
+from src.finops_aws.utils.cache import FinOpsCache
+
+
+def client_error(code):
+    def probe():
+        raise ClientError({'Error': {'Code': code}}, 'Probe')
+    return probe
+
+
+def fake_session():
+    return boto3.Session(aws_access_key_id='x', aws_secret_access_key='y', region_name='us-east-1')
+
+
+class SwallowingService:
+    """Serviço cujo health_check engole o erro da AWS e devolve False"""
+
+    def __init__(self, client, operation):
+        self.client = client
+        self.operation = operation
+
+    def health_check(self):
+        with Stubber(self.client) as stubber:
+            stubber.add_client_error(self.operation, service_error_code='AccessDeniedException')
+            try:
+                getattr(self.client, self.operation)()
+                return True
+            except Exception:
+                return False
+
+
+class FakeServiceFactory:
+    """ServiceFactory com um cliente criado antes do probe e outro durante get_all_services"""
+
+    def __init__(self):
+        session = fake_session()
+        self.early = session.client('athena')
+        self.client_factory = SimpleNamespace(session=session, _clients={'athena_us-east-1': self.early})
+
+    def get_all_services(self):
+        late = self.client_factory.session.client('glue')
+        return {'athena': SwallowingService(self.early, 'list_work_groups'),
+                'glue': SwallowingService(late, 'get_databases')}
+
+
+class FakeS3:
+    """Cliente S3 em memória (get_object/put_object)"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': SimpleNamespace(read=lambda: self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+
+def waiter(sync, outcome=True, calls=None):
+    """Probe que espera `sync` (Barrier ou Event) e conta as chamadas em `calls`"""
+    def probe():
+        if calls is not None:
+            calls.append(1)
+        sync.wait(timeout=5) if isinstance(sync, threading.Event) else sync.wait()
+        return outcome
+    return probe
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    FinOpsCache().clear()
+    yield
+    FinOpsCache().clear()
+
+
+class TestHealthProbe:
+    """Testes para HealthProbe"""
+
+    def test_concurrent_under_global_deadline(self):
+        """Probes em paralelo; o que passa do prazo vira timeout sem segurar o relatório"""
+        barrier = threading.Barrier(8, timeout=5)
+        release = threading.Event()
+        probes = {f's{n}': waiter(barrier) for n in range(8)}
+        probes['hung'] = waiter(release)
+
+        try:
+            report = HealthProbe(probes, account_id='111', deadline_seconds=0.5).run()
+            assert not release.is_set()
+        finally:
+            release.set()
+
+        assert not barrier.broken
+        assert report.deadline_hit
+        assert report.results['hung'].status == ProbeStatus.TIMEOUT
+        assert report.summary()['by_status']['ok'] == 8
+
+    def test_classification(self):
+        """Exceções, dicts de status e False sem erro são classificados"""
+        def broken():
+            raise ValueError('bug')
+
+        report = HealthProbe({
+            'iam': client_error('AccessDeniedException'),
+            'support': client_error('SubscriptionRequiredException'),
+            'macie': lambda: {'status': 'unhealthy', 'message': 'An error occurred (OptInRequired)'},
+            'athena': lambda: {'status': 'healthy'},
+            'quiet': lambda: False,
+            'broken': broken,
+        }, account_id='111').run()
+
+        statuses = {name: result.status for name, result in report.results.items()}
+        assert statuses == {
+            'iam': ProbeStatus.DENIED,
+            'support': ProbeStatus.NOT_SUBSCRIBED,
+            'macie': ProbeStatus.NOT_SUBSCRIBED,
+            'athena': ProbeStatus.OK,
+            'quiet': ProbeStatus.UNAVAILABLE,
+            'broken': ProbeStatus.ERROR,
+        }
+        assert report.results['iam'].code == 'AccessDeniedException'
+        assert report.skipped() == {'iam', 'support', 'macie'}
+
+    def test_error_code_captured_when_health_check_swallows_it(self):
+        """health_check que devolve False: código obtido do evento after-call"""
+        session = fake_session()
+
+        def health_check():
+            client = session.client('athena')
+            with Stubber(client) as stubber:
+                stubber.add_client_error('list_work_groups', service_error_code='AccessDeniedException')
+                try:
+                    client.list_work_groups(MaxResults=1)
+                    return True
+                except Exception:
+                    return False
+
+        report = HealthProbe({'athena': health_check}, account_id='111', sessions=[session]).run()
+
+        assert report.results['athena'].status == ProbeStatus.DENIED
+        assert report.results['athena'].code == 'AccessDeniedException'
+
+    def test_factory_clients_capture_errors(self):
+        """Clientes criados antes e durante get_all_services têm o erro capturado"""
+        report = HealthProbe.from_service_factory(FakeServiceFactory(), account_id='111').run()
+
+        assert {name: r.status for name, r in report.results.items()} == {
+            'athena': ProbeStatus.DENIED, 'glue': ProbeStatus.DENIED}
+
+
+class TestHealthProbeCache:
+    """Cache por conta e compartilhamento com o scan"""
+
+    def test_cached_per_account_and_transients_reprobed(self):
+        """Definitivos vêm do cache; timeout/error são sondados de novo"""
+        calls = {'ok': 0, 'denied': 0, 'flaky': 0}
+        lock = threading.Lock()
+
+        def counted(name, probe):
+            def run():
+                with lock:
+                    calls[name] += 1
+                return probe()
+            return run
+
+        probes = {
+            'ok': counted('ok', lambda: True),
+            'denied': counted('denied', client_error('AccessDenied')),
+            'flaky': counted('flaky', client_error('ThrottlingException')),
+        }
+
+        first = HealthProbe(probes, account_id='111').run()
+        second = HealthProbe(probes, account_id='111').run()
+        other = HealthProbe(probes, account_id='222').run()
+
+        assert first.results['flaky'].status == ProbeStatus.ERROR
+        assert sorted(second.cached) == ['denied', 'ok'] and second.probed == ['flaky']
+        assert sorted(other.probed) == ['denied', 'flaky', 'ok']
+        assert calls == {'ok': 2, 'denied': 2, 'flaky': 3}
+        assert get_skipped_services('111') == {'denied'}
+
+    def test_results_shared_through_s3(self):
+        """Outro processo (cache vazio) lê do S3 os resultados sondados"""
+        store = S3ProbeStore('bucket', client=FakeS3())
+        HealthProbe({'macie': client_error('AccessDeniedException'), 'ec2': lambda: True},
+                    account_id='111', store=store).run()
+        FinOpsCache().clear()
+
+        assert json.loads(store.client.objects['state/health_probe/111.json'])['ec2']['status'] == 'ok'
+        assert get_skipped_services('111', store) == {'macie'}
+        assert get_skipped_services('222', store) == set()
+
+    def test_mapper_probes_factory_services(self):
+        """Com probe habilitado o mapper sonda os serviços do ServiceFactory e pula os negados"""
+        services = [{'name': name} for name in ('athena', 'glue', 'rds')]
+
+        with patch.object(lambda_mapper, 'ServiceFactory', FakeServiceFactory):
+            kept, skipped = lambda_mapper._skip_unavailable_services(
+                services, {'account_id': '333', 'probe_services': True})
+
+        assert [s['name'] for s in kept] == ['rds']
+        assert skipped == ['athena', 'glue']
+        assert get_skipped_services('333') == {'athena', 'glue'}
+
+    def test_mapper_skips_known_unavailable_services(self):
+        """lambda_mapper pula serviços negados/não assinados da conta"""
+        HealthProbe({'macie': client_error('AccessDeniedException'),
+                     'securityhub': client_error('SubscriptionRequiredException'),
+                     'ec2': lambda: True}, account_id='111').run()
+        services = [{'name': name} for name in ('ec2', 'macie', 'securityhub', 'rds')]
+
+        kept, skipped = lambda_mapper._skip_unavailable_services(services, {'account_id': '111'})
+        everything, none = lambda_mapper._skip_unavailable_services(
+            services, {'account_id': '111', 'include_unavailable': True})
+
+        assert [s['name'] for s in kept] == ['ec2', 'rds']
+        assert skipped == ['macie', 'securityhub']
+        assert len(everything) == 4 and none == []
+
+    def test_maturity_detection_uses_concurrent_probe(self):
+        """_detect_services_status sonda em paralelo e reaproveita o cache"""
+        barrier = threading.Barrier(3, timeout=5)
+        calls = []
+        probes = {name: waiter(barrier, calls=calls) for name in ('cur_ingestion', 'showback', 'unit_economics')}
+        probes['cost_allocation'] = client_error('AccessDenied')
+
+        with patch.object(finops_full_integration, '_finops_service_probes', return_value=probes), \
+             patch.dict('os.environ', {'AWS_ACCOUNT_ID': '111'}):
+            status = finops_full_integration._detect_services_status()
+            cached = finops_full_integration._detect_services_status()
+
+        assert not barrier.broken
+        assert len(calls) == 3
+        assert cached == status
+        assert status['cur_ingestion'] and status['showback'] and status['cost_explorer']
+        assert status['cost_allocation'] is False and status['training'] is False
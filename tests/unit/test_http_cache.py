@@ -0,0 +1,185 @@
+"""
+Testes unitários para o cache HTTP do dashboard
+
+Cobertura: ETags, GET condicional (304), negociação de compressão
+e cache imutável de assets com hash
+"""
+import gzip
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from src.finops_aws.dashboard import http_cache
+from src.finops_aws.dashboard.http_cache import (
+    HTTPResponseCache,
+    CachedResponse,
+    apply_cached_response,
+    etag_matches,
+    is_immutable_asset,
+    make_etag,
+    negotiate_encoding,
+)
+
+
+class TestETag:
+    """Testes para geração e comparação de ETags"""
+
+    def test_etag_depends_on_content(self):
+        """ETag muda quando o conteúdo muda"""
+        assert make_etag(b'{"a": 1}') == make_etag(b'{"a": 1}')
+        assert make_etag(b'{"a": 1}') != make_etag(b'{"a": 2}')
+
+    def test_etag_matches_variants(self):
+        """Aceita ETag fraco, listas, '*' e sufixos de codificação"""
+        etag = make_etag(b'payload')
+        base = etag.strip('"')
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'W/{etag}', etag)
+        assert etag_matches(f'"other", "{base}-gzip"', etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestEncodingNegotiation:
+    """Testes para negociação de Accept-Encoding"""
+
+    def test_gzip_selected(self):
+        """Seleciona gzip quando aceito"""
+        with patch.object(http_cache, 'BROTLI_AVAILABLE', False):
+            assert negotiate_encoding('gzip, deflate') == 'gzip'
+
+    def test_brotli_preferred_when_available(self):
+        """Prefere brotli quando disponível"""
+        with patch.object(http_cache, 'BROTLI_AVAILABLE', True):
+            assert negotiate_encoding('gzip, br') == 'br'
+
+    def test_q_zero_refused(self):
+        """Respeita q=0"""
+        with patch.object(http_cache, 'BROTLI_AVAILABLE', False):
+            assert negotiate_encoding('gzip;q=0') is None
+            assert negotiate_encoding('') is None
+
+
+class TestHTTPResponseCache:
+    """Testes para HTTPResponseCache"""
+
+    def test_entries_invalidated_on_version_bump(self):
+        """Entradas versionadas expiram com novo snapshot"""
+        cache = HTTPResponseCache()
+        cache.put('GET:/api/v1/costs?', b'{}', 'application/json')
+        cache.put('static:/assets/a-12345678.js', b'x', 'application/javascript', versioned=False)
+
+        assert cache.get('GET:/api/v1/costs?') is not None
+        cache.bump_version()
+        assert cache.get('GET:/api/v1/costs?') is None
+        assert cache.get('static:/assets/a-12345678.js') is not None
+
+    def test_compressed_body_is_computed_once(self):
+        """Corpo comprimido é reutilizado entre requisições"""
+        cache = HTTPResponseCache(min_compress_size=10)
+        entry = cache.put('k', b'{"cost": 1}' * 100, 'application/json')
+
+        with patch.object(http_cache, 'BROTLI_AVAILABLE', False):
+            body, encoding = cache.encode(entry, 'gzip')
+            again, _ = cache.encode(entry, 'gzip')
+
+        assert encoding == 'gzip'
+        assert body is again
+        assert gzip.decompress(body) == entry.body
+
+    def test_small_body_not_compressed(self):
+        """Corpos pequenos são enviados sem compressão"""
+        cache = HTTPResponseCache(min_compress_size=1024)
+        entry = cache.put('k', b'{}', 'application/json')
+
+        body, encoding = cache.encode(entry, 'gzip')
+
+        assert encoding is None
+        assert body == b'{}'
+
+    def test_lru_eviction(self):
+        """Respeita limite de entradas"""
+        cache = HTTPResponseCache(max_entries=2)
+        for i in range(3):
+            cache.put(f'k{i}', b'x', 'application/json')
+
+        assert cache.get('k0') is None
+        assert cache.get('k2') is not None
+        assert cache.get_stats()['entries'] == 2
+
+
+class TestApplyCachedResponse:
+    """Testes para aplicação da entrada em respostas Flask"""
+
+    @pytest.fixture
+    def app(self):
+        return Flask(__name__)
+
+    def test_not_modified(self, app):
+        """Retorna 304 quando If-None-Match corresponde"""
+        cache = HTTPResponseCache()
+        entry = cache.put('k', b'{"a": 1}', 'application/json')
+
+        with app.test_request_context(headers={'If-None-Match': entry.etag}):
+            from flask import request
+            response = app.response_class(mimetype='application/json')
+            response = apply_cached_response(response, entry, request.headers, cache)
+
+        assert response.status_code == 304
+        assert response.get_data() == b''
+        assert response.headers['ETag'] == entry.etag
+
+    def test_not_modified_does_not_compress(self, app):
+        """304 de variante gzip devolve a ETag da variante sem comprimir o corpo"""
+        cache = HTTPResponseCache(min_compress_size=10)
+        entry = cache.put('k', b'{"a": 1}' * 200, 'application/json')
+
+        with patch.object(http_cache, 'BROTLI_AVAILABLE', False), \
+             patch.object(http_cache, 'compress', side_effect=AssertionError('compress')):
+            with app.test_request_context(headers={'If-None-Match': entry.etag_for('gzip'),
+                                                   'Accept-Encoding': 'gzip'}):
+                from flask import request
+                response = app.response_class(mimetype='application/json')
+                response = apply_cached_response(response, entry, request.headers, cache)
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == entry.etag_for('gzip')
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert 'Content-Encoding' not in response.headers
+        assert entry.encoded == {}
+
+    def test_full_response_with_gzip(self, app):
+        """Retorna corpo comprimido e headers de revalidação"""
+        cache = HTTPResponseCache(min_compress_size=10)
+        entry = cache.put('k', b'{"a": 1}' * 200, 'application/json')
+
+        with patch.object(http_cache, 'BROTLI_AVAILABLE', False):
+            with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+                from flask import request
+                response = app.response_class(mimetype='application/json')
+                response = apply_cached_response(response, entry, request.headers, cache)
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['ETag'].endswith('-gzip"')
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(response.get_data()) == entry.body
+
+
+class TestImmutableAssets:
+    """Testes para detecção de assets com hash"""
+
+    def test_hashed_assets(self):
+        """Arquivos gerados pelo Vite são imutáveis"""
+        assert is_immutable_asset('assets/index-DgR3a_9x.js')
+        assert is_immutable_asset('assets/vendor-1a2b3c4d.css')
+
+    def test_unhashed_files(self):
+        """index.html e arquivos sem hash exigem revalidação"""
+        assert not is_immutable_asset('index.html')
+        assert not is_immutable_asset('favicon.ico')
+        assert not is_immutable_asset('assets/logo.svg')
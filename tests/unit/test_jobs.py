@@ -0,0 +1,201 @@
+"""
+Testes unitários para a fila de jobs do dashboard
+
+Cobertura: persistência SQLite, deduplicação, prioridades,
+workers reservados para requisições interativas e recuperação
+"""
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.finops_aws.dashboard.jobs import (
+    Job,
+    JobQueue,
+    JobPriority,
+    JobStatus,
+    SQLiteJobStore,
+    make_dedup_key,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / 'jobs.db'))
+
+
+class TestJobPriority:
+    """Testes para JobPriority"""
+
+    def test_parse_names_and_numbers(self):
+        """Aceita nomes e valores numéricos"""
+        assert JobPriority.parse('interactive') == JobPriority.INTERACTIVE
+        assert JobPriority.parse(JobPriority.SCHEDULED) == JobPriority.SCHEDULED
+        assert JobPriority.parse(75) == JobPriority.NORMAL
+
+    def test_parse_invalid(self):
+        """Rejeita nome desconhecido e tipos não numéricos com ValueError"""
+        for value in ('urgent', '-5', {'level': 1}, [100], None, True):
+            with pytest.raises(ValueError):
+                JobPriority.parse(value)
+
+
+class TestSQLiteJobStore:
+    """Testes para SQLiteJobStore"""
+
+    def test_claim_by_priority_then_age(self, store):
+        """Reserva o job de maior prioridade e, em empate, o mais antigo"""
+        store.insert_unique(_job('analysis', {'n': 1}, JobPriority.SCHEDULED))
+        store.insert_unique(_job('analysis', {'n': 2}, JobPriority.INTERACTIVE))
+        store.insert_unique(_job('analysis', {'n': 3}, JobPriority.INTERACTIVE))
+
+        order = [store.claim_next().payload['n'] for _ in range(3)]
+
+        assert order == [2, 3, 1]
+        assert store.claim_next() is None
+
+    def test_min_priority_filter(self, store):
+        """Worker reservado ignora jobs não interativos"""
+        store.insert_unique(_job('analysis', {}, JobPriority.SCHEDULED))
+
+        assert store.claim_next(min_priority=JobPriority.INTERACTIVE) is None
+        assert store.claim_next() is not None
+
+    def test_requeue_running_after_restart(self, tmp_path):
+        """Jobs de worker sem heartbeat dentro do lease voltam para a fila"""
+        path = str(tmp_path / 'jobs.db')
+        store = SQLiteJobStore(path)
+        store.insert_unique(_job('analysis', {}, JobPriority.NORMAL))
+        claimed = store.claim_next()
+
+        reopened = SQLiteJobStore(path)
+        assert reopened.requeue_running(lease=timedelta(0)) == 1
+        assert reopened.get(claimed.job_id).status == JobStatus.QUEUED
+
+    def test_live_worker_jobs_not_requeued(self, tmp_path):
+        """Outro processo não recupera jobs de um worker com heartbeat recente"""
+        path = str(tmp_path / 'jobs.db')
+        live = SQLiteJobStore(path)
+        live.insert_unique(_job('analysis', {}, JobPriority.NORMAL))
+        claimed = live.claim_next()
+        other = SQLiteJobStore(path)
+
+        assert other.requeue_running(lease=timedelta(minutes=1)) == 0
+        assert live.requeue_running(lease=timedelta(0)) == 0
+        assert live.heartbeat() == 1
+        assert other.get(claimed.job_id).status == JobStatus.RUNNING
+
+    def test_queue_start_keeps_other_workers_jobs(self, tmp_path):
+        """start() de um novo processo não executa de novo o job de outro vivo"""
+        path = str(tmp_path / 'jobs.db')
+        live = SQLiteJobStore(path)
+        live.insert_unique(_job('analysis', {}, JobPriority.NORMAL))
+        claimed = live.claim_next()
+        runs = []
+        queue = JobQueue(store=SQLiteJobStore(path), max_workers=1, poll_interval=0.05)
+        queue.register('analysis', lambda payload: runs.append(payload))
+
+        queue.start()
+        queue.stop()
+
+        assert runs == []
+        assert live.get(claimed.job_id).status == JobStatus.RUNNING
+
+
+class TestJobQueue:
+    """Testes para JobQueue"""
+
+    def test_submit_and_result(self, store):
+        """Executa job e persiste o resultado"""
+        queue = JobQueue(store=store, max_workers=1, poll_interval=0.05)
+        queue.register('export', lambda payload: {'format': payload['format'], 'content': 'a,b'})
+
+        job, created = queue.submit('export', {'format': 'csv'})
+        finished = queue.wait(job.job_id, timeout=5)
+        queue.stop()
+
+        assert created is True
+        assert finished.status == JobStatus.SUCCEEDED
+        assert finished.result == {'format': 'csv', 'content': 'a,b'}
+        assert finished.to_dict()['duration_seconds'] is not None
+
+    def test_dedup_in_flight_jobs(self, store):
+        """Jobs idênticos em andamento são deduplicados"""
+        release = threading.Event()
+        queue = JobQueue(store=store, max_workers=1, poll_interval=0.05)
+        queue.register('analysis', lambda payload: release.wait(5) and {'ok': True})
+
+        first, created_first = queue.submit('analysis', {'regions': ['us-east-1']})
+        second, created_second = queue.submit('analysis', {'regions': ['us-east-1']})
+        other, created_other = queue.submit('analysis', {'regions': ['sa-east-1']})
+        release.set()
+        queue.wait(other.job_id, timeout=5)
+        queue.stop()
+
+        assert created_first and not created_second and created_other
+        assert second.job_id == first.job_id
+        assert make_dedup_key('analysis', {'a': 1, 'b': 2}) == make_dedup_key('analysis', {'b': 2, 'a': 1})
+
+    def test_failed_job_records_error(self, store):
+        """Exceção do handler marca o job como falho"""
+        queue = JobQueue(store=store, max_workers=1, poll_interval=0.05)
+
+        def boom(payload):
+            raise RuntimeError('provedor indisponível')
+
+        queue.register('ai_report', boom)
+        job, _ = queue.submit('ai_report', {})
+        finished = queue.wait(job.job_id, timeout=5)
+        queue.stop()
+
+        assert finished.status == JobStatus.FAILED
+        assert 'provedor indisponível' in finished.error
+
+    def test_interactive_job_not_blocked_by_scheduled_scan(self, store):
+        """Worker reservado executa job interativo durante scan agendado"""
+        release = threading.Event()
+        queue = JobQueue(store=store, max_workers=2, reserved_interactive_workers=1, poll_interval=0.05)
+        queue.register('analysis', lambda payload: release.wait(5) and {'scan': True})
+        queue.register('ai_report', lambda payload: {'report': 'ok'})
+
+        scans = [queue.submit('analysis', {'scan': i}, priority='scheduled')[0] for i in range(2)]
+        interactive, _ = queue.submit('ai_report', {}, priority='interactive')
+        finished = queue.wait(interactive.job_id, timeout=5)
+
+        statuses = [queue.get(s.job_id).status for s in scans]
+        release.set()
+        queue.stop()
+
+        assert finished.status == JobStatus.SUCCEEDED
+        assert JobStatus.QUEUED in statuses
+
+    def test_unknown_kind(self, store):
+        """Rejeita tipo de job sem handler"""
+        queue = JobQueue(store=store)
+
+        with pytest.raises(ValueError):
+            queue.submit('unknown')
+
+    def test_cancel_queued_job(self, store):
+        """Cancela job ainda não iniciado"""
+        queue = JobQueue(store=store)
+        queue.register('analysis', lambda p: p)
+        job, _ = store.insert_unique(_job('analysis', {}, JobPriority.NORMAL))
+
+        assert queue.cancel(job.job_id) is True
+        assert queue.get(job.job_id).status == JobStatus.CANCELLED
+        assert queue.cancel(job.job_id) is False
+
+
+def _job(kind, payload, priority):
+    """Cria Job sem iniciar workers"""
+    return Job(
+        job_id=f"job-{uuid.uuid4().hex[:16]}",
+        kind=kind,
+        payload=payload,
+        priority=int(priority),
+        status=JobStatus.QUEUED,
+        dedup_key=make_dedup_key(kind, payload),
+        created_at=datetime.now()
+    )
@@ -0,0 +1,164 @@
+"""
+Testes unitários para o motor de KPIs
+
+Cobertura: fontes buscadas uma vez e em paralelo, dependências entre
+fontes e KPIs, linhagem, erros e KPICalculator com uma única série
+diária de 13 meses
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.finops_aws.analytics import DataSource, KPIDefinition, KPIEngine, set_cost_cube
+from src.finops_aws.services.kpi_calculator import KPICalculator
+
+
+class TestKPIEngine:
+    """Testes para KPIEngine"""
+
+    def test_sources_fetched_once_in_parallel(self):
+        """Fontes independentes rodam juntas; cada uma é buscada uma vez"""
+        calls = []
+        lock = threading.Lock()
+        # 'a' e 'b' só passam da barreira se forem buscadas juntas
+        barrier = threading.Barrier(2, timeout=5)
+
+        def slow(name, value):
+            def fetch(_):
+                with lock:
+                    calls.append(name)
+                barrier.wait()
+                return value
+            return fetch
+
+        engine = KPIEngine(
+            sources=[DataSource('a', slow('a', 2.0)), DataSource('b', slow('b', 3.0)),
+                     DataSource('unused', slow('unused', 0.0))],
+            kpis=[
+                KPIDefinition('sum', lambda c: c['a'] + c['b'], sources=('a', 'b')),
+                KPIDefinition('double_a', lambda c: c['a'] * 2, sources=('a',)),
+            ]
+        )
+
+        evaluation = engine.evaluate()
+
+        assert evaluation.values == {'sum': 5.0, 'double_a': 4.0}
+        assert sorted(calls) == ['a', 'b']
+        assert not barrier.broken
+        assert set(evaluation.compute_ms) == {'sum', 'double_a'}
+
+    def test_dependencies_and_lineage(self):
+        """Fonte dependente recebe a anterior; linhagem inclui fontes transitivas"""
+        engine = KPIEngine(
+            sources=[
+                DataSource('raw', lambda _: {'origin': 'cost_cube', 'values': [1, 2, 3]}),
+                DataSource('derived', lambda d: sum(d['raw']['values']), requires=('raw',), origin='local'),
+                DataSource('rate', lambda _: 0.5, origin='cost_explorer'),
+            ],
+            kpis=[
+                KPIDefinition('total', lambda c: c['derived'], sources=('derived',)),
+                KPIDefinition('scaled', lambda c: c['total'] * c['rate'], sources=('rate',), kpis=('total',)),
+            ]
+        )
+
+        evaluation = engine.evaluate(['scaled'])
+
+        assert evaluation['scaled'] == 3.0
+        assert evaluation.lineage['scaled'] == ['derived', 'rate', 'raw']
+        assert evaluation.sources['raw'].origin == 'cost_cube'
+        assert evaluation.sources['derived'].origin == 'local'
+
+    def test_errors_use_default(self):
+        """Falha de fonte ou cálculo não interrompe os demais KPIs"""
+        def broken(_):
+            raise RuntimeError('throttled')
+
+        engine = KPIEngine(
+            sources=[DataSource('bad', broken), DataSource('good', lambda _: 7)],
+            kpis=[
+                KPIDefinition('from_bad', lambda c: c['bad'] * 2, sources=('bad',), default=-1),
+                KPIDefinition('from_good', lambda c: c['good'], sources=('good',)),
+            ]
+        )
+
+        evaluation = engine.evaluate()
+
+        assert evaluation.values == {'from_bad': -1, 'from_good': 7}
+        assert evaluation.sources['bad'].error == 'throttled'
+        assert 'from_bad' in evaluation.errors
+
+    def test_unknown_dependency_rejected(self):
+        """Dependências não declaradas são rejeitadas na construção"""
+        with pytest.raises(ValueError):
+            KPIEngine(sources=[], kpis=[KPIDefinition('x', lambda c: 0, sources=('missing',))])
+        with pytest.raises(ValueError):
+            KPIEngine(sources=[], kpis=[KPIDefinition('x', lambda c: 0, kpis=('x',))])
+
+
+class TestKPICalculatorEngine:
+    """calculate_all_kpis com busca única"""
+
+    @staticmethod
+    def _ce():
+        """CE com custo diário 10, e 20 nos últimos 30 dias"""
+        today = datetime.utcnow().date()
+        recent = (today - timedelta(days=30)).isoformat()
+        ce = MagicMock()
+
+        def get_cost_and_usage(**params):
+            day = datetime.strptime(params['TimePeriod']['Start'], '%Y-%m-%d').date()
+            end = datetime.strptime(params['TimePeriod']['End'], '%Y-%m-%d').date()
+            results = []
+            while day < end:
+                cost = 20.0 if day.isoformat() >= recent else 10.0
+                results.append({'TimePeriod': {'Start': day.isoformat()},
+                                'Total': {'UnblendedCost': {'Amount': str(cost)}}})
+                day += timedelta(days=1)
+            return {'ResultsByTime': results}
+
+        ce.get_cost_and_usage.side_effect = get_cost_and_usage
+        ce.get_reservation_utilization.return_value = {'Total': {'UtilizationPercentage': '90'}}
+        ce.get_reservation_coverage.return_value = {
+            'Total': {'CoverageHours': {'CoverageHoursPercentage': '75'}}}
+        ce.get_savings_plans_utilization.return_value = {
+            'Total': {'Utilization': {'UtilizationPercentage': '80', 'UnusedCommitment': '12'}}}
+        ce.get_savings_plans_coverage.return_value = {'Total': {'Coverage': {'CoveragePercentage': '65'}}}
+        factory = MagicMock()
+        factory.get_client.return_value = ce
+        return factory, ce
+
+    def test_single_fetch_per_source(self):
+        """Uma série DAILY de 13 meses; forecast local; RI/SP uma vez cada"""
+        set_cost_cube(None)
+        factory, ce = self._ce()
+
+        result = KPICalculator(client_factory=factory).calculate_all_kpis(
+            idle_cost=48.0, revenue=1200.0, transactions_count=600)
+        kpis, metadata = result.kpis, result.to_dict()['metadata']
+
+        assert ce.get_cost_and_usage.call_count == 1
+        period = ce.get_cost_and_usage.call_args.kwargs
+        assert period['Granularity'] == 'DAILY'
+        assert (datetime.utcnow() - datetime.strptime(period['TimePeriod']['Start'], '%Y-%m-%d')).days >= 396
+        ce.get_cost_forecast.assert_not_called()
+        for method in (ce.get_reservation_utilization, ce.get_reservation_coverage,
+                       ce.get_savings_plans_utilization, ce.get_savings_plans_coverage):
+            assert method.call_count == 1
+
+        assert kpis.total_spend == pytest.approx(600.0)
+        assert kpis.cost_growth_mom == pytest.approx(100.0)
+        assert kpis.cost_growth_yoy == pytest.approx(100.0)
+        assert kpis.commitment_loss == pytest.approx(12.0)
+        assert kpis.waste_percent == pytest.approx(10.0)
+        assert kpis.margin == pytest.approx(50.0)
+        assert kpis.cost_per_transaction == pytest.approx(1.0)
+        assert kpis.forecast_7d == pytest.approx(140.0, rel=0.05)
+        assert kpis.forecast_90d > kpis.forecast_30d > kpis.forecast_7d
+        assert kpis.economic_health_index == 70
+        assert metadata['lineage']['waste_percent'] == ['daily_costs', 'inputs', 'sp_utilization']
+        assert metadata['sources']['daily_costs']['origin'] == 'cost_explorer'
+        assert metadata['sources']['forecast']['origin'] == 'forecast_engine'
+        assert set(metadata['compute_ms']) >= {'total_spend', 'economic_health_index'}
@@ -521,6 +521,28 @@ class TestDynamoDBFinOpsService:
         pitr_recs = [r for r in recommendations if r.recommendation_type == 'ENABLE_PITR']
         assert len(pitr_recs) >= 1
 
+    def test_capacity_analysis_over_provisioned(self):
+        """Testa custo desperdiçado de tabela provisionada subutilizada"""
+        table = DynamoDBTable(
+            table_name='idle-table',
+            table_status='ACTIVE',
+            billing_mode='PROVISIONED',
+            read_capacity=100,
+            write_capacity=50
+        )
+        metrics = {
+            'consumed_read_capacity': {'average': 10},
+            'consumed_write_capacity': {'average': 5}
+        }
+
+        with patch.object(self.service, 'get_tables', return_value=[table]), \
+             patch.object(self.service, 'get_table_metrics', return_value=metrics):
+            analysis = self.service.get_capacity_analysis()
+
+        assert analysis['tables_analyzed'] == 1
+        assert [t['table_name'] for t in analysis['over_provisioned']] == ['idle-table']
+        assert analysis['total_wasted_capacity_cost'] > 0
+
 
 class TestS3Bucket:
     """Testes para S3Bucket dataclass"""
@@ -0,0 +1,117 @@
+"""
+Testes unitários para o catálogo de preços offline
+
+Cobertura: extração de arquivos de oferta, lookup no índice com
+memory-map, fallback de referência, refresh incremental por versão e
+uso do índice pelos serviços
+"""
+import json
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.finops_aws.pricing import PriceIndex, read_offer_file, set_price_index
+from src.finops_aws.services.eks_service import EKSService
+
+
+def _offer(path, region, version, m5_price=0.1, gp3_price=0.09):
+    """Arquivo de oferta EC2 regional no formato da Price List"""
+    products = {
+        'SKU1': {'productFamily': 'Compute Instance', 'attributes': {
+            'regionCode': region, 'instanceType': 'm5.large', 'operatingSystem': 'Linux',
+            'tenancy': 'Shared', 'preInstalledSw': 'NA', 'capacitystatus': 'Used',
+            'licenseModel': 'No License required'}},
+        'SKU2': {'productFamily': 'Compute Instance', 'attributes': {
+            'regionCode': region, 'instanceType': 'm5.large', 'operatingSystem': 'Linux',
+            'tenancy': 'Shared', 'preInstalledSw': 'NA', 'capacitystatus': 'UnusedCapacityReservation'}},
+        'SKU3': {'productFamily': 'Storage', 'attributes': {
+            'regionCode': region, 'volumeApiName': 'gp3'}},
+    }
+    terms = {sku: {f'{sku}.JRTCKXETXF': {'priceDimensions': {f'{sku}.1': {
+        'beginRange': '0', 'unit': unit, 'pricePerUnit': {'USD': str(price)}}}}}
+        for sku, price, unit in (('SKU1', m5_price, 'Hrs'), ('SKU2', 0.0, 'Hrs'), ('SKU3', gp3_price, 'GB-Mo'))}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        'formatVersion': 'v1.0', 'offerCode': 'AmazonEC2', 'version': version,
+        'products': products, 'terms': {'OnDemand': terms}
+    }))
+    return str(path)
+
+
+class TestOfferFiles:
+    """Testes para leitura dos arquivos de oferta"""
+
+    def test_on_demand_entries_extracted(self, tmp_path):
+        """Só produtos usados On-Demand entram, com atributos normalizados"""
+        shard = read_offer_file(_offer(tmp_path / 'us-east-1' / 'index.json', 'us-east-1', 'v1'))
+
+        assert shard.shard_id == 'AmazonEC2__us-east-1'
+        assert shard.version == 'v1'
+        assert sorted((e.attributes.get('instance_type', e.attributes.get('volume_type')), e.price)
+                      for e in shard.entries) == [('gp3', 0.09), ('m5.large', 0.1)]
+
+
+class TestPriceIndex:
+    """Testes para PriceIndex"""
+
+    def test_lookup_from_memory_mapped_index(self, tmp_path):
+        """Preço por região vem do índice mapeado em memória"""
+        index = PriceIndex(str(tmp_path / 'index'))
+        index.refresh([
+            _offer(tmp_path / 'offers' / 'us-east-1' / 'index.json', 'us-east-1', 'v1'),
+            _offer(tmp_path / 'offers' / 'sa-east-1' / 'index.json', 'sa-east-1', 'v1', m5_price=0.153),
+        ])
+
+        reopened = PriceIndex(str(tmp_path / 'index'))
+        quote = reopened.lookup('AmazonEC2', 'sa-east-1', instanceType='m5.large',
+                                operatingSystem='Linux', tenancy='Shared')
+
+        assert isinstance(reopened._slots, np.memmap)
+        assert len(reopened) == 4
+        assert quote.price == pytest.approx(0.153) and quote.unit == 'Hrs' and quote.source == 'price_list'
+        assert reopened.ebs_gb_month('gp3', 'us-east-1') == pytest.approx(0.09)
+
+    def test_reference_fallback_without_index(self, tmp_path):
+        """Sem índice, usa os preços de referência; SKU desconhecido usa o default"""
+        index = PriceIndex(str(tmp_path / 'missing'))
+
+        assert len(index) == 0
+        assert index.ec2_hourly('m5.large') == pytest.approx(0.096)
+        assert index.rds_hourly('db.r5.large', engine='Aurora PostgreSQL') == pytest.approx(0.29)
+        assert index.dynamodb_capacity_hourly() == (0.00013, 0.00065)
+        assert index.ec2_hourly('x9.huge', default=0.5) == 0.5
+
+    def test_incremental_refresh(self, tmp_path):
+        """Arquivos com a mesma versão são ignorados; versão nova regrava o shard"""
+        index = PriceIndex(str(tmp_path / 'index'))
+        east = _offer(tmp_path / 'offers' / 'us-east-1' / 'index.json', 'us-east-1', 'v1')
+        south = _offer(tmp_path / 'offers' / 'sa-east-1' / 'index.json', 'sa-east-1', 'v1')
+        index.refresh([east, south])
+
+        unchanged = index.refresh([east, south])
+        _offer(tmp_path / 'offers' / 'us-east-1' / 'index.json', 'us-east-1', 'v2', m5_price=0.09)
+        changed = index.refresh_directory(str(tmp_path / 'offers'))
+
+        assert unchanged == {'updated': [], 'skipped': 2, 'entries': 4}
+        assert changed['updated'] == ['AmazonEC2__us-east-1'] and changed['skipped'] == 1
+        assert index.versions == {'AmazonEC2__us-east-1': 'v2', 'AmazonEC2__sa-east-1': 'v1'}
+        assert index.ec2_hourly('m5.large', 'us-east-1') == pytest.approx(0.09)
+
+
+class TestServicesUsePriceIndex:
+    """Serviços consultam o índice global"""
+
+    def test_eks_rate_from_index(self, tmp_path):
+        """EKS usa o preço da região configurada"""
+        index = PriceIndex(str(tmp_path / 'index'))
+        index.refresh([_offer(tmp_path / 'sa-east-1.json', 'sa-east-1', 'v1', m5_price=0.153)])
+        set_price_index(index)
+        try:
+            service = EKSService(client_factory=MagicMock())
+            service.region = 'sa-east-1'
+
+            assert service._estimate_instance_hourly_rate('m5.large') == pytest.approx(0.153)
+            assert service._estimate_instance_hourly_rate('c5.large') == pytest.approx(0.085)
+        finally:
+            set_price_index(None)
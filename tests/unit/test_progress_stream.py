@@ -0,0 +1,211 @@
+"""
+Testes unitários para o stream de progresso (SSE) do dashboard
+
+Cobertura: broker de eventos, replay para assinantes tardios,
+formato text/event-stream e callbacks de estágio da análise
+"""
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.finops_aws.dashboard.progress_stream import (
+    ProgressBroker,
+    ProgressEvent,
+    stage_progress_callback,
+    state_manager_listener,
+    EVENT_COMPLETE,
+    EVENT_PROGRESS,
+    EVENT_RECOMMENDATIONS,
+)
+
+
+def _parse_sse(chunks):
+    """Converte blocos SSE em lista de (evento, payload)"""
+    events = []
+    for chunk in chunks:
+        lines = chunk.strip().split('\n')
+        event = next((line[7:] for line in lines if line.startswith('event: ')), None)
+        data = next((line[6:] for line in lines if line.startswith('data: ')), None)
+        if event:
+            events.append((event, json.loads(data)))
+    return events
+
+
+class TestProgressEvent:
+    """Testes para ProgressEvent"""
+
+    def test_to_sse_format(self):
+        """Evento segue o formato text/event-stream"""
+        event = ProgressEvent(channel='analysis', event='progress', data={'stage': 'costs'}, sequence=3)
+
+        sse = event.to_sse()
+
+        assert sse.startswith('id: 3\nevent: progress\ndata: ')
+        assert sse.endswith('\n\n')
+        assert json.loads(sse.split('data: ')[1])['data'] == {'stage': 'costs'}
+
+
+class TestProgressBroker:
+    """Testes para ProgressBroker"""
+
+    def test_late_subscriber_receives_history(self):
+        """Assinante tardio recebe eventos já publicados"""
+        broker = ProgressBroker()
+        broker.open('analysis')
+        broker.publish('analysis', EVENT_PROGRESS, {'stage': 'costs'})
+        broker.publish('analysis', EVENT_COMPLETE, {})
+
+        events = _parse_sse(broker.stream('analysis', heartbeat_seconds=0.1))
+
+        assert [e for e, _ in events] == [EVENT_PROGRESS, EVENT_COMPLETE]
+        assert not broker.is_active('analysis')
+
+    def test_last_event_id_skips_seen_events(self):
+        """Last-Event-ID evita reenvio de eventos já recebidos"""
+        broker = ProgressBroker()
+        broker.open('analysis')
+        broker.publish('analysis', EVENT_PROGRESS, {'stage': 'costs'})
+        broker.publish('analysis', EVENT_PROGRESS, {'stage': 'budgets'})
+        broker.publish('analysis', EVENT_COMPLETE, {})
+
+        events = _parse_sse(broker.stream('analysis', last_event_id=2, heartbeat_seconds=0.1))
+
+        assert [e for e, _ in events] == [EVENT_COMPLETE]
+
+    def test_live_events_from_another_thread(self):
+        """Eventos publicados durante a conexão são entregues em ordem"""
+        broker = ProgressBroker()
+        broker.open('multi-region')
+        subscriber = broker.subscribe('multi-region')
+
+        def producer():
+            for region in ('us-east-1', 'sa-east-1'):
+                broker.publish('multi-region', EVENT_PROGRESS, {'stage': region})
+            broker.publish('multi-region', EVENT_COMPLETE, {})
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        thread.join()
+
+        received = [subscriber.get(timeout=1).data.get('stage') for _ in range(3)]
+        assert received == ['us-east-1', 'sa-east-1', None]
+
+    def test_heartbeat_when_idle(self):
+        """Envia heartbeat enquanto não há eventos"""
+        broker = ProgressBroker()
+        broker.open('analysis')
+
+        stream = broker.stream('analysis', heartbeat_seconds=0.01)
+        assert next(stream).startswith('retry:')
+        assert next(stream) == ': heartbeat\n\n'
+        stream.close()
+
+
+class TestCallbacks:
+    """Testes para adaptadores de callbacks"""
+
+    def test_stage_callback_publishes_progress_and_batch(self):
+        """Callback de estágio publica progresso e lote de recomendações"""
+        broker = ProgressBroker()
+        broker.open('analysis')
+        callback = stage_progress_callback(broker, 'analysis')
+
+        callback('compute_optimizer', {
+            'completed_stages': 5,
+            'total_stages': 15,
+            'recommendations': [{'type': 'EC2_RIGHTSIZING', 'savings': 10}]
+        })
+        callback('commitments', {'completed_stages': 6, 'total_stages': 15, 'recommendations': []})
+
+        history = broker.get_history('analysis')
+        assert [h['event'] for h in history] == [EVENT_PROGRESS, EVENT_RECOMMENDATIONS, EVENT_PROGRESS]
+        assert history[0]['data']['recommendations_count'] == 1
+        assert history[1]['data']['recommendations'][0]['savings'] == 10
+
+    def test_state_manager_listener(self):
+        """Listener converte conclusão de serviço do DynamoDBStateManager"""
+        broker = ProgressBroker()
+        broker.open('scan')
+        listener = state_manager_listener(broker, 'scan')
+
+        listener({
+            'service_name': 'ec2',
+            'status': 'completed',
+            'result_summary': {'instances': 2, 'recommendations': [{'type': 'EC2_IDLE'}]}
+        })
+
+        history = broker.get_history('scan')
+        assert history[0]['data']['stage'] == 'ec2'
+        assert history[0]['data']['summary'] == {'instances': 2}
+        assert history[1]['data']['recommendations'] == [{'type': 'EC2_IDLE'}]
+
+
+class TestDashboardAnalysisProgress:
+    """Testes para progress_callback de get_dashboard_analysis"""
+
+    CO_RECS = [{'type': 'EC2_RIGHTSIZING', 'resource_id': 'i-1', 'savings': 5}]
+
+    def _run_analysis(self, **kwargs):
+        """Executa a análise com todas as integrações simuladas"""
+        from src.finops_aws.dashboard import analysis
+
+        empty = {'error': 'disabled'}
+        with patch.object(analysis, '_get_cost_data', return_value={'total': 0, 'by_service': {}}), \
+             patch.object(analysis, 'boto3'), \
+             patch.object(analysis, 'get_analyzers_analysis', return_value=([], {})), \
+             patch.object(analysis, 'get_rightsizing_recommendations', return_value=[]), \
+             patch.object(analysis, 'get_compute_optimizer_recommendations', return_value=self.CO_RECS), \
+             patch.object(analysis, 'get_cost_explorer_ri_recommendations', return_value=[]), \
+             patch.object(analysis, 'get_trusted_advisor_recommendations', return_value=[]), \
+             patch.object(analysis, 'get_amazon_q_insights', return_value=[]), \
+             patch.object(analysis, 'get_budgets_analysis', return_value=empty), \
+             patch.object(analysis, 'get_anomaly_detection_analysis', return_value=empty), \
+             patch.object(analysis, 'get_savings_plans_analysis', return_value=empty), \
+             patch.object(analysis, 'get_reserved_instances_analysis', return_value=empty), \
+             patch.object(analysis, 'get_commitments_summary', return_value={}), \
+             patch.object(analysis, 'get_tag_governance_analysis', return_value=empty), \
+             patch.object(analysis, 'get_finops_kpis', return_value=empty):
+            return analysis.get_dashboard_analysis(**kwargs)
+
+    def test_callback_called_for_each_stage(self):
+        """Callback recebe todos os estágios com progresso crescente"""
+        stages = []
+
+        self._run_analysis(progress_callback=lambda stage, payload: stages.append((stage, payload)))
+
+        names = [s for s, _ in stages]
+        assert names[0] == 'costs'
+        assert names[-1] == 'kpis'
+        assert stages[-1][1]['progress_percentage'] == 100.0
+        co_payload = dict(stages)['compute_optimizer']
+        assert co_payload['recommendations'] == self.CO_RECS
+        assert co_payload['success'] is True
+
+    def test_progress_published_from_state_manager_checkpoints(self):
+        """Com state manager, o SSE é alimentado pelos checkpoints complete_service"""
+        from src.finops_aws.core.dynamodb_state_manager import DynamoDBStateManager, TaskStatus
+
+        broker = ProgressBroker()
+        broker.open('analysis')
+        manager = DynamoDBStateManager(table=MagicMock())
+        manager.add_completion_listener(state_manager_listener(broker, 'analysis'))
+        callback_stages = []
+
+        with patch.object(manager, 'get_running_execution', return_value=None), \
+             patch.dict('os.environ', {'AWS_ACCOUNT_ID': '123456789012'}):
+            self._run_analysis(
+                progress_callback=lambda stage, payload: callback_stages.append(stage),
+                state_manager=manager
+            )
+
+        history = broker.get_history('analysis')
+        progress = [e['data'] for e in history if e['event'] == EVENT_PROGRESS]
+        batches = [e['data'] for e in history if e['event'] == EVENT_RECOMMENDATIONS]
+        checkpoints = manager.current_execution.checkpoints
+        assert callback_stages == []
+        assert {p['stage'] for p in progress} == set(checkpoints)
+        assert progress[-1]['progress_percentage'] == 100.0
+        assert batches == [{'stage': 'compute_optimizer', 'recommendations': self.CO_RECS}]
+        assert all(c.status == TaskStatus.COMPLETED for c in checkpoints.values())
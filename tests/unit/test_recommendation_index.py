@@ -0,0 +1,166 @@
+"""
+Testes unitários para RecommendationIndex
+
+Cobertura: filtros server-side, ordenação, busca textual
+e paginação por cursor sobre índices em memória
+"""
+import time
+
+import pytest
+
+from src.finops_aws.dashboard.recommendation_index import (
+    RecommendationIndex,
+    RecommendationQuery,
+    InvalidCursorError,
+)
+
+
+def _make_recommendations(count):
+    types = ['EC2_IDLE', 'EBS_ORPHAN', 'RDS_SINGLE_AZ', 'S3_LIFECYCLE']
+    services = ['EC2', 'EBS', 'RDS', 'S3']
+    regions = ['us-east-1', 'sa-east-1', 'eu-west-1']
+    priorities = ['HIGH', 'MEDIUM', 'LOW']
+    return [
+        {
+            'type': types[i % 4],
+            'resource_id': f'res-{i}',
+            'title': f'Recurso {i} otimizável',
+            'description': f'Descrição do recurso {i}',
+            'priority': priorities[i % 3],
+            'savings': float(i % 97),
+            'service': services[i % 4],
+            'region': regions[i % 3],
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def index():
+    return RecommendationIndex(_make_recommendations(300), version=1)
+
+
+def _collect_all(index, **kwargs):
+    """Percorre todas as páginas seguindo next_cursor"""
+    items, cursor = [], None
+    while True:
+        page = index.query(RecommendationQuery(cursor=cursor, **kwargs))
+        items.extend(page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return items, page['total']
+
+
+class TestRecommendationQuery:
+    """Testes para parsing da query string"""
+
+    def test_from_args(self):
+        """Converte parâmetros separados por vírgula"""
+        query = RecommendationQuery.from_args({
+            'type': 'EC2_IDLE,EBS_ORPHAN', 'priority': 'high', 'min_savings': '10',
+            'limit': '9999', 'sort': 'priority', 'order': 'asc'
+        })
+
+        assert query.types == ['EC2_IDLE', 'EBS_ORPHAN']
+        assert query.priorities == ['HIGH']
+        assert query.min_savings == 10.0
+        assert query.limit == 500
+        assert query.sort == 'priority'
+
+    def test_invalid_sort(self):
+        """Rejeita campo de ordenação desconhecido"""
+        with pytest.raises(ValueError):
+            RecommendationQuery.from_args({'sort': 'random'})
+
+
+class TestRecommendationIndex:
+    """Testes para consultas no índice"""
+
+    def test_default_sort_by_savings_desc(self, index):
+        """Ordenação padrão por maior economia"""
+        page = index.query(RecommendationQuery(limit=10))
+
+        savings = [r['savings'] for r in page['items']]
+        assert savings == sorted(savings, reverse=True)
+        assert page['total'] == 300
+        assert page['next_cursor'] is not None
+
+    def test_pagination_covers_all_items_once(self, index):
+        """Cursor percorre todos os itens sem repetição"""
+        items, total = _collect_all(index, limit=37)
+
+        ids = [r['resource_id'] for r in items]
+        assert len(ids) == total == 300
+        assert len(set(ids)) == 300
+
+    def test_selective_filter_pagination(self, index):
+        """Filtros combinados com paginação"""
+        items, total = _collect_all(
+            index, services=['EC2'], regions=['us-east-1'], min_savings=20, limit=5
+        )
+
+        assert len(items) == total
+        assert all(r['service'] == 'EC2' and r['region'] == 'us-east-1' for r in items)
+        assert all(r['savings'] >= 20 for r in items)
+        savings = [r['savings'] for r in items]
+        assert savings == sorted(savings, reverse=True)
+
+    def test_savings_range_and_ascending_order(self, index):
+        """Faixa de economia com ordem ascendente"""
+        page = index.query(RecommendationQuery(min_savings=10, max_savings=12, order='asc', limit=500))
+
+        savings = [r['savings'] for r in page['items']]
+        assert savings == sorted(savings)
+        assert set(savings) == {10.0, 11.0, 12.0}
+
+    def test_priority_sort(self, index):
+        """Ordenação por prioridade coloca HIGH primeiro"""
+        page = index.query(RecommendationQuery(sort='priority', limit=100))
+
+        assert page['items'][0]['priority'] == 'HIGH'
+        assert page['items'][-1]['priority'] == 'HIGH'
+
+    def test_text_search_with_prefix(self, index):
+        """Busca textual por termo exato e por prefixo"""
+        exact = index.query(RecommendationQuery(search='res-42', limit=10))
+        prefix = index.query(RecommendationQuery(search='otimiz', limit=10))
+
+        assert [r['resource_id'] for r in exact['items']] == ['res-42']
+        assert prefix['total'] == 300
+
+    def test_region_detected_from_resource_id(self):
+        """Região inferida do resource_id quando ausente"""
+        index = RecommendationIndex([
+            {'type': 'EBS_ORPHAN', 'resource_id': 'sa-east-1-ebs', 'savings': 5},
+            {'type': 'EC2_STOPPED', 'resource_id': 'i-123', 'savings': 1},
+        ], version=1, default_region='us-east-1')
+
+        page = index.query(RecommendationQuery(regions=['sa-east-1']))
+
+        assert [r['resource_id'] for r in page['items']] == ['sa-east-1-ebs']
+        assert index.facets()['region'] == {'sa-east-1': 1, 'us-east-1': 1}
+
+    def test_cursor_from_other_snapshot_rejected(self, index):
+        """Cursor de outro snapshot é rejeitado"""
+        page = index.query(RecommendationQuery(limit=10))
+        newer = RecommendationIndex(_make_recommendations(300), version=2)
+
+        with pytest.raises(InvalidCursorError):
+            newer.query(RecommendationQuery(limit=10, cursor=page['next_cursor']))
+        with pytest.raises(InvalidCursorError):
+            index.query(RecommendationQuery(limit=10, cursor='lixo'))
+
+    @pytest.mark.benchmark
+    def test_page_latency_on_large_snapshot(self):
+        """Páginas profundas respondem rapidamente em snapshot grande"""
+        index = RecommendationIndex(_make_recommendations(50000), version=1)
+        first = index.query(RecommendationQuery(limit=50))
+        cursor = first['next_cursor']
+
+        start = time.perf_counter()
+        for _ in range(10):
+            index.query(RecommendationQuery(limit=50, cursor=cursor, services=['EC2'], priorities=['HIGH']))
+            index.query(RecommendationQuery(limit=50, cursor=cursor))
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 20
+
+        assert elapsed_ms < 50
@@ -0,0 +1,259 @@
+"""
+Testes unitários para o rightsizing por percentis
+
+Cobertura: percentis vetorizados contra np.nanpercentile, casamento com o
+tipo mais barato que atende, upsize por p99, memória ausente, catálogo de
+candidatos, RightsizingService com descoberta paginada, GetMetricData em
+lote e dimensões do CloudWatch Agent, integração com o dashboard e
+benchmark de 50 mil recursos
+"""
+import time
+import warnings
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.finops_aws.analytics import (
+    RightsizingEngine,
+    RightsizingPolicy,
+    UtilizationBatch,
+    row_percentiles,
+)
+from src.finops_aws.dashboard import integrations
+from src.finops_aws.pricing import InstanceCatalog, PriceIndex
+from src.finops_aws.services.base_service import ServiceRecommendation
+from src.finops_aws.services.rightsizing_service import RightsizingService
+
+HOURS = 24 * 14
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Catálogo sobre um índice vazio (preços de referência)"""
+    return InstanceCatalog(price_index=PriceIndex(str(tmp_path)))
+
+
+def flat(value, hours=HOURS):
+    return np.full(hours, float(value))
+
+
+class TestRowPercentiles:
+    """Testes para row_percentiles"""
+
+    def test_matches_nanpercentile(self):
+        """Mesmo resultado de np.nanpercentile, com buracos e linha vazia"""
+        matrix = np.random.default_rng(3).gamma(2.0, 10.0, (200, HOURS))
+        matrix[matrix > 45] = np.nan
+        matrix[7] = np.nan
+
+        result = row_percentiles(matrix, chunk=64)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = np.nanpercentile(matrix, [50, 95, 99], axis=1).T
+        assert np.allclose(result, expected, equal_nan=True)
+        assert np.isnan(result[7]).all()
+
+
+class TestRightsizingEngine:
+    """Testes para RightsizingEngine"""
+
+    def test_cheapest_fit_downsize(self, catalog):
+        """CPU e memória baixas: menor tipo da mesma arquitetura que atende"""
+        batch = UtilizationBatch(
+            'ec2', ['i-1'], ['m5.4xlarge'],
+            cpu=[flat(10)], memory=[flat(20)], network_mbps=[flat(100)]
+        )
+
+        result = RightsizingEngine(catalog).analyze(batch)
+        rec = result.recommendations()[0]
+
+        # 16 vCPU × 10% / 60% = 2.7 vCPU; 64 GiB × 20% / 75% = 17 GiB
+        assert rec.action == 'downsize'
+        assert rec.recommended_type == 'r5.xlarge'
+        assert rec.monthly_savings == pytest.approx((0.768 - 0.252) * 730)
+        assert rec.cpu_percentiles == {'p50': 10.0, 'p95': 10.0, 'p99': 10.0}
+
+    def test_upsize_on_p99_and_keep(self, catalog):
+        """p99 acima do limite força upsize; uso adequado mantém o tipo"""
+        spiky = flat(40)
+        spiky[::20] = 98.0
+        batch = UtilizationBatch(
+            'ec2', ['hot', 'ok'], ['c5.xlarge', 'c5.large'],
+            cpu=[spiky, flat(55)], memory=[flat(50), flat(60)]
+        )
+
+        result = RightsizingEngine(catalog).analyze(batch)
+
+        assert list(result.actions) == ['upsize', 'keep']
+        assert result.recommended_types[0] == 'c5.2xlarge'
+        assert result.monthly_savings[0] < 0
+        assert result.recommended_types[1] == 'c5.large'
+
+    def test_missing_memory_keeps_current_memory(self, catalog):
+        """Sem métrica de memória, a memória atual é preservada"""
+        batch = UtilizationBatch('ec2', ['i-1'], ['r5.2xlarge'], cpu=[flat(5)])
+
+        result = RightsizingEngine(catalog).analyze(batch)
+
+        # 64 GiB mantidos: r5.2xlarge já é o tipo mais barato com essa memória
+        assert list(result.actions) == ['keep']
+        assert result.recommended_types == ['r5.2xlarge']
+        assert result.recommendation(0).memory_percentiles['p95'] is None
+
+    def test_policy_guards(self, catalog):
+        """Poucos pontos, tipo desconhecido e arquitetura preservada"""
+        short = np.full(HOURS, np.nan)
+        short[:10] = 5.0
+        batch = UtilizationBatch(
+            'ec2', ['few', 'unknown', 'arm'], ['m5.xlarge', 'x2iedn.metal', 'm6g.2xlarge'],
+            cpu=[short, flat(5), flat(5)], memory=[flat(10), flat(10), flat(10)]
+        )
+
+        result = RightsizingEngine(catalog).analyze(batch)
+
+        assert list(result.actions) == ['insufficient_data', 'unsupported_type', 'downsize']
+        assert catalog.spec('ec2', result.recommended_types[2]).arch == 'arm64'
+
+        graviton = RightsizingEngine(catalog, RightsizingPolicy(allow_arch_change=True)).analyze(
+            UtilizationBatch('ec2', ['x86'], ['m5.2xlarge'], cpu=[flat(20)], memory=[flat(30)]))
+        assert catalog.spec('ec2', graviton.recommended_types[0]).arch == 'arm64'
+
+    def test_rds_elasticache_and_fargate_candidates(self, catalog):
+        """Candidatos por serviço usam prefixos e o preço por nó/tarefa"""
+        rds = RightsizingEngine(catalog).analyze(UtilizationBatch(
+            'rds', ['db-1'], ['db.r5.4xlarge'], cpu=[flat(8)], memory=[flat(15)], engines=['PostgreSQL']))
+        cache = RightsizingEngine(catalog).analyze(UtilizationBatch(
+            'elasticache', ['cache-1'], ['cache.r5.2xlarge'], cpu=[flat(5)], memory=[flat(20)], counts=[3]))
+        fargate = RightsizingEngine(catalog).analyze(UtilizationBatch(
+            'ecs', ['svc'], ['4vCPU-16GB'], cpu=[flat(10)], memory=[flat(10)], counts=[10]))
+
+        assert rds.recommended_types[0].startswith('db.r5.')
+        assert cache.recommended_types[0].startswith('cache.')
+        current = cache.current_hourly[0] * 3 * 730
+        assert cache.monthly_savings[0] == pytest.approx(current - cache.recommended_hourly[0] * 3 * 730)
+        assert fargate.recommended_types[0] == '1vCPU-3GB'
+        assert fargate.summary()['monthly_savings'] > 0
+
+
+class TestRightsizingService:
+    """RightsizingService com clientes simulados"""
+
+    def test_paginated_discovery_and_batched_metrics(self, catalog):
+        """Frota paginada; GetMetricData em lotes com NextToken"""
+        ec2, cloudwatch = MagicMock(), MagicMock()
+        pages = [{'Reservations': [{'Instances': [
+            {'InstanceId': f'i-{p}{n}', 'InstanceType': 'm5.2xlarge'} for n in range(3)]}]} for p in range(2)]
+        ec2.get_paginator.return_value.paginate.return_value = pages
+
+        calls = []
+
+        def get_metric_data(**params):
+            calls.append(params)
+            start = params['StartTime']
+            stamps = [start + timedelta(hours=h) for h in range(HOURS)]
+            values = {'0': 10.0, '1': 25.0, '2': 1e8, '3': 1e8}
+            results = [{'Id': q['Id'], 'Timestamps': stamps, 'Values': [values[q['Id'][-1]]] * HOURS}
+                       for q in params['MetricDataQueries']]
+            if 'NextToken' not in params:
+                return {'MetricDataResults': results[:2], 'NextToken': 'next'}
+            return {'MetricDataResults': results[2:]}
+
+        cloudwatch.get_metric_data.side_effect = get_metric_data
+        agent_dimensions = [{'Name': 'InstanceId', 'Value': 'i-00'}, {'Name': 'ImageId', 'Value': 'ami-1'},
+                            {'Name': 'InstanceType', 'Value': 'm5.2xlarge'}]
+        cloudwatch.get_paginator.return_value.paginate.return_value = [{'Metrics': [
+            {'Dimensions': agent_dimensions[:1]}, {'Dimensions': agent_dimensions}]}]
+        factory = MagicMock()
+        factory.get_client.side_effect = lambda name, region=None: {'ec2': ec2, 'cloudwatch': cloudwatch}[name]
+        service = RightsizingService(client_factory=factory, catalog=catalog)
+
+        result = service.analyze(['ec2'], days=14)['ec2']
+        recommendations = service.get_recommendations()
+
+        assert len(result) == 6
+        queries = sum(len(c['MetricDataQueries']) for c in calls if 'NextToken' not in c)
+        assert queries == 6 * 4
+        assert all(len(c['MetricDataQueries']) <= 100800 // HOURS for c in calls)
+        assert result.network[0] == pytest.approx(2 * 1e8 * 8 / 3600 / 1e6)
+        assert set(result.actions) == {'downsize'}
+        assert recommendations[0].recommendation_type == 'RIGHTSIZING_DOWNSIZE'
+        assert recommendations[0].estimated_savings > 0
+        assert service.get_metrics().resource_count == 6
+        memory = {q['Id']: q['MetricStat']['Metric']['Dimensions']
+                  for c in calls for q in c['MetricDataQueries'] if q['Id'].endswith('_1')}
+        assert memory['m0_1'] == agent_dimensions
+        assert memory['m1_1'] == [{'Name': 'InstanceId', 'Value': 'i-01'}]
+        cloudwatch.get_paginator.return_value.paginate.assert_called_once_with(
+            Namespace='CWAgent', MetricName='mem_used_percent')
+
+    def test_dashboard_integration(self):
+        """get_rightsizing_recommendations usa os clientes da região pedida"""
+        service = MagicMock()
+        service.get_recommendations.return_value = [ServiceRecommendation(
+            resource_id='db-1', resource_type='rds', recommendation_type='RIGHTSIZING_DOWNSIZE',
+            title='Reduzir db.r5.2xlarge para db.r5.large', description='CPU p95 10%',
+            estimated_savings=123.456, priority='HIGH')]
+        clients = MagicMock()
+
+        with patch('src.finops_aws.services.rightsizing_service.RightsizingService',
+                   return_value=service) as cls:
+            recommendations = integrations.get_rightsizing_recommendations('eu-west-1', clients)
+
+        cls.assert_called_once_with(client_factory=clients, region='eu-west-1')
+        service.analyze.assert_called_once_with()
+        assert recommendations == [{
+            'type': 'RIGHTSIZING_DOWNSIZE_RDS', 'resource_id': 'db-1',
+            'title': 'Right-size RDS: Reduzir db.r5.2xlarge para db.r5.large',
+            'description': 'RDS db-1: CPU p95 10%', 'priority': 'HIGH', 'savings': 123.46,
+            'service': 'FinOps Rightsizing', 'region': 'eu-west-1',
+        }]
+
+    def test_ecs_fargate_discovery(self, catalog):
+        """Serviços Fargate viram tarefas com tamanho da task definition"""
+        ecs = MagicMock()
+        paginators = {
+            'list_clusters': [{'clusterArns': ['arn:aws:ecs:us-east-1:1:cluster/prod']}],
+            'list_services': [{'serviceArns': ['arn:svc/api']}],
+        }
+        ecs.get_paginator.side_effect = lambda name: MagicMock(paginate=MagicMock(return_value=paginators[name]))
+        ecs.describe_services.return_value = {'services': [
+            {'serviceName': 'api', 'taskDefinition': 'api:3', 'desiredCount': 4}]}
+        ecs.describe_task_definition.return_value = {'taskDefinition': {'cpu': '2048', 'memory': '8192'}}
+        factory = MagicMock()
+        factory.get_client.return_value = ecs
+
+        resources = RightsizingService(client_factory=factory, catalog=catalog).discover('ecs')
+
+        assert resources[0].resource_id == 'prod/api'
+        assert resources[0].current_type == '2vCPU-8GB'
+        assert resources[0].count == 4
+        assert dict(resources[0].dimensions) == {'ClusterName': 'prod', 'ServiceName': 'api'}
+
+
+class TestRightsizingBenchmark:
+    """Benchmark do rightsizing vetorizado"""
+
+    @pytest.mark.benchmark
+    def test_fifty_thousand_resources(self, catalog):
+        """50 mil recursos × 14 dias horários (CPU, memória, rede) bem abaixo de 1 minuto"""
+        rng = np.random.default_rng(11)
+        size = 50_000
+        types = np.array(['m5.large', 'm5.2xlarge', 'c5.4xlarge', 'r5.xlarge', 'm6g.xlarge'])
+        batch = UtilizationBatch(
+            'ec2', [f'i-{n}' for n in range(size)], list(types[rng.integers(0, len(types), size)]),
+            cpu=rng.gamma(2.0, 12.0, (size, HOURS)).astype(np.float32),
+            memory=rng.uniform(10, 80, (size, HOURS)).astype(np.float32),
+            network_mbps=rng.gamma(2.0, 50.0, (size, HOURS)).astype(np.float32)
+        )
+
+        started = time.perf_counter()
+        result = RightsizingEngine(catalog).analyze(batch)
+        top = result.recommendations(limit=100)
+        elapsed = time.perf_counter() - started
+
+        assert len(result) == size
+        assert len(top) == 100
+        assert elapsed < 60.0
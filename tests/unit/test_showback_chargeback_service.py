@@ -0,0 +1,115 @@
+"""
+Testes unitários para o chargeback em lote do ShowbackChargebackService
+
+Cobertura: carga única BU×serviço e BU×projeto, divisão entre BUs,
+ajustes vetorizados por regra e exportação colunar das invoices
+"""
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.finops_aws.analytics import set_cost_cube
+from src.finops_aws.services.showback_chargeback_service import (
+    ChargebackRule,
+    ChargebackType,
+    InvoiceStatus,
+    ShowbackChargebackService,
+)
+
+
+def _groups(rows):
+    return [{'Keys': list(keys), 'Metrics': {'UnblendedCost': {'Amount': str(cost)}}}
+            for keys, cost in rows]
+
+
+def _ce_client():
+    """CE com BU×SERVICE paginado em dois meses e BU×Project em uma página"""
+    ce = MagicMock()
+
+    def get_cost_and_usage(**params):
+        second = params['GroupBy'][1]['Key']
+        if second == 'SERVICE':
+            if 'NextPageToken' not in params:
+                return {'NextPageToken': 'p2', 'ResultsByTime': [{'Groups': _groups([
+                    (('BusinessUnit$Finance', 'AmazonEC2'), 100), (('BusinessUnit$Ops', 'AmazonS3'), 20),
+                    (('BusinessUnit$', 'AmazonEC2'), 999),
+                ])}]}
+            return {'ResultsByTime': [{'Groups': _groups([
+                (('BusinessUnit$Finance', 'AmazonEC2'), 50), (('BusinessUnit$Finance', 'Tax'), -5),
+                (('BusinessUnit$Ops', 'AWSLambda'), 30),
+            ])}]}
+        return {'ResultsByTime': [{'Groups': _groups([
+            (('BusinessUnit$Finance', 'Project$ledger'), 150), (('BusinessUnit$Ops', 'Project$'), 50),
+        ])}]}
+    ce.get_cost_and_usage.side_effect = get_cost_and_usage
+    return ce
+
+
+@pytest.fixture
+def service():
+    set_cost_cube(None)
+    factory = MagicMock()
+    factory.get_client.return_value = _ce_client()
+    service = ShowbackChargebackService(client_factory=factory)
+    service._chargeback_rules = [
+        ChargebackRule(rule_id='markup', name='markup', business_unit='*',
+                       chargeback_type=ChargebackType.PROPORTIONAL, allocation_tag='shared',
+                       rate_multiplier=1.1),
+        ChargebackRule(rule_id='fee', name='fee', business_unit='Ops',
+                       chargeback_type=ChargebackType.FIXED, allocation_tag='', fixed_amount=25.0),
+    ]
+    return service
+
+
+class TestBulkChargeback:
+    """Testes para create_chargeback_invoices"""
+
+    def test_one_load_for_all_business_units(self, service):
+        """Três chamadas (duas páginas + projetos) geram invoices de todas as BUs"""
+        ce = service._client_factory.get_client.return_value
+
+        invoices = service.create_chargeback_invoices(datetime(2024, 1, 1), datetime(2024, 3, 1))
+
+        assert ce.get_cost_and_usage.call_count == 3
+        assert [inv.business_unit for inv in invoices] == ['Finance', 'Ops']
+        finance, ops = invoices
+        assert finance.subtotal == pytest.approx(150.0)
+        assert [item['description'] for item in finance.line_items] == ['AWS AmazonEC2']
+        assert finance.by_project == {'ledger': 150.0}
+        assert ops.subtotal == pytest.approx(50.0)
+        assert ops.by_project == {}
+        assert all(inv.status == InvoiceStatus.DRAFT for inv in invoices)
+        assert len(service._invoices) == 2
+
+    def test_adjustments_match_single_invoice_rules(self, service):
+        """Ajustes em lote seguem as mesmas regras do cálculo por BU"""
+        business_units = ['Finance', 'Ops', 'Data']
+        subtotals = np.array([150.0, 50.0, 0.0])
+
+        batch = service._calculate_adjustments_batch(business_units, subtotals)
+
+        expected = [service._calculate_adjustments(bu, sub) for bu, sub in zip(business_units, subtotals)]
+        assert batch.tolist() == pytest.approx(expected)
+        assert batch[1] == pytest.approx(30.0)
+
+    def test_selected_business_units(self, service):
+        """Lista explícita de BUs inclui BU sem custo com invoice zerada"""
+        invoices = service.create_chargeback_invoices(
+            datetime(2024, 1, 1), datetime(2024, 3, 1), business_units=['Ops', 'Data'])
+
+        assert [inv.total for inv in invoices] == pytest.approx([80.0, 0.0])
+
+    def test_export_single_columnar_file(self, service, tmp_path):
+        """Todas as invoices em um único Parquet, uma linha por line item"""
+        pq = pytest.importorskip('pyarrow.parquet')
+        invoices = service.create_chargeback_invoices(datetime(2024, 1, 1), datetime(2024, 3, 1))
+        path = str(tmp_path / 'invoices.parquet')
+
+        rows = service.export_invoices(path, invoices)
+
+        table = pq.read_table(path)
+        assert rows == table.num_rows == 3
+        assert sorted(set(table.column('business_unit').to_pylist())) == ['Finance', 'Ops']
+        assert sum(table.column('amount').to_pylist()) == pytest.approx(200.0)
@@ -0,0 +1,178 @@
+"""
+Testes unitários para o coletor do Trusted Advisor
+
+Cobertura: resumos em lote, download paralelo apenas dos checks
+sinalizados, cache por (checkId, timestamp), recursos sem truncamento com
+economia estimada, controle de refresh e integração do dashboard
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.finops_aws.dashboard import integrations
+from src.finops_aws.dashboard.trusted_advisor_collector import SUMMARY_BATCH_SIZE, TrustedAdvisorCollector
+from src.finops_aws.utils.cache import FinOpsCache
+
+COLUMNS = ['Region/AZ', 'Instance ID', 'Instance Name', 'Instance Type', 'Estimated Monthly Savings']
+
+
+def support_client(checks=60, flagged_every=4, resources=30, delay=0.0, timestamps=None):
+    """Cliente Support com `checks` checks de custo, sinalizados a cada `flagged_every`"""
+    client = MagicMock()
+    timestamps = timestamps if timestamps is not None else {}
+    client.describe_trusted_advisor_checks.return_value = {'checks': [
+        {'id': f'c{n}', 'name': f'Check {n}', 'category': 'cost_optimizing', 'metadata': COLUMNS}
+        for n in range(checks)
+    ] + [{'id': 'sec', 'name': 'Security', 'category': 'security', 'metadata': []}]}
+
+    def summaries(checkIds):
+        return {'summaries': [{
+            'checkId': check_id,
+            'status': 'warning' if int(check_id[1:]) % flagged_every == 0 else 'ok',
+            'timestamp': timestamps.get(check_id, '2024-05-01T00:00:00Z'),
+            'resourcesSummary': {'resourcesFlagged': resources if int(check_id[1:]) % flagged_every == 0 else 0},
+            'categorySpecificSummary': {'costOptimizing': {'estimatedMonthlySavings': 10.0}},
+        } for check_id in checkIds]}
+
+    active = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def result(checkId, language):
+        with lock:
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+        time.sleep(delay)
+        with lock:
+            active['now'] -= 1
+        return {'result': {'checkId': checkId, 'status': 'warning', 'flaggedResources': [
+            {'status': 'warning', 'region': 'us-east-1', 'resourceId': f'hash-{checkId}-{n}', 'isSuppressed': n == 0,
+             'metadata': ['us-east-1a', f'i-{checkId}-{n}', 'web', 'm5.large', '$1,234.50']}
+            for n in range(resources)
+        ]}}
+
+    client.describe_trusted_advisor_check_summaries.side_effect = summaries
+    client.describe_trusted_advisor_check_result.side_effect = result
+    client.active = active
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    FinOpsCache().clear()
+    yield
+    FinOpsCache().clear()
+
+
+class TestTrustedAdvisorCollector:
+    """Testes para TrustedAdvisorCollector"""
+
+    def test_batched_summaries_and_parallel_results(self):
+        """Resumos em lotes; só checks sinalizados baixados, em paralelo"""
+        client = support_client(delay=0.05)
+
+        snapshot = TrustedAdvisorCollector(client, max_workers=8).collect()
+
+        batches = [c.kwargs['checkIds'] for c in client.describe_trusted_advisor_check_summaries.call_args_list]
+        assert [len(b) for b in batches] == [SUMMARY_BATCH_SIZE, 60 - SUMMARY_BATCH_SIZE]
+        assert client.describe_trusted_advisor_check_result.call_count == 15
+        assert client.active['max'] > 1
+        assert len(snapshot.summaries) == 60
+        assert snapshot.summary()['flagged_checks'] == 15
+
+    def test_all_flagged_resources_without_truncation(self):
+        """Todos os recursos (exceto suprimidos), id e economia das colunas"""
+        client = support_client(checks=12, resources=30)
+
+        recommendations = list(TrustedAdvisorCollector(client).collect().iter_recommendations())
+
+        assert len(recommendations) == 3 * 29
+        first = recommendations[0]
+        assert first['resource_id'] == 'i-c0-1'
+        assert first['savings'] == pytest.approx(1234.5)
+        assert first['region'] == 'us-east-1'
+        assert first['type'] == 'TRUSTED_ADVISOR'
+
+    def test_unchanged_checks_not_downloaded_again(self):
+        """Resultado reutilizado enquanto o timestamp do check não muda"""
+        timestamps = {}
+        client = support_client(checks=8, timestamps=timestamps)
+        collector = TrustedAdvisorCollector(client)
+
+        first = collector.collect()
+        timestamps['c4'] = '2024-05-02T00:00:00Z'
+        second = collector.collect()
+
+        assert sorted(first.downloaded) == ['c0', 'c4']
+        assert second.downloaded == ['c4']
+        assert second.reused == ['c0']
+        assert client.describe_trusted_advisor_check_result.call_count == 3
+        assert client.describe_trusted_advisor_checks.call_count == 1
+        assert len(second.to_recommendations()) == len(first.to_recommendations())
+
+    def test_download_errors_are_isolated(self):
+        """Falha em um check não impede os demais"""
+        client = support_client(checks=8)
+        original = client.describe_trusted_advisor_check_result.side_effect
+
+        def flaky(checkId, language):
+            if checkId == 'c4':
+                raise ClientError({'Error': {'Code': 'Throttling'}}, 'DescribeTrustedAdvisorCheckResult')
+            return original(checkId=checkId, language=language)
+
+        client.describe_trusted_advisor_check_result.side_effect = flaky
+
+        snapshot = TrustedAdvisorCollector(client).collect()
+
+        assert snapshot.errors == [{'check_id': 'c4', 'error': 'Throttling'}]
+        assert set(snapshot.results) == {'c0'}
+
+
+class TestTrustedAdvisorRefresh:
+    """Controle de refresh dos checks"""
+
+    def test_refresh_only_stale_checks(self):
+        """Apenas checks mais antigos que o limite são re-executados"""
+        now = datetime(2024, 5, 2, 12, tzinfo=timezone.utc)
+        fresh = (now - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        client = support_client(checks=3, timestamps={'c1': fresh})
+
+        def refresh(checkId):
+            if checkId != 'c0':
+                raise ClientError({'Error': {'Code': 'InvalidParameterValue'}}, 'RefreshTrustedAdvisorCheck')
+            return {'status': {'checkId': checkId, 'status': 'enqueued'}}
+
+        client.refresh_trusted_advisor_check.side_effect = refresh
+        client.describe_trusted_advisor_check_refresh_statuses.return_value = {
+            'statuses': [{'checkId': 'c0', 'status': 'processing'}]}
+        collector = TrustedAdvisorCollector(client)
+
+        statuses = collector.refresh(max_age_seconds=6 * 3600, now=now)
+
+        refreshed = [c.kwargs['checkId'] for c in client.refresh_trusted_advisor_check.call_args_list]
+        assert sorted(refreshed) == ['c0', 'c2']
+        assert statuses == {'c0': 'enqueued'}
+        assert collector.refresh_statuses(['c0']) == {'c0': 'processing'}
+
+
+class TestTrustedAdvisorIntegration:
+    """get_trusted_advisor_recommendations"""
+
+    def test_dashboard_integration_and_subscription_error(self):
+        """Todos os recursos sinalizados; sem suporte Business, aviso informativo"""
+        client = support_client(checks=8, resources=12)
+        with patch('src.finops_aws.dashboard.trusted_advisor_collector.boto3.client', return_value=client):
+            recommendations = integrations.get_trusted_advisor_recommendations()
+
+        FinOpsCache().clear()
+        unsupported = MagicMock()
+        unsupported.describe_trusted_advisor_checks.side_effect = ClientError(
+            {'Error': {'Code': 'SubscriptionRequiredException'}}, 'DescribeTrustedAdvisorChecks')
+        with patch('src.finops_aws.dashboard.trusted_advisor_collector.boto3.client', return_value=unsupported):
+            fallback = integrations.get_trusted_advisor_recommendations()
+
+        assert len(recommendations) == 2 * 11
+        assert fallback[0]['type'] == 'TRUSTED_ADVISOR_UNAVAILABLE'